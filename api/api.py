@@ -0,0 +1,258 @@
+"""
+API Layer.
+This exposes the application services over HTTP with FastAPI.
+
+Handlers are async-first:
+- Reads (balance, summary, ...) run in the threadpool whenever they can
+  block (sharded, SQLite, hot accounts, cold tier) and on the event loop
+  otherwise; either way identical concurrent reads are coalesced into
+  one computation.
+- Writes go through a per-account async queue and execute in a worker
+  thread, so the event loop never blocks on account locks or ledger fsyncs.
+
+Handlers talk to a BankingService, or to a ShardRouter with the same
+interface when accounts are partitioned across shard processes.
+"""
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+import config
+from api.coalescing import RequestCoalescer
+from api.schemas import AccountCreateRequest, AmountRequest, BatchRequest
+from api.write_queue import AccountWriteQueues, WriteQueueFullError
+from application.banking_service import BankingService
+from application.ledger_export import FORMATS, MEDIA_TYPES, NDJSON, export_ledger
+from domain.entities.transaction import TransactionType
+from domain.Exceptions.exception_error import BankingError, IdempotencyKeyReusedError, VelocityLimitExceededError
+from infrastructure import metrics
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.repository.factory import build_idempotency_cache, build_repositories
+from infrastructure.sharding.shard_router import ShardRouter, ShardUnavailableError
+
+
+def build_banking():
+    """
+    Create the service the handlers call.
+
+    With config.SHARD_COUNT set, accounts live in shard processes (see
+    infrastructure.sharding) and every API worker routes to them; otherwise
+    they live in this process.
+    """
+    if config.SHARD_COUNT:
+        return ShardRouter()
+    lock_manager = StripedLockManager()
+    account_repository, transaction_repository = build_repositories(lock_manager)
+    return BankingService(account_repository, transaction_repository, lock_manager, build_idempotency_cache())
+
+
+banking = build_banking()
+
+
+
+def _reads_can_block() -> bool:
+    """
+    Whether a read may wait on I/O or a lock, which must not happen on the event loop.
+
+    Shard calls wait on a socket, SQLite reads on a pooled connection and
+    the disk, hot-account reads on slot and stripe locks, and cold-tier
+    reads on the segment files. Only plain in-memory reads never wait.
+    """
+    return (bool(config.SHARD_COUNT) or config.REPOSITORY_BACKEND != "memory"
+            or config.HOT_ACCOUNTS_ENABLED or config.COLD_TIER_ENABLED)
+
+
+if config.API_OFFLOAD_READS == "auto":
+    OFFLOAD_READS = _reads_can_block()
+else:
+    OFFLOAD_READS = config.API_OFFLOAD_READS == "1"
+
+read_coalescer = RequestCoalescer()
+write_queues = AccountWriteQueues()
+
+app = FastAPI(title=config.APP_NAME, version=config.APP_VERSION, debug=config.DEBUG)
+router = APIRouter(prefix=config.API_PREFIX)
+
+
+def _http_error(error: Exception) -> HTTPException:
+    """Translate a service error into an HTTP error."""
+    if isinstance(error, ShardUnavailableError):
+        return HTTPException(status_code=503, detail=str(error))
+    if isinstance(error, IdempotencyKeyReusedError):
+        return HTTPException(status_code=409, detail=str(error))
+    if isinstance(error, VelocityLimitExceededError):
+        return HTTPException(status_code=429, detail=str(error))
+    message = str(error)
+    if "not found" in message.lower():
+        return HTTPException(status_code=404, detail=message)
+    return HTTPException(status_code=400, detail=message)
+
+
+async def _read(key, func, *args):
+    try:
+        return await read_coalescer.run(key, func, *args, offload=OFFLOAD_READS)
+    except (ValueError, BankingError, ShardUnavailableError) as e:
+        raise _http_error(e)
+
+
+async def _write(account_id: str, func, *args):
+    try:
+        return await write_queues.submit(account_id, func, *args)
+    except WriteQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except (ValueError, BankingError, ShardUnavailableError) as e:
+        raise _http_error(e)
+
+
+@router.post("/accounts", status_code=201)
+async def create_account(request: AccountCreateRequest):
+    try:
+        return await run_in_threadpool(
+            banking.create_account, request.account_type, request.initial_deposit, request.owner_name
+        )
+    except (ValueError, BankingError, ShardUnavailableError) as e:
+        raise _http_error(e)
+
+
+@router.get("/accounts")
+async def list_accounts(offset: int = 0, limit: int = config.HISTORY_PAGE_DEFAULT, after: Optional[str] = None):
+    limit = max(1, min(limit, config.HISTORY_PAGE_MAX))
+    return await _read(("accounts", offset, limit, after), banking.list_accounts, max(offset, 0), limit, after)
+
+
+@router.get("/accounts/{account_id}")
+async def get_account(account_id: str):
+    return await _read(("account", account_id), banking.get_account, account_id)
+
+
+@router.get("/accounts/{account_id}/balance")
+async def get_balance(account_id: str, as_of: Optional[datetime] = None):
+    if as_of is not None:
+        return await _read(("balance", account_id, as_of), banking.get_balance_as_of, account_id, as_of)
+    return await _read(("balance", account_id), banking.get_balance, account_id)
+
+
+@router.get("/accounts/{account_id}/summary")
+async def get_account_summary(account_id: str):
+    return await _read(("summary", account_id), banking.get_account_summary, account_id)
+
+
+@router.get("/accounts/{account_id}/transactions")
+async def get_transaction_history(account_id: str, limit: int = config.HISTORY_PAGE_DEFAULT,
+                                  cursor: Optional[str] = None, since: Optional[datetime] = None,
+                                  until: Optional[datetime] = None,
+                                  transaction_type: Optional[str] = None):
+    key = ("history", account_id, limit, cursor, since, until, transaction_type)
+    return await _read(key, banking.get_transaction_history_page,
+                       account_id, limit, cursor, since, until, transaction_type)
+
+
+@router.get("/accounts/{account_id}/rollups")
+async def get_account_rollups(account_id: str, start: Optional[date] = None, end: Optional[date] = None,
+                              granularity: Optional[str] = None):
+    key = ("rollups", account_id, start, end, granularity)
+    return await _read(key, banking.get_period_report, account_id, None, start, end, granularity)
+
+
+@router.post("/accounts/{account_id}/deposit", status_code=201)
+async def deposit(account_id: str, request: AmountRequest,
+                  idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
+    return await _write(account_id, banking.deposit, account_id, request.amount, request.description,
+                        idempotency_key)
+
+
+@router.post("/accounts/{account_id}/withdraw", status_code=201)
+async def withdraw(account_id: str, request: AmountRequest,
+                   idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
+    return await _write(account_id, banking.withdraw, account_id, request.amount, request.description,
+                        idempotency_key)
+
+
+@router.get("/transactions/{transaction_id}")
+async def get_transaction(transaction_id: str):
+    return await _read(("transaction", transaction_id), banking.get_transaction, transaction_id)
+
+
+@router.post("/transactions/batch")
+async def apply_batch(request: BatchRequest):
+    postings = [posting.model_dump() for posting in request.postings]
+    # A batch can be large: run it in a worker thread, not on the event loop
+    try:
+        return await run_in_threadpool(banking.apply_batch, postings, request.atomic)
+    except (ValueError, ShardUnavailableError) as e:
+        raise _http_error(e)
+
+
+def _export_response(account_id: Optional[str], export_format: str, compress: bool,
+                     since: Optional[datetime], until: Optional[datetime],
+                     transaction_type: Optional[str]) -> StreamingResponse:
+    """
+    Stream a ledger export.
+
+    Parameters are validated before the first byte is sent: once streaming
+    has started the status code can no longer change.
+    """
+    if export_format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown export format: {export_format}")
+    if transaction_type is not None and transaction_type.upper() not in TransactionType.__members__:
+        raise HTTPException(status_code=400, detail=f"Unknown transaction type: {transaction_type}")
+    # A sync iterator: Starlette pulls it from the threadpool, so shard calls don't block the loop
+    body = export_ledger(banking, account_id, export_format, compress,
+                         since=since, until=until, transaction_type=transaction_type)
+    filename = f"ledger-{account_id or 'all'}.{export_format}" + (".gz" if compress else "")
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if compress else MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/accounts/{account_id}/export")
+async def export_account_ledger(account_id: str, format: str = NDJSON, gzip: bool = False,
+                                since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                transaction_type: Optional[str] = None):
+    await _read(("account", account_id), banking.get_account, account_id)
+    return _export_response(account_id, format, gzip, since, until, transaction_type)
+
+
+@router.get("/export")
+async def export_all_ledgers(format: str = NDJSON, gzip: bool = False,
+                             since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             transaction_type: Optional[str] = None):
+    """Every account's ledger in one stream, for nightly reconciliation."""
+    return _export_response(None, format, gzip, since, until, transaction_type)
+
+
+@router.get("/rollups")
+async def get_type_rollups(account_type: str, start: Optional[date] = None, end: Optional[date] = None,
+                           granularity: Optional[str] = None):
+    """Period totals across every account of a type, for BI extracts."""
+    key = ("rollups", None, account_type, start, end, granularity)
+    return await _read(key, banking.get_period_report, None, account_type, start, end, granularity)
+
+
+@router.get("/balances")
+async def get_balances_as_of(as_of: datetime, account_id: Optional[List[str]] = Query(None)):
+    """Balances at one cut-off for the given accounts (all of them if none), for month-end reports."""
+    key = ("balances", as_of, tuple(account_id) if account_id else None)
+    return await _read(key, banking.get_balances_as_of, as_of, account_id)
+
+
+@router.get("/stats")
+async def get_bank_totals():
+    return await _read(("stats",), banking.get_bank_totals)
+
+
+app.include_router(router)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint (outside the API prefix, as scrapers expect)."""
+    if not config.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    families = await run_in_threadpool(banking.collect_metrics)
+    return PlainTextResponse(metrics.render(families), media_type="text/plain; version=0.0.4")
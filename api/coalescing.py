@@ -0,0 +1,73 @@
+"""
+Request coalescing for hot read endpoints.
+
+Concurrent identical reads (same endpoint, same account) share a single
+in-flight computation: the first request computes, every request that
+arrives while it is running awaits the same future.
+"""
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+
+
+class RequestCoalescer:
+    """
+    Deduplicates concurrent calls by key on one event loop.
+    """
+
+    def __init__(self, executor=None):
+        """
+        Initialize the coalescer.
+
+        Args:
+            executor: Executor for offloaded computations (asyncio's default if None)
+        """
+        self._executor = executor
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.computed = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, func: Callable[..., Any], *args, offload: bool = False) -> Any:
+        """
+        Run func(*args), or join an identical call already in flight.
+
+        In-memory reads are O(1), so they run inline on the event loop and
+        never occupy a threadpool worker. An inline call first yields to
+        the loop once, so identical requests already waiting to run join it
+        instead of each computing in turn. Reads that can block (persistent
+        backends, locks) pass offload=True; that is where waiting requests
+        pile up and coalescing saves the most work.
+
+        Args:
+            key: Identity of the computation, e.g. ("summary", account_id)
+            func: Synchronous function computing the result
+            offload: Run func in the executor instead of inline
+
+        Returns:
+            Any: The shared result
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        self.computed += 1
+        try:
+            if offload:
+                result = await loop.run_in_executor(self._executor, func, *args)
+            else:
+                # Let requests queued behind this one reach the in-flight check
+                await asyncio.sleep(0)
+                result = func(*args)
+        except BaseException as error:
+            future.set_exception(error)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
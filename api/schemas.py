@@ -0,0 +1,29 @@
+"""
+Request models for the Banking API.
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class AccountCreateRequest(BaseModel):
+    account_type: str = Field(..., description="Key of config.ACCOUNT_CLASSES, e.g. 'checking'")
+    initial_deposit: float = 0.0
+    owner_name: Optional[str] = None
+
+
+class AmountRequest(BaseModel):
+    amount: float
+    description: Optional[str] = None
+
+
+class PostingRequest(BaseModel):
+    account_id: str
+    type: str = Field(..., description="'deposit' or 'withdraw'")
+    amount: float
+    description: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    postings: List[PostingRequest]
+    atomic: bool = True
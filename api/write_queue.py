@@ -0,0 +1,86 @@
+"""
+Per-account async write queues.
+
+Writes for one account are executed strictly in arrival order by a single
+drain task, each write running in a worker thread so the event loop never
+blocks on repository I/O or account locks. Writes to different accounts
+drain concurrently. A queue and its task exist only while the account has
+pending writes.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Callable, Dict, Hashable
+
+import config
+
+
+class WriteQueueFullError(Exception):
+    """Raised when an account already has too many writes pending."""
+    pass
+
+
+class AccountWriteQueues:
+    """
+    Serializes writes per account off the event loop.
+    """
+
+    def __init__(self, executor=None, max_pending: int = None):
+        """
+        Initialize the queues.
+
+        Args:
+            executor: Executor the writes run in (asyncio's default if None)
+            max_pending: Per-account queue depth (defaults to config.API_WRITE_QUEUE_DEPTH)
+        """
+        self._executor = executor
+        self.max_pending = config.API_WRITE_QUEUE_DEPTH if max_pending is None else max_pending
+        self._queues: Dict[Hashable, deque] = {}
+
+    def pending(self, account_id: Hashable) -> int:
+        """Number of writes queued or running for an account."""
+        queue = self._queues.get(account_id)
+        return len(queue) if queue is not None else 0
+
+    async def submit(self, account_id: Hashable, func: Callable[..., Any], *args) -> Any:
+        """
+        Queue func(*args) behind the account's earlier writes and await it.
+
+        Args:
+            account_id: Account the write belongs to
+            func: Synchronous write, e.g. transaction_service.deposit
+            *args: Arguments for func
+
+        Returns:
+            Any: func's result
+
+        Raises:
+            WriteQueueFullError: If the account's queue is full
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(account_id)
+        if queue is None:
+            queue = self._queues[account_id] = deque()
+            loop.create_task(self._drain(account_id, queue))
+        elif len(queue) >= self.max_pending:
+            raise WriteQueueFullError(f"Too many pending writes for account {account_id}")
+
+        future = loop.create_future()
+        queue.append((func, args, future))
+        return await future
+
+    async def _drain(self, account_id: Hashable, queue: deque) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while queue:
+                func, args, future = queue[0]
+                try:
+                    result = await loop.run_in_executor(self._executor, func, *args)
+                except Exception as error:
+                    if not future.done():
+                        future.set_exception(error)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                queue.popleft()
+        finally:
+            del self._queues[account_id]
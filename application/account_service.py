@@ -8,27 +8,32 @@ from domain.Exceptions.exception_error import (
     OverdraftExceededError, 
     InsufficientDepositError  # Now this will work
 )
-from domain.services.business_rules import BusinessRuleService
+from domain.services.rule_registry import RULES
 
 class AccountCreationService:
-    def __init__(self, account_repository, business_rule_service=None):
+    def __init__(self, account_repository, rules=None):
         self.account_repository = account_repository
-        self.business_rules = business_rule_service or BusinessRuleService()
+        self.rules = rules or RULES
 
     def create_account(
         self,
         account_class: Type[Account],  # Pass CheckingAccount or SavingsAccount directly
         initial_deposit: float = 0.0,
-        owner_name: Optional[str] = None
+        owner_name: Optional[str] = None,
+        account_id: Optional[str] = None
     ) -> str:
-        """Create an account using the class."""
-        min_deposit = self.business_rules.get_minimum_initial_deposit(account_class)
-        if initial_deposit < min_deposit:
-            raise InsufficientDepositError(f"Minimum deposit: {min_deposit}")
+        """
+        Create an account using the class.
+
+        account_id is normally generated here; a shard router passes one in
+        because it needs the ID to pick the owning shard before creation.
+        """
+        self.rules.table.for_class(account_class).check_opening(initial_deposit)
 
         account = account_class(
-            account_id=str(uuid4()),
+            account_id=account_id or str(uuid4()),
             balance=initial_deposit,
+            creation_date=datetime.now(),
             owner_name=owner_name
         )
         self.account_repository.create_account(account)
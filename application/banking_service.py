@@ -0,0 +1,343 @@
+"""
+Banking Service in the Application Layer.
+This is the single entry point the API talks to.
+
+Every method returns plain, picklable data (dicts and lists) rather than
+entities, so the same interface can be served in-process or from a shard
+process on the other side of a socket (see infrastructure.sharding).
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from application.account_service import AccountCreationService
+from application.transaction_service import TransactionService
+from domain.entities.checkingAccount import CheckingAccount
+from domain.entities.savingsAccount import SavingsAccount
+from domain.services.rule_registry import RULES
+from infrastructure.repository.period_rollups import to_day
+
+ACCOUNT_CLASS_TYPES = {cls.__name__: cls for cls in (CheckingAccount, SavingsAccount)}
+
+
+class BankingService:
+    """
+    Facade over account creation, postings and queries.
+    """
+
+    def __init__(self, account_repository, transaction_repository, lock_manager=None, idempotency=None,
+                 rules=None):
+        """
+        Initialize the facade and the services behind it.
+
+        Args:
+            account_repository: Repository for account persistence
+            transaction_repository: Repository for transaction persistence
+            lock_manager: Per-account lock manager shared with background jobs
+            idempotency: IdempotencyCache for keyed deposits and withdrawals
+            rules: RuleRegistry for account types and opening rules (the process-wide one if omitted)
+        """
+        self.account_repository = account_repository
+        self.transaction_repository = transaction_repository
+        self.rules = rules or RULES
+        self.account_service = AccountCreationService(account_repository, self.rules)
+        self.transaction_service = TransactionService(
+            account_repository, transaction_repository, lock_manager, idempotency=idempotency
+        )
+
+    def create_account(self, account_type: str, initial_deposit: float = 0.0,
+                       owner_name: Optional[str] = None, account_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Open an account.
+
+        Args:
+            account_type: Key of config.ACCOUNT_CLASSES, e.g. "checking"
+            initial_deposit: Opening balance
+            owner_name: Optional owner name
+            account_id: Pre-assigned ID (generated if None)
+
+        Returns:
+            Dict: The new account's info
+
+        Raises:
+            ValueError: If the account type is unknown
+        """
+        rules = self.rules.for_type(account_type)
+        if rules is None:
+            raise ValueError(f"Unknown account type: {account_type}")
+        account_id = self.account_service.create_account(
+            ACCOUNT_CLASS_TYPES[rules.class_name], initial_deposit, owner_name, account_id
+        )
+        return self.get_account(account_id)
+
+    def get_account(self, account_id: str) -> Dict[str, Any]:
+        """
+        Get an account's info.
+
+        Raises:
+            ValueError: If the account doesn't exist
+        """
+        account = self.account_repository.get_account_by_id(account_id)
+        if not account:
+            raise ValueError(f"Account not found: {account_id}")
+        return self._account_info(account)
+
+    def _account_info(self, account) -> Dict[str, Any]:
+        info = account.get_account_info()
+        # Deposits still pending in hot-account slots count towards the balance
+        info["balance"] = self.transaction_service.current_balance(account)
+        return info
+
+    def get_balance(self, account_id: str) -> Dict[str, Any]:
+        """
+        Get an account's current balance.
+
+        Raises:
+            ValueError: If the account doesn't exist
+        """
+        account = self.account_repository.get_account_by_id(account_id)
+        if not account:
+            raise ValueError(f"Account not found: {account_id}")
+        return {"account_id": account_id, "balance": self.transaction_service.current_balance(account)}
+
+    def get_balance_as_of(self, account_id: str, at) -> Dict[str, Any]:
+        """
+        Get an account's balance at a point in time.
+
+        The balance is the opening balance recorded when the account was
+        created plus every posting at or before the cut-off, found from the
+        nearest balance checkpoint (see TransactionRepository.get_net_change_as_of).
+
+        Args:
+            account_id: ID of the account
+            at: Cut-off (datetime, date for its midnight, or ISO string);
+                postings at exactly that time are included
+
+        Returns:
+            Dict: Account ID, cut-off and balance (None if the account was not open yet)
+
+        Raises:
+            ValueError: If the account doesn't exist or has no recorded opening balance
+        """
+        at = _to_datetime(at)
+        account = self.account_repository.get_account_by_id(account_id)
+        if not account:
+            raise ValueError(f"Account not found: {account_id}")
+        self.transaction_service.consolidate(account_id)
+        balance = None
+        if _opened_by(account, at):
+            balance = _opening_balance(account) + self.transaction_repository.get_net_change_as_of(account_id, at)
+        return {"account_id": account_id, "as_of": at.isoformat(), "balance": balance}
+
+    def get_balances_as_of(self, at, account_ids: Iterable[str] = None) -> Dict[str, Any]:
+        """
+        Get many accounts' balances at the same point in time, e.g. for month-end reports.
+
+        Args:
+            at: Cut-off (see get_balance_as_of)
+            account_ids: Accounts to report on (every account if None)
+
+        Returns:
+            Dict: Cut-off and account ID -> balance (None for accounts not open yet)
+
+        Raises:
+            ValueError: If an account doesn't exist or can't be answered for that time
+        """
+        at = _to_datetime(at)
+        if account_ids is None:
+            accounts = list(self.account_repository.accounts.values())
+        else:
+            accounts = []
+            for account_id in account_ids:
+                account = self.account_repository.get_account_by_id(account_id)
+                if not account:
+                    raise ValueError(f"Account not found: {account_id}")
+                accounts.append(account)
+        self.transaction_service.consolidate()
+        balances = {account.account_id: None for account in accounts}
+        opened = [account for account in accounts if _opened_by(account, at)]
+        net_changes = self.transaction_repository.get_net_changes_as_of(
+            [account.account_id for account in opened], at
+        )
+        for account in opened:
+            balances[account.account_id] = _opening_balance(account) + net_changes[account.account_id]
+        return {"as_of": at.isoformat(), "balances": balances}
+
+    def get_account_summary(self, account_id: str) -> Dict[str, Any]:
+        """See TransactionService.get_account_summary."""
+        return self.transaction_service.get_account_summary(account_id)
+
+    def get_period_report(self, account_id: str = None, account_type: str = None, start=None, end=None,
+                          granularity: str = None) -> Dict[str, Any]:
+        """
+        Deposit/withdrawal totals over a date range, from the period rollups.
+
+        The cost depends on the number of day/month buckets in the range,
+        not on the number of transactions.
+
+        Args:
+            account_id: Account to report on
+            account_type: Or every account of a type (key of config.ACCOUNT_CLASSES)
+            start: First day, inclusive (unbounded if None)
+            end: Last day, exclusive (unbounded if None)
+            granularity: Also list the totals of each "day" or "month" starting in the range
+
+        Returns:
+            Dict: The scope and range, totals and, with a granularity, one entry per non-empty period
+
+        Raises:
+            ValueError: If the account or type doesn't exist, or a parameter is invalid
+        """
+        account_class = None
+        if account_id is not None:
+            if not self.account_repository.get_account_by_id(account_id):
+                raise ValueError(f"Account not found: {account_id}")
+        elif account_type is not None:
+            rules = self.rules.for_type(account_type)
+            if rules is None:
+                raise ValueError(f"Unknown account type: {account_type}")
+            account_type, account_class = rules.account_type, rules.class_name
+        start, end = to_day(start), to_day(end)
+        # Pending hot-account deposits are only in the rollups once consolidated
+        self.transaction_service.consolidate(account_id)
+
+        totals = self.transaction_repository.get_period_totals(account_id, account_class, start, end)
+        report = {
+            "account_id": account_id,
+            "account_type": None if account_id is not None else account_type,
+            "start": start.isoformat() if start is not None else None,
+            "end": end.isoformat() if end is not None else None,
+            "totals": totals.to_dict()
+        }
+        if granularity is not None:
+            periods = self.transaction_repository.get_period_rollups(
+                granularity, account_id, account_class, start, end
+            )
+            report["granularity"] = granularity
+            report["periods"] = [
+                dict(period=period_start.isoformat(), **period_totals.to_dict())
+                for period_start, period_totals in periods
+            ]
+        return report
+
+    def deposit(self, account_id: str, amount: float, description: str = None,
+                idempotency_key: str = None) -> Dict[str, Any]:
+        """Deposit funds and return the transaction's info (see TransactionService.deposit)."""
+        return self.transaction_service.deposit(
+            account_id, amount, description, idempotency_key
+        ).get_transaction_info()
+
+    def withdraw(self, account_id: str, amount: float, description: str = None,
+                 idempotency_key: str = None) -> Dict[str, Any]:
+        """Withdraw funds and return the transaction's info (see TransactionService.withdraw)."""
+        return self.transaction_service.withdraw(
+            account_id, amount, description, idempotency_key
+        ).get_transaction_info()
+
+    def apply_batch(self, postings: Iterable[Dict[str, Any]], atomic: bool = True) -> Dict[str, Any]:
+        """See TransactionService.apply_batch."""
+        return self.transaction_service.apply_batch(postings, atomic)
+
+    def get_transaction(self, transaction_id) -> Dict[str, Any]:
+        """
+        Get a transaction's info.
+
+        Raises:
+            ValueError: If the transaction doesn't exist
+        """
+        return self.transaction_service.get_transaction_by_id(transaction_id).get_transaction_info()
+
+    def get_transaction_history_page(self, account_id: str, limit: int = None, cursor: str = None,
+                                     since=None, until=None, transaction_type=None) -> Dict[str, Any]:
+        """See TransactionService.get_transaction_history_page; transactions are returned as info dicts."""
+        page = self.transaction_service.get_transaction_history_page(
+            account_id, limit, cursor=cursor, since=since, until=until, transaction_type=transaction_type
+        )
+        page["transactions"] = [t.get_transaction_info() for t in page["transactions"]]
+        return page
+
+    def list_accounts(self, offset: int = 0, limit: int = None, after: str = None) -> List[Dict[str, Any]]:
+        """
+        List accounts in creation order.
+
+        The page is cut by the repository, so a database backend reads only
+        its rows. Walking every account page by page with after costs O(N)
+        overall, where growing offsets cost O(N^2).
+
+        Args:
+            offset: Accounts to skip (not combined with after)
+            limit: Maximum accounts returned (all if None)
+            after: ID of the last account of the previous page
+
+        Returns:
+            List[Dict]: Account infos
+
+        Raises:
+            ValueError: If both offset and after are given, or the after account doesn't exist
+        """
+        if after is not None and offset:
+            raise ValueError("Page by offset or by after, not both")
+        accounts = self.account_repository.get_accounts_page(offset, limit, after)
+        return [self._account_info(account) for account in accounts]
+
+    def count_accounts(self) -> int:
+        """Number of accounts."""
+        return len(self.account_repository.accounts)
+
+    def collect_metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot this process's metrics.
+
+        Returns:
+            Dict: See MetricsRegistry.collect
+        """
+        return self.transaction_service.metrics.collect()
+
+    def get_bank_totals(self) -> Dict[str, Any]:
+        """
+        Aggregate figures across every account.
+
+        Returns:
+            Dict: Account count, total balance and account count per type
+        """
+        accounts = list(self.account_repository.accounts.values())
+        by_type = {}
+        for account in accounts:
+            by_type[account.account_type] = by_type.get(account.account_type, 0) + 1
+        return {
+            "accounts": len(accounts),
+            "total_balance": sum(self.transaction_service.current_balance(account) for account in accounts),
+            "accounts_by_type": by_type
+        }
+
+
+def _to_datetime(value) -> datetime:
+    """
+    Normalise a point in time.
+
+    Raises:
+        ValueError: If the value is not a datetime, date or ISO string
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    raise ValueError(f"Invalid point in time: {value!r}")
+
+
+def _opened_by(account, at: datetime) -> bool:
+    """Whether the account existed at the given time (accounts without a creation date always did)."""
+    return account.creation_date is None or account.creation_date.timestamp() <= at.timestamp()
+
+
+def _opening_balance(account) -> float:
+    """
+    The balance the account was opened with.
+
+    Raises:
+        ValueError: If it was not recorded (accounts opened before it was kept)
+    """
+    if account.opening_balance is None:
+        raise ValueError(f"No opening balance recorded for account {account.account_id}")
+    return account.opening_balance
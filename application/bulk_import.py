@@ -0,0 +1,398 @@
+"""
+Bulk Import in the Application Layer.
+This loads JSON Lines migration files (accounts and their transactions)
+straight into the repositories.
+
+One record per line:
+
+    {"record": "account", "account_id": "A1", "account_type": "checking",
+     "initial_deposit": 500.0, "owner_name": "Ada", "creation_date": "2023-06-01T00:00:00"}
+    {"record": "transaction", "account_id": "A1", "type": "deposit", "amount": 25.0,
+     "description": "Salary", "timestamp": "2024-01-31T09:00:00", "transaction_id": "T1"}
+
+account_id and creation_date are optional for accounts, and transaction_id
+and timestamp are optional for transactions. Blank lines are ignored.
+
+An account is never dated after its earliest posting, so balance-as-of
+queries cover the whole imported history: without a creation_date it is
+dated at its earliest posting in the same chunk (or the import time if it
+has none), and a posting in a later chunk dated before the opening moves
+the opening back (as a ledger replay does too).
+
+The file is memory-mapped and cut into chunks on line boundaries. Worker
+processes parse and validate the chunks (shape, types, account class and
+minimum initial deposit, positive amounts). The main process applies them
+in file order, because balances depend on it. Every posting goes through
+the entity's deposit/withdraw rules on a working copy of its account.
+Each chunk is written with the bulk paths (create_accounts,
+save_transactions, one update_account per touched account) in a single
+unit of work.
+
+Bad lines are reported with their byte offset and line number and skipped.
+After every committed chunk a checkpoint records how far the import got,
+so an interrupted run can resume. Generated account and transaction IDs
+are derived from the import and the line's offset, so a chunk replayed
+after a crash is rejected line by line as duplicates rather than opened or
+posted twice.
+
+Run from the repository root (state goes to the configured backend, so
+set LEDGER_DIR or REPOSITORY_BACKEND=sqlite):
+    python -m application.bulk_import migration.jsonl --resume
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from hashlib import blake2b
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import config
+from application.banking_service import ACCOUNT_CLASS_TYPES
+from application.checkpoints import load_checkpoint, save_checkpoint
+from application.transaction_service import _working_copy
+from domain.Exceptions.exception_error import BankingError
+from domain.entities.transaction import Transaction, TransactionType
+from domain.services.rule_registry import RULES
+
+ACCOUNT_RECORD = "account"
+TRANSACTION_RECORD = "transaction"
+
+_TRANSACTION_TYPES = {"deposit": TransactionType.DEPOSIT, "withdraw": TransactionType.WITHDRAW}
+
+
+def chunk_boundaries(path: str, chunk_bytes: int, start: int = 0) -> List[Tuple[int, int]]:
+    """
+    Cut a file into byte ranges that end on line boundaries.
+
+    Args:
+        path: Input file
+        chunk_bytes: Approximate chunk size
+        start: Offset to start from (must be at the start of a line)
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) offsets covering [start, file size)
+    """
+    size = os.path.getsize(path)
+    if start >= size:
+        return []
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        boundaries = []
+        while start < size:
+            cut = data.find(b"\n", min(start + chunk_bytes, size) - 1)
+            end = size if cut == -1 else cut + 1
+            boundaries.append((start, end))
+            start = end
+    return boundaries
+
+
+def _number(record: Dict[str, Any], field: str, default=None) -> float:
+    value = record.get(field, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{field} must be a number")
+    return float(value)
+
+
+def _parse_line(line: bytes) -> tuple:
+    """Validate one line; returns a compact record tuple or raises ValueError."""
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("Line is not a JSON object")
+    kind = record.get("record")
+
+    if kind == ACCOUNT_RECORD:
+        rules = RULES.for_type(str(record.get("account_type", "")))
+        if rules is None:
+            raise ValueError(f"Unknown account type: {record.get('account_type')}")
+        initial_deposit = _number(record, "initial_deposit", 0.0)
+        rules.check_opening(initial_deposit)
+        owner_name = record.get("owner_name")
+        creation_date = record.get("creation_date")
+        if creation_date is not None:
+            creation_date = datetime.fromisoformat(str(creation_date)).timestamp()
+        return (ACCOUNT_RECORD, record.get("account_id"), rules.class_name, initial_deposit,
+                None if owner_name is None else str(owner_name), creation_date)
+
+    if kind == TRANSACTION_RECORD:
+        account_id = record.get("account_id")
+        if account_id is None:
+            raise ValueError("Missing field: account_id")
+        type_name = str(record.get("type", record.get("transaction_type", ""))).lower()
+        if type_name not in _TRANSACTION_TYPES:
+            raise ValueError(f"Unknown transaction type: {record.get('type')}")
+        if "amount" not in record:
+            raise ValueError("Missing field: amount")
+        amount = _number(record, "amount")
+        if not amount > 0:
+            raise ValueError("Amount must be positive")
+        timestamp = record.get("timestamp")
+        if timestamp is not None:
+            timestamp = datetime.fromisoformat(str(timestamp)).timestamp()
+        description = record.get("description")
+        return (TRANSACTION_RECORD, account_id, type_name, amount,
+                None if description is None else str(description), timestamp, record.get("transaction_id"))
+
+    raise ValueError(f"Unknown record kind: {kind!r}")
+
+
+def parse_chunk(path: str, start: int, end: int) -> Tuple[List[tuple], List[tuple], int]:
+    """
+    Parse and validate the lines in [start, end) of a file (runs in a worker process).
+
+    Returns:
+        Tuple: (records, errors, line count). Records are (offset, line index
+            in chunk, record tuple); errors are (offset, line index, message).
+    """
+    records, errors = [], []
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        chunk = data[start:end]
+    position = 0
+    index = 0
+    for index, line in enumerate(chunk.split(b"\n")):
+        offset = start + position
+        position += len(line) + 1
+        if not line.strip():
+            continue
+        try:
+            records.append((offset, index, _parse_line(line)))
+        except (ValueError, TypeError, KeyError, BankingError) as e:
+            errors.append((offset, index, str(e) or type(e).__name__))
+    # A chunk ending in a newline splits into one trailing empty piece
+    return records, errors, index + (0 if chunk.endswith(b"\n") else 1)
+
+
+class BulkImporter:
+    """
+    Loads JSONL migration files into the repositories through the bulk paths.
+    """
+
+    def __init__(self, account_repository, transaction_repository, lock_manager=None,
+                 workers: int = None, chunk_bytes: int = None):
+        """
+        Initialize the importer.
+
+        Args:
+            account_repository: Repository the accounts go to
+            transaction_repository: Repository the transactions go to
+            lock_manager: Per-account lock manager shared with live services (optional)
+            workers: Parser processes (defaults to config.IMPORT_WORKERS)
+            chunk_bytes: Bytes per parsed chunk (defaults to config.IMPORT_CHUNK_BYTES)
+        """
+        self.account_repository = account_repository
+        self.transaction_repository = transaction_repository
+        self.lock_manager = lock_manager
+        self.workers = workers or config.IMPORT_WORKERS
+        self.chunk_bytes = chunk_bytes or config.IMPORT_CHUNK_BYTES
+
+    def run(self, path: str, checkpoint_path: Optional[str] = None, resume: bool = False,
+            errors_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Import a file.
+
+        Args:
+            path: JSONL input
+            checkpoint_path: Where progress is recorded (defaults to <path>.checkpoint.json)
+            resume: Continue from the checkpoint instead of starting over
+            errors_path: JSONL report of bad lines (defaults to <path>.errors.jsonl)
+
+        Returns:
+            Dict: The final checkpoint: offsets, line/account/transaction/error counts
+
+        Raises:
+            ValueError: If the checkpoint belongs to a different file
+        """
+        path = os.path.abspath(path)
+        checkpoint_path = checkpoint_path or path + ".checkpoint.json"
+        errors_path = errors_path or path + ".errors.jsonl"
+
+        state = load_checkpoint(checkpoint_path) if resume else None
+        if state is not None and state["input"] != path:
+            raise ValueError(f"Checkpoint {checkpoint_path} is for {state['input']}")
+        if state is None:
+            state = {"input": path, "import_id": uuid.uuid4().hex, "offset": 0, "lines": 0,
+                     "accounts": 0, "transactions": 0, "errors": 0, "complete": False}
+            save_checkpoint(checkpoint_path, state)
+            mode = "w"
+        else:
+            mode = "a"
+
+        with open(errors_path, mode) as error_log:
+            for (start, end), parsed in self._parse(path, state["offset"]):
+                records, errors, line_count = parsed
+                errors = [(offset, state["lines"] + index, message) for offset, index, message in errors]
+                records = [(offset, state["lines"] + index, record) for offset, index, record in records]
+                accounts, transactions, apply_errors = self._apply_chunk(records, state["import_id"])
+                errors.extend(apply_errors)
+                errors.sort()
+                for offset, line, message in errors:
+                    error_log.write(json.dumps({"offset": offset, "line": line + 1, "error": message}) + "\n")
+                error_log.flush()
+                state.update(
+                    offset=end, lines=state["lines"] + line_count, accounts=state["accounts"] + accounts,
+                    transactions=state["transactions"] + transactions, errors=state["errors"] + len(errors)
+                )
+                save_checkpoint(checkpoint_path, state)
+
+        state["complete"] = True
+        save_checkpoint(checkpoint_path, state)
+        return state
+
+    def _parse(self, path: str, start: int) -> Iterator[Tuple[Tuple[int, int], tuple]]:
+        """Parse chunks in the pool, yielding results in file order with a bounded lookahead."""
+        boundaries = chunk_boundaries(path, self.chunk_bytes, start)
+        if self.workers <= 1:
+            for bounds in boundaries:
+                yield bounds, parse_chunk(path, *bounds)
+            return
+        window = 2 * self.workers
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = []
+            for bounds in boundaries:
+                futures.append((bounds, pool.submit(parse_chunk, path, *bounds)))
+                if len(futures) >= window:
+                    bounds, future = futures.pop(0)
+                    yield bounds, future.result()
+            for bounds, future in futures:
+                yield bounds, future.result()
+
+    def _apply_chunk(self, records: List[tuple], import_id: str) -> Tuple[int, int, List[tuple]]:
+        """
+        Apply one chunk's records in order and write them with the bulk paths.
+
+        Returns:
+            Tuple: (accounts created, transactions saved, errors)
+        """
+        errors = []
+        opened = {}
+        working = {}
+        baseline = {}
+        redated = set()
+        transactions = []
+        seen_transaction_ids = set()
+        now = datetime.now()
+
+        # Accounts without an ID get one derived from the line, like transactions
+        records = [
+            (offset, line, (record[0], _derived_id(import_id, offset)) + record[2:])
+            if record[0] == ACCOUNT_RECORD and record[1] is None else (offset, line, record)
+            for offset, line, record in records
+        ]
+        # Earliest posting per account in this chunk, to date the accounts it opens
+        earliest = {}
+        for _, _, record in records:
+            if record[0] == TRANSACTION_RECORD:
+                posted = record[5] if record[5] is not None else now.timestamp()
+                if posted < earliest.get(record[1], posted + 1):
+                    earliest[record[1]] = posted
+
+        touched = {record[1] for _, _, record in records}
+        lock = self.lock_manager.locked_many(touched) if self.lock_manager is not None else nullcontext()
+        unit_of_work = getattr(self.account_repository, "unit_of_work", None)
+        with lock, (unit_of_work() if unit_of_work is not None else nullcontext()):
+            hot_accounts = getattr(self.lock_manager, "hot_accounts", None)
+            if hot_accounts is not None:
+                # Withdrawals must see deposits still pending in hot-account slots
+                for account_id in touched:
+                    hot_accounts.consolidate(account_id, self.account_repository, self.transaction_repository)
+            for offset, line, record in records:
+                try:
+                    if record[0] == ACCOUNT_RECORD:
+                        _, account_id, class_name, initial_deposit, owner_name, created = record
+                        if account_id in working or self.account_repository.get_account_by_id(account_id):
+                            raise ValueError(f"Duplicate account ID: {account_id}")
+                        created = now.timestamp() if created is None else created
+                        created = min(created, earliest.get(account_id, created))
+                        account = ACCOUNT_CLASS_TYPES[class_name](
+                            account_id=account_id, balance=initial_deposit,
+                            creation_date=datetime.fromtimestamp(created), owner_name=owner_name
+                        )
+                        opened[account_id] = account
+                        working[account_id] = _working_copy(account)
+                        baseline[account_id] = initial_deposit
+                        continue
+
+                    _, account_id, type_name, amount, description, timestamp, transaction_id = record
+                    account = working.get(account_id)
+                    if account is None:
+                        stored = self.account_repository.get_account_by_id(account_id)
+                        if not stored:
+                            raise ValueError(f"Account not found: {account_id}")
+                        account = working[account_id] = _working_copy(stored)
+                        baseline[account_id] = stored.balance
+                    if transaction_id is None:
+                        transaction_id = _derived_id(import_id, offset)
+                    if (transaction_id in seen_transaction_ids
+                            or self.transaction_repository.get_transaction_by_id(transaction_id)):
+                        raise ValueError(f"Duplicate transaction ID: {transaction_id}")
+                    transaction_type = _TRANSACTION_TYPES[type_name]
+                    if transaction_type is TransactionType.DEPOSIT:
+                        account.deposit(amount)
+                    else:
+                        account.withdraw(amount)
+                    posted = datetime.fromtimestamp(timestamp) if timestamp is not None else now
+                    if account.creation_date is not None and posted < account.creation_date:
+                        # Back-dated history: open the account no later than its first posting
+                        account.creation_date = posted
+                        if account_id in opened:
+                            opened[account_id].creation_date = posted
+                        else:
+                            redated.add(account_id)
+                    seen_transaction_ids.add(transaction_id)
+                    transactions.append(Transaction(
+                        transaction_id=transaction_id,
+                        account_id=account_id,
+                        transaction_type=transaction_type,
+                        amount=amount,
+                        description=description,
+                        timestamp=posted
+                    ))
+                except Exception as e:
+                    errors.append((offset, line, str(e) or type(e).__name__))
+
+            # Openings first (with their opening balances), then the ledger, then the new balances
+            if opened:
+                self.account_repository.create_accounts(list(opened.values()))
+            if transactions:
+                self.transaction_repository.save_transactions(transactions)
+            for account_id, account in working.items():
+                if account.balance != baseline.get(account_id, account.balance) or account_id in redated:
+                    self.account_repository.update_account(account)
+        return len(opened), len(transactions), errors
+
+
+def _derived_id(import_id: str, offset: int) -> str:
+    """Transaction ID that is stable for a given import and line, shaped like a UUID."""
+    return str(uuid.UUID(bytes=blake2b(f"{import_id}:{offset}".encode(), digest_size=16).digest()))
+
+
+def main(argv=None) -> int:
+    from infrastructure.lock_manager import StripedLockManager
+    from infrastructure.repository.factory import build_repositories
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSONL file to import")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint.json)")
+    parser.add_argument("--errors", help="Bad-line report (default: <path>.errors.jsonl)")
+    parser.add_argument("--workers", type=int, default=config.IMPORT_WORKERS)
+    parser.add_argument("--chunk-bytes", type=int, default=config.IMPORT_CHUNK_BYTES)
+    args = parser.parse_args(argv)
+
+    lock_manager = StripedLockManager()
+    account_repository, transaction_repository = build_repositories(lock_manager)
+    importer = BulkImporter(account_repository, transaction_repository, lock_manager,
+                            args.workers, args.chunk_bytes)
+    state = importer.run(args.path, args.checkpoint, args.resume, args.errors)
+    print(f"{state['lines']:,} lines: {state['accounts']:,} accounts, "
+          f"{state['transactions']:,} transactions, {state['errors']:,} bad lines")
+    if state["errors"]:
+        print(f"bad lines reported in {args.errors or os.path.abspath(args.path) + '.errors.jsonl'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""
+Job Checkpoints in the Application Layer.
+This keeps the progress of resumable batch jobs (the bulk import and the
+statement run) in a small JSON file next to their input or output.
+"""
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a checkpoint.
+
+    Args:
+        path: Checkpoint file
+
+    Returns:
+        Optional[Dict]: The saved state, or None if there is no checkpoint yet
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    """Write the checkpoint atomically (temporary file, fsync, rename)."""
+    temporary = path + ".tmp"
+    with open(temporary, "w") as handle:
+        json.dump(state, handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
@@ -0,0 +1,132 @@
+"""
+Interest Accrual Service in the Application Layer.
+This runs end-of-period interest and minimum-balance fees for every
+savings account in one vectorized pass.
+"""
+from typing import Any, Dict
+
+import numpy as np
+
+from domain.entities.savingsAccount import SavingsAccount
+from domain.services.rule_registry import RULES
+
+
+class InterestAccrualService:
+    """
+    Computes month-end interest and fees with NumPy and posts them in bulk.
+
+    Balances and rates are gathered into contiguous float64 arrays, interest
+    and fees are computed with a handful of array operations, and the
+    results are written back as a single apply_batch call so every balance
+    change gets its matching ledger entry.
+    """
+
+    def __init__(self, account_repository, transaction_service, periods_per_year: int = 12):
+        """
+        Initialize the service.
+
+        Args:
+            account_repository: Repository holding the accounts
+            transaction_service: TransactionService used to post the results
+            periods_per_year: Accrual periods per year (12 for monthly runs)
+        """
+        self.account_repository = account_repository
+        self.transaction_service = transaction_service
+        self.periods_per_year = periods_per_year
+
+        savings_rules = RULES.for_type("savings")
+        self.min_balance_fee = savings_rules.min_balance_fee
+        self.minimum_balance = savings_rules.minimum_balance
+
+    def gather(self):
+        """
+        Collect every savings account's balance and annual rate.
+
+        The rate is the one configured for the account's class in the rule
+        registry (read once per run, so a reload applies from the next run);
+        the entity's own interest_rate is only its constructor default.
+
+        Returns:
+            Tuple[list, np.ndarray, np.ndarray]: Account IDs, balances and rates
+        """
+        savings = [
+            account for account in list(self.account_repository.accounts.values())
+            if isinstance(account, SavingsAccount)
+        ]
+        count = len(savings)
+        rules = RULES.table.by_entity
+        account_ids = [account.account_id for account in savings]
+        current_balance = self.transaction_service.current_balance
+        balances = np.fromiter((current_balance(account) for account in savings), dtype=np.float64, count=count)
+        rates = np.fromiter(
+            (rules[type(account)].interest_rate for account in savings),
+            dtype=np.float64, count=count
+        )
+        return account_ids, balances, rates
+
+    def compute(self, balances: np.ndarray, rates: np.ndarray):
+        """
+        Compute interest and fees for one period.
+
+        Interest is only paid on positive balances. The minimum-balance fee
+        applies below the savings minimum and never takes the balance
+        (after interest) below zero. Both are rounded to cents.
+
+        Args:
+            balances: Current balances
+            rates: Annual interest rates
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Interest and fee per account
+        """
+        interest = np.round(np.maximum(balances, 0.0) * rates / self.periods_per_year, 2)
+        fees = np.where(balances < self.minimum_balance, self.min_balance_fee, 0.0)
+        fees = np.round(np.minimum(fees, np.maximum(balances + interest, 0.0)), 2)
+        return interest, fees
+
+    def run(self, dry_run: bool = False, atomic: bool = True) -> Dict[str, Any]:
+        """
+        Accrue one period of interest and fees across all savings accounts.
+
+        Args:
+            dry_run: Compute and report without posting anything
+            atomic: Reject the whole run if any posting fails
+
+        Returns:
+            Dict: Account count, totals, number of postings and, for a real
+                run, the apply_batch outcome (for a dry run, the postings)
+        """
+        account_ids, balances, rates = self.gather()
+        interest, fees = self.compute(balances, rates)
+
+        postings = []
+        for index in np.flatnonzero(interest > 0).tolist():
+            postings.append({
+                "account_id": account_ids[index],
+                "type": "deposit",
+                "amount": interest[index].item(),
+                "description": "Interest payment"
+            })
+        for index in np.flatnonzero(fees > 0).tolist():
+            postings.append({
+                "account_id": account_ids[index],
+                "type": "withdraw",
+                "amount": fees[index].item(),
+                "description": "Minimum balance fee"
+            })
+
+        summary = {
+            "accounts": len(account_ids),
+            "total_interest": round(float(interest.sum()), 2),
+            "total_fees": round(float(fees.sum()), 2),
+            "postings": len(postings),
+            "dry_run": dry_run
+        }
+        if dry_run:
+            summary["preview"] = postings
+            return summary
+
+        # Fees are system postings: they neither hit nor use up the customer's velocity limits
+        result = self.transaction_service.apply_batch(postings, atomic=atomic, enforce_velocity=False)
+        summary.update(committed=result["committed"], applied=result["applied"], errors=result["errors"])
+        return summary
@@ -0,0 +1,168 @@
+"""
+Ledger Export in the Application Layer.
+This streams account ledgers for statements, audits and nightly
+reconciliation.
+
+The pipeline is a chain of generators:
+
+    iter_account_ids -> iter_ledger_rows -> encode_ndjson / encode_csv -> gzip_chunks
+
+Accounts and transactions are read one page at a time through the
+BankingService interface (so a ShardRouter works too) and every page is
+encoded and compressed before the next one is fetched. Memory use is
+bounded by the chunk size, not by the size of the history.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import config
+
+NDJSON = "ndjson"
+CSV = "csv"
+FORMATS = (NDJSON, CSV)
+
+MEDIA_TYPES = {NDJSON: "application/x-ndjson", CSV: "text/csv"}
+
+# Column order of the CSV export (and key order of the NDJSON one)
+COLUMNS = ("account_id", "transaction_id", "transaction_type", "amount", "description", "timestamp")
+
+
+def _row(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a transaction info dict into a flat, serializable row."""
+    transaction_type = info["transaction_type"]
+    timestamp = info["timestamp"]
+    return {
+        "account_id": info["account_id"],
+        "transaction_id": info["transaction_id"],
+        "transaction_type": getattr(transaction_type, "value", transaction_type),
+        "amount": info["amount"],
+        "description": info.get("description"),
+        "timestamp": timestamp.isoformat() if hasattr(timestamp, "isoformat") else timestamp
+    }
+
+
+def iter_account_ids(banking, chunk_size: int = None) -> Iterator[str]:
+    """
+    Yield every account ID, fetching chunk_size accounts at a time.
+
+    Args:
+        banking: BankingService or ShardRouter
+        chunk_size: Accounts per fetch (defaults to config.EXPORT_CHUNK_SIZE)
+    """
+    chunk_size = chunk_size or config.EXPORT_CHUNK_SIZE
+    after = None
+    while True:
+        accounts = banking.list_accounts(0, chunk_size, after)
+        for account in accounts:
+            yield account["account_id"]
+        if len(accounts) < chunk_size:
+            return
+        after = accounts[-1]["account_id"]
+
+
+def iter_ledger_rows(banking, account_ids: Iterable[str], chunk_size: int = None, since=None,
+                     until=None, transaction_type=None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield the ledgers of the given accounts as chunks of rows.
+
+    Each account's transactions come in timestamp order, one history page
+    (at most chunk_size rows) per chunk.
+
+    Args:
+        banking: BankingService or ShardRouter
+        account_ids: Accounts to export, in output order
+        chunk_size: Rows per chunk (defaults to config.EXPORT_CHUNK_SIZE)
+        since: Only transactions at or after this time
+        until: Only transactions before this time
+        transaction_type: Only this type ('DEPOSIT'/'WITHDRAW')
+
+    Raises:
+        ValueError: If an account doesn't exist or a filter is invalid
+    """
+    chunk_size = min(chunk_size or config.EXPORT_CHUNK_SIZE, config.HISTORY_PAGE_MAX)
+    for account_id in account_ids:
+        cursor = None
+        while True:
+            page = banking.get_transaction_history_page(
+                account_id, chunk_size, cursor, since, until, transaction_type
+            )
+            if page["transactions"]:
+                yield [_row(info) for info in page["transactions"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+
+def encode_ndjson(chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Encode each chunk of rows as newline-delimited JSON."""
+    dumps = json.JSONEncoder(separators=(",", ":"), default=str).encode
+    for rows in chunks:
+        yield "".join(dumps(row) + "\n" for row in rows).encode()
+
+
+def encode_csv(chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Encode each chunk of rows as CSV, after a header line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode()
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([row[column] for column in COLUMNS] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+ENCODERS = {NDJSON: encode_ndjson, CSV: encode_csv}
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = None) -> Iterator[bytes]:
+    """
+    Compress a byte stream into a single gzip member, chunk by chunk.
+
+    Args:
+        chunks: Uncompressed byte chunks
+        level: zlib compression level (defaults to config.EXPORT_GZIP_LEVEL)
+    """
+    # wbits=31 writes the gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(config.EXPORT_GZIP_LEVEL if level is None else level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_ledger(banking, account_id: Optional[str] = None, export_format: str = NDJSON,
+                  compress: bool = False, chunk_size: int = None, since=None, until=None,
+                  transaction_type=None) -> Iterator[bytes]:
+    """
+    Stream one account's ledger, or every account's, as encoded bytes.
+
+    Nothing is fetched until the returned iterator is consumed.
+
+    Args:
+        banking: BankingService or ShardRouter
+        account_id: Account to export (all accounts if None)
+        export_format: "ndjson" or "csv"
+        compress: gzip the output on the fly
+        chunk_size: Accounts and rows fetched per call (defaults to config.EXPORT_CHUNK_SIZE)
+        since: Only transactions at or after this time
+        until: Only transactions before this time
+        transaction_type: Only this type ('DEPOSIT'/'WITHDRAW')
+
+    Returns:
+        Iterator[bytes]: The encoded (and possibly compressed) export
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    encoder = ENCODERS.get(export_format)
+    if encoder is None:
+        raise ValueError(f"Unknown export format: {export_format}")
+    account_ids = [account_id] if account_id is not None else iter_account_ids(banking, chunk_size)
+    stream = encoder(iter_ledger_rows(banking, account_ids, chunk_size, since, until, transaction_type))
+    return gzip_chunks(stream) if compress else stream
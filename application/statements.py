@@ -0,0 +1,515 @@
+"""
+Statement Batch Job in the Application Layer.
+This renders one statement file per account for a period, in parallel.
+
+The job runs in three steps:
+
+1. The main process captures everything the statements need into a
+   statement image: flat NumPy columns (accounts, their period
+   transactions, a string heap) saved as .npy files next to the output.
+   Each account's opening balance is its current balance minus every
+   posting since the period started, read under the account's stripe lock.
+2. Accounts are cut into chunks, and worker processes render the chunks.
+   Workers open the image with mmap_mode="r", so they share the page
+   cache instead of receiving pickled object graphs, and write their
+   statement files directly.
+3. A checkpoint in the output directory records finished and failed
+   chunks. A failed chunk is retried on its own (a crashing chunk cannot
+   take others down with it); a run started with resume only renders the
+   chunks that are not done yet.
+
+Run from the repository root (state comes from the configured backend):
+    python -m application.statements 2026-09 --output statements/2026-09 --workers 4
+    python -m application.statements 2026-09 --output statements/2026-09 --resume
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from application.checkpoints import load_checkpoint, save_checkpoint
+from infrastructure.repository.account_aggregates import is_deposit
+
+TEXT = "txt"
+CSV = "csv"
+FORMATS = (TEXT, CSV)
+
+IMAGE_DIRECTORY = ".image"
+CHECKPOINT_FILE = "statements.checkpoint.json"
+
+# Columns of the statement image: per account, then per transaction
+ACCOUNT_COLUMNS = ("account_id", "account_type", "owner_name", "opening_balance", "first_row")
+TRANSACTION_COLUMNS = ("timestamp", "amount", "deposit", "transaction_id", "description")
+_NO_STRING = -1
+
+
+class _StringHeap:
+    """Interned strings, saved as one UTF-8 byte array plus end offsets."""
+
+    def __init__(self):
+        self._index = {}
+        self._encoded = []
+
+    def add(self, value) -> int:
+        if value is None:
+            return _NO_STRING
+        value = str(value)
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self._encoded)
+            self._encoded.append(value.encode("utf-8"))
+        return index
+
+    def save(self, directory: str) -> None:
+        ends = np.cumsum([len(encoded) for encoded in self._encoded], dtype=np.int64)
+        np.save(os.path.join(directory, "string_ends.npy"), ends)
+        np.save(os.path.join(directory, "string_bytes.npy"), np.frombuffer(b"".join(self._encoded), dtype=np.uint8))
+
+
+def build_image(account_repository, transaction_repository, transaction_service, directory: str,
+                start: datetime, end: datetime) -> Dict[str, Any]:
+    """
+    Capture the data for a period's statements as memory-mappable columns.
+
+    Accounts opened after the period are left out. Accounts are ordered by
+    ID, so the statements (and the chunks) come out the same on every run.
+
+    Args:
+        account_repository: Repository holding the accounts
+        transaction_repository: Repository holding their history
+        transaction_service: TransactionService the accounts are written through
+        directory: Where the image goes (created or replaced)
+        start: First moment of the period
+        end: First moment after the period
+
+    Returns:
+        Dict: The image metadata (period, account and transaction counts)
+    """
+    transaction_service.consolidate()
+    lock_manager = transaction_service.lock_manager
+    strings = _StringHeap()
+    accounts = {name: array("q") for name in ("account_id", "account_type", "owner_name", "first_row")}
+    opening_balances = array("d")
+    rows = {"timestamp": array("d"), "amount": array("d"), "deposit": array("B"),
+            "transaction_id": array("q"), "description": array("q")}
+    start_epoch, end_epoch = start.timestamp(), end.timestamp()
+
+    for account_id in sorted(list(account_repository.accounts), key=str):
+        with lock_manager.lock_for(account_id) if lock_manager is not None else nullcontext():
+            account = account_repository.get_account_by_id(account_id)
+            if not account or (account.creation_date is not None and account.creation_date.timestamp() >= end_epoch):
+                continue
+            balance = transaction_service.current_balance(account)
+            since_start = list(_history_since(transaction_repository, account_id, start))
+        accounts["account_id"].append(strings.add(account_id))
+        accounts["account_type"].append(strings.add(account.account_type))
+        accounts["owner_name"].append(strings.add(account.owner_name))
+        accounts["first_row"].append(len(rows["amount"]))
+        net_since_start = 0.0
+        for transaction in since_start:
+            deposit = is_deposit(transaction)
+            net_since_start += transaction.amount if deposit else -transaction.amount
+            epoch = transaction.timestamp.timestamp()
+            if epoch < end_epoch:
+                rows["timestamp"].append(epoch)
+                rows["amount"].append(transaction.amount)
+                rows["deposit"].append(deposit)
+                rows["transaction_id"].append(strings.add(transaction.transaction_id))
+                rows["description"].append(strings.add(getattr(transaction, "description", None)))
+        opening_balances.append(balance - net_since_start)
+    accounts["first_row"].append(len(rows["amount"]))
+
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
+    for name, values in accounts.items():
+        np.save(os.path.join(directory, f"{name}.npy"), np.frombuffer(values, dtype=np.int64))
+    np.save(os.path.join(directory, "opening_balance.npy"), np.frombuffer(opening_balances, dtype=np.float64))
+    for name, values in rows.items():
+        dtype = {"d": np.float64, "B": np.uint8, "q": np.int64}[values.typecode]
+        np.save(os.path.join(directory, f"{name}.npy"), np.frombuffer(values, dtype=dtype))
+    strings.save(directory)
+    meta = {"start": start.isoformat(), "end": end.isoformat(), "accounts": len(opening_balances),
+            "transactions": len(rows["amount"])}
+    with open(os.path.join(directory, "meta.json"), "w") as handle:
+        json.dump(meta, handle)
+    return meta
+
+
+def _history_since(transaction_repository, account_id, start: datetime) -> Iterator:
+    """An account's transactions at or after start, in timestamp order, one page at a time."""
+    cursor = None
+    while True:
+        page, cursor = transaction_repository.get_transactions_page(
+            account_id, config.HISTORY_PAGE_MAX, cursor=cursor, since=start
+        )
+        yield from page
+        if cursor is None:
+            return
+
+
+class StatementImage:
+    """
+    Read-only view of a statement image; every column is memory-mapped.
+    """
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, "meta.json")) as handle:
+            self.meta = json.load(handle)
+        self.start = datetime.fromisoformat(self.meta["start"])
+        self.end = datetime.fromisoformat(self.meta["end"])
+
+        def load(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+        self.account_id, self.account_type, self.owner_name, self.first_row = (
+            load(name) for name in ("account_id", "account_type", "owner_name", "first_row")
+        )
+        self.opening_balance = load("opening_balance")
+        self.timestamp, self.amount, self.deposit, self.transaction_id, self.description = (
+            load(name) for name in TRANSACTION_COLUMNS
+        )
+        self._string_ends = load("string_ends")
+        self._string_bytes = load("string_bytes")
+
+    def __len__(self):
+        return len(self.opening_balance)
+
+    def string(self, index: int) -> Optional[str]:
+        if index == _NO_STRING:
+            return None
+        start = int(self._string_ends[index - 1]) if index else 0
+        return self._string_bytes[start:int(self._string_ends[index])].tobytes().decode("utf-8")
+
+    def statement(self, account: int) -> Dict[str, Any]:
+        """
+        One account's statement data.
+
+        Returns:
+            Dict: Account details, opening/closing balance, period totals and
+                the transactions with their running balance
+        """
+        first, last = int(self.first_row[account]), int(self.first_row[account + 1])
+        amounts = np.asarray(self.amount[first:last])
+        deposits = np.asarray(self.deposit[first:last], dtype=bool)
+        opening = float(self.opening_balance[account])
+        running = opening + np.cumsum(np.where(deposits, amounts, -amounts))
+        string = self.string
+        return {
+            "account_id": string(int(self.account_id[account])),
+            "account_type": string(int(self.account_type[account])),
+            "owner_name": string(int(self.owner_name[account])),
+            "period_start": self.start,
+            "period_end": self.end,
+            "opening_balance": opening,
+            "closing_balance": float(running[-1]) if len(running) else opening,
+            "total_deposits": float(amounts[deposits].sum()),
+            "total_withdrawals": float(amounts[~deposits].sum()),
+            "deposit_count": int(deposits.sum()),
+            "withdrawal_count": int(len(deposits) - deposits.sum()),
+            "transactions": [
+                {
+                    "timestamp": datetime.fromtimestamp(timestamp),
+                    "transaction_id": string(transaction_id),
+                    "transaction_type": "DEPOSIT" if deposit else "WITHDRAW",
+                    "amount": amount,
+                    "balance": balance,
+                    "description": string(description)
+                }
+                for timestamp, transaction_id, deposit, amount, balance, description in zip(
+                    self.timestamp[first:last].tolist(), self.transaction_id[first:last].tolist(),
+                    deposits.tolist(), amounts.tolist(), running.tolist(), self.description[first:last].tolist()
+                )
+            ]
+        }
+
+
+def render_text(statement: Dict[str, Any]) -> str:
+    """Render a statement as a fixed-width text document."""
+    last_day = statement["period_end"].fromordinal(statement["period_end"].toordinal() - 1)
+    lines = [
+        f"Statement for account {statement['account_id']} ({statement['account_type']})",
+        f"Owner: {statement['owner_name']}" if statement["owner_name"] else None,
+        f"Period: {statement['period_start']:%Y-%m-%d} to {last_day:%Y-%m-%d}",
+        "",
+        f"{'Opening balance':<50}{statement['opening_balance']:>15,.2f}",
+        "",
+        f"{'Date':<21}{'Type':<10}{'Amount':>14}{'Balance':>15}  Description",
+    ]
+    for row in statement["transactions"]:
+        lines.append(
+            f"{row['timestamp']:%Y-%m-%d %H:%M:%S}  {row['transaction_type']:<10}{row['amount']:>14,.2f}"
+            f"{row['balance']:>15,.2f}  {row['description'] or ''}".rstrip()
+        )
+    lines += [
+        "",
+        f"{'Deposits':<21}{statement['deposit_count']:>10}{statement['total_deposits']:>34,.2f}",
+        f"{'Withdrawals':<21}{statement['withdrawal_count']:>10}{statement['total_withdrawals']:>34,.2f}",
+        f"{'Closing balance':<50}{statement['closing_balance']:>15,.2f}",
+    ]
+    return "\n".join(line for line in lines if line is not None) + "\n"
+
+
+def render_csv(statement: Dict[str, Any]) -> str:
+    """Render a statement's transactions as CSV, with the balances as first and last rows."""
+    lines = ["timestamp,transaction_id,transaction_type,amount,balance,description",
+             f"{statement['period_start'].isoformat()},,OPENING,,{round(statement['opening_balance'], 2)!r},"]
+    for row in statement["transactions"]:
+        description = row["description"]
+        if description is not None and any(character in description for character in ',"\n'):
+            description = '"' + description.replace('"', '""') + '"'
+        lines.append(f"{row['timestamp'].isoformat()},{row['transaction_id']},{row['transaction_type']},"
+                     f"{row['amount']!r},{round(row['balance'], 2)!r},{description or ''}")
+    lines.append(f"{statement['period_end'].isoformat()},,CLOSING,,{round(statement['closing_balance'], 2)!r},")
+    return "\n".join(lines) + "\n"
+
+
+RENDERERS = {TEXT: render_text, CSV: render_csv}
+
+# Images opened by this (worker) process, by directory
+_IMAGES: Dict[str, StatementImage] = {}
+
+
+def statement_file_name(account_id: str, statement_format: str) -> str:
+    """File name of an account's statement (path separators and the like replaced)."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", account_id) + "." + statement_format
+
+
+def render_chunk(image_directory: str, output_directory: str, first: int, last: int,
+                 statement_format: str) -> Tuple[int, int]:
+    """
+    Render the statements of accounts [first, last) of an image (runs in a worker process).
+
+    Each file is written to a temporary name and renamed, so a retried
+    chunk simply overwrites what an earlier attempt left.
+
+    Returns:
+        Tuple[int, int]: Statements written and transactions rendered
+    """
+    image = _IMAGES.get(image_directory)
+    if image is None:
+        image = _IMAGES[image_directory] = StatementImage(image_directory)
+    render = RENDERERS[statement_format]
+    transactions = 0
+    for account in range(first, last):
+        statement = image.statement(account)
+        path = os.path.join(output_directory, statement_file_name(statement["account_id"], statement_format))
+        with open(path + ".tmp", "w") as handle:
+            handle.write(render(statement))
+        os.replace(path + ".tmp", path)
+        transactions += len(statement["transactions"])
+    return last - first, transactions
+
+
+class StatementJob:
+    """
+    Renders every account's statement for a period across a process pool.
+    """
+
+    def __init__(self, account_repository, transaction_repository, transaction_service,
+                 workers: int = None, chunk_accounts: int = None, retries: int = None):
+        """
+        Initialize the job.
+
+        Args:
+            account_repository: Repository holding the accounts
+            transaction_repository: Repository holding their history
+            transaction_service: TransactionService the accounts are written through
+            workers: Renderer processes (defaults to config.STATEMENT_WORKERS; 1 renders in-process)
+            chunk_accounts: Accounts per chunk (defaults to config.STATEMENT_CHUNK_ACCOUNTS)
+            retries: Extra attempts for a failed chunk (defaults to config.STATEMENT_RETRIES)
+        """
+        self.account_repository = account_repository
+        self.transaction_repository = transaction_repository
+        self.transaction_service = transaction_service
+        self.workers = workers or config.STATEMENT_WORKERS
+        self.chunk_accounts = chunk_accounts or config.STATEMENT_CHUNK_ACCOUNTS
+        self.retries = config.STATEMENT_RETRIES if retries is None else retries
+
+    def run(self, output_directory: str, start, end, statement_format: str = TEXT, resume: bool = False,
+            progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """
+        Render the statements for [start, end) into a directory.
+
+        Args:
+            output_directory: Where the statement files and the checkpoint go
+            start: First day of the period (date, datetime or ISO string)
+            end: Day after the period
+            statement_format: "txt" or "csv"
+            resume: Continue from the checkpoint instead of starting over
+            progress: Called with the checkpoint state after every chunk
+
+        Returns:
+            Dict: The final checkpoint: period, counts, done and failed chunks
+
+        Raises:
+            ValueError: If the format or period is invalid, or the checkpoint
+                belongs to another period or format
+        """
+        if statement_format not in RENDERERS:
+            raise ValueError(f"Unknown statement format: {statement_format}")
+        start, end = _to_datetime(start), _to_datetime(end)
+        if start >= end:
+            raise ValueError("The period must end after it starts")
+        os.makedirs(output_directory, exist_ok=True)
+        checkpoint_path = os.path.join(output_directory, CHECKPOINT_FILE)
+        image_directory = os.path.join(output_directory, IMAGE_DIRECTORY)
+
+        state = load_checkpoint(checkpoint_path) if resume else None
+        if state is not None and (state["start"], state["end"], state["format"]) != (
+                start.isoformat(), end.isoformat(), statement_format):
+            raise ValueError(f"Checkpoint {checkpoint_path} is for another period or format")
+        if state is None:
+            meta = build_image(self.account_repository, self.transaction_repository, self.transaction_service,
+                               image_directory, start, end)
+            chunks = [[first, min(first + self.chunk_accounts, meta["accounts"])]
+                      for first in range(0, meta["accounts"], self.chunk_accounts)]
+            state = {"start": meta["start"], "end": meta["end"], "format": statement_format,
+                     "accounts": meta["accounts"], "transactions": meta["transactions"], "chunks": chunks,
+                     "done": [], "failed": {}, "statements": 0, "complete": False}
+            save_checkpoint(checkpoint_path, state)
+
+        done = set(state["done"])
+        pending = [index for index in range(len(state["chunks"])) if index not in done]
+        attempts = {}
+        isolated = False
+        while pending:
+            retry = []
+            for index, outcome in self._render(image_directory, output_directory, state["chunks"], pending,
+                                               statement_format, isolated):
+                if isinstance(outcome, BaseException):
+                    attempts[index] = attempts.get(index, 0) + 1
+                    if attempts[index] <= self.retries:
+                        retry.append(index)
+                    else:
+                        state["failed"][str(index)] = f"{type(outcome).__name__}: {outcome}"
+                else:
+                    state["done"].append(index)
+                    state["failed"].pop(str(index), None)
+                    state["statements"] += outcome[0]
+                save_checkpoint(checkpoint_path, state)
+                if progress is not None:
+                    progress(state)
+            pending = sorted(retry)
+            isolated = True
+
+        state["complete"] = not state["failed"]
+        save_checkpoint(checkpoint_path, state)
+        if state["complete"]:
+            shutil.rmtree(image_directory, ignore_errors=True)
+        return state
+
+    def _render(self, image_directory: str, output_directory: str, chunks: List[List[int]], indexes: List[int],
+                statement_format: str, isolated: bool) -> Iterator[Tuple[int, Any]]:
+        """
+        Render chunks, yielding (chunk index, result or exception) as each finishes.
+
+        Isolated rounds (retries) give every chunk a pool of its own, so a
+        chunk that kills its worker only fails itself.
+        """
+        if self.workers <= 1:
+            for index in indexes:
+                yield index, _outcome(lambda: render_chunk(
+                    image_directory, output_directory, *chunks[index], statement_format
+                ))
+            return
+        if isolated:
+            for index in indexes:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    future = pool.submit(render_chunk, image_directory, output_directory, *chunks[index],
+                                         statement_format)
+                    yield index, _outcome(future.result)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(render_chunk, image_directory, output_directory, *chunks[index], statement_format): index
+                for index in indexes
+            }
+            for future in as_completed(futures):
+                yield futures[future], _outcome(future.result)
+
+
+def _outcome(call: Callable[[], Any]) -> Any:
+    """The call's result, or the exception it raised."""
+    try:
+        return call()
+    except Exception as e:
+        return e
+
+
+def _to_datetime(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+def month_period(month: str) -> Tuple[date, date]:
+    """
+    The first day of a "YYYY-MM" month and the first day of the next one.
+
+    Raises:
+        ValueError: If the month is malformed
+    """
+    try:
+        year, number = (int(part) for part in month.split("-"))
+        first = date(year, number, 1)
+    except ValueError:
+        raise ValueError(f"Invalid month (expected YYYY-MM): {month}")
+    return first, date(year + number // 12, number % 12 + 1, 1)
+
+
+def main(argv=None) -> int:
+    from infrastructure.lock_manager import StripedLockManager
+    from infrastructure.repository.factory import build_repositories
+    from application.transaction_service import TransactionService
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("month", help="Statement month, YYYY-MM")
+    parser.add_argument("--output", required=True, help="Directory for the statement files")
+    parser.add_argument("--format", choices=FORMATS, default=TEXT)
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint")
+    parser.add_argument("--workers", type=int, default=config.STATEMENT_WORKERS)
+    parser.add_argument("--chunk-accounts", type=int, default=config.STATEMENT_CHUNK_ACCOUNTS)
+    args = parser.parse_args(argv)
+    try:
+        start, end = month_period(args.month)
+    except ValueError as e:
+        parser.error(str(e))
+
+    lock_manager = StripedLockManager()
+    account_repository, transaction_repository = build_repositories(lock_manager)
+    transaction_service = TransactionService(account_repository, transaction_repository, lock_manager)
+    job = StatementJob(account_repository, transaction_repository, transaction_service,
+                       args.workers, args.chunk_accounts)
+    started = time.perf_counter()
+
+    def report(state):
+        elapsed = time.perf_counter() - started
+        print(f"  {len(state['done'])}/{len(state['chunks'])} chunks, {state['statements']:,}/{state['accounts']:,} "
+              f"statements ({state['statements'] / elapsed:,.0f}/s)", file=sys.stderr)
+
+    state = job.run(args.output, start, end, args.format, args.resume, report)
+    print(f"{state['statements']:,} statements, {state['transactions']:,} transactions in {args.output}")
+    for index, error in sorted(state["failed"].items(), key=lambda item: int(item[0])):
+        first, last = state["chunks"][int(index)]
+        print(f"chunk {index} (accounts {first}-{last - 1}) failed: {error}")
+    return 0 if state["complete"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,12 +2,43 @@
 Transaction Service in the Application Layer.
 This orchestrates transaction creation and processing.
 """
-from typing import List, Dict, Any, Union
+from contextlib import nullcontext
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Union
 from uuid import uuid4
 
 from domain.entities.account import Account
 from domain.entities.transaction import Transaction, TransactionType
-from domain.services.business_rules import BusinessRuleService
+from domain.services.rule_registry import RULES
+import config
+from infrastructure.idempotency import IdempotencyCache
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.metrics import REGISTRY
+from infrastructure.velocity_limits import VelocityLimiter
+
+# Accepted spellings of a posting's type in apply_batch
+_POSTING_TYPES = {}
+for _member in TransactionType:
+    _POSTING_TYPES.update({_member: _member, _member.value: _member, _member.value.lower(): _member})
+
+
+def _working_copy(account):
+    """Shallow-copy an account entity (much cheaper than copy.copy)."""
+    working = object.__new__(type(account))
+    working.__dict__.update(account.__dict__)
+    return working
+
+
+def _amount_fingerprint(amount):
+    """
+    Normalise an amount for an idempotency fingerprint, so a retry sending
+    "10" after 10.0 matches; an unparsable amount is kept for the operation
+    itself to reject.
+    """
+    try:
+        return float(amount)
+    except (TypeError, ValueError):
+        return amount
 
 
 class TransactionService:
@@ -16,19 +47,36 @@ class TransactionService:
     Coordinates between domain entities and repositories.
     """
     
-    def __init__(self, account_repository, transaction_repository):
+    def __init__(self, account_repository, transaction_repository, lock_manager=None, metrics=None,
+                 idempotency=None, velocity=None):
         """
         Initialize the service with required repositories.
         
         Args:
             account_repository: Repository for account persistence
             transaction_repository: Repository for transaction persistence
+            lock_manager: Per-account lock manager (a private one is created if omitted)
+            metrics: MetricsRegistry for stage timings (the process-wide one if omitted)
+            idempotency: IdempotencyCache for keyed retries (an in-memory one if omitted)
+            velocity: VelocityLimiter for the per-class withdrawal limits (one is
+                created if omitted and config.VELOCITY_LIMITS_ENABLED is set)
         """
         self.account_repository = account_repository
         self.transaction_repository = transaction_repository
-        self.business_rules = BusinessRuleService()
+        self.lock_manager = lock_manager or StripedLockManager()
+        self.metrics = metrics or REGISTRY
+        self.idempotency = idempotency if idempotency is not None else IdempotencyCache()
+        if velocity is None and config.VELOCITY_LIMITS_ENABLED:
+            velocity = VelocityLimiter()
+        self.velocity = velocity
+        # Split-balance deposits need a repository that can stage transactions
+        hot_accounts = getattr(self.lock_manager, "hot_accounts", None)
+        if not hasattr(transaction_repository, "stage_transaction"):
+            hot_accounts = None
+        self.hot_accounts = hot_accounts
     
-    def deposit(self, account_id: str, amount: Union[str, float], description: str = None) -> Transaction:
+    def deposit(self, account_id: str, amount: Union[str, float], description: str = None,
+                idempotency_key: str = None) -> Transaction:
         """
         Deposit funds into an account.
         
@@ -36,13 +84,25 @@ class TransactionService:
             account_id: ID of the account
             amount: Amount to deposit (string or numeric)
             description: Optional description
+            idempotency_key: Client-chosen key, scoped to the account; a retry
+                under the same key returns the original transaction
             
         Returns:
             Transaction: The created transaction
             
         Raises:
             ValueError: For invalid deposits
+            IdempotencyKeyReusedError: If the key was used for a different request
         """
+        if idempotency_key is None:
+            return self._deposit(account_id, amount, description)
+        return self.idempotency.run(
+            (account_id, idempotency_key), ("deposit", _amount_fingerprint(amount), description),
+            self._deposit, account_id, amount, description
+        )
+    
+    def _deposit(self, account_id: str, amount: Union[str, float], description: str = None) -> Transaction:
+        timer = self.metrics.timer("deposit")
         try:
             # Convert amount to float if it's a string
             amount_float = float(amount) if isinstance(amount, str) else float(amount)
@@ -51,35 +111,61 @@ class TransactionService:
             if amount_float <= 0:
                 raise ValueError("Deposit amount must be positive")
             
-            # Get account
-            account = self.account_repository.get_account_by_id(account_id)
-            if not account:
-                raise ValueError(f"Account not found: {account_id}")
-            
-            # Perform deposit (returns new account instance)
-            updated_account = account.deposit(amount_float)
-            
-            # Save updated account
-            self.account_repository.update_account(updated_account)
-            
-            # Create and save transaction
-            transaction = Transaction(
-                transaction_id=str(uuid4()),
-                account_id=account_id,
-                transaction_type=TransactionType.DEPOSIT,
-                amount=amount_float,  # Use converted float
-                description=description
-            )
+            hot = self.hot_accounts.get(account_id) if self.hot_accounts is not None else None
+            if hot is not None:
+                transaction = self._deposit_to_slot(hot, account_id, amount_float, description, timer)
+                if transaction is not None:
+                    timer.finish()
+                    return transaction
             
-            self.transaction_repository.save_transaction(transaction)
+            # Balance change and ledger append happen atomically per account
+            with self._deposit_lock(account_id), self._unit_of_work():
+                timer.mark("lock_wait")
+                
+                # Get account
+                account = self.account_repository.get_account_by_id(account_id)
+                if not account:
+                    raise ValueError(f"Account not found: {account_id}")
+                timer.mark("lookup")
+                
+                # Perform deposit on a working copy; the stored account is only
+                # replaced once the transaction is in the ledger
+                updated_account = _working_copy(account).deposit(amount_float)
+                timer.mark("mutate")
+                
+                # Create and save transaction
+                transaction_id = str(uuid4())
+                timer.mark("uuid")
+                transaction = Transaction(
+                    transaction_id=transaction_id,
+                    account_id=account_id,
+                    transaction_type=TransactionType.DEPOSIT,
+                    amount=amount_float,  # Use converted float
+                    description=description
+                )
+                
+                # Ledger first: if the append fails, no balance has moved
+                self.transaction_repository.save_transaction(transaction)
+                timer.mark("save_transaction")
+                
+                # Save updated account
+                self.account_repository.update_account(updated_account)
+                timer.mark("update_account")
+            timer.finish()
             return transaction
             
         except ValueError as e:
+            timer.fail(e)
             raise ValueError(f"Deposit failed: {str(e)}")
-        except TypeError:
+        except TypeError as e:
+            timer.fail(e)
             raise ValueError("Amount must be a number")
+        except Exception as e:
+            timer.fail(e)
+            raise
     
-    def withdraw(self, account_id: str, amount: Union[str, float], description: str = None) -> Transaction:
+    def withdraw(self, account_id: str, amount: Union[str, float], description: str = None,
+                 idempotency_key: str = None) -> Transaction:
         """
         Withdraw funds from an account.
         
@@ -87,13 +173,27 @@ class TransactionService:
             account_id: ID of the account
             amount: Amount to withdraw (string or numeric)
             description: Optional description
+            idempotency_key: Client-chosen key, scoped to the account; a retry
+                under the same key returns the original transaction
             
         Returns:
             Transaction: The created transaction
             
         Raises:
             ValueError: For invalid withdrawals
+            VelocityLimitExceededError: If the withdrawal would exceed one of the
+                account class's velocity limits
+            IdempotencyKeyReusedError: If the key was used for a different request
         """
+        if idempotency_key is None:
+            return self._withdraw(account_id, amount, description)
+        return self.idempotency.run(
+            (account_id, idempotency_key), ("withdraw", _amount_fingerprint(amount), description),
+            self._withdraw, account_id, amount, description
+        )
+    
+    def _withdraw(self, account_id: str, amount: Union[str, float], description: str = None) -> Transaction:
+        timer = self.metrics.timer("withdraw")
         try:
             # Convert amount to float if it's a string
             amount_float = float(amount) if isinstance(amount, str) else float(amount)
@@ -102,34 +202,328 @@ class TransactionService:
             if amount_float <= 0:
                 raise ValueError("Withdrawal amount must be positive")
             
-            # Get account
-            account = self.account_repository.get_account_by_id(account_id)
-            if not account:
-                raise ValueError(f"Account not found: {account_id}")
+            # Balance change and ledger append happen atomically per account
+            with self.lock_manager.lock_for(account_id), self._unit_of_work():
+                timer.mark("lock_wait")
+                
+                # Fold pending hot-account deposits in, so the rules see the whole balance
+                if self.hot_accounts is not None:
+                    self.hot_accounts.consolidate(account_id, self.account_repository, self.transaction_repository)
+                
+                # Get account
+                account = self.account_repository.get_account_by_id(account_id)
+                if not account:
+                    raise ValueError(f"Account not found: {account_id}")
+                timer.mark("lookup")
+                
+                # Velocity limits of the account's class, checked before the balance moves
+                limits = RULES.table.by_entity[type(account)].velocity_limits if self.velocity is not None else ()
+                if limits:
+                    overdraft = amount_float > account.balance
+                    self.velocity.check(account_id, limits, amount_float, overdraft)
+                    timer.mark("velocity")
+                
+                # Perform withdrawal on a working copy; the stored account is only
+                # replaced once the transaction is in the ledger
+                updated_account = _working_copy(account).withdraw(amount_float)
+                timer.mark("mutate")
+                
+                # Create and save transaction
+                transaction_id = str(uuid4())
+                timer.mark("uuid")
+                transaction = Transaction(
+                    transaction_id=transaction_id,
+                    account_id=account_id,
+                    transaction_type=TransactionType.WITHDRAW,
+                    amount=amount_float,  # Use converted float
+                    description=description
+                )
+                
+                # Ledger first: if the append fails, no balance has moved
+                self.transaction_repository.save_transaction(transaction)
+                timer.mark("save_transaction")
+                
+                # Save updated account
+                self.account_repository.update_account(updated_account)
+                timer.mark("update_account")
+                if limits:
+                    self.velocity.record(account_id, limits, amount_float, overdraft)
+            timer.finish()
+            return transaction
             
-            # Perform withdrawal (returns new account instance)
-            updated_account = account.withdraw(amount_float)
+        except ValueError as e:
+            timer.fail(e)
+            raise ValueError(f"Withdrawal failed: {str(e)}")
+        except TypeError as e:
+            timer.fail(e)
+            raise ValueError("Amount must be a number")
+        except Exception as e:
+            timer.fail(e)
+            raise
+        
+    def apply_batch(self, postings: Iterable[Dict[str, Any]], atomic: bool = True,
+                    enforce_velocity: bool = True) -> Dict[str, Any]:
+        """
+        Apply many deposits and withdrawals in one pass.
+        
+        The whole batch is validated up front, postings are grouped by
+        account, each account is fetched and updated once with its net
+        change, and all ledger rows are appended with a single repository
+        call. Every posting still goes through the entity's deposit/withdraw
+        rules, in batch order, on a working copy of its account.
+        
+        Args:
+            postings: Dicts with account_id, type ("deposit"/"withdraw"),
+                amount and an optional description
+            atomic: If True, any failing posting rejects the whole batch;
+                otherwise failing postings are skipped and the rest applied
+            enforce_velocity: Check and count withdrawals against the velocity
+                limits; False for system postings (fees) that are not customer
+                withdrawals
             
-            # Save updated account
-            self.account_repository.update_account(updated_account)
+        Returns:
+            Dict: committed flag, applied/failed counts, results (one entry
+                per posting: its transaction ID, or None if not applied) and
+                errors (posting index -> message)
+        """
+        timer = self.metrics.timer("apply_batch")
+        postings = list(postings)
+        results = [None] * len(postings)
+        errors = {}
+        by_account = {}
+        
+        # Validate everything before touching any account
+        for index, posting in enumerate(postings):
+            try:
+                account_id = posting["account_id"]
+                type_name = posting.get("type", posting.get("transaction_type"))
+                transaction_type = _POSTING_TYPES.get(type_name)
+                if transaction_type is None:
+                    raise ValueError(f"Unknown transaction type: {type_name}")
+                amount_float = float(posting["amount"])
+                if amount_float <= 0:
+                    raise ValueError("Amount must be positive")
+            except KeyError as e:
+                errors[index] = f"Missing field: {e}"
+                continue
+            except (TypeError, ValueError) as e:
+                errors[index] = f"Invalid posting: {e}"
+                continue
+            by_account.setdefault(account_id, []).append(
+                (index, transaction_type, amount_float, posting.get("description"))
+            )
+        
+        timer.mark("validate")
+        if errors and atomic:
+            return self._batch_result(False, results, errors)
+        
+        # One uuid4 per batch; each posting's ID replaces its last 12 hex
+        # digits with the posting index, so IDs stay unique and UUID-shaped.
+        id_prefix = str(uuid4())[:24]
+        timestamp = datetime.now()
+        
+        with self.lock_manager.locked_many(by_account), self._unit_of_work():
+            timer.mark("lock_wait")
+            if self.hot_accounts is not None:
+                for account_id in by_account:
+                    self.hot_accounts.consolidate(account_id, self.account_repository, self.transaction_repository)
+            
+            # Run every posting against a working copy of its account
+            updated_accounts = []
+            transactions = []
+            applied_indexes = []
+            # (account_id, limits, amount, overdraft) per withdrawal, recorded once committed
+            velocity_records = []
+            table = RULES.table
+            enforce_velocity = enforce_velocity and self.velocity is not None
+            for account_id, items in by_account.items():
+                account = self.account_repository.get_account_by_id(account_id)
+                if not account:
+                    for index, _, _, _ in items:
+                        errors[index] = f"Account not found: {account_id}"
+                    continue
+                
+                working = _working_copy(account)
+                limits = table.by_entity[type(account)].velocity_limits if enforce_velocity else ()
+                pending = (0, 0.0, 0)
+                for index, transaction_type, amount_float, description in items:
+                    try:
+                        if transaction_type is TransactionType.DEPOSIT:
+                            working = working.deposit(amount_float)
+                        else:
+                            if limits:
+                                overdraft = amount_float > working.balance
+                                self.velocity.check(account_id, limits, amount_float, overdraft, pending)
+                            working = working.withdraw(amount_float)
+                            if limits:
+                                pending = (pending[0] + 1, pending[1] + amount_float, pending[2] + overdraft)
+                                velocity_records.append((account_id, limits, amount_float, overdraft))
+                    except Exception as e:
+                        errors[index] = str(e) or type(e).__name__
+                        continue
+                    transactions.append(Transaction(
+                        transaction_id=f"{id_prefix}{index:012x}",
+                        account_id=account_id,
+                        transaction_type=transaction_type,
+                        amount=amount_float,
+                        description=description,
+                        timestamp=timestamp
+                    ))
+                    applied_indexes.append(index)
+                updated_accounts.append(working)
+            timer.mark("apply")
             
-            # Create and save transaction
+            if errors and atomic:
+                return self._batch_result(False, results, errors)
+            
+            # Ledger first: if the append fails, no balance has moved
+            self.transaction_repository.save_transactions(transactions)
+            timer.mark("save_transactions")
+            for account in updated_accounts:
+                self.account_repository.update_account(account)
+            timer.mark("update_accounts")
+            for account_id, limits, amount_float, overdraft in velocity_records:
+                self.velocity.record(account_id, limits, amount_float, overdraft)
+        
+        timer.finish()
+        for index, transaction in zip(applied_indexes, transactions):
+            results[index] = transaction.transaction_id
+        return self._batch_result(True, results, errors)
+    
+    def _deposit_to_slot(self, hot, account_id, amount_float: float, description: str, timer):
+        """
+        Deposit into one of a hot account's sub-balance slots.
+        
+        The transaction is durable when this returns and counts towards
+        current_balance at once; it reaches the committed balance and the
+        history when the slots are next consolidated.
+        
+        Returns:
+            Transaction or None: The transaction, or None if the account was
+                demoted meanwhile and the normal path must be taken
+        """
+        account = self.account_repository.get_account_by_id(account_id)
+        if not account:
+            raise ValueError(f"Account not found: {account_id}")
+        # The entity's deposit rules, run on a copy: the committed balance
+        # only moves when the slots are consolidated
+        _working_copy(account).deposit(amount_float)
+        timer.mark("lookup")
+        
+        slot = hot.acquire_slot()
+        try:
+            timer.mark("lock_wait")
+            if hot.retired:
+                return None
             transaction = Transaction(
                 transaction_id=str(uuid4()),
                 account_id=account_id,
-                transaction_type=TransactionType.WITHDRAW,
-                amount=amount_float,  # Use converted float
+                transaction_type=TransactionType.DEPOSIT,
+                amount=amount_float,
                 description=description
             )
+            self.transaction_repository.stage_transaction(transaction)
+            timer.mark("stage_transaction")
+            slot.balance += amount_float
+            slot.pending.append(transaction)
+            full = len(slot.pending) >= self.hot_accounts.max_pending
+        finally:
+            slot.lock.release()
+        
+        if full:
+            with self.lock_manager.lock_for(account_id):
+                self.hot_accounts.consolidate(account_id, self.account_repository, self.transaction_repository)
+        return transaction
+    
+    def _deposit_lock(self, account_id):
+        """The account's stripe lock, watched for contention when hot-account mode is on."""
+        lock = self.lock_manager.lock_for(account_id)
+        if self.hot_accounts is None:
+            return lock
+        return self.hot_accounts.watched(lock, account_id)
+    
+    def consolidate(self, account_id=None) -> None:
+        """
+        Fold pending hot-account deposits into the committed balance and history.
+        
+        Called before anything reads an account's history or totals.
+        
+        Args:
+            account_id: Account to consolidate (every hot account if None)
+        """
+        if self.hot_accounts is None:
+            return
+        if account_id is None:
+            for hot_account_id in self.hot_accounts.hot_account_ids():
+                self.consolidate(hot_account_id)
+            return
+        if account_id in self.hot_accounts:
+            with self.lock_manager.lock_for(account_id):
+                self.hot_accounts.consolidate(account_id, self.account_repository, self.transaction_repository)
+    
+    def current_balance(self, account) -> float:
+        """
+        Get an account's balance including deposits pending in hot-account slots.
+        
+        Args:
+            account: The account entity
             
-            self.transaction_repository.save_transaction(transaction)
-            return transaction
-            
-        except ValueError as e:
-            raise ValueError(f"Withdrawal failed: {str(e)}")
-        except TypeError:
-            raise ValueError("Amount must be a number")
+        Returns:
+            float: The balance
+        """
+        hot = self.hot_accounts.get(account.account_id) if self.hot_accounts is not None else None
+        if hot is None:
+            return account.balance
+        with hot.locked():
+            return account.balance + hot.pending_balance()
+    
+    def promote_hot_account(self, account_id) -> None:
+        """
+        Put an account in hot mode without waiting for contention to be observed.
         
+        Raises:
+            ValueError: If hot-account mode is off or the account doesn't exist
+        """
+        if self.hot_accounts is None:
+            raise ValueError("Hot-account mode is not available")
+        if not self.account_repository.get_account_by_id(account_id):
+            raise ValueError(f"Account not found: {account_id}")
+        self.hot_accounts.promote(account_id)
+    
+    def demote_hot_account(self, account_id) -> None:
+        """Take an account out of hot mode, folding its pending deposits in."""
+        if self.hot_accounts is None:
+            return
+        with self.lock_manager.lock_for(account_id):
+            hot = self.hot_accounts.demote(account_id)
+            if hot is not None:
+                self.hot_accounts.consolidate(
+                    account_id, self.account_repository, self.transaction_repository, hot=hot
+                )
+    
+    def _unit_of_work(self):
+        """
+        Scope that commits the account update and transaction insert together.
+
+        Database-backed repositories provide unit_of_work(); the in-memory
+        ones rely on the account lock and the ledger-first write order:
+        every path appends its transactions before it replaces the account,
+        and changes balances only on working copies until then.
+        """
+        unit_of_work = getattr(self.account_repository, "unit_of_work", None)
+        return unit_of_work() if unit_of_work is not None else nullcontext()
+    
+    @staticmethod
+    def _batch_result(committed: bool, results: List, errors: Dict[int, str]) -> Dict[str, Any]:
+        applied = sum(1 for result in results if result is not None)
+        return {
+            "committed": committed,
+            "applied": applied,
+            "failed": len(errors),
+            "results": results,
+            "errors": errors
+        }
+    
     def get_transaction_history(self, account_id):
         """
         Get the transaction history for an account.
@@ -149,8 +543,59 @@ class TransactionService:
             raise ValueError(f"Account not found: {account_id}")
         
         # Get transactions
+        self.consolidate(account_id)
         return self.transaction_repository.get_transactions_for_account(account_id)
     
+    def get_transaction_history_page(self, account_id, limit: int = None, cursor: str = None,
+                                     since=None, until=None, transaction_type=None) -> Dict[str, Any]:
+        """
+        Get one page of the transaction history for an account.
+        
+        Pages are cut from a per-account timestamp index, so each page costs
+        O(log n + limit) however long the history is.
+        
+        Args:
+            account_id: ID of the account
+            limit: Page size (defaults to config.HISTORY_PAGE_DEFAULT)
+            cursor: Opaque cursor returned with the previous page
+            since: Only transactions at or after this time
+            until: Only transactions before this time
+            transaction_type: Only this type (TransactionType or its name)
+            
+        Returns:
+            Dict: The page's transactions and the cursor for the next page
+            
+        Raises:
+            ValueError: If the account doesn't exist or a parameter is invalid
+        """
+        # Verify account exists
+        account = self.account_repository.get_account_by_id(account_id)
+        if not account:
+            raise ValueError(f"Account not found: {account_id}")
+        
+        # Validate paging parameters
+        limit = config.HISTORY_PAGE_DEFAULT if limit is None else int(limit)
+        if not 0 < limit <= config.HISTORY_PAGE_MAX:
+            raise ValueError(f"Limit must be between 1 and {config.HISTORY_PAGE_MAX}")
+        if isinstance(transaction_type, str):
+            try:
+                transaction_type = TransactionType[transaction_type.upper()]
+            except KeyError:
+                raise ValueError(f"Unknown transaction type: {transaction_type}")
+        
+        # Get page
+        self.consolidate(account_id)
+        transactions, next_cursor = self.transaction_repository.get_transactions_page(
+            account_id, limit, cursor=cursor, since=since, until=until,
+            transaction_type=transaction_type
+        )
+        
+        return {
+            "account_id": account_id,
+            "transactions": transactions,
+            "next_cursor": next_cursor
+        }
+    
     def get_transaction_by_id(self, transaction_id):
         """
         Get a specific transaction by ID.
@@ -165,17 +610,25 @@ class TransactionService:
             ValueError: If the transaction doesn't exist
         """
         transaction = self.transaction_repository.get_transaction_by_id(transaction_id)
+        if not transaction and self.hot_accounts is not None:
+            # It may still be pending in a hot account's slots
+            self.consolidate()
+            transaction = self.transaction_repository.get_transaction_by_id(transaction_id)
         if not transaction:
             raise ValueError(f"Transaction not found: {transaction_id}")
         
         return transaction
     
-    def get_account_summary(self, account_id):
+    def get_account_summary(self, account_id, verify: bool = False):
         """
         Get a summary of account activity.
         
+        Totals come from running aggregates the repository maintains at
+        write time, so this is O(1) regardless of history length.
+        
         Args:
             account_id: ID of the account
+            verify: Also recompute the totals from the raw ledger and report drift
             
         Returns:
             Dict: Summary of account activity
@@ -183,23 +636,38 @@ class TransactionService:
         Raises:
             ValueError: If the account doesn't exist
         """
+        timer = self.metrics.timer("get_account_summary")
         # Verify account exists
         account = self.account_repository.get_account_by_id(account_id)
         if not account:
-            raise ValueError(f"Account not found: {account_id}")
-        
-        # Get transactions
-        transactions = self.transaction_repository.get_transactions_for_account(account_id)
+            error = ValueError(f"Account not found: {account_id}")
+            timer.fail(error)
+            raise error
+        timer.mark("lookup")
+        self.consolidate(account_id)
         
-        # Calculate metrics
-        total_deposits = sum(t.amount for t in transactions if t.transaction_type == TransactionType.DEPOSIT)
-        total_withdrawals = sum(t.amount for t in transactions if t.transaction_type == TransactionType.WITHDRAW)
-        transaction_count = len(transactions)
+        # Get running totals
+        aggregate = self.transaction_repository.get_account_aggregate(account_id)
+        timer.mark("aggregate")
         
-        return {
+        summary = {
             "account_id": account_id,
-            "current_balance": account.balance,
-            "total_deposits": total_deposits,
-            "total_withdrawals": total_withdrawals,
-            "transaction_count": transaction_count
-        }
\ No newline at end of file
+            "current_balance": self.current_balance(account),
+            "total_deposits": aggregate.total_deposits,
+            "total_withdrawals": aggregate.total_withdrawals,
+            "transaction_count": aggregate.transaction_count,
+            "first_transaction_at": aggregate.first_timestamp,
+            "last_transaction_at": aggregate.last_timestamp,
+            "min_amount": aggregate.min_amount,
+            "max_amount": aggregate.max_amount
+        }
+        
+        if verify:
+            # Under the account's lock, so no posting lands between the ledger scan and the totals
+            with self.lock_manager.lock_for(account_id):
+                drift = self.transaction_repository.verify_aggregates(account_id)
+            summary["drift"] = drift.get(account_id, {})
+            timer.mark("verify")
+        
+        timer.finish()
+        return summary
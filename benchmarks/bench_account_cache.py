@@ -0,0 +1,205 @@
+"""
+Account cache benchmark and staleness check.
+
+First replays Zipf-skewed balance reads and a read/write mix against the
+SQLite backend with and without CachedAccountRepository, and reports
+throughput and cache stats.
+
+Then hammers a deliberately small cache (so entries are evicted all the
+time) from several writer and reader threads. Some units of work are made
+to fail after the account update, so they roll back. Every writer checks,
+under the account lock, that the cached balance matches the database
+after each operation. At the end every account's cached balance is
+compared with the database and with its transaction totals. The script
+exits with status 1 on any mismatch.
+
+Run from the repository root:
+    python -m benchmarks.bench_account_cache
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from application.banking_service import BankingService
+from benchmarks.workload import BALANCE, DEPOSIT, SUMMARY, WITHDRAW, ZipfSampler
+from domain.Exceptions.exception_error import BankingError
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.repository.cached_account_repository import CachedAccountRepository
+from infrastructure.repository.sqlite_repository import (
+    SQLiteAccountRepository,
+    SQLiteDatabase,
+    SQLiteTransactionRepository
+)
+
+
+class _FlakyTransactions:
+    """Transaction repository that fails a share of saves, forcing rollbacks."""
+
+    def __init__(self, repository, failure_rate: float, seed: int):
+        self.repository = repository
+        self.failure_rate = failure_rate
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.repository, name)
+
+    def save_transaction(self, transaction):
+        with self._lock:
+            fail = self._rng.random() < self.failure_rate
+            self.failures += fail
+        if fail:
+            raise RuntimeError("Injected failure")
+        return self.repository.save_transaction(transaction)
+
+
+def open_bank(directory: str, name: str, cached: bool, cache_size: int = None, failure_rate: float = 0.0):
+    database = SQLiteDatabase(os.path.join(directory, f"{name}.db"))
+    inner = SQLiteAccountRepository(database)
+    account_repository = CachedAccountRepository(inner, max_entries=cache_size) if cached else inner
+    transaction_repository = SQLiteTransactionRepository(database)
+    if failure_rate:
+        transaction_repository = _FlakyTransactions(transaction_repository, failure_rate, seed=7)
+    banking = BankingService(account_repository, transaction_repository, StripedLockManager())
+    return banking, inner, database
+
+
+def read_throughput(banking, account_ids, operations, seed: int):
+    rng = random.Random(seed)
+    popularity = ZipfSampler(len(account_ids), 1.1, rng)
+    sample = [account_ids[popularity.sample()] for _ in range(operations)]
+    started = time.perf_counter()
+    for account_id in sample:
+        banking.get_balance(account_id)
+    return operations / (time.perf_counter() - started)
+
+
+def throughput(banking, account_ids, operations, seed: int):
+    rng = random.Random(seed)
+    popularity = ZipfSampler(len(account_ids), 1.1, rng)
+    plan = []
+    for _ in range(operations):
+        roll = rng.random()
+        kind = BALANCE if roll < 0.35 else SUMMARY if roll < 0.5 else DEPOSIT if roll < 0.85 else WITHDRAW
+        plan.append((kind, account_ids[popularity.sample()]))
+    started = time.perf_counter()
+    for kind, account_id in plan:
+        try:
+            if kind == BALANCE:
+                banking.get_balance(account_id)
+            elif kind == SUMMARY:
+                banking.get_account_summary(account_id)
+            elif kind == DEPOSIT:
+                banking.deposit(account_id, 5.0)
+            else:
+                banking.withdraw(account_id, 3.0)
+        except (ValueError, BankingError):
+            pass
+    return operations / (time.perf_counter() - started)
+
+
+def staleness_check(directory: str, args) -> list:
+    banking, inner, database = open_bank(directory, "check", True, args.check_cache_size, args.failure_rate)
+    cache = banking.account_repository
+    lock_manager = banking.transaction_service.lock_manager
+    account_ids = [banking.create_account("checking", 1_000.0)["account_id"] for _ in range(args.check_accounts)]
+    problems = []
+    stop = threading.Event()
+
+    def writer(seed):
+        rng = random.Random(seed)
+        for _ in range(args.check_operations // args.writers):
+            account_id = rng.choice(account_ids)
+            try:
+                if rng.random() < 0.6:
+                    banking.deposit(account_id, round(rng.uniform(1, 50), 2))
+                else:
+                    banking.withdraw(account_id, round(rng.uniform(1, 50), 2))
+            except (ValueError, BankingError, RuntimeError):
+                pass
+            with lock_manager.lock_for(account_id):
+                cached = cache.get_account_by_id(account_id).balance
+                stored = inner.get_account_by_id(account_id).balance
+            if cached != stored:
+                problems.append(f"{account_id}: cached {cached} != stored {stored} after a write")
+
+    def reader(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            banking.get_balance(rng.choice(account_ids))
+            cache.get_account_by_id(f"missing-{rng.randrange(1000)}")
+
+    writers = [threading.Thread(target=writer, args=(seed,)) for seed in range(args.writers)]
+    readers = [threading.Thread(target=reader, args=(100 + seed,)) for seed in range(args.readers)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    transactions = banking.transaction_repository
+    for account_id in account_ids:
+        cached = cache.get_account_by_id(account_id).balance
+        stored = inner.get_account_by_id(account_id).balance
+        aggregate = transactions.get_account_aggregate(account_id)
+        expected = round(1_000.0 + aggregate.total_deposits - aggregate.total_withdrawals, 6)
+        if not (cached == stored and abs(stored - expected) < 1e-6):
+            problems.append(f"{account_id}: cached {cached}, stored {stored}, from transactions {expected}")
+
+    print(f"\nstaleness check: {args.check_operations:,} writes from {args.writers} threads, "
+          f"{args.readers} reader threads, {transactions.failures:,} rolled back")
+    print(f"  cache: {cache.stats()}")
+    database.close()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=2_000)
+    parser.add_argument("--operations", type=int, default=20_000)
+    parser.add_argument("--cache-size", type=int, default=500, help="Cache entries in the throughput run")
+    parser.add_argument("--check-accounts", type=int, default=200)
+    parser.add_argument("--check-cache-size", type=int, default=32, help="Small, so entries keep getting evicted")
+    parser.add_argument("--check-operations", type=int, default=20_000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--failure-rate", type=float, default=0.05, help="Share of writes rolled back")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench-account-cache-")
+    try:
+        print(f"{args.operations:,} operations over {args.accounts:,} Zipf-skewed accounts (SQLite)")
+        for cached in (False, True):
+            banking, _, database = open_bank(directory, f"cached-{cached}", cached, args.cache_size)
+            account_ids = [banking.create_account("checking", 1_000.0)["account_id"] for _ in range(args.accounts)]
+            reads = read_throughput(banking, account_ids, args.operations, seed=2)
+            mixed = throughput(banking, account_ids, args.operations, seed=3)
+            label = "cached" if cached else "uncached"
+            print(f"  {label:<10} balance reads {reads:>10,.0f} ops/s   mixed {mixed:>10,.0f} ops/s")
+            if cached:
+                print(f"  cache: {banking.account_repository.stats()}")
+            database.close()
+
+        problems = staleness_check(directory, args)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if problems:
+        print(f"\n{len(problems)} stale read(s):")
+        for problem in problems[:20]:
+            print(f"  {problem}")
+        return 1
+    print("  no stale balances")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
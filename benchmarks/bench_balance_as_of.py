@@ -0,0 +1,89 @@
+"""
+Point-in-time balance benchmark: cost of one balance-as-of query.
+
+Builds one account with a long history in each in-memory transaction
+backend and times balance-as-of queries at random cut-offs two ways: by
+replaying the account's history up to the cut-off, and through the
+checkpoint index (bisect, nearest checkpoint, replay at most one interval).
+Every checkpointed answer is compared with the replayed one.
+
+Run from the repository root:
+    python -m benchmarks.bench_balance_as_of
+    python -m benchmarks.bench_balance_as_of --history 10000 100000 --interval 128
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.columnar_transaction_repository import ColumnarTransactionRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+BACKENDS = {"memory": TransactionRepository, "columnar": ColumnarTransactionRepository}
+
+
+def build(backend, history: int, interval: int):
+    repository = BACKENDS[backend]()
+    repository.checkpoints.interval = interval
+    rng = random.Random(7)
+    start = datetime(2020, 1, 1)
+    for minute in range(history):
+        deposit = rng.random() < 0.6
+        repository.save_transaction(Transaction(
+            transaction_id=None,
+            account_id="account",
+            transaction_type=TransactionType.DEPOSIT if deposit else TransactionType.WITHDRAW,
+            amount=float(rng.randint(1, 500)),
+            timestamp=start + timedelta(minutes=minute)
+        ))
+    return repository, start
+
+
+def replayed(repository, at: datetime) -> float:
+    net = 0.0
+    for transaction in repository.get_transactions_for_account("account"):
+        if transaction.timestamp > at:
+            break
+        net += transaction.amount if transaction.transaction_type == TransactionType.DEPOSIT else -transaction.amount
+    return net
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--interval", type=int, default=64, help="History entries between checkpoints")
+    args = parser.parse_args()
+
+    print(f"{args.queries} queries per run at random cut-offs, checkpoint every {args.interval} entries")
+    print(f"  {'backend':<9} {'history':>8} {'replay':>12} {'checkpoint':>12} {'speedup':>8}")
+    mismatches = 0
+    for backend in BACKENDS:
+        for history in args.history:
+            repository, start = build(backend, history, args.interval)
+            rng = random.Random(history)
+            cutoffs = [start + timedelta(minutes=rng.uniform(0, history)) for _ in range(args.queries)]
+
+            started = time.perf_counter()
+            expected = [replayed(repository, at) for at in cutoffs]
+            replay = (time.perf_counter() - started) / args.queries
+
+            started = time.perf_counter()
+            answers = [repository.get_net_change_as_of("account", at) for at in cutoffs]
+            indexed = (time.perf_counter() - started) / args.queries
+
+            mismatches += sum(abs(got - want) > 1e-6 for got, want in zip(answers, expected))
+            print(f"  {backend:<9} {history:>8,} {replay * 1e6:>9.1f} us {indexed * 1e6:>9.1f} us "
+                  f"{replay / indexed:>7.1f}x")
+
+    if mismatches:
+        print(f"{mismatches} checkpointed answer(s) differ from the replayed balance")
+        return 1
+    print("  every checkpointed answer matched the replayed balance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Batch posting benchmark: apply_batch against one deposit/withdraw call per posting.
+
+Run from the repository root:
+    python -m benchmarks.bench_batch_posting
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+from application.transaction_service import TransactionService
+from domain.entities.account import Account
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger
+
+
+def build_service(accounts, ledger_dir=None):
+    ledger = WriteAheadLedger(ledger_dir, fsync=True) if ledger_dir else None
+    account_repository = AccountRepository(ledger)
+    service = TransactionService(account_repository, TransactionRepository(ledger))
+    for i in range(accounts):
+        account_repository.create_account(Account(f"acct-{i}", "Checking", balance=1_000_000.0))
+    return service, ledger
+
+
+def make_postings(count, accounts, seed=7):
+    rng = random.Random(seed)
+    postings = []
+    for _ in range(count):
+        postings.append({
+            "account_id": f"acct-{rng.randrange(accounts)}",
+            "type": "deposit" if rng.random() < 0.7 else "withdraw",
+            "amount": round(rng.uniform(1, 500), 2),
+            "description": "Payroll run"
+        })
+    return postings
+
+
+def run(postings, accounts, mode, durable):
+    ledger_dir = tempfile.mkdtemp(prefix="batch-bench-") if durable else None
+    try:
+        service, ledger = build_service(accounts, ledger_dir)
+        started = time.perf_counter()
+        if mode == "single":
+            for posting in postings:
+                if posting["type"] == "deposit":
+                    service.deposit(posting["account_id"], posting["amount"], posting["description"])
+                else:
+                    service.withdraw(posting["account_id"], posting["amount"], posting["description"])
+        else:
+            result = service.apply_batch(postings, atomic=(mode == "atomic"))
+            assert result["committed"] and result["applied"] == len(postings), result["errors"]
+        elapsed = time.perf_counter() - started
+        if ledger is not None:
+            ledger.close()
+        return len(postings) / elapsed
+    finally:
+        if ledger_dir:
+            shutil.rmtree(ledger_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--postings", type=int, default=200_000)
+    parser.add_argument("--durable-postings", type=int, default=5_000,
+                        help="Postings for the fsynced ledger runs (single-call path is slow there)")
+    parser.add_argument("--accounts", type=int, default=10_000)
+    args = parser.parse_args()
+
+    for durable, count in ((False, args.postings), (True, args.durable_postings)):
+        postings = make_postings(count, args.accounts)
+        single = run(postings, args.accounts, "single", durable)
+        print(f"\n{'fsynced ledger' if durable else 'in-memory'}: {count:,} postings over {args.accounts:,} accounts")
+        print(f"  {'single calls':<22} {single:>12,.0f} postings/s")
+        for mode in ("atomic", "best-effort"):
+            rate = run(postings, args.accounts, mode, durable)
+            print(f"  {'apply_batch ' + mode:<22} {rate:>12,.0f} postings/s  ({rate / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
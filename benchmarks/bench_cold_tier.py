@@ -0,0 +1,154 @@
+"""
+Cold tier benchmark: memory held by transaction history before and after
+spilling old entries, and the latency of history reads in each tier.
+
+Fills a TransactionRepository with a year of history, then spills
+everything older than the last few weeks to a ColdStore and reports the
+traced heap per transaction before and after the spill, in total and
+without the day/month rollups (which stay in memory). A second
+repository holds the same history all in memory; recent history pages
+(served from memory either way), pages deep in the cold tier and lookups
+by ID of cold transactions are timed against both, and every tiered answer
+is compared with the all-hot one.
+
+Run from the repository root:
+    python -m benchmarks.bench_cold_tier
+    python -m benchmarks.bench_cold_tier --transactions 1000000 --hot-days 7
+"""
+import argparse
+import gc
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import config
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository import period_rollups
+from infrastructure.repository.cold_storage import ColdStore
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+DAYS = 365
+
+
+def fill(repository, count: int, accounts: int, started: datetime):
+    rng = random.Random(11)
+    account_ids = [str(UUID(int=rng.getrandbits(128), version=4)) for _ in range(accounts)]
+    descriptions = config.SAMPLE_DEPOSIT_DESCRIPTIONS + config.SAMPLE_WITHDRAWAL_DESCRIPTIONS + [None]
+    step = DAYS * 86400 / count
+    for i in range(count):
+        repository.save_transaction(Transaction(
+            transaction_id=f"{account_ids[i % accounts][:8]}-{i:012d}",
+            account_id=account_ids[rng.randrange(accounts)],
+            transaction_type=TransactionType.DEPOSIT if rng.random() < 0.6 else TransactionType.WITHDRAW,
+            amount=round(rng.uniform(1, 1000), 2),
+            description=rng.choice(descriptions),
+            timestamp=started + timedelta(seconds=i * step)
+        ))
+    return account_ids
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def rollup_bytes() -> int:
+    """Traced bytes allocated by the day/month rollups, which tiering leaves in memory."""
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, period_rollups.__file__)])
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+def timed(func, calls):
+    """Mean seconds per call, and a fingerprint of the results (no references kept)."""
+    started = time.perf_counter()
+    results = [func(*args) for args in calls]
+    elapsed = (time.perf_counter() - started) / len(calls)
+    fingerprint = []
+    for result in results:
+        rows = result[0] if isinstance(result, tuple) else [result]
+        fingerprint.append([(row.transaction_id, row.amount, row.timestamp) for row in rows])
+    return elapsed, fingerprint
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=300_000)
+    parser.add_argument("--accounts", type=int, default=2_000)
+    parser.add_argument("--hot-days", type=float, default=21, help="History kept in memory")
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench-cold-")
+    store = ColdStore(directory)
+    try:
+        started = datetime(2025, 1, 1)
+        end = started + timedelta(days=DAYS)
+
+        # Memory: one repository, traced before and after its spill
+        tracemalloc.start()
+        baseline = traced()
+        tiered = TransactionRepository(cold_store=store)
+        account_ids = fill(tiered, args.transactions, args.accounts, started)
+        before = traced() - baseline
+        spill_started = time.perf_counter()
+        moved = tiered.spill(end - timedelta(days=args.hot_days))
+        spill_seconds = time.perf_counter() - spill_started
+        after = traced() - baseline
+        rollups = rollup_bytes()
+        tracemalloc.stop()
+
+        # Latency: the same history kept all in memory, untraced
+        hot = TransactionRepository()
+        fill(hot, args.transactions, args.accounts, started)
+        rng = random.Random(5)
+        recent = end - timedelta(days=args.hot_days / 2)
+        queries = {
+            "recent page (50)": ("get_transactions_page", [
+                (rng.choice(account_ids), 50, None, recent) for _ in range(args.queries)
+            ]),
+            "cold page (50)": ("get_transactions_page", [
+                (rng.choice(account_ids), 50, None, started + timedelta(days=rng.uniform(0, DAYS / 2)))
+                for _ in range(args.queries)
+            ]),
+            "cold lookup by ID": ("get_transaction_by_id", [
+                (f"{account_ids[i % args.accounts][:8]}-{i:012d}",)
+                for i in (rng.randrange(args.transactions // 2) for _ in range(args.queries))
+            ]),
+        }
+
+        stats = store.stats()
+        print(f"{args.transactions:,} transactions over {args.accounts:,} accounts and {DAYS} days, "
+              f"{args.hot_days:g} days kept hot")
+        print(f"  spilled {moved:,} in {spill_seconds:.1f}s to {stats['segments']} segment(s), "
+              f"{stats['bytes_on_disk'] / moved:.0f} bytes/transaction on disk")
+        print(f"  heap         {before / args.transactions:>5.0f} -> {after / args.transactions:>4.0f} bytes/transaction "
+              f"({before / after:.1f}x smaller)")
+        print(f"  w/o rollups  {(before - rollups) / args.transactions:>5.0f} -> "
+              f"{(after - rollups) / args.transactions:>4.0f} bytes/transaction "
+              f"({(before - rollups) / (after - rollups):.1f}x smaller)")
+        print(f"  {'query':<24} {'all hot':>10} {'tiered':>10}")
+        mismatched = []
+        for name, (method, calls) in queries.items():
+            hot_seconds, expected = timed(getattr(hot, method), calls)
+            tiered_seconds, answered = timed(getattr(tiered, method), calls)
+            print(f"  {name:<24} {hot_seconds * 1e6:>7.1f} us {tiered_seconds * 1e6:>7.1f} us")
+            if answered != expected:
+                mismatched.append(name)
+
+        if mismatched:
+            print(f"tiered answers differ from the all-hot ones for: {', '.join(mismatched)}")
+            return 1
+        print("  every tiered answer matched the all-hot one")
+        return 0
+    finally:
+        store.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Hot-account benchmark: deposit throughput on a single account.
+
+Many threads deposit into one account backed by a fsynced write-ahead
+ledger. In the normal mode every deposit holds the account's stripe lock
+across its ledger commit, so the deposits are serialized one fsync at a
+time. In hot-account mode they spread over the account's sub-balance slots
+and share the ledger's group commits, so throughput grows with the number
+of threads until the slots or the disk are saturated.
+
+Each run checks that the balance (committed plus pending slots) and the
+history after consolidation account for every deposit.
+
+Run from the repository root:
+    python -m benchmarks.bench_hot_account
+    python -m benchmarks.bench_hot_account --threads 1 2 4 8 16 --slots 16
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from application.transaction_service import TransactionService
+from domain.entities.checkingAccount import CheckingAccount
+from infrastructure.hot_accounts import HotAccountRegistry
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.metrics import MetricsRegistry
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger
+
+
+def run_once(threads: int, deposits: int, hot: bool, slots: int, fsync: bool):
+    """
+    Run one measurement.
+
+    Returns:
+        Tuple[float, Optional[str]]: Deposits per second and a problem description, if any
+    """
+    directory = tempfile.mkdtemp(prefix="bench-hot-")
+    ledger = WriteAheadLedger(directory, fsync=fsync)
+    try:
+        registry = HotAccountRegistry(slots=slots, promote_after=0, max_pending=1_000_000) if hot else None
+        lock_manager = StripedLockManager(hot_accounts=registry)
+        account_repository = AccountRepository(ledger)
+        transaction_repository = TransactionRepository(ledger)
+        service = TransactionService(
+            account_repository, transaction_repository, lock_manager,
+            metrics=MetricsRegistry(enabled=False)
+        )
+        account_repository.create_account(CheckingAccount("merchant", balance=0.0))
+        if hot:
+            service.promote_hot_account("merchant")
+
+        per_thread = deposits // threads
+        start_barrier = threading.Barrier(threads + 1)
+
+        def worker():
+            start_barrier.wait()
+            for _ in range(per_thread):
+                service.deposit("merchant", 1.0)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        start_barrier.wait()
+        started = time.perf_counter()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        expected = float(per_thread * threads)
+        account = account_repository.get_account_by_id("merchant")
+        problem = None
+        if service.current_balance(account) != expected:
+            problem = f"balance {service.current_balance(account)} != {expected}"
+        elif len(service.get_transaction_history("merchant")) != per_thread * threads:
+            problem = "history is missing deposits"
+        elif account.balance != expected:
+            problem = f"consolidated balance {account.balance} != {expected}"
+        return per_thread * threads / elapsed, problem
+    finally:
+        ledger.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--deposits", type=int, default=2_000, help="Deposits per run, split over the threads")
+    parser.add_argument("--slots", type=int, default=8, help="Sub-balance slots of the hot account")
+    parser.add_argument("--no-fsync", action="store_true", help="Skip fsync (measures CPU cost only)")
+    args = parser.parse_args()
+
+    fsync = not args.no_fsync
+    print(f"{args.deposits:,} deposits into one account per run, fsync {'on' if fsync else 'off'}, "
+          f"{args.slots} slots")
+    print(f"  {'threads':>7} {'normal':>12} {'hot':>12} {'speedup':>8}")
+    problems = []
+    for threads in args.threads:
+        normal, problem = run_once(threads, args.deposits, False, args.slots, fsync)
+        problems += [problem] if problem else []
+        hot, problem = run_once(threads, args.deposits, True, args.slots, fsync)
+        problems += [problem] if problem else []
+        print(f"  {threads:>7} {normal:>10,.0f}/s {hot:>10,.0f}/s {hot / normal:>7.2f}x")
+
+    if problems:
+        print(f"{len(problems)} run(s) lost deposits, e.g. {problems[0]}")
+        return 1
+    print("  every run accounted for every deposit")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
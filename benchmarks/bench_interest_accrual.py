@@ -0,0 +1,67 @@
+"""
+Interest accrual benchmark: vectorized InterestAccrualService against the
+per-object SavingsAccount.apply_interest loop.
+
+Run from the repository root:
+    python -m benchmarks.bench_interest_accrual
+"""
+import argparse
+import random
+import time
+
+from application.interest_accrual import InterestAccrualService
+from application.transaction_service import TransactionService
+from domain.entities.savingsAccount import SavingsAccount
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+
+def build(accounts, seed=11):
+    rng = random.Random(seed)
+    account_repository = AccountRepository()
+    for i in range(accounts):
+        account_repository.create_account(SavingsAccount(
+            f"sav-{i}", balance=round(rng.uniform(20, 50_000), 2), interest_rate=0.025
+        ))
+    service = TransactionService(account_repository, TransactionRepository())
+    return account_repository, InterestAccrualService(account_repository, service)
+
+
+def timed(label, accounts, func):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<34} {elapsed * 1000:>9.1f} ms  {accounts / elapsed:>14,.0f} accounts/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=200_000)
+    args = parser.parse_args()
+    print(f"{args.accounts:,} savings accounts")
+
+    account_repository, _ = build(args.accounts)
+    accounts = list(account_repository.accounts.values())
+    timed("apply_interest loop (no ledger)", args.accounts, lambda: [a.apply_interest() for a in accounts])
+
+    account_repository, engine = build(args.accounts)
+    service = engine.transaction_service
+
+    def per_account_postings():
+        for account in list(account_repository.accounts.values()):
+            interest = round(account.balance * account.interest_rate / 12, 2)
+            if interest > 0:
+                service.deposit(account.account_id, interest, "Interest payment")
+
+    timed("per-account deposit loop (ledger)", args.accounts, per_account_postings)
+
+    _, engine = build(args.accounts)
+    account_ids, balances, rates = engine.gather()
+    timed("gather into arrays", args.accounts, engine.gather)
+    timed("vectorized interest + fees", args.accounts, lambda: engine.compute(balances, rates))
+    timed("dry run (gather + compute)", args.accounts, lambda: engine.run(dry_run=True))
+    timed("full run (with ledger entries)", args.accounts, engine.run)
+
+
+if __name__ == "__main__":
+    main()
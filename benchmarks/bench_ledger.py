@@ -0,0 +1,108 @@
+"""
+Write-ahead ledger benchmark: group-commit throughput and replay speed.
+
+Run from the repository root:
+    python -m benchmarks.bench_ledger
+"""
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+from uuid import uuid4
+
+from domain.entities.account import Account
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger, encode_transaction
+
+
+def bench_group_commit(threads, records_per_thread):
+    """Measure fsynced appends per second and records per fsync."""
+    directory = tempfile.mkdtemp(prefix="ledger-bench-")
+    try:
+        ledger = WriteAheadLedger(directory, fsync=True)
+        payload = encode_transaction(Transaction(
+            str(uuid4()), "acct-0", TransactionType.DEPOSIT, 10.0, "Salary deposit"
+        ))
+
+        def writer():
+            for _ in range(records_per_thread):
+                ledger.append(payload)
+
+        workers = [threading.Thread(target=writer) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        ledger.close()
+        total = threads * records_per_thread
+        return total / elapsed, total / max(ledger.commit_count, 1)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_replay(records, accounts):
+    """Measure raw segment scan and full repository rebuild rates."""
+    directory = tempfile.mkdtemp(prefix="ledger-bench-")
+    try:
+        ledger = WriteAheadLedger(directory, fsync=False)
+        account_repository = AccountRepository(ledger)
+        for i in range(accounts):
+            account_repository.create_account(Account(f"acct-{i}", "Checking", balance=0.0))
+
+        batch = []
+        for i in range(records):
+            batch.append(encode_transaction(Transaction(
+                str(uuid4()), f"acct-{i % accounts}", TransactionType.DEPOSIT, 1.0, None
+            )))
+            if len(batch) == 10_000:
+                ledger.append_many(batch)
+                batch = []
+        ledger.append_many(batch)
+        ledger.close()
+
+        reopened = WriteAheadLedger(directory, fsync=False)
+        started = time.perf_counter()
+        scanned = sum(1 for _ in reopened.iter_payloads())
+        scan_rate = scanned / (time.perf_counter() - started)
+
+        transaction_repository = TransactionRepository(reopened)
+        restored_accounts = AccountRepository(reopened)
+        started = time.perf_counter()
+        replayed = transaction_repository.replay(restored_accounts)
+        rebuild_rate = replayed / (time.perf_counter() - started)
+        reopened.close()
+
+        restored_total = sum(a.balance for a in restored_accounts.accounts.values())
+        if restored_total != float(records):
+            raise AssertionError(f"Replay restored {restored_total}, expected {records}")
+        return scan_rate, rebuild_rate
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", default="1,4,16,64")
+    parser.add_argument("--records-per-thread", type=int, default=200)
+    parser.add_argument("--replay-records", type=int, default=1_000_000)
+    parser.add_argument("--accounts", type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'appends/s':>12} {'records/fsync':>14}")
+    for threads in [int(t) for t in args.threads.split(",")]:
+        rate, per_fsync = bench_group_commit(threads, args.records_per_thread)
+        print(f"{threads:>8} {rate:>12,.0f} {per_fsync:>14.1f}")
+
+    scan_rate, rebuild_rate = bench_replay(args.replay_records, args.accounts)
+    print(f"\nreplay of {args.replay_records:,} records:")
+    print(f"  raw segment scan : {scan_rate:>12,.0f} records/s")
+    print(f"  full rebuild     : {rebuild_rate:>12,.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Contention benchmark for per-account lock striping.
+
+Drives TransactionService.deposit/withdraw from a growing number of threads
+and reports throughput for striped locking against a single global lock.
+A small simulated storage latency (which releases the GIL, like real I/O)
+makes the difference between the two visible under CPython.
+
+Run from the repository root:
+    python -m benchmarks.bench_lock_contention
+"""
+import argparse
+import threading
+import time
+
+from application.transaction_service import TransactionService
+from domain.entities.account import Account
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+
+class SlowAccountRepository(AccountRepository):
+    """Account repository that simulates a storage round-trip on every write."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def update_account(self, account: Account) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        super().update_account(account)
+
+
+def run_once(threads, ops_per_thread, accounts_per_thread, stripes, latency, shared_account=False):
+    """
+    Run one measurement and verify that no update was lost.
+
+    Returns:
+        float: Completed operations per second
+    """
+    account_repository = SlowAccountRepository(latency)
+    service = TransactionService(
+        account_repository,
+        TransactionRepository(),
+        lock_manager=StripedLockManager(stripes)
+    )
+
+    account_count = 1 if shared_account else threads * accounts_per_thread
+    account_ids = [f"acct-{i}" for i in range(account_count)]
+    for account_id in account_ids:
+        account_repository.create_account(Account(account_id, "Checking", balance=0.0))
+
+    start_barrier = threading.Barrier(threads + 1)
+
+    def worker(worker_index):
+        if shared_account:
+            own_ids = account_ids
+        else:
+            own_ids = account_ids[worker_index * accounts_per_thread:(worker_index + 1) * accounts_per_thread]
+        start_barrier.wait()
+        for op in range(ops_per_thread):
+            account_id = own_ids[op % len(own_ids)]
+            service.deposit(account_id, 2.0)
+            service.withdraw(account_id, 1.0)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # Every deposit/withdraw pair nets +1.0; a lost update would show up here.
+    expected_total = float(threads * ops_per_thread)
+    actual_total = sum(account_repository.get_account_by_id(a).balance for a in account_ids)
+    if actual_total != expected_total:
+        raise AssertionError(f"Lost updates: expected {expected_total}, got {actual_total}")
+
+    return (threads * ops_per_thread * 2) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", default="1,2,4,8,16", help="Comma-separated thread counts")
+    parser.add_argument("--ops", type=int, default=200, help="Deposit/withdraw pairs per thread")
+    parser.add_argument("--accounts-per-thread", type=int, default=8)
+    parser.add_argument("--stripes", type=int, default=256)
+    parser.add_argument("--latency-us", type=float, default=200.0, help="Simulated storage latency per write")
+    args = parser.parse_args()
+
+    latency = args.latency_us / 1_000_000
+    thread_counts = [int(t) for t in args.threads.split(",")]
+
+    print(f"{'threads':>8} {'striped ops/s':>15} {'global ops/s':>15} {'speedup':>9} {'hot-acct ops/s':>15}")
+    for threads in thread_counts:
+        striped = run_once(threads, args.ops, args.accounts_per_thread, args.stripes, latency)
+        global_lock = run_once(threads, args.ops, args.accounts_per_thread, 1, latency)
+        hot = run_once(threads, args.ops, args.accounts_per_thread, args.stripes, latency, shared_account=True)
+        print(f"{threads:>8} {striped:>15,.0f} {global_lock:>15,.0f} {striped / global_lock:>8.2f}x {hot:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Metrics overhead benchmark: cost of stage timings on the deposit hot path.
+
+Compares deposits with metrics fully disabled (no-op timer, repositories
+left uninstrumented), with service stage timings only, and with stage
+timings plus repository method timings.
+
+Run from the repository root:
+    python -m benchmarks.bench_metrics_overhead
+"""
+import argparse
+import time
+
+from application.transaction_service import TransactionService
+from domain.entities.account import Account
+from infrastructure.metrics import MetricsRegistry
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.factory import instrument_repositories
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+
+def build_service(metrics, instrument_repositories_too):
+    account_repository = AccountRepository()
+    transaction_repository = TransactionRepository()
+    if instrument_repositories_too:
+        instrument_repositories(account_repository, transaction_repository, metrics)
+    service = TransactionService(account_repository, transaction_repository, metrics=metrics)
+    account_repository.create_account(Account("acct", "Checking", balance=0.0))
+    return service
+
+
+def per_deposit(service, operations):
+    deposit = service.deposit
+    started = time.perf_counter()
+    for _ in range(operations):
+        deposit("acct", 1.0)
+    return (time.perf_counter() - started) / operations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=5, help="Best of this many rounds per variant")
+    args = parser.parse_args()
+
+    variants = {
+        "disabled": lambda: build_service(MetricsRegistry(enabled=False), False),
+        "stage timings": lambda: build_service(MetricsRegistry(enabled=True), False),
+        "stages + repositories": lambda: build_service(MetricsRegistry(enabled=True), True),
+    }
+    best = {name: min(per_deposit(factory(), args.operations) for _ in range(args.rounds))
+            for name, factory in variants.items()}
+
+    baseline = best["disabled"]
+    print(f"{args.operations:,} deposits, best of {args.rounds}")
+    for name, seconds in best.items():
+        print(f"  {name:<24} {seconds * 1e6:7.2f} us/deposit  (+{(seconds - baseline) * 1e6:.2f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Rule validation benchmark: cost per call of the business-rule checks.
+
+Times each check the creation and posting paths make, with the rules
+resolved the old way (walking config.ACCOUNT_CLASSES by class name, as
+BusinessRuleService used to) and through the compiled RuleRegistry table.
+
+Then reloads the registry in a tight loop while reader threads validate
+against it. Each reader checks that a table it picked up is internally
+consistent (both classes carry the same generation of settings). The
+script exits with status 1 if any reader saw a mixed table.
+
+Run from the repository root:
+    python -m benchmarks.bench_rule_validation
+"""
+import argparse
+import copy
+import sys
+import threading
+import time
+
+import config
+from domain.entities.checkingAccount import CheckingAccount
+from domain.entities.savingsAccount import SavingsAccount
+from domain.services.rule_registry import RuleRegistry
+
+
+def legacy_minimum(account_class):
+    class_name = getattr(account_class, "__name__", account_class)
+    for account_config in config.ACCOUNT_CLASSES.values():
+        if account_config["class"] == class_name:
+            return account_config["config"].get("minimum_initial_deposit", 0.0)
+    return 0.0
+
+
+def legacy_opening(account_type, initial_deposit):
+    account_config = config.ACCOUNT_CLASSES.get(account_type.lower())
+    if account_config is None:
+        raise ValueError(f"Unknown account type: {account_type}")
+    minimum = legacy_minimum(account_config["class"])
+    if initial_deposit < minimum:
+        raise ValueError(f"Minimum deposit: {minimum}")
+
+
+def legacy_withdrawal(account, amount):
+    # The inline checks CheckingAccount.withdraw used to make
+    if account.status == "closed":
+        raise ValueError("closed")
+    if amount <= 0:
+        raise ValueError("Amount must be positive.")
+    if amount > account.balance + account.overdraft_limit:
+        raise ValueError("Withdrawal exceeds balance and overdraft limit.")
+
+
+def per_call(func, args, operations: int, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(operations):
+            func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best / operations
+
+
+def swap_check(seconds: float, readers: int) -> list:
+    generations = []
+    for generation in range(2):
+        classes = copy.deepcopy(config.ACCOUNT_CLASSES)
+        for account_config in classes.values():
+            account_config["config"]["minimum_initial_deposit"] = float(generation * 100)
+        generations.append(classes)
+    registry = RuleRegistry(generations[0])
+    stop = threading.Event()
+    problems = []
+    validations = [0] * readers
+
+    def reader(slot):
+        while not stop.is_set():
+            table = registry.table
+            minimums = {rules.minimum_initial_deposit for rules in table.by_type.values()}
+            if len(minimums) != 1:
+                problems.append(f"table {table.version} mixes minimums {sorted(minimums)}")
+            table.for_class(CheckingAccount).check_opening(1_000.0)
+            validations[slot] += 1
+
+    threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(readers)]
+    for thread in threads:
+        thread.start()
+    reloads = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        registry.reload(generations[reloads % 2])
+        reloads += 1
+    stop.set()
+    for thread in threads:
+        thread.join()
+    print(f"\nhot swap: {reloads:,} reloads while {readers} readers ran {sum(validations):,} validations")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=5, help="Best of this many rounds per check")
+    parser.add_argument("--swap-seconds", type=float, default=2.0)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    registry = RuleRegistry()
+    checking = CheckingAccount("bench", balance=1_000.0, overdraft_limit=100.0)
+    savings = SavingsAccount("bench-savings", balance=1_000.0)
+
+    def compiled_opening(account_type, initial_deposit):
+        rules = registry.for_type(account_type)
+        if rules is None:
+            raise ValueError(f"Unknown account type: {account_type}")
+        rules.check_opening(initial_deposit)
+
+    def compiled_withdrawal(account, amount):
+        registry.table.by_entity[type(account)].check_withdrawal(account, amount)
+
+    checks = [
+        ("minimum deposit lookup", legacy_minimum, registry.for_class, (SavingsAccount,)),
+        ("opening (savings)", legacy_opening, compiled_opening, ("savings", 500.0)),
+        ("withdrawal (checking)", legacy_withdrawal, compiled_withdrawal, (checking, 50.0)),
+    ]
+    print(f"{args.operations:,} calls per check, best of {args.rounds}")
+    print(f"  {'check':<26} {'config walk':>12} {'compiled':>12}")
+    for name, legacy, compiled, call_args in checks:
+        before = per_call(legacy, call_args, args.operations, args.rounds)
+        after = per_call(compiled, call_args, args.operations, args.rounds)
+        print(f"  {name:<26} {before * 1e9:>9.0f} ns {after * 1e9:>9.0f} ns")
+    withdraw = per_call(lambda: savings.withdraw(1.0).deposit(1.0), (), args.operations, args.rounds)
+    print(f"  {'entity withdraw+deposit':<26} {'':>12} {withdraw * 1e9:>9.0f} ns")
+
+    problems = swap_check(args.swap_seconds, args.readers)
+    if problems:
+        print(f"{len(problems)} inconsistent table(s) seen, e.g. {problems[0]}")
+        return 1
+    print("  every table seen was consistent")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Sharding benchmark: posting throughput as the number of shard processes grows.
+
+Client processes (standing in for API workers) each run a ShardRouter and
+post deposits to random accounts as fast as they can. With one shard every
+posting serializes on one interpreter; with N shards the work spreads over
+N processes, so throughput should rise roughly linearly until the cores
+run out.
+
+Run from the repository root:
+    python -m benchmarks.bench_sharding
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from infrastructure.sharding.cluster import ShardCluster
+from infrastructure.sharding.shard_router import ShardRouter
+
+
+def client(addresses, authkey, account_ids, postings, seed, start, results):
+    router = ShardRouter(addresses, authkey)
+    rng = random.Random(seed)
+    start.wait()
+    started = time.perf_counter()
+    for _ in range(postings):
+        router.deposit(rng.choice(account_ids), 1.0, "Benchmark")
+    results.put(time.perf_counter() - started)
+    router.close()
+
+
+def run(shards, clients, accounts, postings):
+    socket_dir = tempfile.mkdtemp(prefix="shard-bench-")
+    try:
+        with ShardCluster(shards, socket_dir=socket_dir) as cluster:
+            router = cluster.router()
+            account_ids = [router.create_account("checking", 100.0)["account_id"] for _ in range(accounts)]
+            router.close()
+
+            context = multiprocessing.get_context("spawn")
+            start = context.Event()
+            results = context.Queue()
+            processes = [
+                context.Process(target=client, args=(
+                    cluster.addresses, cluster.authkey, account_ids, postings, seed, start, results
+                ))
+                for seed in range(clients)
+            ]
+            for process in processes:
+                process.start()
+            time.sleep(1.0)  # let every client finish importing
+            start.set()
+            slowest = max(results.get() for _ in processes)
+            for process in processes:
+                process.join()
+        return clients * postings / slowest
+    finally:
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-shards", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=None, help="Client processes (defaults to 2 x max shards)")
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--postings", type=int, default=5_000, help="Deposits per client")
+    args = parser.parse_args()
+    clients = args.clients or 2 * args.max_shards
+
+    shard_counts = sorted({1, *(2 ** i for i in range(10) if 2 ** i <= args.max_shards), args.max_shards})
+    print(f"{clients} clients x {args.postings:,} deposits over {args.accounts:,} accounts "
+          f"({os.cpu_count()} CPUs)")
+    baseline = None
+    for shards in shard_counts:
+        rate = run(shards, clients, args.accounts, args.postings)
+        baseline = baseline or rate
+        print(f"  {shards:>3} shard(s) {rate:>12,.0f} deposits/s  ({rate / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
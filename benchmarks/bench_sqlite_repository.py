@@ -0,0 +1,102 @@
+"""
+Repository backend benchmark: SQLite against the in-memory repositories.
+
+Measures single deposits (one unit of work each, from several threads),
+apply_batch (executemany), balance reads, transaction lookups by ID and
+history pages through the (account_id, timestamp) index.
+
+Run from the repository root:
+    python -m benchmarks.bench_sqlite_repository
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+import config
+from application.banking_service import BankingService
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.sqlite_repository import (
+    SQLiteAccountRepository,
+    SQLiteDatabase,
+    SQLiteTransactionRepository
+)
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+
+def timed(operations, func):
+    started = time.perf_counter()
+    func()
+    return operations / (time.perf_counter() - started)
+
+
+def run(banking, args):
+    rng = random.Random(11)
+    account_ids = [banking.create_account("checking", 1_000.0)["account_id"] for _ in range(args.accounts)]
+    rates = {}
+
+    def deposit_worker(seed):
+        worker_rng = random.Random(seed)
+        for _ in range(args.deposits // args.threads):
+            banking.deposit(worker_rng.choice(account_ids), 1.0, "Benchmark")
+
+    def deposits():
+        threads = [threading.Thread(target=deposit_worker, args=(seed,)) for seed in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    rates[f"deposit ({args.threads} threads)"] = timed(args.deposits, deposits)
+
+    postings = [
+        {"account_id": rng.choice(account_ids), "type": "deposit", "amount": 2.0, "description": "Payroll"}
+        for _ in range(args.batch)
+    ]
+    transaction_ids = []
+    rates["apply_batch"] = timed(args.batch, lambda: transaction_ids.extend(banking.apply_batch(postings)["results"]))
+
+    sample = [rng.choice(account_ids) for _ in range(args.reads)]
+    rates["get_balance"] = timed(args.reads, lambda: [banking.get_balance(a) for a in sample])
+    lookups = [rng.choice(transaction_ids) for _ in range(args.reads)]
+    rates["get_transaction"] = timed(args.reads, lambda: [banking.get_transaction(t) for t in lookups])
+    rates["history page (50)"] = timed(
+        args.reads, lambda: [banking.get_transaction_history_page(a, 50) for a in sample]
+    )
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--deposits", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=50_000)
+    parser.add_argument("--reads", type=int, default=20_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="sqlite-bench-")
+    try:
+        memory = run(BankingService(AccountRepository(), TransactionRepository()), args)
+        results = {"memory": memory}
+        for synchronous in ("NORMAL", "FULL"):
+            config.SQLITE_SYNCHRONOUS = synchronous
+            database = SQLiteDatabase(os.path.join(directory, f"bank-{synchronous.lower()}.db"))
+            results[f"sqlite {synchronous}"] = run(
+                BankingService(SQLiteAccountRepository(database), SQLiteTransactionRepository(database)), args
+            )
+            database.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    names = list(results)
+    print(f"{'operations/s':<24}" + "".join(f"{name:>16}" for name in names))
+    for operation in memory:
+        print(f"{operation:<24}" + "".join(f"{results[name][operation]:>16,.0f}" for name in names))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Statement batch benchmark: statements rendered per second across worker counts.
+
+Fills in-memory repositories with accounts and three months of history,
+then renders the middle month's statements once per worker count (1
+renders in-process, more uses the process pool reading the memory-mapped
+statement image). Each run includes building its image, which is also
+timed on its own; every run's statement files are compared with the first
+run's.
+
+Rendering is CPU-bound, so the speedup is capped by the cores available.
+
+Run from the repository root:
+    python -m benchmarks.bench_statements
+    python -m benchmarks.bench_statements --accounts 50000 --workers 1 2 4 8 --format csv
+"""
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import config
+from application.banking_service import BankingService
+from application.statements import FORMATS, TEXT, StatementJob, build_image
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+START = datetime(2026, 8, 1)
+PERIOD = (datetime(2026, 9, 1), datetime(2026, 10, 1))
+DAYS = 92
+
+
+def fill(accounts: int, transactions: int) -> BankingService:
+    banking = BankingService(AccountRepository(), TransactionRepository())
+    rng = random.Random(13)
+    account_ids = []
+    for i in range(accounts):
+        account = banking.create_account("checking" if i % 2 else "savings", 500.0,
+                                         account_id=str(UUID(int=rng.getrandbits(128), version=4)))
+        account_ids.append(account["account_id"])
+        banking.account_repository.get_account_by_id(account["account_id"]).creation_date = START
+    descriptions = config.SAMPLE_DEPOSIT_DESCRIPTIONS + config.SAMPLE_WITHDRAWAL_DESCRIPTIONS + [None]
+    for _ in range(transactions):
+        account = banking.account_repository.get_account_by_id(rng.choice(account_ids))
+        deposit = rng.random() < 0.6
+        amount = round(rng.uniform(1, 500), 2)
+        banking.transaction_repository.save_transaction(Transaction(
+            transaction_id=None,
+            account_id=account.account_id,
+            transaction_type=TransactionType.DEPOSIT if deposit else TransactionType.WITHDRAW,
+            amount=amount,
+            description=rng.choice(descriptions),
+            timestamp=START + timedelta(seconds=rng.uniform(0, DAYS * 86400))
+        ))
+        account.balance += amount if deposit else -amount
+    return banking
+
+
+def digest(directory: str) -> str:
+    """Hash of every statement file's name and contents."""
+    hashed = hashlib.sha256()
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and not name.endswith(".json"):
+            hashed.update(name.encode())
+            with open(path, "rb") as handle:
+                hashed.update(handle.read())
+    return hashed.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=20_000)
+    parser.add_argument("--transactions", type=int, default=600_000, help="Spread over three months")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-accounts", type=int, default=config.STATEMENT_CHUNK_ACCOUNTS)
+    parser.add_argument("--format", choices=FORMATS, default=TEXT)
+    args = parser.parse_args()
+
+    banking = fill(args.accounts, args.transactions)
+    service = banking.transaction_service
+    directory = tempfile.mkdtemp(prefix="bench-statements-")
+    try:
+        started = time.perf_counter()
+        meta = build_image(banking.account_repository, banking.transaction_repository, service,
+                           os.path.join(directory, "image"), *PERIOD)
+        image_seconds = time.perf_counter() - started
+        print(f"{meta['accounts']:,} statements, {meta['transactions']:,} transactions in the period, "
+              f"{os.cpu_count()} CPU(s), {args.chunk_accounts} accounts per chunk")
+        print(f"  image build {image_seconds:.2f}s")
+        print(f"  {'workers':>7} {'seconds':>8} {'statements/s':>13} {'speedup':>8}  (runs include their image build)")
+
+        baseline = expected = None
+        mismatched = []
+        for workers in args.workers:
+            output = os.path.join(directory, f"workers-{workers}")
+            job = StatementJob(banking.account_repository, banking.transaction_repository, service,
+                               workers, args.chunk_accounts)
+            started = time.perf_counter()
+            state = job.run(output, *PERIOD, statement_format=args.format)
+            seconds = time.perf_counter() - started
+            baseline = baseline or seconds
+            print(f"  {workers:>7} {seconds:>8.2f} {state['statements'] / seconds:>13,.0f} {baseline / seconds:>7.2f}x")
+            answered = digest(output)
+            expected = expected or answered
+            if not state["complete"] or answered != expected:
+                mismatched.append(workers)
+            shutil.rmtree(output)
+
+        if mismatched:
+            print(f"statements differ from the first run's with workers: {', '.join(map(str, mismatched))}")
+            return 1
+        print("  every run wrote identical statements")
+        return 0
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
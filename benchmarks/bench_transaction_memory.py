@@ -0,0 +1,62 @@
+"""
+Memory benchmark: bytes per stored transaction for the object-per-row
+TransactionRepository against ColumnarTransactionRepository.
+
+Run from the repository root:
+    python -m benchmarks.bench_transaction_memory
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import config
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.columnar_transaction_repository import ColumnarTransactionRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+
+def fill(repository, count, accounts, seed=3):
+    rng = random.Random(seed)
+    account_ids = [str(uuid4()) for _ in range(accounts)]
+    descriptions = config.SAMPLE_DEPOSIT_DESCRIPTIONS + config.SAMPLE_WITHDRAWAL_DESCRIPTIONS + [None]
+    started = datetime(2026, 1, 1)
+    for i in range(count):
+        repository.save_transaction(Transaction(
+            transaction_id=str(uuid4()),
+            account_id=account_ids[rng.randrange(accounts)],
+            transaction_type=TransactionType.DEPOSIT if rng.random() < 0.6 else TransactionType.WITHDRAW,
+            amount=round(rng.uniform(1, 1000), 2),
+            description=rng.choice(descriptions),
+            timestamp=started + timedelta(seconds=i)
+        ))
+
+
+def measure(factory, count, accounts):
+    gc.collect()
+    tracemalloc.start()
+    repository = factory()
+    fill(repository, count, accounts)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=500_000)
+    parser.add_argument("--accounts", type=int, default=5_000)
+    args = parser.parse_args()
+
+    objects = measure(TransactionRepository, args.transactions, args.accounts)
+    columnar = measure(ColumnarTransactionRepository, args.transactions, args.accounts)
+    print(f"{args.transactions:,} transactions over {args.accounts:,} accounts")
+    print(f"  {'TransactionRepository':<32} {objects:>8.0f} bytes/transaction")
+    print(f"  {'ColumnarTransactionRepository':<32} {columnar:>8.0f} bytes/transaction  ({objects / columnar:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
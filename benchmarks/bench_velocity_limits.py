@@ -0,0 +1,125 @@
+"""
+Velocity limit benchmark: latency a withdrawal pays for the velocity checks.
+
+Times TransactionService.withdraw over many accounts with and without a
+VelocityLimiter, alternating between the two services in small rounds so
+that both see the same repository state. The limits are set high enough
+that nothing is rejected, so every limited withdrawal pays for all three
+windows (minute/hour/day, with the overdraft counter) in full. Also times
+the limiter's check + record on its own and reports its heap per tracked
+account.
+
+Run from the repository root:
+    python -m benchmarks.bench_velocity_limits
+    python -m benchmarks.bench_velocity_limits --accounts 100000 --withdrawals 500000
+"""
+import argparse
+import copy
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+import config
+from application.banking_service import BankingService
+from application.transaction_service import TransactionService
+from benchmarks.suite import percentile
+from domain.services.rule_registry import RULES
+from infrastructure.metrics import MetricsRegistry
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.velocity_limits import VelocityLimiter
+
+ROUND = 100  # Withdrawals per service before switching to the other
+
+
+def generous_rules():
+    """config.ACCOUNT_CLASSES with every window limited, but too high to ever trip."""
+    account_classes = copy.deepcopy(config.ACCOUNT_CLASSES)
+    for account_config in account_classes.values():
+        account_config["config"]["velocity_limits"] = {
+            window: {"count": 10 ** 9, "amount": 1e15, "overdrafts": 10 ** 9} for window in ("minute", "hour", "day")
+        }
+    return account_classes
+
+
+def summary(latencies):
+    latencies = sorted(latencies)
+    return {
+        "p50": percentile(latencies, 0.50) * 1e6,
+        "p99": percentile(latencies, 0.99) * 1e6,
+        "mean": sum(latencies) / len(latencies) * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--withdrawals", type=int, default=200_000, help="Per service")
+    args = parser.parse_args()
+
+    RULES.reload(generous_rules())
+    try:
+        banking = BankingService(AccountRepository(), TransactionRepository())
+        account_ids = [banking.create_account("checking", 1e12)["account_id"] for _ in range(args.accounts)]
+        # Separate metrics registries keep the two services' stage timings apart
+        services = {
+            "unlimited": TransactionService(banking.account_repository, banking.transaction_repository,
+                                            metrics=MetricsRegistry()),
+            "limited": TransactionService(banking.account_repository, banking.transaction_repository,
+                                          metrics=MetricsRegistry(), velocity=VelocityLimiter())
+        }
+        rng = random.Random(17)
+        latencies = {name: [] for name in services}
+        clock = time.perf_counter
+        gc.disable()
+        try:
+            for _ in range(args.withdrawals // ROUND):
+                for name, service in services.items():
+                    recorded = latencies[name]
+                    for account_id in rng.choices(account_ids, k=ROUND):
+                        started = clock()
+                        service.withdraw(account_id, 1.0)
+                        recorded.append(clock() - started)
+        finally:
+            gc.enable()
+        limiter = services["limited"].velocity
+
+        # The limiter on its own, over the same accounts
+        limits = RULES.table.by_class["CheckingAccount"].velocity_limits
+        alone = []
+        for account_id in rng.choices(account_ids, k=args.withdrawals):
+            started = clock()
+            limiter.check(account_id, limits, 1.0)
+            limiter.record(account_id, limits, 1.0)
+            alone.append(clock() - started)
+
+        tracemalloc.start()
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        measured = VelocityLimiter()
+        for account_id in account_ids:
+            measured.record(account_id, limits, 1.0, True)
+        gc.collect()
+        per_account = (tracemalloc.get_traced_memory()[0] - baseline) / len(measured)
+        tracemalloc.stop()
+    finally:
+        RULES.reload()
+
+    results = {name: summary(values) for name, values in latencies.items()}
+    results["check + record"] = summary(alone)
+    print(f"{args.withdrawals:,} withdrawals per service over {args.accounts:,} accounts, "
+          f"{len(limits)} windows x {limiter.buckets} buckets")
+    print(f"  {'':<16} {'p50':>9} {'p99':>9} {'mean':>9}")
+    for name, stats in results.items():
+        print(f"  {name:<16} {stats['p50']:>6.2f} us {stats['p99']:>6.2f} us {stats['mean']:>6.2f} us")
+    unlimited, limited = results["unlimited"], results["limited"]
+    print(f"  added per withdrawal: p50 {limited['p50'] - unlimited['p50']:+.2f} us, "
+          f"p99 {limited['p99'] - unlimited['p99']:+.2f} us")
+    print(f"  limiter heap: {per_account:,.0f} bytes per tracked account ({len(limiter):,} tracked)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
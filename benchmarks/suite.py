@@ -0,0 +1,295 @@
+"""
+Benchmark suite: mixed banking workloads with regression checks.
+
+Each scenario builds a fresh bank (N accounts of every configured class),
+replays the same Zipf-skewed operation stream from benchmarks.workload and
+reports throughput, p50/p99 latency (overall and per operation) and peak
+traced memory. Scenarios:
+
+    service          TransactionService called directly, one thread
+    service-threads  TransactionService called from several threads
+    http             The FastAPI app in-process over httpx's ASGI transport,
+                     with many concurrent clients
+
+Results can be saved as a baseline and later runs compared against it;
+the suite exits with status 1 when a metric regresses beyond the
+tolerance. Baselines are machine-specific: record them on the machine
+that runs the comparison.
+
+Run from the repository root:
+    python -m benchmarks.suite --save-baseline
+    python -m benchmarks.suite
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+from application.banking_service import BankingService
+from benchmarks.workload import BALANCE, DEPOSIT, SUMMARY, WITHDRAW, build_accounts, generate_operations
+from domain.Exceptions.exception_error import BankingError
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# metric -> True if higher is better
+CHECKED_METRICS = {"throughput": True, "p50_ms": False, "p99_ms": False, "peak_memory_mb": False}
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def new_banking() -> BankingService:
+    return BankingService(AccountRepository(), TransactionRepository())
+
+
+class Recorder:
+    """Collects per-operation latencies and outcomes (thread-safe appends)."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.rejected = 0
+        self.errors = 0
+
+    def summarize(self, seconds: float) -> dict:
+        everything = sorted(value for values in self.latencies.values() for value in values)
+        by_kind = {}
+        for kind, values in sorted(self.latencies.items()):
+            values.sort()
+            by_kind[kind] = {
+                "count": len(values),
+                "p50_ms": percentile(values, 0.50) * 1e3,
+                "p99_ms": percentile(values, 0.99) * 1e3
+            }
+        return {
+            "operations": len(everything),
+            "seconds": seconds,
+            "throughput": len(everything) / seconds,
+            "p50_ms": percentile(everything, 0.50) * 1e3,
+            "p99_ms": percentile(everything, 0.99) * 1e3,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "by_kind": by_kind
+        }
+
+
+# Scenario drivers: each returns (recorder, seconds)
+
+def drive_service(banking, operations, threads: int = 1):
+    transaction_service = banking.transaction_service
+    account_repository = banking.account_repository
+    recorder = Recorder()
+    clock = time.perf_counter
+
+    def worker(chunk):
+        latencies = defaultdict(list)
+        rejected = errors = 0
+        for operation in chunk:
+            started = clock()
+            try:
+                if operation.kind == DEPOSIT:
+                    transaction_service.deposit(operation.account_id, operation.amount, operation.description)
+                elif operation.kind == WITHDRAW:
+                    transaction_service.withdraw(operation.account_id, operation.amount, operation.description)
+                elif operation.kind == BALANCE:
+                    account_repository.get_account_by_id(operation.account_id).balance
+                else:
+                    transaction_service.get_account_summary(operation.account_id)
+            except (ValueError, BankingError):
+                rejected += 1
+            except Exception:
+                errors += 1
+            latencies[operation.kind].append(clock() - started)
+        with lock:
+            for kind, values in latencies.items():
+                recorder.latencies[kind].extend(values)
+            recorder.rejected += rejected
+            recorder.errors += errors
+
+    lock = threading.Lock()
+    chunks = [operations[i::threads] for i in range(threads)]
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    started = clock()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return recorder, clock() - started
+
+
+def drive_http(banking, operations, concurrency: int = 32):
+    import httpx
+    import api.api as api_module
+
+    # Point the app at this scenario's fresh bank
+    api_module.banking = banking
+    prefix = api_module.config.API_PREFIX
+    recorder = Recorder()
+    clock = time.perf_counter
+
+    async def client(http, queue):
+        while queue:
+            operation = queue.pop()
+            started = clock()
+            if operation.kind in (DEPOSIT, WITHDRAW):
+                response = await http.post(
+                    f"{prefix}/accounts/{operation.account_id}/{operation.kind}",
+                    json={"amount": operation.amount, "description": operation.description}
+                )
+            else:
+                endpoint = "balance" if operation.kind == BALANCE else "summary"
+                response = await http.get(f"{prefix}/accounts/{operation.account_id}/{endpoint}")
+            recorder.latencies[operation.kind].append(clock() - started)
+            if 400 <= response.status_code < 500:
+                recorder.rejected += 1
+            elif response.status_code >= 500:
+                recorder.errors += 1
+
+    async def run():
+        queue = list(reversed(operations))
+        transport = httpx.ASGITransport(app=api_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            started = clock()
+            await asyncio.gather(*(client(http, queue) for _ in range(concurrency)))
+            return clock() - started
+
+    seconds = asyncio.run(run())
+    return recorder, seconds
+
+
+SCENARIOS = {
+    "service": lambda banking, operations, args: drive_service(banking, operations, 1),
+    "service-threads": lambda banking, operations, args: drive_service(banking, operations, args.threads),
+    "http": lambda banking, operations, args: drive_http(banking, operations, args.concurrency),
+}
+
+
+def run_scenario(name: str, args) -> dict:
+    """Run one scenario: a timed pass, then (optionally) a traced pass for peak memory."""
+    banking = new_banking()
+    account_ids = build_accounts(banking, args.accounts_per_class, seed=args.seed)
+    operations = generate_operations(account_ids, args.operations, args.read_ratio,
+                                     args.deposit_ratio, args.zipf, seed=args.seed + 1)
+    recorder, seconds = SCENARIOS[name](banking, operations, args)
+    result = recorder.summarize(seconds)
+
+    if args.memory:
+        # tracemalloc slows everything down, so memory gets its own pass
+        tracemalloc.start()
+        banking = new_banking()
+        account_ids = build_accounts(banking, args.accounts_per_class, seed=args.seed)
+        operations = generate_operations(account_ids, args.operations, args.read_ratio,
+                                         args.deposit_ratio, args.zipf, seed=args.seed + 1)
+        SCENARIOS[name](banking, operations, args)
+        result["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compare results against a baseline.
+
+    Returns:
+        list: (scenario, metric, baseline value, current value) per regression
+    """
+    regressions = []
+    for scenario, result in results.items():
+        reference = baseline.get(scenario)
+        if not reference:
+            continue
+        for metric, higher_is_better in CHECKED_METRICS.items():
+            if metric not in result or metric not in reference:
+                continue
+            current, expected = result[metric], reference[metric]
+            if higher_is_better:
+                regressed = current < expected * (1 - tolerance)
+            else:
+                regressed = current > expected * (1 + tolerance)
+            if regressed:
+                regressions.append((scenario, metric, expected, current))
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    print(f"\n{'scenario':<16}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'peak MB':>10}{'rejected':>10}{'errors':>8}")
+    for name, result in results.items():
+        peak = result.get("peak_memory_mb")
+        print(f"{name:<16}{result['throughput']:>12,.0f}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+              f"{'-' if peak is None else format(peak, '.1f'):>10}{result['rejected']:>10}{result['errors']:>8}")
+        for kind, stats in result["by_kind"].items():
+            print(f"  {kind:<14}{stats['count']:>12,}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenario names")
+    parser.add_argument("--accounts-per-class", type=int, default=1_000)
+    parser.add_argument("--operations", type=int, default=20_000)
+    parser.add_argument("--read-ratio", type=float, default=0.3)
+    parser.add_argument("--deposit-ratio", type=float, default=0.6, help="Share of deposits among writes")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for account popularity")
+    parser.add_argument("--threads", type=int, default=4, help="Threads for service-threads")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients for http")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip the peak-memory pass")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--output", help="Also write the full results as JSON here")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        print(f"running {name} ...", flush=True)
+        results[name] = run_scenario(name, args)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as handle:
+                baseline = json.load(handle)
+        for name, result in results.items():
+            baseline[name] = {metric: result[metric] for metric in CHECKED_METRICS if metric in result}
+        with open(args.baseline, "w") as handle:
+            json.dump(baseline, handle, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as handle:
+        regressions = compare(results, json.load(handle), args.tolerance)
+    if not regressions:
+        print(f"\nNo regressions beyond {args.tolerance:.0%} of the baseline")
+        return 0
+    print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+    for scenario, metric, expected, current in regressions:
+        print(f"  {scenario} {metric}: baseline {expected:,.3f}, now {current:,.3f}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Synthetic workloads for the benchmark suite.
+
+Builds a bank with N accounts of every class in config.ACCOUNT_CLASSES and
+generates a reproducible stream of mixed operations. Account popularity is
+Zipf-skewed (a few hot accounts take most of the traffic, like payroll or
+merchant accounts), amounts are log-normal, and descriptions come from the
+sample lists in config.
+"""
+import random
+from bisect import bisect_left
+from itertools import accumulate
+from typing import List, NamedTuple, Optional
+
+import config
+from domain.services.business_rules import BusinessRuleService
+from application.banking_service import ACCOUNT_CLASS_TYPES
+
+DEPOSIT = "deposit"
+WITHDRAW = "withdraw"
+BALANCE = "balance"
+SUMMARY = "summary"
+
+
+class Operation(NamedTuple):
+    kind: str
+    account_id: str
+    amount: Optional[float] = None
+    description: Optional[str] = None
+
+
+class ZipfSampler:
+    """
+    Draws indexes in [0, n) with P(rank k) proportional to 1 / k**s.
+
+    Ranks are shuffled onto indexes, so the hot accounts are not simply the
+    first ones created.
+    """
+
+    def __init__(self, n: int, s: float = 1.1, rng: random.Random = None):
+        self.rng = rng or random.Random()
+        self._cumulative = list(accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+        self._total = self._cumulative[-1]
+        self._index_for_rank = list(range(n))
+        self.rng.shuffle(self._index_for_rank)
+
+    def sample(self) -> int:
+        rank = bisect_left(self._cumulative, self.rng.random() * self._total)
+        return self._index_for_rank[min(rank, len(self._index_for_rank) - 1)]
+
+
+def build_accounts(banking, accounts_per_class: int, seed: int = 1) -> List[str]:
+    """
+    Open accounts_per_class accounts of every configured class.
+
+    Opening balances are random but always meet the class's minimum
+    initial deposit.
+
+    Args:
+        banking: BankingService (or anything with the same create_account)
+        accounts_per_class: Accounts to open per class
+        seed: Random seed
+
+    Returns:
+        List[str]: IDs of the new accounts
+    """
+    rng = random.Random(seed)
+    rules = BusinessRuleService()
+    account_ids = []
+    for account_type, account_config in config.ACCOUNT_CLASSES.items():
+        minimum = rules.get_minimum_initial_deposit(ACCOUNT_CLASS_TYPES[account_config["class"]])
+        for i in range(accounts_per_class):
+            opening = round(minimum + rng.lognormvariate(7.0, 1.0), 2)
+            info = banking.create_account(account_type, opening, f"Load test {account_type} {i}")
+            account_ids.append(info["account_id"])
+    return account_ids
+
+
+def generate_operations(account_ids: List[str], count: int, read_ratio: float = 0.3,
+                        deposit_ratio: float = 0.6, zipf_s: float = 1.1, seed: int = 2) -> List[Operation]:
+    """
+    Generate a mixed operation stream.
+
+    Args:
+        account_ids: Accounts to target
+        count: Number of operations
+        read_ratio: Share of reads (split evenly between balance and summary)
+        deposit_ratio: Share of deposits among the writes
+        zipf_s: Zipf exponent for account popularity (0 is uniform)
+        seed: Random seed
+
+    Returns:
+        List[Operation]: The operations, in order
+    """
+    rng = random.Random(seed)
+    popularity = ZipfSampler(len(account_ids), zipf_s, rng)
+    operations = []
+    for _ in range(count):
+        account_id = account_ids[popularity.sample()]
+        if rng.random() < read_ratio:
+            operations.append(Operation(BALANCE if rng.random() < 0.5 else SUMMARY, account_id))
+        elif rng.random() < deposit_ratio:
+            amount = round(rng.lognormvariate(4.0, 1.2), 2) or 0.01
+            operations.append(Operation(DEPOSIT, account_id, amount, rng.choice(config.SAMPLE_DEPOSIT_DESCRIPTIONS)))
+        else:
+            amount = round(rng.lognormvariate(3.5, 1.0), 2) or 0.01
+            operations.append(Operation(WITHDRAW, account_id, amount, rng.choice(config.SAMPLE_WITHDRAWAL_DESCRIPTIONS)))
+    return operations
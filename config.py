@@ -2,6 +2,7 @@
 Configuration settings for the Banking Application.
 """
 import os
+import tempfile
 from typing import Dict, Any
 
 # Application settings
@@ -13,6 +14,70 @@ DEBUG = True
 API_PREFIX = "/api"
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", "8000"))
+HISTORY_PAGE_DEFAULT = 100  # Transactions per history page
+HISTORY_PAGE_MAX = 1000
+API_WRITE_QUEUE_DEPTH = int(os.getenv("API_WRITE_QUEUE_DEPTH", "1000"))  # Pending writes per account
+API_OFFLOAD_READS = os.getenv("API_OFFLOAD_READS", "auto")  # "1"/"0": always/never run reads in the threadpool; "auto": when they can block
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))  # More than one requires SHARD_COUNT > 0
+IMPORT_CHUNK_BYTES = int(os.getenv("IMPORT_CHUNK_BYTES", str(4 * 1024 * 1024)))  # Bytes parsed per bulk-import task
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", str(os.cpu_count() or 1)))  # Bulk-import parser processes
+EXPORT_CHUNK_SIZE = HISTORY_PAGE_MAX  # Accounts / transactions fetched per step of a ledger export
+EXPORT_GZIP_LEVEL = 6  # zlib level for gzipped exports
+STATEMENT_WORKERS = int(os.getenv("STATEMENT_WORKERS", str(os.cpu_count() or 1)))  # Statement renderer processes
+STATEMENT_CHUNK_ACCOUNTS = int(os.getenv("STATEMENT_CHUNK_ACCOUNTS", "500"))  # Accounts per statement task
+STATEMENT_RETRIES = int(os.getenv("STATEMENT_RETRIES", "2"))  # Extra attempts for a failed statement chunk
+
+# Metrics settings
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"  # Stage timings and error counters
+METRICS_BUCKETS = (  # Histogram bucket upper bounds, in seconds
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0
+)
+
+# Concurrency settings
+LOCK_STRIPES = int(os.getenv("LOCK_STRIPES", "256"))  # Per-account lock pool size
+HOT_ACCOUNTS_ENABLED = os.getenv("HOT_ACCOUNTS_ENABLED", "0") == "1"  # Split deposits to contended accounts
+HOT_ACCOUNT_SLOTS = int(os.getenv("HOT_ACCOUNT_SLOTS", "8"))  # Sub-balance slots per hot account
+HOT_ACCOUNT_PROMOTE_AFTER = int(os.getenv("HOT_ACCOUNT_PROMOTE_AFTER", "64"))  # Contended deposits per window
+HOT_ACCOUNT_WINDOW_SECONDS = float(os.getenv("HOT_ACCOUNT_WINDOW_SECONDS", "1.0"))
+HOT_ACCOUNT_MAX_PENDING = int(os.getenv("HOT_ACCOUNT_MAX_PENDING", "1024"))  # Slot deposits before consolidating
+VELOCITY_LIMITS_ENABLED = os.getenv("VELOCITY_LIMITS_ENABLED", "0") == "1"  # Enforce ACCOUNT_CLASSES velocity_limits
+VELOCITY_BUCKETS = int(os.getenv("VELOCITY_BUCKETS", "30"))  # Ring buckets per window (window / buckets = resolution)
+VELOCITY_MAX_ACCOUNTS = int(os.getenv("VELOCITY_MAX_ACCOUNTS", "100000"))  # Accounts tracked before evicting the idlest
+
+# Sharding settings
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))  # 0 keeps all accounts in the API process
+SHARD_SOCKET_DIR = os.getenv("SHARD_SOCKET_DIR", os.path.join(tempfile.gettempdir(), "banking-shards"))
+# Shared secret of the shard sockets; unset, a cluster started here generates one and passes it on
+SHARD_AUTHKEY = os.getenv("SHARD_AUTHKEY", "").encode()
+SHARD_VIRTUAL_NODES = int(os.getenv("SHARD_VIRTUAL_NODES", "128"))  # Hash ring points per shard
+
+# Persistence settings
+REPOSITORY_BACKEND = os.getenv("REPOSITORY_BACKEND", "memory")  # "memory" or "sqlite"
+SQLITE_PATH = os.getenv("SQLITE_PATH", "banking.db")
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))  # Open connections per process
+SQLITE_CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))  # Prepared statements per connection
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # FULL fsyncs every commit, NORMAL each checkpoint
+ACCOUNT_CACHE_ENABLED = os.getenv("ACCOUNT_CACHE_ENABLED", "1") == "1"  # Cache accounts in front of "sqlite"
+ACCOUNT_CACHE_SIZE = int(os.getenv("ACCOUNT_CACHE_SIZE", "100000"))  # Accounts kept
+ACCOUNT_CACHE_MAX_BYTES = int(os.getenv("ACCOUNT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # Estimated memory kept
+ACCOUNT_CACHE_NEGATIVE_SIZE = int(os.getenv("ACCOUNT_CACHE_NEGATIVE_SIZE", "10000"))  # Unknown ids remembered
+LEDGER_DIR = os.getenv("LEDGER_DIR")  # Unset keeps all state in memory
+LEDGER_SEGMENT_BYTES = int(os.getenv("LEDGER_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+LEDGER_FSYNC = os.getenv("LEDGER_FSYNC", "1") == "1"
+IDEMPOTENCY_CAPACITY = int(os.getenv("IDEMPOTENCY_CAPACITY", "100000"))  # Completed keys remembered
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+IDEMPOTENCY_PERSIST = os.getenv("IDEMPOTENCY_PERSIST", "1") == "1"  # Journal keys next to the ledger / database
+SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "300"))
+SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", "2"))  # Snapshots retained on disk
+SNAPSHOT_COMPACT = os.getenv("SNAPSHOT_COMPACT", "1") == "1"  # Drop ledger segments covered by a snapshot
+BALANCE_CHECKPOINT_INTERVAL = int(os.getenv("BALANCE_CHECKPOINT_INTERVAL", "64"))  # Postings per balance checkpoint
+COLD_TIER_ENABLED = os.getenv("COLD_TIER_ENABLED", "0") == "1"  # Spill old history to compressed segments
+COLD_TIER_DIR = os.getenv("COLD_TIER_DIR", os.path.join(tempfile.gettempdir(), "banking-cold"))  # Without a ledger
+COLD_TIER_AGE_SECONDS = float(os.getenv("COLD_TIER_AGE_SECONDS", str(30 * 24 * 3600)))  # History kept in memory
+COLD_TIER_INTERVAL_SECONDS = float(os.getenv("COLD_TIER_INTERVAL_SECONDS", "3600"))  # Between spills
+COLD_TIER_BLOCK_ENTRIES = int(os.getenv("COLD_TIER_BLOCK_ENTRIES", "256"))  # Transactions per compressed block
+COLD_TIER_CACHE_BLOCKS = int(os.getenv("COLD_TIER_CACHE_BLOCKS", "256"))  # Decoded blocks kept in memory
 
 # Account class configuration (updated to use class references)
 ACCOUNT_CLASSES = {
@@ -21,9 +86,17 @@ ACCOUNT_CLASSES = {
         "config": {
             "free_transfers": True,
             "debit_card": True,
+            "overdraft": True,  # Withdrawals may use the account's overdraft_limit
             "monthly_fee": 0.0,
             "interest_rate": 0.01,  # 1% annual interest
-            "min_balance_fee": 0.0
+            "min_balance_fee": 0.0,
+            # Withdrawal limits per rolling window (enforced when VELOCITY_LIMITS_ENABLED):
+            # count and amount of withdrawals, and overdrafts (withdrawals taking the balance below zero)
+            "velocity_limits": {
+                "minute": {"count": 10, "amount": 5000.0},
+                "hour": {"count": 60, "amount": 20000.0},
+                "day": {"count": 200, "amount": 50000.0, "overdrafts": 3}
+            }
         }
     },
     "savings": {
@@ -33,8 +106,13 @@ ACCOUNT_CLASSES = {
             "debit_card": False,
             "monthly_fee": 0.0,
             "interest_rate": 0.025,  # 2.5% annual interest
-            "min_balance_fee": 5.0,  # Fee if balance drops below minimum
-            "minimum_initial_deposit": 100.0
+            "min_balance_fee": 5.0,  # Fee if balance drops below minimum_balance
+            "minimum_balance": 100.0,
+            "minimum_initial_deposit": 100.0,
+            "velocity_limits": {
+                "hour": {"count": 6, "amount": 10000.0},
+                "day": {"count": 12, "amount": 25000.0}
+            }
         }
     }
 }
@@ -0,0 +1,47 @@
+
+
+class BankingError(Exception):
+    """Base class for other exceptions in the banking system."""
+    pass
+
+class InsufficientBalanceError(BankingError):
+    """Raised when a withdrawal is attempted with insufficient balance."""
+    def __init__(self, message="Insufficient balance for this operation."):
+        self.message = message
+        super().__init__(self.message)
+
+class InvalidAmountError(BankingError):
+    """Raised when an invalid amount is provided for deposit or withdrawal."""
+    def __init__(self, message="Amount must be positive."):
+        self.message = message
+        super().__init__(self.message)
+
+class AccountClosedError(BankingError):
+    """Raised when an operation is attempted on a closed account."""
+    def __init__(self, message="This account is closed."):
+        self.message = message
+        super().__init__(self.message)
+
+class OverdraftExceededError(BankingError):
+    """Raised when a withdrawal would exceed the overdraft limit."""
+    def __init__(self, message="Withdrawal exceeds balance and overdraft limit."):
+        self.message = message
+        super().__init__(self.message)
+
+class InsufficientDepositError(BankingError):
+    """Raised when an account is opened below its minimum initial deposit."""
+    def __init__(self, message="Initial deposit is below the minimum for this account type."):
+        self.message = message
+        super().__init__(self.message)
+
+class IdempotencyKeyReusedError(BankingError):
+    """Raised when an idempotency key is replayed with different request parameters."""
+    def __init__(self, message="Idempotency key was already used for a different request."):
+        self.message = message
+        super().__init__(self.message)
+
+class VelocityLimitExceededError(BankingError):
+    """Raised when a withdrawal would exceed one of the account's velocity limits."""
+    def __init__(self, message="Withdrawal velocity limit exceeded."):
+        self.message = message
+        super().__init__(self.message)
@@ -1,23 +1,31 @@
+from domain.services.rule_registry import RULES
 
 class Account:
-    def __init__(self, account_id, account_type, balance=0.0, status='active', creation_date=None):
+    # Accounts without an overdraft facility (see CheckingAccount)
+    overdraft_limit = 0.0
+    # Balance the account was opened with (None for accounts recorded before it was kept)
+    opening_balance = None
+
+    def __init__(self, account_id, account_type, balance=0.0, status='active', creation_date=None, owner_name=None):
         self.account_id = account_id
         self.account_type = account_type
         self.balance = balance
+        self.opening_balance = balance
         self.status = status
         self.creation_date = creation_date
+        self.owner_name = owner_name
 
     def deposit(self, amount):
         if amount <= 0:
             raise ValueError("Deposit amount must be positive.")
         self.balance += amount
+        return self
 
     def withdraw(self, amount):
-        if amount <= 0:
-            raise ValueError("Withdrawal amount must be positive.")
-        if amount > self.balance:
-            raise ValueError("Insufficient balance.")
+        # Per-class rules (overdraft, closed accounts) come from the compiled rule table
+        RULES.table.by_entity[type(self)].check_withdrawal(self, amount)
         self.balance -= amount
+        return self
 
     def get_balance(self):
         return self.balance
@@ -28,5 +36,6 @@ class Account:
             "account_type": self.account_type,
             "balance": self.balance,
             "status": self.status,
-            "creation_date": self.creation_date
+            "creation_date": self.creation_date,
+            "owner_name": self.owner_name
         }
@@ -0,0 +1,14 @@
+
+
+from domain.entities.account import Account
+
+class CheckingAccount(Account):
+    def __init__(self, account_id, balance=0.0, overdraft_limit=0.0, status='active', creation_date=None, owner_name=None):
+        super().__init__(account_id, account_type='Checking', balance=balance, status=status, creation_date=creation_date, owner_name=owner_name)
+        self.overdraft_limit = overdraft_limit
+
+    def get_account_info(self):
+        """Override to include overdraft limit in account info."""
+        info = super().get_account_info()
+        info['overdraft_limit'] = self.overdraft_limit
+        return info
@@ -1,9 +1,9 @@
 
-from account import Account
+from domain.entities.account import Account
 
 class SavingsAccount(Account):
-    def __init__(self, account_id, balance=0.0, interest_rate=0.02, status='active', creation_date=None):
-        super().__init__(account_id, account_type='Savings', balance=balance, status=status, creation_date=creation_date)
+    def __init__(self, account_id, balance=0.0, interest_rate=0.02, status='active', creation_date=None, owner_name=None):
+        super().__init__(account_id, account_type='Savings', balance=balance, status=status, creation_date=creation_date, owner_name=owner_name)
         self.interest_rate = interest_rate
 
     def apply_interest(self):
@@ -0,0 +1,30 @@
+"""
+Transaction entity used by the application layer.
+"""
+from datetime import datetime
+from enum import Enum
+
+
+class TransactionType(Enum):
+    DEPOSIT = 'DEPOSIT'
+    WITHDRAW = 'WITHDRAW'
+
+
+class Transaction:
+    def __init__(self, transaction_id, account_id, transaction_type, amount, description=None, timestamp=None):
+        self.transaction_id = transaction_id
+        self.account_id = account_id
+        self.transaction_type = transaction_type
+        self.amount = amount
+        self.description = description
+        self.timestamp = timestamp or datetime.now()
+
+    def get_transaction_info(self):
+        return {
+            "transaction_id": self.transaction_id,
+            "account_id": self.account_id,
+            "transaction_type": self.transaction_type.value,
+            "amount": self.amount,
+            "description": self.description,
+            "timestamp": self.timestamp
+        }
@@ -1,5 +1,7 @@
 # services.py
 
+from domain.services.rule_registry import RULES
+
 class BankingService:
     @staticmethod
     def check_negative_balance(account):
@@ -10,3 +12,7 @@ class BankingService:
     def validate_deposit_amount(amount):
         if amount <= 0:
             raise ValueError("Deposit amount must be positive.")
+
+class BusinessRuleService:
+    def get_minimum_initial_deposit(self, account_class):
+        return RULES.for_class(account_class).minimum_initial_deposit
@@ -0,0 +1,269 @@
+"""
+Compiled business rules in the Domain Layer.
+This turns config.ACCOUNT_CLASSES into immutable lookup tables and per-class
+validator and fee closures, once, so the creation and posting paths stop
+walking nested config dicts.
+
+A RuleTable is never modified after it is built. Reloading compiles a new
+table and swaps the registry's reference to it in one assignment. Readers
+take no lock: they read the current table and keep using it for as long as
+they need a consistent view.
+"""
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+import config
+from domain.Exceptions.exception_error import (
+    AccountClosedError,
+    InsufficientBalanceError,
+    InsufficientDepositError,
+    InvalidAmountError
+)
+
+
+# Rolling windows a velocity limit may be set for, in seconds
+VELOCITY_WINDOWS = {"minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+
+class VelocityLimit(NamedTuple):
+    """Withdrawal limits over one rolling window; None means unlimited."""
+    window: str
+    seconds: float
+    count: Optional[int]
+    amount: Optional[float]
+    # Withdrawals that take the balance below zero
+    overdrafts: Optional[int]
+
+
+class AccountRules(NamedTuple):
+    """Rules of one account class, with its validators pre-bound."""
+    account_type: Optional[str]
+    class_name: Optional[str]
+    minimum_initial_deposit: float
+    monthly_fee: float
+    min_balance_fee: float
+    # Balance below which min_balance_fee is charged
+    minimum_balance: float
+    interest_rate: float
+    free_transfers: bool
+    debit_card: bool
+    overdraft: bool
+    # check_opening(initial_deposit) raises InsufficientDepositError
+    check_opening: Callable[[float], None]
+    # check_withdrawal(account, amount) raises if the entity may not pay amount out
+    check_withdrawal: Callable[[Any, float], None]
+    # fee(balance) is the periodic fee charged at that balance
+    fee: Callable[[float], float]
+    # Enforced by the VelocityLimiter of the services that withdraw (empty if none)
+    velocity_limits: Tuple[VelocityLimit, ...] = ()
+
+
+class _EntityIndex(dict):
+    """Entity class -> AccountRules, resolved by class name on first use."""
+
+    def __init__(self, by_class: Mapping[str, AccountRules], default: AccountRules):
+        super().__init__()
+        self._by_class = by_class
+        self._default = default
+
+    def __missing__(self, account_class):
+        rules = self._by_class.get(account_class.__name__, self._default)
+        self[account_class] = rules
+        return rules
+
+
+class RuleTable(NamedTuple):
+    """One compiled version of the rules."""
+    version: int
+    by_type: Mapping[str, AccountRules]
+    by_class: Mapping[str, AccountRules]
+    default: AccountRules
+    # Hot-path lookup by the entity class itself: RULES.table.by_entity[type(account)]
+    by_entity: Mapping[type, AccountRules]
+
+    def for_class(self, account_class) -> AccountRules:
+        """Rules for an entity class (or class name); unconfigured classes get the defaults."""
+        if isinstance(account_class, str):
+            return self.by_class.get(account_class, self.default)
+        return self.by_entity[account_class]
+
+
+def _opening_check(minimum: float) -> Callable[[float], None]:
+    if minimum <= 0:
+        def check_opening(initial_deposit):
+            pass
+        return check_opening
+
+    def check_opening(initial_deposit):
+        if initial_deposit < minimum:
+            raise InsufficientDepositError(f"Minimum deposit: {minimum}")
+    return check_opening
+
+
+def _withdrawal_check(overdraft: bool) -> Callable[[Any, float], None]:
+    if overdraft:
+        # Closed accounts are refused and the account's own overdraft_limit applies
+        def check_withdrawal(account, amount):
+            if account.status == "closed":
+                raise AccountClosedError()
+            if amount <= 0:
+                raise InvalidAmountError()
+            if amount > account.balance + account.overdraft_limit:
+                raise InsufficientBalanceError("Withdrawal exceeds balance and overdraft limit.")
+        return check_withdrawal
+
+    def check_withdrawal(account, amount):
+        if amount <= 0:
+            raise ValueError("Withdrawal amount must be positive.")
+        if amount > account.balance:
+            raise ValueError("Insufficient balance.")
+    return check_withdrawal
+
+
+def _fee(monthly_fee: float, min_balance_fee: float, minimum_balance: float) -> Callable[[float], float]:
+    def fee(balance):
+        return monthly_fee + (min_balance_fee if balance < minimum_balance else 0.0)
+    return fee
+
+
+def _velocity_limits(settings: Mapping[str, Any]) -> Tuple[VelocityLimit, ...]:
+    limits = []
+    for window, window_settings in settings.items():
+        if window not in VELOCITY_WINDOWS:
+            raise ValueError(f"Unknown window {window} (expected one of {', '.join(VELOCITY_WINDOWS)})")
+        unknown = set(window_settings) - {"count", "amount", "overdrafts"}
+        if unknown:
+            raise ValueError(f"Unknown {window} limit: {', '.join(sorted(unknown))}")
+        count, amount, overdrafts = (window_settings.get(name) for name in ("count", "amount", "overdrafts"))
+        limits.append(VelocityLimit(
+            window=window,
+            seconds=VELOCITY_WINDOWS[window],
+            count=None if count is None else int(count),
+            amount=None if amount is None else float(amount),
+            overdrafts=None if overdrafts is None else int(overdrafts)
+        ))
+    return tuple(sorted(limits, key=lambda limit: limit.seconds))
+
+
+def compile_rules(account_type: Optional[str], class_name: Optional[str], settings: Dict[str, Any]) -> AccountRules:
+    """
+    Compile one account class's settings.
+
+    Args:
+        account_type: Key in ACCOUNT_CLASSES (None for the defaults)
+        class_name: Entity class name
+        settings: The class's "config" dict
+
+    Returns:
+        AccountRules: The compiled rules
+
+    Raises:
+        ValueError: If a setting has the wrong type
+    """
+    try:
+        minimum = float(settings.get("minimum_initial_deposit", 0.0))
+        monthly_fee = float(settings.get("monthly_fee", 0.0))
+        min_balance_fee = float(settings.get("min_balance_fee", 0.0))
+        minimum_balance = float(settings.get("minimum_balance", 0.0))
+        interest_rate = float(settings.get("interest_rate", 0.0))
+        velocity_limits = _velocity_limits(settings.get("velocity_limits") or {})
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid rule for {account_type}: {e}")
+    overdraft = bool(settings.get("overdraft", False))
+    return AccountRules(
+        account_type=account_type,
+        class_name=class_name,
+        minimum_initial_deposit=minimum,
+        monthly_fee=monthly_fee,
+        min_balance_fee=min_balance_fee,
+        minimum_balance=minimum_balance,
+        interest_rate=interest_rate,
+        free_transfers=bool(settings.get("free_transfers", False)),
+        debit_card=bool(settings.get("debit_card", False)),
+        overdraft=overdraft,
+        check_opening=_opening_check(minimum),
+        check_withdrawal=_withdrawal_check(overdraft),
+        fee=_fee(monthly_fee, min_balance_fee, minimum_balance),
+        velocity_limits=velocity_limits
+    )
+
+
+def compile_table(account_classes: Mapping[str, Dict[str, Any]], version: int = 0) -> RuleTable:
+    """
+    Compile a whole ACCOUNT_CLASSES mapping.
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    by_type = {}
+    by_class = {}
+    for account_type, account_config in account_classes.items():
+        class_name = account_config.get("class") if isinstance(account_config, dict) else None
+        if not class_name:
+            raise ValueError(f"Account type {account_type} has no class")
+        rules = compile_rules(account_type.lower(), class_name, account_config.get("config", {}))
+        by_type[rules.account_type] = rules
+        # The first type configured for a class defines its entity rules
+        by_class.setdefault(class_name, rules)
+    default = compile_rules(None, None, {})
+    return RuleTable(
+        version=version,
+        by_type=MappingProxyType(by_type),
+        by_class=MappingProxyType(by_class),
+        default=default,
+        by_entity=_EntityIndex(by_class, default)
+    )
+
+
+class RuleRegistry:
+    """
+    Holds the current RuleTable and hot-swaps it on reload.
+    """
+
+    def __init__(self, account_classes: Mapping[str, Dict[str, Any]] = None):
+        """
+        Initialize the registry, compiling the rules straight away.
+
+        Args:
+            account_classes: Rules to compile (defaults to config.ACCOUNT_CLASSES)
+        """
+        self._reload_lock = threading.Lock()
+        self.table = compile_table(config.ACCOUNT_CLASSES if account_classes is None else account_classes)
+
+    def reload(self, account_classes: Mapping[str, Dict[str, Any]] = None) -> RuleTable:
+        """
+        Compile new rules and make them current.
+
+        The new table is fully built before it replaces the old one, so a
+        request sees either the old rules or the new ones, never a mix. A
+        bad configuration raises and leaves the current rules in place.
+
+        Args:
+            account_classes: Rules to compile (defaults to config.ACCOUNT_CLASSES)
+
+        Returns:
+            RuleTable: The table now in effect
+
+        Raises:
+            ValueError: If the rules are malformed
+        """
+        with self._reload_lock:
+            table = compile_table(
+                config.ACCOUNT_CLASSES if account_classes is None else account_classes,
+                self.table.version + 1
+            )
+            self.table = table
+        return table
+
+    def for_class(self, account_class) -> AccountRules:
+        """Rules for an entity class (or class name) in the current table."""
+        return self.table.for_class(account_class)
+
+    def for_type(self, account_type: str) -> Optional[AccountRules]:
+        """Rules for an ACCOUNT_CLASSES key (case-insensitive), or None if unknown."""
+        return self.table.by_type.get(account_type.lower())
+
+
+# Process-wide registry, compiled at import
+RULES = RuleRegistry()
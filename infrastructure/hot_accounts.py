@@ -0,0 +1,283 @@
+"""
+Hot Account Registry in the Infrastructure Layer.
+This splits deposits to heavily contended accounts across sub-balance slots.
+
+A hot account keeps its committed balance on the entity as usual, plus K
+slots, each with its own lock, a pending balance and the transactions that
+produced it. A deposit only takes one free slot's lock while its ledger
+record is written, so K deposits to the same account can wait on the
+ledger's group commit together instead of queueing on the account's stripe.
+
+Slots are folded back into the account ("consolidated") by whoever holds
+the account's stripe lock: withdrawals, history reads and snapshots. A
+reader that holds every slot lock sees the committed balance and the
+pending slots in a consistent state, so balance reads do not need to
+consolidate.
+
+Lock order is always stripe, then slots in index order. The deposit path
+holds a single slot and never takes the stripe while holding it.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, List, Tuple
+
+import config
+
+
+class _Slot:
+    """One sub-balance: its lock, pending amount and pending transactions."""
+
+    __slots__ = ("lock", "balance", "pending")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.balance = 0.0
+        self.pending = []
+
+
+class HotAccount:
+    """
+    The sub-balance slots of one promoted account.
+    """
+
+    def __init__(self, slot_count: int):
+        self.slots = [_Slot() for _ in range(slot_count)]
+        # Set under every slot lock once the account is demoted; a depositor
+        # that then gets a slot must fall back to the normal path.
+        self.retired = False
+        self._cursor = itertools.count()
+
+    def acquire_slot(self) -> _Slot:
+        """
+        Take the lock of a free slot, or wait for one if all are busy.
+
+        Callers release slot.lock when done.
+        """
+        slots = self.slots
+        start = next(self._cursor)
+        for offset in range(len(slots)):
+            slot = slots[(start + offset) % len(slots)]
+            if slot.lock.acquire(blocking=False):
+                return slot
+        slot = slots[start % len(slots)]
+        slot.lock.acquire()
+        return slot
+
+    @contextmanager
+    def locked(self):
+        """Hold every slot lock, in index order."""
+        acquired = []
+        try:
+            for slot in self.slots:
+                slot.lock.acquire()
+                acquired.append(slot.lock)
+            yield self
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    def pending_balance(self) -> float:
+        """Sum of the slots (callers hold every slot lock for an exact figure)."""
+        return sum(slot.balance for slot in self.slots)
+
+    def drain(self) -> Tuple[float, List[Any]]:
+        """
+        Empty every slot.
+
+        Callers hold every slot lock.
+
+        Returns:
+            Tuple[float, list]: The pending amount and the pending transactions
+        """
+        total = 0.0
+        transactions = []
+        for slot in self.slots:
+            if slot.pending:
+                total += slot.balance
+                transactions.extend(slot.pending)
+                slot.balance = 0.0
+                slot.pending = []
+        return total, transactions
+
+
+class HotAccountRegistry:
+    """
+    Tracks lock contention per account and holds the slots of hot accounts.
+    """
+
+    def __init__(self, slots: int = None, promote_after: int = None, window: float = None,
+                 max_pending: int = None):
+        """
+        Initialize the registry.
+
+        Args:
+            slots: Sub-balance slots per hot account (defaults to config.HOT_ACCOUNT_SLOTS)
+            promote_after: Contended deposits within one window that promote
+                an account (defaults to config.HOT_ACCOUNT_PROMOTE_AFTER; 0
+                turns automatic promotion off)
+            window: Length of the contention window in seconds
+                (defaults to config.HOT_ACCOUNT_WINDOW_SECONDS)
+            max_pending: Deposits a slot holds before the depositor
+                consolidates (defaults to config.HOT_ACCOUNT_MAX_PENDING)
+
+        Raises:
+            ValueError: If the slot count is not positive
+        """
+        self.slot_count = config.HOT_ACCOUNT_SLOTS if slots is None else slots
+        if self.slot_count <= 0:
+            raise ValueError("Slot count must be positive")
+        self.promote_after = config.HOT_ACCOUNT_PROMOTE_AFTER if promote_after is None else promote_after
+        self.window = config.HOT_ACCOUNT_WINDOW_SECONDS if window is None else window
+        self.max_pending = config.HOT_ACCOUNT_MAX_PENDING if max_pending is None else max_pending
+
+        self._accounts: Dict[Hashable, HotAccount] = {}
+        # Contended acquisitions per account in the current window only
+        self._contention: Dict[Hashable, int] = {}
+        self._window_started = time.monotonic()
+        self._lock = threading.Lock()
+        self.promotions = 0
+
+    def get(self, account_id: Hashable):
+        """The account's HotAccount, or None if it is not hot (lock-free)."""
+        return self._accounts.get(account_id)
+
+    def __contains__(self, account_id: Hashable) -> bool:
+        return account_id in self._accounts
+
+    def acquire(self, lock, account_id: Hashable) -> None:
+        """
+        Acquire an account's stripe lock, counting the acquisition if it had to wait.
+
+        Args:
+            lock: The account's stripe lock
+            account_id: ID of the account
+        """
+        if lock.acquire(blocking=False):
+            return
+        if self.promote_after > 0:
+            self._contended(account_id)
+        lock.acquire()
+
+    def _contended(self, account_id: Hashable) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_started >= self.window:
+                self._contention.clear()
+                self._window_started = now
+            count = self._contention.get(account_id, 0) + 1
+            self._contention[account_id] = count
+            if count >= self.promote_after and account_id not in self._accounts:
+                self._accounts[account_id] = HotAccount(self.slot_count)
+                self.promotions += 1
+
+    def promote(self, account_id: Hashable) -> HotAccount:
+        """
+        Put an account in hot mode (no-op if it already is).
+
+        Returns:
+            HotAccount: The account's slots
+        """
+        with self._lock:
+            hot = self._accounts.get(account_id)
+            if hot is None:
+                hot = self._accounts[account_id] = HotAccount(self.slot_count)
+                self.promotions += 1
+            return hot
+
+    def demote(self, account_id: Hashable):
+        """
+        Take an account out of hot mode.
+
+        The caller must hold the account's stripe lock and consolidate the
+        returned slots, which are retired so no further deposit lands in them.
+
+        Returns:
+            Optional[HotAccount]: The retired slots, or None if the account was not hot
+        """
+        with self._lock:
+            hot = self._accounts.pop(account_id, None)
+        if hot is not None:
+            with hot.locked():
+                hot.retired = True
+        return hot
+
+    def consolidate(self, account_id: Hashable, account_repository, transaction_repository,
+                    hot: HotAccount = None) -> int:
+        """
+        Fold a hot account's slots into its committed balance and history.
+
+        The caller must hold the account's stripe lock. The slots stay
+        locked until the account is updated, so a balance read never counts
+        a pending deposit twice or misses it.
+
+        Args:
+            account_id: ID of the account
+            account_repository: Repository holding the account
+            transaction_repository: Repository the deposits were staged in
+            hot: Slots to fold (e.g. from demote); the account's current ones if omitted
+
+        Returns:
+            int: Number of pending deposits published
+        """
+        hot = hot or self._accounts.get(account_id)
+        if hot is None:
+            return 0
+        with hot.locked():
+            total, transactions = hot.drain()
+            if transactions:
+                account = account_repository.get_account_by_id(account_id)
+                account_repository.update_account(account.deposit(total))
+        if transactions:
+            transaction_repository.publish_transactions(transactions)
+        return len(transactions)
+
+    def watched(self, lock, account_id: Hashable) -> "_WatchedLock":
+        """Context manager acquiring a stripe lock through acquire()."""
+        return _WatchedLock(self, lock, account_id)
+
+    def hot_account_ids(self) -> List[Hashable]:
+        """IDs of the accounts currently in hot mode."""
+        with self._lock:
+            return list(self._accounts)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Current hot accounts and their pending deposits.
+
+        Returns:
+            Dict: Slot count, promotions so far and, per hot account, its
+                pending amount and pending transaction count
+        """
+        with self._lock:
+            accounts = dict(self._accounts)
+        return {
+            "slots": self.slot_count,
+            "promotions": self.promotions,
+            "accounts": {
+                account_id: {
+                    "pending_balance": hot.pending_balance(),
+                    "pending_transactions": sum(len(slot.pending) for slot in hot.slots)
+                }
+                for account_id, hot in accounts.items()
+            }
+        }
+
+
+class _WatchedLock:
+    """Stripe lock context that reports contended acquisitions to the registry."""
+
+    __slots__ = ("registry", "lock", "account_id")
+
+    def __init__(self, registry: HotAccountRegistry, lock, account_id: Hashable):
+        self.registry = registry
+        self.lock = lock
+        self.account_id = account_id
+
+    def __enter__(self):
+        self.registry.acquire(self.lock, self.account_id)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
@@ -0,0 +1,276 @@
+"""
+Idempotency-key cache in the Infrastructure Layer.
+This makes retried writes safe: an operation submitted again under the same
+key returns the first execution's result instead of running twice.
+
+Completed results are kept in an LRU map with a TTL. A duplicate that
+arrives while the first execution is still running waits for it and gets
+the same result (or the same exception). Failed executions are not cached,
+so a key can be retried after an error.
+
+With a journal path, every completed entry is appended to a journal that is
+replayed on start-up and compacted when it grows to twice the capacity.
+Records use the ledger framing (see write_ahead_ledger). The entry is
+written after the operation commits, so a crash between the two can still
+let one retry through.
+
+Journal I/O never runs under the cache lock. Appends take a journal lock
+only for the write itself, and fsyncs are group commits: one fsync covers
+every record written before it started, so concurrent completions share
+it. Compaction runs in a background thread; appends wait only while the
+records written during the rewrite are carried over to the new file.
+"""
+import os
+import pickle
+import shutil
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import config
+from domain.Exceptions.exception_error import IdempotencyKeyReusedError
+from infrastructure.repository.write_ahead_ledger import FRAME_HEADER
+
+
+class _Execution:
+    """The first, still running execution for a key."""
+
+    __slots__ = ("fingerprint", "done", "result", "error")
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class IdempotencyCache:
+    """
+    Bounded LRU + TTL cache of completed operations, keyed by idempotency key.
+    """
+
+    def __init__(self, capacity: int = None, ttl_seconds: float = None, path: str = None,
+                 fsync: bool = None, clock: Callable[[], float] = time.time):
+        """
+        Initialize the cache, replaying the journal if there is one.
+
+        Args:
+            capacity: Completed entries kept (defaults to config.IDEMPOTENCY_CAPACITY)
+            ttl_seconds: How long an entry is honoured (defaults to config.IDEMPOTENCY_TTL_SECONDS)
+            path: Journal file (None keeps the cache in memory only)
+            fsync: fsync every journal append (defaults to config.LEDGER_FSYNC)
+            clock: Wall clock; expiry times are persisted, so this must not be monotonic
+        """
+        self.capacity = config.IDEMPOTENCY_CAPACITY if capacity is None else capacity
+        self.ttl_seconds = config.IDEMPOTENCY_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.path = path
+        self.fsync = config.LEDGER_FSYNC if fsync is None else fsync
+        self._clock = clock
+        # key -> (fingerprint, expires_at, result), least recently used first
+        self._completed: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._in_flight: Dict[Hashable, _Execution] = {}
+        self._lock = threading.Lock()
+        # Lock order: _sync_lock, then _journal_lock, then _lock
+        self._journal_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._journal = None
+        # Records in the journal file, and appended / fsynced since start-up
+        self._journal_records = 0
+        self._appended = 0
+        self._synced = 0
+        self._compacting = False
+        if path:
+            self._load()
+            self._compact()
+
+    def __len__(self) -> int:
+        return len(self._completed)
+
+    def run(self, key: Optional[Hashable], fingerprint, func: Callable[..., Any], *args) -> Any:
+        """
+        Run func(*args) at most once per key.
+
+        Args:
+            key: Idempotency key (None runs func unconditionally)
+            fingerprint: The operation's parameters; a replay must match them
+            func: The operation
+            *args: Its arguments
+
+        Returns:
+            The result of the first successful execution under this key
+
+        Raises:
+            IdempotencyKeyReusedError: If the key was used for a different operation
+        """
+        if key is None:
+            return func(*args)
+
+        with self._lock:
+            entry = self._completed.get(key)
+            if entry is not None:
+                if entry[1] > self._clock():
+                    self._completed.move_to_end(key)
+                    _check_fingerprint(entry[0], fingerprint)
+                    return entry[2]
+                del self._completed[key]
+            execution = self._in_flight.get(key)
+            leader = execution is None
+            if leader:
+                execution = self._in_flight[key] = _Execution(fingerprint)
+
+        if not leader:
+            _check_fingerprint(execution.fingerprint, fingerprint)
+            execution.done.wait()
+            if execution.error is not None:
+                raise execution.error
+            return execution.result
+
+        try:
+            result = func(*args)
+        except BaseException as e:
+            execution.error = e
+            with self._lock:
+                del self._in_flight[key]
+            execution.done.set()
+            raise
+
+        execution.result = result
+        try:
+            with self._lock:
+                expires_at = self._clock() + self.ttl_seconds
+                self._completed[key] = (fingerprint, expires_at, result)
+                while len(self._completed) > self.capacity:
+                    self._completed.popitem(last=False)
+                del self._in_flight[key]
+            if self.path:
+                self._append(_frame(key, fingerprint, expires_at, result))
+        finally:
+            execution.done.set()
+        return result
+
+    # Journal
+
+    def _load(self) -> None:
+        """Replay the journal, stopping at the first torn or corrupt record."""
+        if not os.path.exists(self.path):
+            return
+        now = self._clock()
+        with open(self.path, "rb") as handle:
+            data = handle.read()
+        position = 0
+        while position + FRAME_HEADER.size <= len(data):
+            length, checksum = FRAME_HEADER.unpack_from(data, position)
+            payload = data[position + FRAME_HEADER.size:position + FRAME_HEADER.size + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            position += FRAME_HEADER.size + length
+            key, fingerprint, expires_at, result = pickle.loads(payload)
+            self._completed.pop(key, None)
+            if expires_at > now:
+                self._completed[key] = (fingerprint, expires_at, result)
+        while len(self._completed) > self.capacity:
+            self._completed.popitem(last=False)
+
+    def _compact(self) -> None:
+        """
+        Rewrite the journal with only the live entries and reopen it for appends.
+
+        The live entries are written without holding any lock; appends
+        made meanwhile are copied over from the old file at the swap.
+        """
+        with self._journal_lock:
+            if self._journal is not None:
+                self._journal.flush()
+                start = self._journal.tell()
+            else:
+                start = None
+            appended = self._appended
+            with self._lock:
+                live = list(self._completed.items())
+
+        now = self._clock()
+        temporary = self.path + ".tmp"
+        records = 0
+        with open(temporary, "wb") as handle:
+            for key, (fingerprint, expires_at, result) in live:
+                if expires_at > now:
+                    handle.write(_frame(key, fingerprint, expires_at, result))
+                    records += 1
+            handle.flush()
+            os.fsync(handle.fileno())
+
+            with self._sync_lock, self._journal_lock:
+                if start is not None:
+                    if self._journal is None:
+                        # Closed meanwhile
+                        handle.close()
+                        os.remove(temporary)
+                        return
+                    self._journal.flush()
+                    with open(self.path, "rb") as journal:
+                        journal.seek(start)
+                        shutil.copyfileobj(journal, handle)
+                    records += self._appended - appended
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                    self._journal.close()
+                os.replace(temporary, self.path)
+                self._journal = open(self.path, "ab")
+                self._journal_records = records
+                self._synced = self._appended
+
+    def _compact_in_background(self) -> None:
+        try:
+            self._compact()
+        finally:
+            self._compacting = False
+
+    def _append(self, frame: bytes) -> None:
+        with self._journal_lock:
+            if self._journal is None:
+                return
+            self._journal.write(frame)
+            self._journal.flush()
+            self._appended += 1
+            self._journal_records += 1
+            sequence = self._appended
+            compact = self._journal_records >= 2 * max(self.capacity, 1) and not self._compacting
+            if compact:
+                self._compacting = True
+        if self.fsync:
+            self._sync(sequence)
+        if compact:
+            threading.Thread(target=self._compact_in_background, name="idempotency-compactor", daemon=True).start()
+
+    def _sync(self, sequence: int) -> None:
+        """fsync the journal, unless an fsync that started after record `sequence` was written already did."""
+        with self._sync_lock:
+            if self._synced >= sequence:
+                return
+            with self._journal_lock:
+                if self._journal is None:
+                    return
+                target = self._appended
+                fileno = self._journal.fileno()
+            # Compaction and close() take _sync_lock before closing the file
+            os.fsync(fileno)
+            self._synced = target
+
+    def close(self) -> None:
+        """Close the journal."""
+        with self._sync_lock, self._journal_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+def _frame(key, fingerprint, expires_at: float, result) -> bytes:
+    payload = pickle.dumps((key, fingerprint, expires_at, result), protocol=pickle.HIGHEST_PROTOCOL)
+    return FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _check_fingerprint(expected, actual) -> None:
+    if expected != actual:
+        raise IdempotencyKeyReusedError()
@@ -0,0 +1,388 @@
+"""
+Low-overhead metrics for the hot paths.
+
+Stage timings go into fixed-bucket histograms and failures into counters
+keyed by exception type. Everything can be rendered in the Prometheus text
+exposition format.
+
+Recording only appends floats to a list (atomic, no lock, nothing for the
+garbage collector to track); observations are sorted into buckets in bulk
+with NumPy, every few thousand values and on scrape.
+
+With metrics disabled, timer() hands out a shared no-op timer and
+instrument() leaves objects untouched, so the cost drops to a few no-op
+method calls per operation.
+"""
+import threading
+from functools import wraps
+from time import perf_counter
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+import config
+
+Labels = Tuple[Tuple[str, str], ...]
+
+STAGE_METRIC = "banking_stage_seconds"
+OPERATION_METRIC = "banking_operation_seconds"
+REPOSITORY_METRIC = "banking_repository_seconds"
+ERROR_METRIC = "banking_errors_total"
+
+HELP = {
+    STAGE_METRIC: "Time spent in each stage of a service operation.",
+    OPERATION_METRIC: "End-to-end time of a service operation.",
+    REPOSITORY_METRIC: "Time spent in repository methods.",
+    ERROR_METRIC: "Failed operations by exception type.",
+}
+
+
+# Pending observations per histogram before they are folded into buckets
+_FOLD_AT = 4096
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram; counts are per bucket, cumulated only when rendered.
+    """
+
+    __slots__ = ("bounds", "_bounds_array", "_counts", "_sum", "_pending", "_fold_lock")
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds = tuple(bounds)
+        self._bounds_array = np.array(self.bounds, dtype=np.float64)
+        # One slot per bound plus the +Inf overflow bucket
+        self._counts = np.zeros(len(self.bounds) + 1, dtype=np.int64)
+        self._sum = 0.0
+        self._pending: List[float] = []
+        self._fold_lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        pending = self._pending
+        pending.append(value)
+        if len(pending) >= _FOLD_AT:
+            self._fold()
+
+    def observe_many(self, values: np.ndarray) -> None:
+        """Record an array of observations at once."""
+        with self._fold_lock:
+            self._add(values)
+
+    def _fold(self) -> None:
+        with self._fold_lock:
+            pending = self._pending
+            # Take a prefix: values appended meanwhile stay for the next fold
+            taken = len(pending)
+            if taken:
+                values = np.array(pending[:taken], dtype=np.float64)
+                del pending[:taken]
+                self._add(values)
+
+    def _add(self, values: np.ndarray) -> None:
+        # Caller holds _fold_lock; searchsorted "left" puts a value equal to a bound in that bound's bucket
+        buckets = np.searchsorted(self._bounds_array, values, side="left")
+        self._counts += np.bincount(buckets, minlength=len(self._counts))
+        self._sum += float(values.sum())
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Per-bucket counts and the sum of all observations so far."""
+        self._fold()
+        with self._fold_lock:
+            return self._counts.tolist(), self._sum
+
+    @property
+    def count(self) -> int:
+        return sum(self.snapshot()[0])
+
+
+class Counter:
+    """Monotonic counter."""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class OperationTimer:
+    """
+    Times consecutive stages of one operation.
+
+    Each mark() closes the stage that began at the previous mark (or at
+    creation); finish() hands the timestamps to the operation's recorder.
+    Nothing is recorded for an operation that never finishes, only its
+    error (see fail()).
+    """
+
+    __slots__ = ("_recorder", "_stages", "_stamps")
+
+    def __init__(self, recorder: "_OperationRecorder"):
+        self._recorder = recorder
+        self._stages = []
+        self._stamps = [perf_counter()]
+
+    def mark(self, stage: str) -> None:
+        self._stages.append(stage)
+        self._stamps.append(perf_counter())
+
+    def finish(self) -> None:
+        stamps = self._stamps
+        stamps.append(perf_counter())
+        self._recorder.record(self._stages, stamps)
+
+    def fail(self, error: BaseException) -> None:
+        self._recorder.registry.record_error(self._recorder.operation, error)
+
+
+class _OperationRecorder:
+    """
+    Pending timestamps of one operation, turned into stage and total
+    durations in bulk.
+
+    Finished operations are grouped by their sequence of stages; each group
+    is a flat list holding one row of timestamps per operation, so recording
+    is a tuple() and a list extend. Folding reshapes a group into a matrix
+    and takes the differences between adjacent columns.
+    """
+
+    def __init__(self, registry: "MetricsRegistry", operation: str):
+        self.registry = registry
+        self.operation = operation
+        self._total = registry.operation_histogram(operation)
+        # stage sequence -> flat timestamps, one row of len(sequence) + 2 per operation
+        self._pending: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stages: List[str], stamps: List[float]) -> None:
+        sequence = tuple(stages)
+        pending = self._pending.get(sequence)
+        if pending is None:
+            pending = self._pending.setdefault(sequence, [])
+        # A single extend (atomic under the GIL), so rows from concurrent threads never interleave
+        pending.extend(stamps)
+        if len(pending) >= _FOLD_AT * len(stamps):
+            self.fold()
+
+    def fold(self) -> None:
+        with self._lock:
+            for sequence, pending in list(self._pending.items()):
+                width = len(sequence) + 2
+                taken = len(pending)
+                if not taken:
+                    continue
+                rows = np.array(pending[:taken], dtype=np.float64).reshape(-1, width)
+                del pending[:taken]
+                durations = np.diff(rows[:, :-1], axis=1)
+                for column, stage in enumerate(sequence):
+                    self.registry.stage_histogram(self.operation, stage).observe_many(durations[:, column])
+                self._total.observe_many(rows[:, -1] - rows[:, 0])
+
+
+class _NullTimer:
+    """Stand-in timer used when metrics are disabled."""
+
+    __slots__ = ()
+
+    def mark(self, stage: str) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+    def fail(self, error: BaseException) -> None:
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    Holds every histogram and counter of one process.
+    """
+
+    def __init__(self, enabled: bool = None, buckets: Iterable[float] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            enabled: Collect metrics (defaults to config.METRICS_ENABLED)
+            buckets: Histogram bucket upper bounds in seconds (defaults to config.METRICS_BUCKETS)
+        """
+        self.enabled = config.METRICS_ENABLED if enabled is None else enabled
+        self.buckets = tuple(sorted(config.METRICS_BUCKETS if buckets is None else buckets))
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, Counter]] = {}
+        self._recorders: Dict[str, _OperationRecorder] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, labels: Labels) -> Histogram:
+        family = self._histograms.get(name)
+        histogram = family.get(labels) if family is not None else None
+        if histogram is None:
+            with self._lock:
+                family = self._histograms.setdefault(name, {})
+                histogram = family.setdefault(labels, Histogram(self.buckets))
+        return histogram
+
+    def counter(self, name: str, labels: Labels) -> Counter:
+        family = self._counters.get(name)
+        counter = family.get(labels) if family is not None else None
+        if counter is None:
+            with self._lock:
+                family = self._counters.setdefault(name, {})
+                counter = family.setdefault(labels, Counter())
+        return counter
+
+    def stage_histogram(self, operation: str, stage: str) -> Histogram:
+        return self.histogram(STAGE_METRIC, (("operation", operation), ("stage", stage)))
+
+    def operation_histogram(self, operation: str) -> Histogram:
+        return self.histogram(OPERATION_METRIC, (("operation", operation),))
+
+    def timer(self, operation: str):
+        """
+        Start timing an operation.
+
+        Returns:
+            OperationTimer, or a no-op timer when metrics are disabled
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        recorder = self._recorders.get(operation)
+        if recorder is None:
+            recorder = _OperationRecorder(self, operation)
+            with self._lock:
+                recorder = self._recorders.setdefault(operation, recorder)
+        return OperationTimer(recorder)
+
+    def record_error(self, operation: str, error: BaseException) -> None:
+        """Count a failed operation under its exception type."""
+        if self.enabled:
+            self.counter(ERROR_METRIC, (("operation", operation), ("exception", type(error).__name__))).inc()
+
+    def instrument(self, target, component: str, methods: Iterable[str]):
+        """
+        Time the given methods of an object, in place.
+
+        Each method is replaced on the instance by a wrapper recording into
+        banking_repository_seconds{component=..., method=...}. Nothing is
+        changed when metrics are disabled.
+
+        Args:
+            target: Object to instrument, e.g. a repository
+            component: Label identifying the object
+            methods: Names of the methods to time
+
+        Returns:
+            The same object
+        """
+        if not self.enabled:
+            return target
+        for name in methods:
+            method = getattr(target, name, None)
+            if method is None:
+                continue
+            histogram = self.histogram(REPOSITORY_METRIC, (("component", component), ("method", name)))
+            setattr(target, name, _timed(method, histogram))
+        return target
+
+    def collect(self) -> Dict[str, Tuple[str, list]]:
+        """
+        Snapshot every metric as plain, picklable data.
+
+        Returns:
+            Dict: Family name -> (type, [(labels, payload)]) where payload is
+                (bounds, counts, sum) for histograms and the value for counters
+        """
+        families = {}
+        for recorder in list(self._recorders.values()):
+            recorder.fold()
+        with self._lock:
+            histograms = {name: list(family.items()) for name, family in self._histograms.items()}
+            counters = {name: list(family.items()) for name, family in self._counters.items()}
+        for name, series in histograms.items():
+            families[name] = ("histogram", [
+                (labels, (histogram.bounds, *histogram.snapshot()))
+                for labels, histogram in series
+            ])
+        for name, series in counters.items():
+            families[name] = ("counter", [(labels, counter.value) for labels, counter in series])
+        return families
+
+
+def _timed(method, histogram: Histogram):
+    @wraps(method)
+    def timed(*args, **kwargs):
+        started = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.observe(perf_counter() - started)
+    return timed
+
+
+def merge_families(sources: Iterable[Tuple[Labels, Dict[str, Tuple[str, list]]]]) -> Dict[str, Tuple[str, list]]:
+    """
+    Combine collect() snapshots from several processes.
+
+    Args:
+        sources: (extra labels, snapshot) pairs, e.g. ((("shard", "0"),), snapshot)
+
+    Returns:
+        Dict: One snapshot with the extra labels added to every series
+    """
+    merged = {}
+    for extra, families in sources:
+        for name, (kind, series) in families.items():
+            target = merged.setdefault(name, (kind, []))[1]
+            target.extend((tuple(labels) + tuple(extra), payload) for labels, payload in series)
+    return merged
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def render(families: Dict[str, Tuple[str, list]]) -> str:
+    """
+    Render a collect() snapshot in the Prometheus text format (version 0.0.4).
+    """
+    lines: List[str] = []
+    for name in sorted(families):
+        kind, series = families[name]
+        lines.append(f"# HELP {name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, payload in sorted(series, key=lambda item: item[0]):
+            if kind == "counter":
+                lines.append(f"{name}{_format_labels(labels)} {payload}")
+                continue
+            bounds, counts, total = payload
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_bound(bound)),))} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used unless a service is given its own
+REGISTRY = MetricsRegistry()
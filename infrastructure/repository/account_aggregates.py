@@ -0,0 +1,109 @@
+"""
+Running per-account aggregates maintained at write time.
+"""
+from typing import Dict, Iterable
+
+from domain.entities.transaction import TransactionType
+
+
+def transaction_type_name(transaction) -> str:
+    """Get 'DEPOSIT'/'WITHDRAW' from either transaction entity."""
+    return getattr(transaction.transaction_type, "value", transaction.transaction_type)
+
+
+def is_deposit(transaction) -> bool:
+    """Check for a deposit without the (slow) Enum.value lookup."""
+    transaction_type = transaction.transaction_type
+    return transaction_type is TransactionType.DEPOSIT or transaction_type == "DEPOSIT"
+
+
+class AccountAggregate:
+    """
+    Running totals for one account, updated in O(1) per transaction.
+    """
+
+    __slots__ = (
+        "total_deposits",
+        "total_withdrawals",
+        "transaction_count",
+        "first_timestamp",
+        "last_timestamp",
+        "min_amount",
+        "max_amount"
+    )
+
+    def __init__(self):
+        self.total_deposits = 0.0
+        self.total_withdrawals = 0.0
+        self.transaction_count = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.min_amount = None
+        self.max_amount = None
+
+    def add(self, transaction) -> None:
+        """
+        Fold one transaction into the totals.
+
+        Args:
+            transaction: Transaction that was just saved
+        """
+        amount = transaction.amount
+        if is_deposit(transaction):
+            self.total_deposits += amount
+        else:
+            self.total_withdrawals += amount
+        self.transaction_count += 1
+
+        timestamp = transaction.timestamp
+        if self.first_timestamp is None or timestamp < self.first_timestamp:
+            self.first_timestamp = timestamp
+        if self.last_timestamp is None or timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+        if self.min_amount is None or amount < self.min_amount:
+            self.min_amount = amount
+        if self.max_amount is None or amount > self.max_amount:
+            self.max_amount = amount
+
+    def to_dict(self) -> Dict:
+        """Get the totals as a plain dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable) -> "AccountAggregate":
+        """
+        Recompute the totals from scratch.
+
+        Args:
+            transactions: Every transaction of one account, in ledger order
+
+        Returns:
+            AccountAggregate: The recomputed totals
+        """
+        aggregate = cls()
+        for transaction in transactions:
+            aggregate.add(transaction)
+        return aggregate
+
+    def drift_from(self, expected: "AccountAggregate", tolerance: float = 1e-6) -> Dict:
+        """
+        Compare against recomputed totals.
+
+        Args:
+            expected: Totals recomputed from the raw ledger
+            tolerance: Allowed absolute difference for float totals
+
+        Returns:
+            Dict: Field name -> {"running": ..., "recomputed": ...} for every mismatch
+        """
+        drift = {}
+        for name in self.__slots__:
+            running = getattr(self, name)
+            recomputed = getattr(expected, name)
+            if isinstance(running, float) and isinstance(recomputed, float):
+                matches = abs(running - recomputed) <= tolerance
+            else:
+                matches = running == recomputed
+            if not matches:
+                drift[name] = {"running": running, "recomputed": recomputed}
+        return drift
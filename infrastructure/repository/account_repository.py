@@ -0,0 +1,80 @@
+
+
+import threading
+from collections import defaultdict
+from itertools import islice
+from domain.entities.account import Account
+from infrastructure.repository.write_ahead_ledger import encode_account_opened
+
+class AccountRepository:
+    def __init__(self, ledger=None):
+        self.accounts = {}
+        self.next_account_id = 1
+        self._id_lock = threading.Lock()
+        # Optional WriteAheadLedger; account openings are logged so that
+        # balances can be rebuilt from the ledger alone after a restart.
+        self.ledger = ledger
+        # Held while an opening is logged and inserted, so a snapshot that
+        # holds it sees every account whose opening record is in the ledger
+        self.opening_lock = threading.Lock()
+
+    def create_account(self, account: Account) -> int:
+        with self.opening_lock:
+            if self.ledger is not None:
+                self.ledger.append(encode_account_opened(account))
+            self.accounts[account.account_id] = account
+        return account.account_id
+
+    def create_accounts(self, accounts: list) -> list:
+        """
+        Add many accounts with one ledger commit.
+
+        Args:
+            accounts: Accounts to add
+
+        Returns:
+            list: IDs of the added accounts
+        """
+        with self.opening_lock:
+            if self.ledger is not None:
+                self.ledger.append_many([encode_account_opened(account) for account in accounts])
+            for account in accounts:
+                self.accounts[account.account_id] = account
+        return [account.account_id for account in accounts]
+
+    def get_account_by_id(self, account_id: int) -> Account or None:
+        return self.accounts.get(account_id)
+
+    def update_account(self, account: Account) -> None:
+        self.accounts[account.account_id] = account
+
+    def get_accounts_page(self, offset: int = 0, limit: int = None, after=None) -> list:
+        """
+        Get accounts in creation order.
+
+        Args:
+            offset: Accounts to skip (after the after account, if given)
+            limit: Maximum accounts returned (all if None)
+            after: ID of the last account of the previous page
+
+        Returns:
+            list: The accounts
+
+        Raises:
+            ValueError: If the after account doesn't exist
+        """
+        accounts = iter(self.accounts.items())
+        if after is not None:
+            if after not in self.accounts:
+                raise ValueError(f"Account not found: {after}")
+            for account_id, _ in accounts:
+                if account_id == after:
+                    break
+        end = None if limit is None else offset + limit
+        return [account for _, account in islice(accounts, offset, end)]
+
+    def get_next_account_id(self) -> int:
+        with self._id_lock:
+            next_id = self.next_account_id
+            self.next_account_id += 1
+        return next_id
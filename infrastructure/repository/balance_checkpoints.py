@@ -0,0 +1,110 @@
+"""
+Per-account balance checkpoints maintained at write time.
+Every `interval` entries of an account's time-ordered history, the net of
+the postings so far (deposits minus withdrawals) is recorded, so the
+balance at time T costs one bisect of the account's timestamp index, one
+checkpoint lookup and at most interval - 1 postings replayed on top.
+
+The balance itself is the account's opening balance plus that net (see
+BankingService.get_balance_as_of); the checkpoints never need to know it.
+
+A posting that arrives out of timestamp order lands before some existing
+checkpoints. Those are dropped and rebuilt the next time they are needed.
+"""
+import threading
+from typing import Callable, Dict, Hashable, List
+
+import config
+
+
+class BalanceCheckpoints:
+    """
+    Prefix sums of each account's signed posting amounts.
+    """
+
+    def __init__(self, net_change: Callable[[Hashable, int, int], float], interval: int = None):
+        """
+        Initialize empty checkpoints.
+
+        Args:
+            net_change: net_change(account_id, start, stop) sums the signed
+                amounts of history positions [start, stop)
+            interval: History entries between checkpoints (defaults to
+                config.BALANCE_CHECKPOINT_INTERVAL)
+
+        Raises:
+            ValueError: If the interval is not positive
+        """
+        self.net_change = net_change
+        self.interval = config.BALANCE_CHECKPOINT_INTERVAL if interval is None else interval
+        if self.interval <= 0:
+            raise ValueError("Checkpoint interval must be positive")
+        # account_id -> [net of the first interval entries, of the first 2 * interval, ...]
+        self._sums: Dict[Hashable, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def appended(self, account_id: Hashable, position: int, length: int) -> None:
+        """
+        Account for one posting added to an account's history.
+
+        Args:
+            account_id: ID of the account
+            position: Where the posting was inserted
+            length: History length after the insert
+        """
+        interval = self.interval
+        if position < length - 1:
+            # Late arrival: every checkpoint covering the position is stale
+            sums = self._sums.get(account_id)
+            if sums:
+                with self._lock:
+                    del sums[position // interval:]
+            return
+        if length % interval == 0:
+            self._extend(account_id, length // interval)
+
+    def _extend(self, account_id: Hashable, count: int) -> List[float]:
+        interval = self.interval
+        with self._lock:
+            sums = self._sums.get(account_id)
+            if sums is None:
+                sums = self._sums[account_id] = []
+            while len(sums) < count:
+                start = len(sums) * interval
+                sums.append((sums[-1] if sums else 0.0) + self.net_change(account_id, start, start + interval))
+            return sums
+
+    def net_before(self, account_id: Hashable, position: int) -> float:
+        """
+        Net of an account's first `position` history entries.
+
+        Args:
+            account_id: ID of the account
+            position: Number of leading history entries to include
+
+        Returns:
+            float: Deposits minus withdrawals over those entries
+        """
+        count = position // self.interval
+        base = 0.0
+        if count:
+            sums = self._sums.get(account_id)
+            if sums is None or len(sums) < count:
+                sums = self._extend(account_id, count)
+            base = sums[count - 1]
+        return base + self.net_change(account_id, count * self.interval, position)
+
+    def capture(self, account_id: Hashable) -> List[float]:
+        """Copy one account's checkpoints, for a snapshot."""
+        with self._lock:
+            return list(self._sums.get(account_id, ()))
+
+    def restore(self, account_id: Hashable, sums: List[float]) -> None:
+        """Install checkpoints returned by capture (for the same history)."""
+        if sums:
+            with self._lock:
+                self._sums[account_id] = list(sums)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sums.clear()
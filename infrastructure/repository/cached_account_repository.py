@@ -0,0 +1,236 @@
+"""
+Read-through account cache in the Infrastructure Layer.
+This keeps hot accounts in memory in front of a persistent account
+repository, so lookups on the deposit, withdraw, history and summary paths
+stop costing a database round trip.
+
+The cache is an LRU bounded both by entry count and by an estimate of the
+entries' memory. Writes go through to the wrapped repository first and
+then replace the cached entry. Ids that were looked up and not found are
+remembered in a bounded negative cache until the account is created.
+
+Staleness is prevented with a write sequence number. Every change to the
+cache bumps it, and a lookup only caches what it read if no change happened
+while it was reading. Inside a unit of work, updated accounts are only
+invalidated. Their new state is cached when the outermost scope commits and
+dropped if it rolls back.
+
+Cached entries are private copies. A lookup hands out a shallow copy and a
+write caches a copy of what was written, so a caller changing the account
+it looked up (as the services do inside a unit of work) changes nothing
+other threads can see until it is written and the unit of work commits.
+
+The cache assumes it fronts the only writer of the underlying store.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict
+
+import config
+
+
+def _copy(account):
+    """Shallow-copy an account entity (much cheaper than copy.copy)."""
+    copied = object.__new__(type(account))
+    copied.__dict__.update(account.__dict__)
+    return copied
+
+
+def _estimate_size(account) -> int:
+    """Rough memory footprint of an account entity (object, attribute dict and values)."""
+    state = getattr(account, "__dict__", {})
+    return (sys.getsizeof(account) + sys.getsizeof(state)
+            + sum(sys.getsizeof(value) for value in state.values()))
+
+
+class CachedAccountRepository:
+    """
+    Bounded LRU cache wrapping any account repository.
+
+    Attributes not defined here (accounts, get_next_account_id, ...) are
+    served by the wrapped repository.
+    """
+
+    def __init__(self, repository, max_entries: int = None, max_bytes: int = None, negative_entries: int = None):
+        """
+        Initialize the cache.
+
+        Args:
+            repository: Account repository to wrap
+            max_entries: Accounts kept (defaults to config.ACCOUNT_CACHE_SIZE)
+            max_bytes: Estimated memory kept (defaults to config.ACCOUNT_CACHE_MAX_BYTES)
+            negative_entries: Unknown ids remembered (defaults to config.ACCOUNT_CACHE_NEGATIVE_SIZE)
+        """
+        self.repository = repository
+        self.max_entries = config.ACCOUNT_CACHE_SIZE if max_entries is None else max_entries
+        self.max_bytes = config.ACCOUNT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.negative_entries = config.ACCOUNT_CACHE_NEGATIVE_SIZE if negative_entries is None else negative_entries
+
+        # account_id -> (account, estimated size), least recently used first
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._missing: "OrderedDict[Any, None]" = OrderedDict()
+        self._bytes = 0
+        self._write_sequence = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the cache itself
+        if name == "repository":
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    # Reads
+
+    def get_account_by_id(self, account_id):
+        with self._lock:
+            entry = self._entries.get(account_id)
+            if entry is not None:
+                self._entries.move_to_end(account_id)
+                self.hits += 1
+                return _copy(entry[0])
+            if account_id in self._missing:
+                self.negative_hits += 1
+                return None
+            self.misses += 1
+            sequence = self._write_sequence
+
+        account = self.repository.get_account_by_id(account_id)
+
+        if getattr(self._local, "pending", None) is not None:
+            # Read inside an uncommitted unit of work: not for other threads to see
+            return account
+        with self._lock:
+            # A write (or invalidation) while we were reading may have made what we read stale
+            if self._write_sequence == sequence:
+                if account is None:
+                    self._remember_missing(account_id)
+                else:
+                    self._store(account_id, _copy(account))
+        return account
+
+    # Writes
+
+    def create_account(self, account) -> Any:
+        account_id = self.repository.create_account(account)
+        self._written(account)
+        return account_id
+
+    def create_accounts(self, accounts: list) -> list:
+        account_ids = self.repository.create_accounts(accounts)
+        for account in accounts:
+            self._written(account)
+        return account_ids
+
+    def update_account(self, account) -> None:
+        self.repository.update_account(account)
+        self._written(account)
+
+    def _written(self, account) -> None:
+        pending = getattr(self._local, "pending", None)
+        # The caller keeps its object and may go on changing it
+        account = _copy(account)
+        with self._lock:
+            self._write_sequence += 1
+            self._missing.pop(account.account_id, None)
+            if pending is None:
+                self._store(account.account_id, account)
+            else:
+                # Not committed yet: drop the old state now, cache the new one on commit
+                self._discard(account.account_id)
+                pending[account.account_id] = account
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Run the wrapped repository's unit of work, keeping the cache in step.
+
+        Accounts updated inside the outermost scope are cached when it
+        commits and invalidated when it rolls back.
+        """
+        inner = getattr(self.repository, "unit_of_work", None)
+        if getattr(self._local, "pending", None) is not None:
+            with inner() if inner is not None else nullcontext():
+                yield
+            return
+
+        pending: Dict[Any, Any] = {}
+        self._local.pending = pending
+        try:
+            with inner() if inner is not None else nullcontext():
+                yield
+        except BaseException:
+            self._local.pending = None
+            if pending:
+                self.invalidate(*pending)
+            raise
+        self._local.pending = None
+        with self._lock:
+            self._write_sequence += 1
+            for account_id, account in pending.items():
+                self._store(account_id, account)
+
+    def invalidate(self, *account_ids) -> None:
+        """Drop accounts from the cache (all of them if no id is given)."""
+        with self._lock:
+            self._write_sequence += 1
+            if not account_ids:
+                self._entries.clear()
+                self._missing.clear()
+                self._bytes = 0
+                return
+            for account_id in account_ids:
+                self._discard(account_id)
+                self._missing.pop(account_id, None)
+
+    # Bookkeeping (callers hold self._lock)
+
+    def _store(self, account_id, account) -> None:
+        # account is the cache's own copy
+        self._discard(account_id)
+        size = _estimate_size(account)
+        self._entries[account_id] = (account, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def _discard(self, account_id) -> None:
+        entry = self._entries.pop(account_id, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _remember_missing(self, account_id) -> None:
+        if self.negative_entries <= 0:
+            return
+        self._missing[account_id] = None
+        while len(self._missing) > self.negative_entries:
+            self._missing.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache effectiveness so far.
+
+        Returns:
+            Dict: Hit, miss and eviction counts, hit ratio and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "negative_entries": len(self._missing),
+                "bytes": self._bytes
+            }
@@ -0,0 +1,503 @@
+"""
+Cold Storage in the Infrastructure Layer.
+This moves old transaction history out of the Python heap into compressed,
+immutable segment files that are read back lazily through mmap.
+
+A spill writes one segment file holding, for each account, its entries
+older than the cut-off in blocks of up to `block_entries` ledger-encoded
+transactions. Each block is compressed on its own and starts with the end
+offset of every payload, so reading one entry decompresses one block and
+decodes only that entry::
+
+    <uint32 compressed length><zlib(<uint32 count><uint32 end> ... <payload> ...)>
+
+What stays in memory per cold entry is its epoch timestamp (8 bytes, so
+pagination and balance-as-of can still bisect) and one slot in the cold ID
+index (a 64-bit ID hash, a 64-bit block location and the entry's index in
+the block), instead of a Transaction object, its datetime and ID strings
+and a dict entry.
+
+By default segments only live as long as the process: the ledger remains
+the durable copy. Each file is unlinked as soon as it is mapped where the
+platform allows it, and removed on close otherwise. A durable store (the
+one kept next to a ledger) fsyncs its segments and keeps them, so a
+snapshot can refer to the cold history (export_state) instead of copying
+it, and a restart maps the same segments again (attach) instead of
+loading the history back into memory.
+"""
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Sequence
+from itertools import accumulate
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from infrastructure.repository.write_ahead_ledger import decode_record, encode_transaction
+
+SEGMENT_SUFFIX = ".cold"
+
+_LENGTH = struct.Struct("<I")
+# Location of a block: segment number in the high bits, byte offset in the low ones
+_OFFSET_BITS = 40
+_OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+# Entries per block are indexed as uint16
+MAX_BLOCK_ENTRIES = 0xFFFF
+
+
+def _id_hash(transaction_id) -> int:
+    return hash(transaction_id) & _HASH_MASK
+
+
+class ColdHistory:
+    """
+    The cold part of one account's history (immutable; spills and thaws replace it).
+    """
+
+    __slots__ = ("timestamps", "block_starts", "blocks")
+
+    def __init__(self, timestamps: array = None, block_starts: array = None, blocks: array = None):
+        # Epoch timestamp of every cold entry, in history order
+        self.timestamps = timestamps if timestamps is not None else array("d")
+        # History position of each block's first entry, and the block's location
+        self.block_starts = block_starts if block_starts is not None else array("Q")
+        self.blocks = blocks if blocks is not None else array("Q")
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def last_timestamp(self) -> float:
+        return self.timestamps[-1]
+
+    def block_of(self, position: int) -> int:
+        """Index of the block holding a history position."""
+        return bisect_right(self.block_starts, position) - 1
+
+    def extended(self, timestamps, block_starts, blocks) -> "ColdHistory":
+        """
+        A copy with newly spilled blocks appended.
+
+        Args:
+            timestamps: Timestamps of the spilled entries
+            block_starts: Block start positions, relative to the spilled entries
+            blocks: Block locations
+        """
+        offset = len(self.timestamps)
+        return ColdHistory(
+            self.timestamps + array("d", timestamps),
+            self.block_starts + array("Q", (offset + start for start in block_starts)),
+            self.blocks + array("Q", blocks)
+        )
+
+    def truncated(self, block: int) -> "ColdHistory":
+        """A copy holding only the blocks before `block`."""
+        if block >= len(self.blocks):
+            return self
+        return ColdHistory(self.timestamps[:self.block_starts[block]], self.block_starts[:block], self.blocks[:block])
+
+
+class _Segment:
+    """One memory-mapped segment file."""
+
+    __slots__ = ("path", "_handle", "_map")
+
+    def __init__(self, path: str, keep: bool = False):
+        self.path = path
+        self._handle = open(path, "rb")
+        self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if keep:
+            return
+        try:
+            # The mapping keeps the data, and nothing is left behind even after a crash
+            os.remove(path)
+        except OSError:
+            # Open files cannot be removed on Windows; close() cleans up there
+            pass
+
+    def read(self, offset: int) -> bytes:
+        length = _LENGTH.unpack_from(self._map, offset)[0]
+        start = offset + _LENGTH.size
+        return zlib.decompress(self._map[start:start + length])
+
+    def close(self):
+        self._map.close()
+        self._handle.close()
+
+
+class _Block:
+    """A decompressed block: its payloads and where each one ends."""
+
+    __slots__ = ("data", "ends", "base")
+
+    def __init__(self, data: bytes):
+        count = _LENGTH.unpack_from(data, 0)[0]
+        self.base = _LENGTH.size * (count + 1)
+        self.ends = struct.unpack_from(f"<{count}I", data, _LENGTH.size)
+        self.data = data
+
+    def __len__(self):
+        return len(self.ends)
+
+    def entry(self, index: int):
+        start = self.ends[index - 1] if index else 0
+        return decode_record(self.data[self.base + start:self.base + self.ends[index]])[1]
+
+    def entries(self, first: int = 0, last: int = None) -> list:
+        last = len(self.ends) if last is None else min(last, len(self.ends))
+        return [self.entry(index) for index in range(first, last)]
+
+
+class _ColdIdIndex:
+    """
+    Sorted ID hashes with the location of the block holding each ID.
+
+    Hash collisions are resolved by decoding the candidate blocks, so a
+    match is always exact.
+    """
+
+    def __init__(self):
+        # (hashes, locations, indexes) swapped as one tuple so readers never pair mismatched arrays
+        self._arrays = (np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint16))
+
+    def add(self, hashes: List[int], locations: List[int], indexes: List[int]) -> None:
+        """Index new entries (callers serialize writers)."""
+        old_hashes, old_locations, old_indexes = self._arrays
+        all_hashes = np.concatenate((old_hashes, np.array(hashes, dtype=np.uint64)))
+        all_locations = np.concatenate((old_locations, np.array(locations, dtype=np.uint64)))
+        all_indexes = np.concatenate((old_indexes, np.array(indexes, dtype=np.uint16)))
+        order = np.argsort(all_hashes, kind="stable")
+        self._arrays = (all_hashes[order], all_locations[order], all_indexes[order])
+
+    def candidates(self, transaction_id) -> List[Tuple[int, int]]:
+        """(block location, index in the block) of every entry that may be the ID."""
+        hashes, locations, indexes = self._arrays
+        if not len(hashes):
+            return []
+        key = np.uint64(_id_hash(transaction_id))
+        first = int(np.searchsorted(hashes, key, side="left"))
+        if first == len(hashes) or hashes[first] != key:
+            return []
+        last = int(np.searchsorted(hashes, key, side="right"))
+        return list(zip(locations[first:last].tolist(), indexes[first:last].tolist()))
+
+    def __len__(self):
+        return len(self._arrays[0])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._arrays)
+
+
+class ColdStore:
+    """
+    Writes and reads the cold segments of one transaction repository.
+    """
+
+    def __init__(self, directory: str = None, block_entries: int = None, cache_blocks: int = None,
+                 durable: bool = False):
+        """
+        Create the store in a fresh directory of its own, or in `directory` itself if durable.
+
+        Args:
+            directory: Parent directory for the segment files (defaults to
+                config.COLD_TIER_DIR); for a durable store, the directory
+                holding them
+            block_entries: Entries per compressed block (defaults to config.COLD_TIER_BLOCK_ENTRIES)
+            cache_blocks: Decoded blocks kept in memory (defaults to config.COLD_TIER_CACHE_BLOCKS)
+            durable: Fsync and keep the segments, for snapshots to refer to
+
+        Raises:
+            ValueError: If the block size is out of range
+        """
+        self.block_entries = config.COLD_TIER_BLOCK_ENTRIES if block_entries is None else block_entries
+        if not 0 < self.block_entries <= MAX_BLOCK_ENTRIES:
+            raise ValueError(f"Block size must be between 1 and {MAX_BLOCK_ENTRIES}")
+        self.cache_blocks = config.COLD_TIER_CACHE_BLOCKS if cache_blocks is None else cache_blocks
+        self.durable = durable
+        parent = directory or config.COLD_TIER_DIR
+        os.makedirs(parent, exist_ok=True)
+        # One directory per store, so several processes can share the parent
+        self.directory = parent if durable else tempfile.mkdtemp(prefix="cold-", dir=parent)
+
+        self._segments: List[_Segment] = []
+        self._ids = _ColdIdIndex()
+        self._cache: "OrderedDict[int, _Block]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.bytes_written = 0
+
+    def write(self, runs: List[Tuple[Hashable, list]]) -> Dict[Hashable, Tuple[List[int], List[int]]]:
+        """
+        Write one segment holding every run, and index the IDs in it.
+
+        Args:
+            runs: (account_id, transactions in history order) per account
+
+        Returns:
+            Dict: account_id -> (block start positions within the run, block locations)
+        """
+        if not runs:
+            return {}
+        with self._write_lock:
+            number = len(self._segments)
+            path = os.path.join(self.directory, f"{number:08d}{SEGMENT_SUFFIX}")
+            placements = {}
+            hashes, locations, indexes = [], [], []
+            offset = 0
+            with open(path, "wb") as handle:
+                for account_id, transactions in runs:
+                    starts, blocks = [], []
+                    for start in range(0, len(transactions), self.block_entries):
+                        block = transactions[start:start + self.block_entries]
+                        payloads = [encode_transaction(transaction) for transaction in block]
+                        ends = list(accumulate(len(payload) for payload in payloads))
+                        compressed = zlib.compress(
+                            struct.pack(f"<I{len(ends)}I", len(ends), *ends) + b"".join(payloads)
+                        )
+                        location = (number << _OFFSET_BITS) | offset
+                        handle.write(_LENGTH.pack(len(compressed)))
+                        handle.write(compressed)
+                        offset += _LENGTH.size + len(compressed)
+                        starts.append(start)
+                        blocks.append(location)
+                        hashes.extend(_id_hash(transaction.transaction_id) for transaction in block)
+                        locations.extend([location] * len(block))
+                        indexes.extend(range(len(block)))
+                    placements[account_id] = (starts, blocks)
+                if self.durable:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            self._segments.append(_Segment(path, keep=self.durable))
+            self._ids.add(hashes, locations, indexes)
+            self.bytes_written += offset
+        return placements
+
+    def read_block(self, location: int) -> _Block:
+        """
+        Decompress one block (through a small LRU cache of decompressed blocks).
+
+        Args:
+            location: Block location returned by write()
+
+        Returns:
+            _Block: The block; entries are decoded on access
+        """
+        with self._cache_lock:
+            block = self._cache.get(location)
+            if block is not None:
+                self._cache.move_to_end(location)
+                return block
+        block = _Block(self._segments[location >> _OFFSET_BITS].read(location & _OFFSET_MASK))
+        with self._cache_lock:
+            self._cache[location] = block
+            while len(self._cache) > self.cache_blocks:
+                self._cache.popitem(last=False)
+        return block
+
+    def read_range(self, cold: ColdHistory, start: int, stop: int) -> list:
+        """Cold entries at history positions [start, stop)."""
+        result = []
+        if start >= stop:
+            return result
+        block = cold.block_of(start)
+        while block < len(cold.blocks) and cold.block_starts[block] < stop:
+            first = cold.block_starts[block]
+            result.extend(self.read_block(cold.blocks[block]).entries(max(start - first, 0), stop - first))
+            block += 1
+        return result
+
+    def read_entry(self, cold: ColdHistory, position: int):
+        """The cold entry at a history position."""
+        block = cold.block_of(position)
+        return self.read_block(cold.blocks[block]).entry(position - cold.block_starts[block])
+
+    def iter_range(self, cold: ColdHistory) -> Iterator:
+        """Every cold entry of an account, decoding one block at a time."""
+        for location in cold.blocks:
+            yield from self.read_block(location).entries()
+
+    def find(self, transaction_id):
+        """
+        Look up a cold transaction by ID.
+
+        Returns:
+            Transaction or None: The transaction if it was spilled
+        """
+        for location, index in self._ids.candidates(transaction_id):
+            transaction = self.read_block(location).entry(index)
+            if transaction.transaction_id == transaction_id:
+                return transaction
+        return None
+
+    def __contains__(self, transaction_id) -> bool:
+        return self.find(transaction_id) is not None
+
+    def export_state(self) -> Dict:
+        """
+        Describe the segments written so far, for a snapshot to refer to.
+
+        Only meaningful for a durable store. Segments are never rewritten,
+        so every ColdHistory taken before this call points into them.
+
+        Returns:
+            Dict: Segment file names in write order, the ID index and bytes written
+        """
+        with self._write_lock:
+            return {
+                "segments": [os.path.basename(segment.path) for segment in self._segments],
+                "ids": self._ids._arrays,
+                "bytes_written": self.bytes_written
+            }
+
+    def attach(self, state: Optional[Dict]) -> None:
+        """
+        Map the segments of an exported state again, on a fresh durable store.
+
+        Segment files the state does not list were written after it (and
+        are referenced by nothing restored from it); they are deleted.
+
+        Args:
+            state: A value returned by export_state, or None for no segments
+
+        Raises:
+            ValueError: If the store is not durable or already has segments
+        """
+        if not self.durable:
+            raise ValueError("Only a durable cold store can attach segments")
+        names = state["segments"] if state else []
+        with self._write_lock:
+            if self._segments:
+                raise ValueError("The cold store already has segments")
+            for name in os.listdir(self.directory):
+                if name.endswith(SEGMENT_SUFFIX) and name not in names:
+                    os.remove(os.path.join(self.directory, name))
+            self._segments = [_Segment(os.path.join(self.directory, name), keep=True) for name in names]
+            if state:
+                self._ids._arrays = state["ids"]
+                self.bytes_written = state["bytes_written"]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Size of the cold tier.
+
+        Returns:
+            Dict: Segment count, cold entries indexed, bytes on disk and
+                bytes held by the in-memory ID index
+        """
+        return {
+            "segments": len(self._segments),
+            "entries": len(self._ids),
+            "bytes_on_disk": self.bytes_written,
+            "index_bytes": self._ids.nbytes
+        }
+
+    def start_periodic(self, transaction_repository, lock_manager=None, age: float = None,
+                       interval: float = None) -> None:
+        """
+        Spill old history in a background thread.
+
+        Args:
+            transaction_repository: Repository whose history is tiered
+            lock_manager: Lock manager the services write under
+            age: Entries older than this many seconds are spilled
+                (defaults to config.COLD_TIER_AGE_SECONDS)
+            interval: Seconds between spills (defaults to config.COLD_TIER_INTERVAL_SECONDS)
+        """
+        age = config.COLD_TIER_AGE_SECONDS if age is None else age
+        interval = config.COLD_TIER_INTERVAL_SECONDS if interval is None else interval
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                transaction_repository.spill(time.time() - age, lock_manager)
+
+        self._thread = threading.Thread(target=run, name="cold-tier-spiller", daemon=True)
+        self._thread.start()
+
+    def stop_periodic(self) -> None:
+        """Stop the background spill thread, if running."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        """Stop spilling and unmap the segments, deleting them unless the store is durable."""
+        self.stop_periodic()
+        with self._write_lock:
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
+            with self._cache_lock:
+                self._cache.clear()
+        if not self.durable:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class TieredHistory(Sequence):
+    """An account's cold entries followed by its hot ones, as one sequence."""
+
+    __slots__ = ("_store", "_cold", "_hot")
+
+    def __init__(self, store: ColdStore, cold: ColdHistory, hot: list):
+        self._store = store
+        self._cold = cold
+        self._hot = hot
+
+    def __len__(self):
+        return len(self._cold) + len(self._hot)
+
+    def __getitem__(self, position):
+        cold_length = len(self._cold)
+        if isinstance(position, slice):
+            start, stop, step = position.indices(len(self))
+            if step != 1:
+                return [self[index] for index in range(start, stop, step)]
+            return (
+                self._store.read_range(self._cold, start, min(stop, cold_length))
+                + self._hot[max(start - cold_length, 0):max(stop - cold_length, 0)]
+            )
+        if position < 0:
+            position += len(self)
+        if position >= cold_length:
+            return self._hot[position - cold_length]
+        if position < 0:
+            raise IndexError("history index out of range")
+        return self._store.read_entry(self._cold, position)
+
+    def __iter__(self):
+        yield from self._store.iter_range(self._cold)
+        yield from self._hot
+
+
+class TieredTimestamps(Sequence):
+    """The matching timestamps, for bisecting across both tiers."""
+
+    __slots__ = ("_cold", "_hot")
+
+    def __init__(self, cold: ColdHistory, hot: list):
+        self._cold = cold.timestamps
+        self._hot = hot
+
+    def __len__(self):
+        return len(self._cold) + len(self._hot)
+
+    def __getitem__(self, position):
+        cold_length = len(self._cold)
+        if position >= cold_length:
+            return self._hot[position - cold_length]
+        return self._cold[position]
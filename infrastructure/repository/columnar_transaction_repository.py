@@ -0,0 +1,332 @@
+"""
+Columnar Transaction Repository in the Infrastructure Layer.
+This stores transactions as parallel typed arrays instead of one Python
+object per row, cutting memory per transaction several times over.
+
+Columns (one entry per row):
+    id_hi / id_lo   two uint64 halves of the UUID (or the integer ID)
+    account         uint32 index into a table of account IDs
+    kind            uint8: transaction type in the low bits, ID format above
+    amount          float64
+    timestamp       float64 epoch seconds
+    description     uint32 index into an interned string table (0 = None)
+
+Rows are handed out as TransactionView objects (two slots, no __dict__)
+that read the columns on attribute access; a full Transaction entity is
+only built when materialize() is called.
+"""
+import threading
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from datetime import datetime
+from uuid import UUID
+
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+# kind column layout
+_TYPE_MASK = 0x0F
+_ID_UUID = 0x00
+_ID_INT = 0x10
+_ID_STRING = 0x20
+_ID_MASK = 0x30
+
+_TYPE_CODES = {TransactionType.DEPOSIT: 1, TransactionType.WITHDRAW: 2, "DEPOSIT": 1, "WITHDRAW": 2}
+_TYPES_BY_CODE = {1: TransactionType.DEPOSIT, 2: TransactionType.WITHDRAW}
+
+_UINT64 = (1 << 64) - 1
+_EMPTY = -1
+
+
+class TransactionView:
+    """
+    Read-only view of one stored row, shaped like a Transaction.
+    """
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    @property
+    def transaction_id(self):
+        return self._store._decode_id(self._row)
+
+    @property
+    def account_id(self):
+        return self._store._account_ids[self._store._account[self._row]]
+
+    @property
+    def transaction_type(self):
+        return _TYPES_BY_CODE[self._store._kind[self._row] & _TYPE_MASK]
+
+    @property
+    def amount(self):
+        return self._store._amount[self._row]
+
+    @property
+    def description(self):
+        index = self._store._description[self._row]
+        return self._store._strings[index - 1] if index else None
+
+    @property
+    def timestamp(self):
+        return datetime.fromtimestamp(self._store._timestamp[self._row])
+
+    def get_transaction_info(self):
+        return self.materialize().get_transaction_info()
+
+    def materialize(self) -> Transaction:
+        """Build a full Transaction entity for this row."""
+        return Transaction(
+            transaction_id=self.transaction_id,
+            account_id=self.account_id,
+            transaction_type=self.transaction_type,
+            amount=self.amount,
+            description=self.description,
+            timestamp=self.timestamp
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, TransactionView) and other._store is self._store and other._row == self._row
+
+    def __hash__(self):
+        return hash((id(self._store), self._row))
+
+    def __repr__(self):
+        return f"TransactionView({self.transaction_id!r}, {self.account_id!r}, {self.amount!r})"
+
+
+class _RowViews(Sequence):
+    """An account's rows as a lazy sequence of TransactionViews."""
+
+    __slots__ = ("_store", "_rows")
+
+    def __init__(self, store, rows):
+        self._store = store
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [TransactionView(self._store, row) for row in self._rows[position]]
+        return TransactionView(self._store, self._rows[position])
+
+
+class _RowTimestamps(Sequence):
+    """An account's row timestamps, as the sorted index pagination bisects."""
+
+    __slots__ = ("_timestamps", "_rows")
+
+    def __init__(self, timestamps, rows):
+        self._timestamps = timestamps
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, position):
+        return self._timestamps[self._rows[position]]
+
+
+class _AccountRowMap:
+    """Mapping facade so the base repository's history lookups keep working."""
+
+    def __init__(self, store, wrap):
+        self._store = store
+        self._wrap = wrap
+
+    def get(self, account_id, default=None):
+        index = self._store._account_index.get(account_id)
+        if index is None:
+            return default
+        return self._wrap(self._store._rows_by_account[index])
+
+    def __iter__(self):
+        return iter(self._store._account_ids)
+
+    def __contains__(self, account_id):
+        return account_id in self._store._account_index
+
+
+class _IdIndex:
+    """
+    Open-addressing hash index from transaction ID to row number.
+
+    Stores one int64 row number per slot (about 16 bytes per row at the
+    0.5 load factor) instead of a dict entry plus a key object.
+    """
+
+    def __init__(self, store, capacity=1024):
+        self._store = store
+        # (slots, mask) swapped as one tuple so lock-free readers never pair
+        # a resized slot array with the old mask.
+        self._table = (array("q", [_EMPTY]) * capacity, capacity - 1)
+        self._size = 0
+
+    def _find(self, key, table):
+        hi, lo, flags = key
+        store = self._store
+        slots, mask = table
+        slot = (lo ^ (lo >> 29) ^ hi) & mask
+        while True:
+            row = slots[slot]
+            if row == _EMPTY:
+                return slot, None
+            if store._id_lo[row] == lo and store._id_hi[row] == hi and store._kind[row] & _ID_MASK == flags:
+                return slot, row
+            slot = (slot + 1) & mask
+
+    def add(self, key, row):
+        """Index a row (callers hold the store's row lock)."""
+        if (self._size + 1) * 2 > len(self._table[0]):
+            self._grow()
+        table = self._table
+        slot, _ = self._find(key, table)
+        table[0][slot] = row
+        self._size += 1
+
+    def get(self, transaction_id, default=None):
+        key = self._store._encode_id(transaction_id, intern=False)
+        if key is None:
+            return default
+        _, row = self._find(key, self._table)
+        return default if row is None else TransactionView(self._store, row)
+
+    def __contains__(self, transaction_id):
+        return self.get(transaction_id) is not None
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self):
+        store = self._store
+        old_slots = self._table[0]
+        capacity = len(old_slots) * 2
+        table = (array("q", [_EMPTY]) * capacity, capacity - 1)
+        for row in old_slots:
+            if row != _EMPTY:
+                key = (store._id_hi[row], store._id_lo[row], store._kind[row] & _ID_MASK)
+                slot, _ = self._find(key, table)
+                table[0][slot] = row
+        self._table = table
+
+
+class ColumnarTransactionRepository(TransactionRepository):
+    """
+    Drop-in TransactionRepository that keeps rows in typed arrays.
+
+    Saving, ledger writes, replay, aggregates and pagination are inherited;
+    only the row storage and the ID index differ.
+    """
+
+    def __init__(self, ledger=None, account_class_of=None):
+        super().__init__(ledger, account_class_of)
+        self._rows_lock = threading.Lock()
+
+        self._id_hi = array("Q")
+        self._id_lo = array("Q")
+        self._account = array("I")
+        self._kind = array("B")
+        self._amount = array("d")
+        self._timestamp = array("d")
+        self._description = array("I")
+
+        self._account_ids = []
+        self._account_index = {}
+        self._rows_by_account = []
+        self._strings = []
+        self._string_index = {}
+
+        self.transactions = _AccountRowMap(self, lambda rows: _RowViews(self, rows))
+        self.timestamps = _AccountRowMap(self, lambda rows: _RowTimestamps(self._timestamp, rows))
+        self.by_id = _IdIndex(self)
+
+    def __len__(self):
+        return len(self._amount)
+
+    def _encode_id(self, transaction_id, intern=True):
+        """Split an ID into (hi, lo, flags); None if unknown and not interned."""
+        if isinstance(transaction_id, int):
+            return 0, transaction_id & _UINT64, _ID_INT
+        try:
+            value = UUID(transaction_id).int
+            return value >> 64, value & _UINT64, _ID_UUID
+        except (TypeError, ValueError, AttributeError):
+            pass
+        text = str(transaction_id)
+        index = self._string_index.get(text)
+        if index is None:
+            if not intern:
+                return None
+            index = self._intern(text)
+        return 0, index, _ID_STRING
+
+    def _decode_id(self, row):
+        flags = self._kind[row] & _ID_MASK
+        if flags == _ID_INT:
+            return self._id_lo[row]
+        if flags == _ID_STRING:
+            return self._strings[self._id_lo[row]]
+        return str(UUID(int=(self._id_hi[row] << 64) | self._id_lo[row]))
+
+    def _intern(self, text):
+        index = self._string_index.get(text)
+        if index is None:
+            index = self._string_index[text] = len(self._strings)
+            self._strings.append(text)
+        return index
+
+    def _append(self, transaction) -> None:
+        """Add a transaction as a new row, plus its index entries and aggregates."""
+        epoch = transaction.timestamp.timestamp()
+        description = getattr(transaction, "description", None)
+
+        with self._rows_lock:
+            hi, lo, flags = key = self._encode_id(transaction.transaction_id)
+            account_index = self._account_index.get(transaction.account_id)
+            if account_index is None:
+                account_index = self._account_index[transaction.account_id] = len(self._account_ids)
+                self._account_ids.append(transaction.account_id)
+                self._rows_by_account.append(array("I"))
+
+            row = len(self._amount)
+            self._id_hi.append(hi)
+            self._id_lo.append(lo)
+            self._account.append(account_index)
+            self._kind.append(_TYPE_CODES[transaction.transaction_type] | flags)
+            self._amount.append(transaction.amount)
+            self._timestamp.append(epoch)
+            self._description.append(0 if description is None else self._intern(description) + 1)
+            self.by_id.add(key, row)
+
+            rows = self._rows_by_account[account_index]
+            if not rows or epoch >= self._timestamp[rows[-1]]:
+                position = len(rows)
+                rows.append(row)
+            else:
+                # Late arrival: keep the account's rows in timestamp order
+                position = bisect_right(_RowTimestamps(self._timestamp, rows), epoch)
+                rows.insert(position, row)
+            length = len(rows)
+
+        self._aggregate_for(transaction.account_id).add(transaction)
+        self.rollups.add(transaction)
+        self.checkpoints.appended(transaction.account_id, position, length)
+
+    def _net_change(self, account_id, start: int, stop: int) -> float:
+        """Sum of the signed amounts at history positions [start, stop), read from the columns."""
+        index = self._account_index.get(account_id)
+        if index is None:
+            return 0.0
+        amounts = self._amount
+        kinds = self._kind
+        deposit = _TYPE_CODES[TransactionType.DEPOSIT]
+        return sum(
+            amounts[row] if kinds[row] & _TYPE_MASK == deposit else -amounts[row]
+            for row in self._rows_by_account[index][start:stop]
+        )
@@ -0,0 +1,127 @@
+"""
+Repository factory in the Infrastructure Layer.
+This builds the repositories selected in config.
+"""
+import os
+
+import config
+from infrastructure.idempotency import IdempotencyCache
+from infrastructure.metrics import REGISTRY
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.cached_account_repository import CachedAccountRepository
+from infrastructure.repository.cold_storage import ColdStore
+from infrastructure.repository.period_rollups import account_class_resolver
+from infrastructure.repository.snapshot_store import SnapshotStore
+from infrastructure.repository.sqlite_repository import (
+    SQLiteAccountRepository,
+    SQLiteDatabase,
+    SQLiteTransactionRepository
+)
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger
+
+
+# Repository methods timed when metrics are enabled
+ACCOUNT_METHODS = ("create_account", "create_accounts", "get_account_by_id", "update_account")
+TRANSACTION_METHODS = (
+    "save_transaction", "save_transactions", "stage_transaction", "publish_transactions",
+    "get_transaction_by_id", "get_transactions_for_account", "get_transactions_page", "get_account_aggregate",
+    "get_period_totals", "get_period_rollups",
+)
+
+
+def instrument_repositories(account_repository, transaction_repository, metrics=None):
+    """
+    Time the repositories' public methods into banking_repository_seconds.
+
+    Returns:
+        Tuple: The same (account_repository, transaction_repository)
+    """
+    metrics = metrics or REGISTRY
+    metrics.instrument(account_repository, type(account_repository).__name__, ACCOUNT_METHODS)
+    metrics.instrument(transaction_repository, type(transaction_repository).__name__, TRANSACTION_METHODS)
+    return account_repository, transaction_repository
+
+
+def build_repositories(lock_manager, ledger_dir: str = None, sqlite_path: str = None):
+    """
+    Create the account and transaction repositories.
+
+    config.REPOSITORY_BACKEND picks the backend. For "memory" with a ledger
+    directory, state is restored from the newest snapshot plus the ledger
+    tail, snapshots are taken periodically and, with config.SNAPSHOT_COMPACT,
+    the ledger segments they cover are dropped. With config.COLD_TIER_ENABLED,
+    "memory" history older than config.COLD_TIER_AGE_SECONDS is spilled to a
+    ColdStore periodically; next to a ledger the store is durable, so
+    snapshots refer to its segments instead of copying the history. For
+    "sqlite", accounts are cached in memory unless config.ACCOUNT_CACHE_ENABLED
+    is off.
+
+    Args:
+        lock_manager: Lock manager the services write under (used by snapshots)
+        ledger_dir: Ledger directory (defaults to config.LEDGER_DIR; unset keeps state in memory)
+        sqlite_path: Database file for the "sqlite" backend (defaults to config.SQLITE_PATH)
+
+    Returns:
+        Tuple: (account_repository, transaction_repository)
+
+    Raises:
+        ValueError: If the configured backend is unknown
+    """
+    if config.REPOSITORY_BACKEND == "sqlite":
+        database = SQLiteDatabase(sqlite_path)
+        account_repository = SQLiteAccountRepository(database)
+        if config.ACCOUNT_CACHE_ENABLED:
+            account_repository = CachedAccountRepository(account_repository)
+        return instrument_repositories(account_repository, SQLiteTransactionRepository(database))
+    if config.REPOSITORY_BACKEND != "memory":
+        raise ValueError(f"Unknown repository backend: {config.REPOSITORY_BACKEND}")
+
+    ledger_dir = ledger_dir or config.LEDGER_DIR
+    if not ledger_dir:
+        cold_store = ColdStore() if config.COLD_TIER_ENABLED else None
+        account_repository = AccountRepository()
+        transaction_repository = TransactionRepository(
+            account_class_of=account_class_resolver(account_repository.accounts), cold_store=cold_store
+        )
+    else:
+        ledger = WriteAheadLedger(ledger_dir)
+        snapshots = SnapshotStore(os.path.join(ledger_dir, "snapshots"))
+        # Kept even with the tier off, so the cold history a snapshot refers to stays readable
+        cold_store = ColdStore(os.path.join(ledger_dir, "cold"), durable=True)
+        account_repository = AccountRepository(ledger)
+        transaction_repository = TransactionRepository(
+            ledger, account_class_resolver(account_repository.accounts), cold_store=cold_store,
+            snapshots=snapshots
+        )
+        snapshots.restore(account_repository, transaction_repository)
+        snapshots.start_periodic(
+            account_repository, transaction_repository, ledger, lock_manager, compact=config.SNAPSHOT_COMPACT
+        )
+    if config.COLD_TIER_ENABLED:
+        cold_store.start_periodic(transaction_repository, lock_manager)
+    return instrument_repositories(account_repository, transaction_repository)
+
+
+def build_idempotency_cache(ledger_dir: str = None, sqlite_path: str = None) -> IdempotencyCache:
+    """
+    Create the idempotency-key cache, persisted next to the durable state.
+
+    The journal goes in the ledger directory for the "memory" backend and
+    beside the database file for "sqlite". Without durable state, or with
+    config.IDEMPOTENCY_PERSIST off, the cache lives in memory only.
+
+    Args:
+        ledger_dir: Ledger directory (defaults to config.LEDGER_DIR)
+        sqlite_path: Database file (defaults to config.SQLITE_PATH)
+
+    Returns:
+        IdempotencyCache: The cache
+    """
+    path = None
+    if config.IDEMPOTENCY_PERSIST:
+        if config.REPOSITORY_BACKEND == "sqlite":
+            path = (sqlite_path or config.SQLITE_PATH) + ".idempotency"
+        elif ledger_dir or config.LEDGER_DIR:
+            path = os.path.join(ledger_dir or config.LEDGER_DIR, "idempotency.journal")
+    return IdempotencyCache(path=path)
@@ -0,0 +1,106 @@
+"""
+Keyset pagination over per-account timestamp indexes.
+
+A cursor is opaque to clients. Internally it holds the timestamp of the last
+row returned and how many rows sharing that timestamp were already returned,
+so a page resumes with one binary search instead of an offset scan and stays
+correct when new rows are appended between requests.
+"""
+import base64
+import binascii
+from bisect import bisect_left
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+
+def to_epoch(moment) -> Optional[float]:
+    """Convert a datetime (or epoch seconds) to epoch seconds."""
+    if moment is None:
+        return None
+    if isinstance(moment, datetime):
+        return moment.timestamp()
+    return float(moment)
+
+
+def encode_cursor(timestamp: float, skip: int) -> str:
+    """
+    Build an opaque cursor.
+
+    Args:
+        timestamp: Epoch timestamp of the last row returned
+        skip: Rows with exactly that timestamp already returned
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    raw = f"{timestamp!r}:{skip}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Parse a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous page
+
+    Returns:
+        Tuple[float, int]: Timestamp and skip count
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, skip = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split(":")
+        return float(timestamp), int(skip)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def page_positions(timestamps: Sequence[float], rows: Sequence, limit: int,
+                   cursor: str = None, since=None, until=None,
+                   row_filter=None) -> Tuple[List, Optional[str]]:
+    """
+    Select one page of rows from a timestamp-sorted index.
+
+    Costs O(log n + page size) without a row_filter; with one, rows that do
+    not match are skipped while filling the page.
+
+    Args:
+        timestamps: Sorted epoch timestamps, parallel to rows
+        rows: Rows in timestamp order
+        limit: Maximum rows to return
+        cursor: Cursor from the previous page
+        since: Inclusive lower time bound (datetime or epoch seconds)
+        until: Exclusive upper time bound (datetime or epoch seconds)
+        row_filter: Optional predicate rows must satisfy
+
+    Returns:
+        Tuple[List, Optional[str]]: Page rows and the cursor for the next page
+            (None when there are no further rows)
+    """
+    start = 0
+    if since is not None:
+        start = bisect_left(timestamps, to_epoch(since))
+    if cursor is not None:
+        after, skip = decode_cursor(cursor)
+        start = max(start, bisect_left(timestamps, after) + skip)
+    end = len(timestamps) if until is None else bisect_left(timestamps, to_epoch(until))
+
+    page = []
+    position = start
+    last_position = None
+    while position < end and len(page) < limit:
+        row = rows[position]
+        if row_filter is None or row_filter(row):
+            page.append(row)
+            last_position = position
+        position += 1
+
+    if position >= end or last_position is None:
+        return page, None
+
+    last_timestamp = timestamps[last_position]
+    skip = last_position - bisect_left(timestamps, last_timestamp) + 1
+    return page, encode_cursor(last_timestamp, skip)
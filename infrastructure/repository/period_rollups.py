@@ -0,0 +1,362 @@
+"""
+Per-period rollups maintained at write time.
+Deposit and withdrawal totals are kept in day and month buckets, per account
+and per account class, so period reports cost one step per bucket instead
+of one per transaction.
+
+A date range [start, end) is answered by combining buckets: whole months
+from the month buckets and the partial months at either edge from the day
+buckets. A ten-year statement therefore reads at most 120 month buckets and
+about 60 day buckets, however many transactions the account has.
+
+Bucket keys are plain integers: date.toordinal() for days and
+year * 12 + month - 1 for months, both taken from the transaction's local
+timestamp.
+"""
+import threading
+from bisect import bisect_left, insort
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from infrastructure.repository.account_aggregates import is_deposit
+
+DAY = "day"
+MONTH = "month"
+GRANULARITIES = (DAY, MONTH)
+
+ACCOUNT_SCOPE = "account"
+CLASS_SCOPE = "class"
+
+
+def day_key(moment) -> int:
+    return moment.toordinal()
+
+
+def month_key(moment) -> int:
+    return moment.year * 12 + moment.month - 1
+
+
+def month_start(key: int) -> date:
+    return date(key // 12, key % 12 + 1, 1)
+
+
+PERIOD_STARTS = {DAY: date.fromordinal, MONTH: month_start}
+
+
+def to_day(value) -> Optional[date]:
+    """
+    Normalise a range bound to a date.
+
+    Args:
+        value: date, midnight datetime, ISO string or None
+
+    Raises:
+        ValueError: If the bound is not a whole day
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.time() != datetime.min.time():
+            raise ValueError(f"Rollup ranges are whole days, got {value.isoformat()}")
+        return value.date()
+    if isinstance(value, date):
+        return value
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+def split_range(start: Optional[date], end: Optional[date]) -> Tuple[Optional[tuple], List[tuple]]:
+    """
+    Cover [start, end) with whole months plus the leftover days.
+
+    Args:
+        start: First day (None for unbounded)
+        end: Day after the last one (None for unbounded)
+
+    Returns:
+        Tuple: (month key range or None, list of day key ranges); every
+            range is (low, high) with high exclusive and None for unbounded
+    """
+    if start is not None and end is not None and start >= end:
+        return None, []
+    first_month = None if start is None else month_key(start) + (start.day != 1)
+    last_month = None if end is None else month_key(end)
+    if first_month is not None and last_month is not None and first_month >= last_month:
+        return None, [(day_key(start), day_key(end))]
+    days = []
+    if start is not None and start.day != 1:
+        days.append((day_key(start), day_key(month_start(first_month))))
+    if end is not None and end.day != 1:
+        days.append((day_key(month_start(last_month)), day_key(end)))
+    return (first_month, last_month), days
+
+
+def period_span(granularity: str, start: Optional[date], end: Optional[date]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Key range of the periods that start in [start, end).
+
+    Raises:
+        ValueError: If the granularity is unknown
+    """
+    if granularity == MONTH:
+        low = None if start is None else month_key(start) + (start.day != 1)
+        high = None if end is None else month_key(end) + (end.day != 1)
+    elif granularity == DAY:
+        low = None if start is None else day_key(start)
+        high = None if end is None else day_key(end)
+    else:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    return low, high
+
+
+class PeriodTotals:
+    """
+    Deposit and withdrawal totals over some period.
+    """
+
+    __slots__ = ("deposits", "withdrawals", "deposit_count", "withdrawal_count")
+
+    def __init__(self, deposits: float = 0.0, withdrawals: float = 0.0, deposit_count: int = 0,
+                 withdrawal_count: int = 0):
+        self.deposits = deposits
+        self.withdrawals = withdrawals
+        self.deposit_count = deposit_count
+        self.withdrawal_count = withdrawal_count
+
+    def merge(self, other: "PeriodTotals") -> "PeriodTotals":
+        self.deposits += other.deposits
+        self.withdrawals += other.withdrawals
+        self.deposit_count += other.deposit_count
+        self.withdrawal_count += other.withdrawal_count
+        return self
+
+    def to_dict(self) -> Dict:
+        """Get the totals, and the net change, as a plain dictionary."""
+        return {
+            "deposits": self.deposits,
+            "withdrawals": self.withdrawals,
+            "net": self.deposits - self.withdrawals,
+            "deposit_count": self.deposit_count,
+            "withdrawal_count": self.withdrawal_count,
+            "transaction_count": self.deposit_count + self.withdrawal_count
+        }
+
+
+class _Buckets:
+    """Totals per period key, with the keys kept sorted for range scans."""
+
+    __slots__ = ("keys", "totals")
+
+    def __init__(self):
+        self.keys = []
+        self.totals = {}
+
+    def create(self, key: int) -> PeriodTotals:
+        totals = self.totals[key] = PeriodTotals()
+        if not self.keys or key > self.keys[-1]:
+            self.keys.append(key)
+        else:
+            insort(self.keys, key)
+        return totals
+
+    def span(self, low: Optional[int], high: Optional[int]) -> List[int]:
+        keys = self.keys
+        first = 0 if low is None else bisect_left(keys, low)
+        last = len(keys) if high is None else bisect_left(keys, high)
+        return keys[first:last]
+
+
+class PeriodRollups:
+    """
+    Day and month buckets per account and per account class.
+    """
+
+    def __init__(self, account_class_of: Callable[[object], Optional[str]] = None):
+        """
+        Initialize empty rollups.
+
+        Args:
+            account_class_of: Maps an account ID to its entity class name;
+                without it only per-account rollups are kept
+        """
+        self.account_class_of = account_class_of
+        # account_id -> class name, so the lookup happens once per account
+        self._account_classes: Dict[object, str] = {}
+        # (scope, scope key) -> {granularity: _Buckets}
+        self._buckets: Dict[tuple, Dict[str, _Buckets]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, transaction, account_class: str = None) -> None:
+        """
+        Fold one saved transaction into its buckets.
+
+        Args:
+            transaction: The transaction
+            account_class: Its account's class name (looked up if omitted)
+        """
+        if account_class is None and self.account_class_of is not None:
+            account_class = self._account_classes.get(transaction.account_id)
+            if account_class is None:
+                account_class = self.account_class_of(transaction.account_id)
+                if account_class is not None:
+                    self._account_classes[transaction.account_id] = account_class
+        self.add_posting(
+            transaction.account_id, account_class, transaction.timestamp, transaction.amount, is_deposit(transaction)
+        )
+
+    def add_posting(self, account_id, account_class: Optional[str], timestamp: datetime, amount: float,
+                    deposit: bool) -> None:
+        """Fold one posting, given field by field, into its buckets."""
+        day, month = timestamp.toordinal(), timestamp.year * 12 + timestamp.month - 1
+        with self._lock:
+            self._fold((ACCOUNT_SCOPE, account_id), day, month, amount, deposit)
+            if account_class is not None:
+                self._fold((CLASS_SCOPE, account_class), day, month, amount, deposit)
+
+    def _fold(self, scope: tuple, day: int, month: int, amount: float, deposit: bool) -> None:
+        # Hot path (every save_transaction): the bucket updates are inlined; callers hold self._lock
+        buckets = self._buckets.get(scope)
+        if buckets is None:
+            buckets = self._buckets[scope] = {DAY: _Buckets(), MONTH: _Buckets()}
+        days, months = buckets[DAY], buckets[MONTH]
+        day_totals = days.totals.get(day) or days.create(day)
+        month_totals = months.totals.get(month) or months.create(month)
+        if deposit:
+            day_totals.deposits += amount
+            day_totals.deposit_count += 1
+            month_totals.deposits += amount
+            month_totals.deposit_count += 1
+        else:
+            day_totals.withdrawals += amount
+            day_totals.withdrawal_count += 1
+            month_totals.withdrawals += amount
+            month_totals.withdrawal_count += 1
+
+    def totals(self, scope: tuple, start=None, end=None) -> PeriodTotals:
+        """
+        Sum a scope's buckets over [start, end).
+
+        Args:
+            scope: (ACCOUNT_SCOPE, account_id) or (CLASS_SCOPE, class name)
+            start: First day (unbounded if None)
+            end: Day after the last one (unbounded if None)
+
+        Returns:
+            PeriodTotals: The combined totals
+        """
+        months, days = split_range(to_day(start), to_day(end))
+        result = PeriodTotals()
+        with self._lock:
+            buckets = self._buckets.get(scope)
+            if buckets is None:
+                return result
+            ranges = [(buckets[DAY], low, high) for low, high in days]
+            if months is not None:
+                ranges.append((buckets[MONTH],) + months)
+            for granularity, low, high in ranges:
+                for key in granularity.span(low, high):
+                    result.merge(granularity.totals[key])
+        return result
+
+    def periods(self, scope: tuple, granularity: str, start=None, end=None) -> List[Tuple[date, PeriodTotals]]:
+        """
+        List a scope's non-empty buckets whose period starts in [start, end).
+
+        Returns:
+            List[Tuple[date, PeriodTotals]]: Period start and a copy of its totals, in order
+
+        Raises:
+            ValueError: If the granularity is unknown
+        """
+        low, high = period_span(granularity, to_day(start), to_day(end))
+        period_start = PERIOD_STARTS[granularity]
+        with self._lock:
+            buckets = self._buckets.get(scope)
+            if buckets is None:
+                return []
+            bucket = buckets[granularity]
+            return [(period_start(key), PeriodTotals().merge(bucket.totals[key])) for key in bucket.span(low, high)]
+
+    def rows(self) -> Iterable[tuple]:
+        """Every bucket as (scope, scope key, granularity, period, deposits, withdrawals, counts...)."""
+        with self._lock:
+            items = [(scope, dict(buckets)) for scope, buckets in self._buckets.items()]
+        for (scope, scope_key), buckets in items:
+            for granularity, bucket in buckets.items():
+                for key in bucket.keys:
+                    totals = bucket.totals[key]
+                    yield (scope, scope_key, granularity, key, totals.deposits, totals.withdrawals,
+                           totals.deposit_count, totals.withdrawal_count)
+
+    def capture(self, account_id) -> Dict[str, Dict[int, tuple]]:
+        """
+        Copy one account's buckets, for a snapshot.
+
+        Returns:
+            Dict: granularity -> {period key: (deposits, withdrawals, deposit count, withdrawal count)}
+        """
+        with self._lock:
+            buckets = self._buckets.get((ACCOUNT_SCOPE, account_id))
+            if buckets is None:
+                return {}
+            return {
+                granularity: {
+                    key: (totals.deposits, totals.withdrawals, totals.deposit_count, totals.withdrawal_count)
+                    for key, totals in bucket.totals.items()
+                }
+                for granularity, bucket in buckets.items()
+            }
+
+    def restore(self, account_id, captured: Dict[str, Dict[int, tuple]]) -> None:
+        """
+        Fold buckets returned by capture into the account's scope and its class's.
+
+        Args:
+            account_id: ID of the account
+            captured: The account's captured buckets
+        """
+        account_class = self.account_class_of(account_id) if self.account_class_of is not None else None
+        scopes = [(ACCOUNT_SCOPE, account_id)]
+        if account_class is not None:
+            self._account_classes[account_id] = account_class
+            scopes.append((CLASS_SCOPE, account_class))
+        with self._lock:
+            for scope in scopes:
+                buckets = self._buckets.get(scope)
+                if buckets is None:
+                    buckets = self._buckets[scope] = {DAY: _Buckets(), MONTH: _Buckets()}
+                for granularity, periods in captured.items():
+                    bucket = buckets[granularity]
+                    for key, values in periods.items():
+                        totals = bucket.totals.get(key) or bucket.create(key)
+                        totals.merge(PeriodTotals(*values))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+def account_class_resolver(accounts) -> Callable[[object], Optional[str]]:
+    """
+    Build an account_class_of function over an account mapping.
+
+    Args:
+        accounts: account_id -> account entity (e.g. AccountRepository.accounts)
+    """
+    def account_class_of(account_id):
+        account = accounts.get(account_id)
+        return type(account).__name__ if account is not None else None
+    return account_class_of
+
+
+def rollup_scope(account_id=None, account_class: str = None) -> tuple:
+    """
+    Pick the rollup scope for a query.
+
+    Raises:
+        ValueError: Unless exactly one of account_id and account_class is given
+    """
+    if (account_id is None) == (account_class is None):
+        raise ValueError("Give either an account ID or an account class")
+    return (ACCOUNT_SCOPE, account_id) if account_id is not None else (CLASS_SCOPE, account_class)
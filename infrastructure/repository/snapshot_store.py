@@ -0,0 +1,258 @@
+"""
+Snapshot Store in the Infrastructure Layer.
+This bounds restart time by checkpointing every account and its derived
+state next to the ledger.
+
+A snapshot is taken without stopping writers. The starting LSN is read and
+the account list taken while account openings are held back, so every
+account opened at or before that LSN is in the list. Accounts are then
+copied one at a time while holding only that account's stripe lock, and
+each copy records the ledger LSN it reflects (its watermark). Because a
+posting's balance change, its ledger append and its history append happen
+under the same stripe lock, every record for that account with an LSN at
+or below the watermark is already in the copy, and every later record is
+not.
+
+A copy holds the account, its running totals, rollup buckets and balance
+checkpoints as they are, and only the hot tail of its history. The cold
+part is a reference into the cold store's segments, which the store next
+to a ledger keeps on disk (see infrastructure.repository.cold_storage), so
+with the cold tier on a snapshot grows with the accounts and the recent
+history, not with everything ever posted. Restart loads the newest
+snapshot, maps the same cold segments again, indexes the hot tails and
+replays only the ledger records past each account's watermark.
+
+Every record at or below the starting LSN is therefore in the snapshot,
+which is what makes compact() safe.
+
+Deposits to a hot account are appended under a sub-balance slot lock
+instead (see infrastructure.hot_accounts), so for those accounts the slots
+are held as well and their pending amounts and transactions are added to
+the copy.
+"""
+import copy
+import os
+import pickle
+import threading
+import time
+from contextlib import nullcontext
+from typing import Optional
+
+import config
+
+SNAPSHOT_PREFIX = "snapshot-"
+# Snapshots in earlier formats (".pkl", ".v2.pkl") are ignored, so a
+# restart with only those replays the whole ledger
+SNAPSHOT_SUFFIX = ".v3.pkl"
+
+
+class SnapshotStore:
+    """
+    Writes, loads and prunes account snapshots, and compacts the ledger.
+    """
+
+    def __init__(self, directory: str, keep: int = None):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding the snapshot files
+            keep: Number of snapshots to retain (defaults to config.SNAPSHOT_KEEP)
+        """
+        self.directory = directory
+        self.keep = config.SNAPSHOT_KEEP if keep is None else keep
+        os.makedirs(directory, exist_ok=True)
+        self._take_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def take(self, account_repository, transaction_repository, ledger, lock_manager) -> dict:
+        """
+        Write a point-in-time snapshot of every account and its derived state.
+
+        Only the stripe of the account being copied is held at any moment,
+        so postings to all other accounts proceed undisturbed.
+
+        Args:
+            account_repository: Repository whose accounts are captured
+            transaction_repository: Repository whose totals and histories are captured
+            ledger: WriteAheadLedger the accounts are derived from
+            lock_manager: Lock manager the TransactionService writes under
+
+        Returns:
+            dict: Snapshot metadata (path, lsn and account count)
+        """
+        with self._take_lock:
+            taken_at = time.time()
+            opening_lock = getattr(account_repository, "opening_lock", None)
+            with opening_lock if opening_lock is not None else nullcontext():
+                start_lsn = ledger.last_lsn
+                account_ids = list(account_repository.accounts)
+            accounts = {}
+            account_state = {}
+            watermarks = {}
+            hot_accounts = getattr(lock_manager, "hot_accounts", None)
+            for account_id in account_ids:
+                hot = hot_accounts.get(account_id) if hot_accounts is not None else None
+                with lock_manager.lock_for(account_id), (hot.locked() if hot is not None else nullcontext()):
+                    account = copy.copy(account_repository.get_account_by_id(account_id))
+                    captured = transaction_repository.capture_account(account_id)
+                    if hot is not None:
+                        account.balance += hot.pending_balance()
+                        captured["pending"] = [transaction for slot in hot.slots for transaction in slot.pending]
+                    accounts[account_id] = account
+                    account_state[account_id] = captured
+                    watermarks[account_id] = ledger.last_lsn
+
+            # Taken last, so every cold history captured above points into these segments
+            cold_store = transaction_repository.cold_store
+            state = {
+                "lsn": start_lsn,
+                "taken_at": taken_at,
+                "accounts": accounts,
+                "account_state": account_state,
+                "watermarks": watermarks,
+                "cold": cold_store.export_state() if cold_store is not None and cold_store.durable else None,
+                "next_transaction_id": transaction_repository.next_transaction_id,
+                "checkpoint_interval": transaction_repository.checkpoints.interval
+            }
+            path = os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{start_lsn:020d}{SNAPSHOT_SUFFIX}")
+            temporary = path + ".tmp"
+            with open(temporary, "wb") as handle:
+                pickle.dump(state, handle, protocol=pickle.HIGHEST_PROTOCOL)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temporary, path)
+            self._prune()
+
+        return {"path": path, "lsn": start_lsn, "accounts": len(accounts)}
+
+    def snapshots(self):
+        """
+        List snapshot files from newest to oldest.
+
+        Returns:
+            List[Tuple[int, str]]: (starting LSN, path) for every snapshot
+        """
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX):
+                lsn = int(name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)])
+                found.append((lsn, os.path.join(self.directory, name)))
+        found.sort(reverse=True)
+        return found
+
+    def load_latest(self) -> Optional[dict]:
+        """
+        Load the newest readable snapshot.
+
+        A snapshot that cannot be read (e.g. a partial file from a crash) is
+        skipped in favour of the next older one.
+
+        Returns:
+            Optional[dict]: Snapshot state, or None if there is none
+        """
+        for _, path in self.snapshots():
+            try:
+                with open(path, "rb") as handle:
+                    return pickle.load(handle)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                continue
+        return None
+
+    def restore(self, account_repository, transaction_repository) -> int:
+        """
+        Rebuild both repositories from the newest snapshot plus the ledger tail.
+
+        Falls back to a full ledger replay when no snapshot exists.
+
+        Args:
+            account_repository: Repository to load the accounts into
+            transaction_repository: Ledger-backed repository to replay through
+
+        Returns:
+            int: Number of ledger records replayed
+
+        Raises:
+            ValueError: If the ledger was compacted past what the snapshot (if any) covers
+        """
+        state = self.load_latest()
+        segments = transaction_repository.ledger.segments()
+        first_lsn = state["lsn"] + 1 if state is not None else 1
+        if segments and segments[0][0] > first_lsn:
+            raise ValueError(
+                f"Ledger records from LSN {first_lsn} to {segments[0][0] - 1} were compacted "
+                "and no snapshot covers them"
+            )
+        if state is None:
+            cold_store = transaction_repository.cold_store
+            if cold_store is not None and cold_store.durable:
+                # Segments left by an earlier run are not referenced by anything
+                cold_store.attach(None)
+            return transaction_repository.replay(account_repository)
+
+        account_repository.accounts.update(state["accounts"])
+        transaction_repository.restore_accounts(
+            state["account_state"], state["cold"], state["next_transaction_id"], state["checkpoint_interval"]
+        )
+        return transaction_repository.replay(
+            account_repository,
+            from_lsn=state["lsn"] + 1,
+            watermarks=state["watermarks"]
+        )
+
+    def compact(self, ledger) -> int:
+        """
+        Drop ledger segments fully covered by the newest snapshot.
+
+        Every record up to the snapshot's starting LSN (accounts and
+        history alike) is in the snapshot or in the cold segments it refers
+        to, so only those segments go.
+
+        Args:
+            ledger: WriteAheadLedger to compact
+
+        Returns:
+            int: Number of segment files removed
+        """
+        snapshots = self.snapshots()
+        if not snapshots:
+            return 0
+        return ledger.drop_segments_through(snapshots[0][0])
+
+    def start_periodic(self, account_repository, transaction_repository, ledger, lock_manager,
+                       interval: float = None, compact: bool = False) -> None:
+        """
+        Take snapshots in a background thread.
+
+        Args:
+            account_repository: Repository whose accounts are captured
+            transaction_repository: Repository whose totals and histories are captured
+            ledger: WriteAheadLedger the accounts are derived from
+            lock_manager: Lock manager the TransactionService writes under
+            interval: Seconds between snapshots (defaults to config.SNAPSHOT_INTERVAL_SECONDS)
+            compact: Whether to compact the ledger after each snapshot
+        """
+        interval = config.SNAPSHOT_INTERVAL_SECONDS if interval is None else interval
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.take(account_repository, transaction_repository, ledger, lock_manager)
+                if compact:
+                    self.compact(ledger)
+
+        self._thread = threading.Thread(target=run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    def stop_periodic(self) -> None:
+        """Stop the background snapshot thread, if running."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _prune(self) -> None:
+        """Delete snapshots beyond the retention count."""
+        for _, path in self.snapshots()[self.keep:]:
+            os.remove(path)
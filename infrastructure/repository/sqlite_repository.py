@@ -0,0 +1,727 @@
+"""
+SQLite Repositories in the Infrastructure Layer.
+These persist accounts and transactions in one SQLite database and are
+drop-in replacements for AccountRepository and TransactionRepository.
+
+- The database runs in WAL mode, so readers never block the writer.
+- Connections come from a thread-safe pool; each one keeps a cache of
+  prepared statements (sqlite3 compiles each distinct SQL string once per
+  connection), so the hot statements below are parsed only once.
+- unit_of_work() pins one connection to the calling thread inside a
+  single BEGIN IMMEDIATE ... COMMIT. Every repository call the thread
+  makes joins it, so a deposit's balance update and ledger insert commit
+  or roll back together.
+"""
+import pickle
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from collections.abc import Mapping
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import config
+from domain.entities.account import Account
+from domain.entities.checkingAccount import CheckingAccount
+from domain.entities.savingsAccount import SavingsAccount
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.account_aggregates import AccountAggregate, transaction_type_name
+from infrastructure.repository.pagination import decode_cursor, encode_cursor, to_epoch
+from infrastructure.repository.period_rollups import (
+    ACCOUNT_SCOPE,
+    CLASS_SCOPE,
+    DAY,
+    MONTH,
+    PERIOD_STARTS,
+    PeriodRollups,
+    PeriodTotals,
+    period_span,
+    rollup_scope,
+    split_range,
+    to_day
+)
+
+ACCOUNT_CLASSES = {cls.__name__: cls for cls in (Account, CheckingAccount, SavingsAccount)}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id      TEXT PRIMARY KEY,
+    account_class   TEXT NOT NULL,
+    balance         REAL NOT NULL,
+    state           BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    seq             INTEGER PRIMARY KEY,
+    transaction_id  NOT NULL,
+    account_id      TEXT NOT NULL,
+    transaction_type TEXT NOT NULL,
+    amount          REAL NOT NULL,
+    description     TEXT,
+    timestamp       REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_transactions_id ON transactions (transaction_id);
+CREATE INDEX IF NOT EXISTS ix_transactions_account_time ON transactions (account_id, timestamp);
+CREATE TABLE IF NOT EXISTS account_aggregates (
+    account_id          TEXT PRIMARY KEY,
+    total_deposits      REAL NOT NULL,
+    total_withdrawals   REAL NOT NULL,
+    transaction_count   INTEGER NOT NULL,
+    first_timestamp     REAL,
+    last_timestamp      REAL,
+    min_amount          REAL,
+    max_amount          REAL
+);
+CREATE TABLE IF NOT EXISTS period_rollups (
+    scope               TEXT NOT NULL,
+    scope_key           TEXT NOT NULL,
+    granularity         TEXT NOT NULL,
+    period              INTEGER NOT NULL,
+    deposits            REAL NOT NULL,
+    withdrawals         REAL NOT NULL,
+    deposit_count       INTEGER NOT NULL,
+    withdrawal_count    INTEGER NOT NULL,
+    PRIMARY KEY (scope, scope_key, granularity, period)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS balance_checkpoints (
+    account_id          TEXT NOT NULL,
+    timestamp           REAL NOT NULL,
+    net                 REAL NOT NULL,
+    PRIMARY KEY (account_id, timestamp)
+) WITHOUT ROWID;
+"""
+
+INSERT_ACCOUNT = "INSERT INTO accounts (account_id, account_class, balance, state) VALUES (?, ?, ?, ?)"
+SELECT_ACCOUNT = "SELECT account_class, balance, state FROM accounts WHERE account_id = ?"
+UPDATE_ACCOUNT = "UPDATE accounts SET balance = ?, state = ? WHERE account_id = ?"
+# Pages in creation (rowid) order; LIMIT -1 means no limit
+SELECT_ACCOUNTS_PAGE = "SELECT account_class, balance, state FROM accounts ORDER BY rowid LIMIT ? OFFSET ?"
+SELECT_ACCOUNTS_AFTER = (
+    "SELECT account_class, balance, state FROM accounts WHERE rowid > ? ORDER BY rowid LIMIT ? OFFSET ?"
+)
+SELECT_ACCOUNT_ROWID = "SELECT rowid FROM accounts WHERE account_id = ?"
+
+TRANSACTION_COLUMNS = "transaction_id, account_id, transaction_type, amount, description, timestamp"
+INSERT_TRANSACTION = f"INSERT INTO transactions ({TRANSACTION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)"
+SELECT_TRANSACTION = f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE transaction_id = ?"
+SELECT_HISTORY = f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE account_id = ? ORDER BY timestamp, seq"
+SELECT_PAGE = (
+    f"SELECT {TRANSACTION_COLUMNS} FROM transactions "
+    "WHERE account_id = ? AND timestamp >= ? AND timestamp < ? "
+    "ORDER BY timestamp, seq LIMIT -1 OFFSET ?"
+)
+UPSERT_AGGREGATE = """
+INSERT INTO account_aggregates VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT (account_id) DO UPDATE SET
+    total_deposits = total_deposits + excluded.total_deposits,
+    total_withdrawals = total_withdrawals + excluded.total_withdrawals,
+    transaction_count = transaction_count + 1,
+    first_timestamp = MIN(first_timestamp, excluded.first_timestamp),
+    last_timestamp = MAX(last_timestamp, excluded.last_timestamp),
+    min_amount = MIN(min_amount, excluded.min_amount),
+    max_amount = MAX(max_amount, excluded.max_amount)
+"""
+AGGREGATE_COLUMNS = (
+    "total_deposits, total_withdrawals, transaction_count, "
+    "first_timestamp, last_timestamp, min_amount, max_amount"
+)
+SELECT_AGGREGATE = f"SELECT {AGGREGATE_COLUMNS} FROM account_aggregates WHERE account_id = ?"
+ROLLUP_CONFLICT = """
+ON CONFLICT (scope, scope_key, granularity, period) DO UPDATE SET
+    deposits = deposits + excluded.deposits,
+    withdrawals = withdrawals + excluded.withdrawals,
+    deposit_count = deposit_count + excluded.deposit_count,
+    withdrawal_count = withdrawal_count + excluded.withdrawal_count
+"""
+INSERT_ROLLUP = "INSERT INTO period_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+UPSERT_ROLLUP = INSERT_ROLLUP + ROLLUP_CONFLICT
+# The class bucket takes the account's class from the accounts table (no row if the account is unknown)
+UPSERT_CLASS_ROLLUP = (
+    f"INSERT INTO period_rollups SELECT '{CLASS_SCOPE}', account_class, ?, ?, ?, ?, ?, ? "
+    "FROM accounts WHERE account_id = ?" + ROLLUP_CONFLICT
+)
+ROLLUP_WHERE = "WHERE scope = ? AND scope_key = ? AND granularity = ? AND period >= ? AND period < ?"
+SUM_ROLLUPS = (
+    "SELECT TOTAL(deposits), TOTAL(withdrawals), TOTAL(deposit_count), TOTAL(withdrawal_count) "
+    f"FROM period_rollups {ROLLUP_WHERE}"
+)
+SELECT_ROLLUPS = (
+    "SELECT period, deposits, withdrawals, deposit_count, withdrawal_count "
+    f"FROM period_rollups {ROLLUP_WHERE} ORDER BY period"
+)
+SELECT_POSTINGS = """
+SELECT t.account_id, a.account_class, t.transaction_type, t.amount, t.timestamp
+FROM transactions t LEFT JOIN accounts a ON a.account_id = t.account_id
+"""
+# A checkpoint holds the net of every posting at or before its timestamp.
+# A posting at or before an existing checkpoint makes it stale; a new one
+# is taken when an account's posting count crosses a multiple of the
+# interval, unless the batch's last posting is not the account's latest.
+DELETE_CHECKPOINTS = "DELETE FROM balance_checkpoints WHERE account_id = ? AND timestamp >= ?"
+INSERT_CHECKPOINT = """
+INSERT INTO balance_checkpoints
+SELECT account_id, last_timestamp, total_deposits - total_withdrawals FROM account_aggregates
+WHERE account_id = ? AND (transaction_count - ?) / ? < transaction_count / ? AND last_timestamp <= ?
+"""
+SELECT_CHECKPOINT = (
+    "SELECT timestamp, net FROM balance_checkpoints WHERE account_id = ? AND timestamp <= ? "
+    "ORDER BY timestamp DESC LIMIT 1"
+)
+SUM_POSTINGS = """
+SELECT TOTAL(CASE WHEN transaction_type = 'DEPOSIT' THEN amount ELSE -amount END) FROM transactions
+WHERE account_id = ? AND timestamp > ? AND timestamp <= ?
+"""
+# Stand-ins for unbounded period keys
+_LOWEST_PERIOD = -(1 << 62)
+_HIGHEST_PERIOD = 1 << 62
+
+RECOMPUTE_AGGREGATES = """
+SELECT account_id,
+       TOTAL(CASE WHEN transaction_type = 'DEPOSIT' THEN amount END),
+       TOTAL(CASE WHEN transaction_type = 'WITHDRAW' THEN amount END),
+       COUNT(*), MIN(timestamp), MAX(timestamp), MIN(amount), MAX(amount)
+FROM transactions
+"""
+
+
+class SQLiteDatabase:
+    """
+    Connection pool and unit-of-work scope over one SQLite database file.
+    """
+
+    def __init__(self, path: str = None, pool_size: int = None, cached_statements: int = None):
+        """
+        Open the database and create the schema if needed.
+
+        Args:
+            path: Database file (defaults to config.SQLITE_PATH)
+            pool_size: Maximum open connections (defaults to config.SQLITE_POOL_SIZE)
+            cached_statements: Prepared statements cached per connection
+                (defaults to config.SQLITE_CACHED_STATEMENTS)
+        """
+        self.path = path or config.SQLITE_PATH
+        if self.path == ":memory:":
+            raise ValueError("SQLite repositories need a database file; every connection would see its own :memory:")
+        self.pool_size = pool_size or config.SQLITE_POOL_SIZE
+        self.cached_statements = cached_statements or config.SQLITE_CACHED_STATEMENTS
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._open_lock = threading.Lock()
+        self._local = threading.local()
+
+        with self.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: statements autocommit unless inside unit_of_work()
+        connection = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        connection.execute("PRAGMA busy_timeout=5000")
+        return connection
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._open_lock:
+            if self._opened < self.pool_size:
+                self._opened += 1
+                return self._connect()
+        # Pool exhausted: wait for a connection to be returned
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection: the thread's unit-of-work one if open, else a pooled one.
+        """
+        bound = getattr(self._local, "connection", None)
+        if bound is not None:
+            yield bound
+            return
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Run the enclosed repository calls as one database transaction.
+
+        Nested scopes join the outermost one. The write lock is taken up
+        front (BEGIN IMMEDIATE), so a read-modify-write inside the scope
+        cannot interleave with another writer.
+        """
+        if getattr(self._local, "connection", None) is not None:
+            yield
+            return
+        connection = self._acquire()
+        self._local.connection = connection
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        finally:
+            self._local.connection = None
+            self._idle.put(connection)
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _account_state(account) -> bytes:
+    state = dict(account.__dict__)
+    state.pop("balance", None)
+    return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _account_from_row(account_class: str, balance: float, state: bytes):
+    account = object.__new__(ACCOUNT_CLASSES[account_class])
+    account.__dict__.update(pickle.loads(state))
+    account.balance = balance
+    return account
+
+
+def _transaction_row(transaction) -> tuple:
+    return (
+        transaction.transaction_id,
+        transaction.account_id,
+        transaction_type_name(transaction),
+        transaction.amount,
+        transaction.description,
+        transaction.timestamp.timestamp()
+    )
+
+
+def _transaction_from_row(row) -> Transaction:
+    transaction_id, account_id, type_name, amount, description, timestamp = row
+    return Transaction(
+        transaction_id=transaction_id,
+        account_id=account_id,
+        transaction_type=TransactionType(type_name),
+        amount=amount,
+        description=description,
+        timestamp=datetime.fromtimestamp(timestamp)
+    )
+
+
+def _aggregate_row(transaction) -> tuple:
+    amount = transaction.amount
+    deposit = transaction_type_name(transaction) == "DEPOSIT"
+    epoch = transaction.timestamp.timestamp()
+    return (
+        transaction.account_id,
+        amount if deposit else 0.0,
+        0.0 if deposit else amount,
+        epoch, epoch, amount, amount
+    )
+
+
+def _period_bounds(granularity: str, low, high) -> tuple:
+    return (
+        granularity,
+        _LOWEST_PERIOD if low is None else low,
+        _HIGHEST_PERIOD if high is None else high
+    )
+
+
+def _aggregate_from_row(row) -> AccountAggregate:
+    aggregate = AccountAggregate()
+    (aggregate.total_deposits, aggregate.total_withdrawals, aggregate.transaction_count,
+     first, last, aggregate.min_amount, aggregate.max_amount) = row
+    aggregate.first_timestamp = datetime.fromtimestamp(first) if first is not None else None
+    aggregate.last_timestamp = datetime.fromtimestamp(last) if last is not None else None
+    return aggregate
+
+
+class _AccountTable(Mapping):
+    """Read-only mapping view of the accounts table (what callers of .accounts expect)."""
+
+    def __init__(self, database: SQLiteDatabase):
+        self._database = database
+
+    def __getitem__(self, account_id):
+        with self._database.connection() as connection:
+            row = connection.execute(SELECT_ACCOUNT, (account_id,)).fetchone()
+        if row is None:
+            raise KeyError(account_id)
+        return _account_from_row(*row)
+
+    def __iter__(self):
+        with self._database.connection() as connection:
+            ids = [row[0] for row in connection.execute("SELECT account_id FROM accounts ORDER BY rowid")]
+        return iter(ids)
+
+    def __len__(self):
+        with self._database.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+
+    def __contains__(self, account_id):
+        with self._database.connection() as connection:
+            return connection.execute(
+                "SELECT 1 FROM accounts WHERE account_id = ?", (account_id,)
+            ).fetchone() is not None
+
+    def values(self):
+        with self._database.connection() as connection:
+            rows = connection.execute("SELECT account_class, balance, state FROM accounts ORDER BY rowid").fetchall()
+        return [_account_from_row(*row) for row in rows]
+
+    def items(self):
+        return [(account.account_id, account) for account in self.values()]
+
+
+class SQLiteAccountRepository:
+    """
+    AccountRepository backed by the accounts table.
+    """
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+        self.accounts = _AccountTable(database)
+
+    def unit_of_work(self):
+        """See SQLiteDatabase.unit_of_work."""
+        return self.database.unit_of_work()
+
+    def create_account(self, account: Account):
+        try:
+            with self.database.connection() as connection:
+                connection.execute(INSERT_ACCOUNT, (
+                    account.account_id, type(account).__name__, account.balance, _account_state(account)
+                ))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Duplicate account ID: {account.account_id}")
+        return account.account_id
+
+    def create_accounts(self, accounts: list) -> list:
+        """
+        Insert many accounts in one database transaction with executemany.
+
+        Raises:
+            ValueError: If an ID is already taken or repeated
+        """
+        rows = [
+            (account.account_id, type(account).__name__, account.balance, _account_state(account))
+            for account in accounts
+        ]
+        try:
+            with self.database.unit_of_work(), self.database.connection() as connection:
+                connection.executemany(INSERT_ACCOUNT, rows)
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Duplicate account ID in batch: {e}")
+        return [account.account_id for account in accounts]
+
+    def get_account_by_id(self, account_id) -> Optional[Account]:
+        with self.database.connection() as connection:
+            row = connection.execute(SELECT_ACCOUNT, (account_id,)).fetchone()
+        return _account_from_row(*row) if row is not None else None
+
+    def update_account(self, account: Account) -> None:
+        with self.database.connection() as connection:
+            connection.execute(UPDATE_ACCOUNT, (account.balance, _account_state(account), account.account_id))
+
+    def get_accounts_page(self, offset: int = 0, limit: int = None, after=None) -> list:
+        """
+        Get accounts in creation order, reading only the requested rows.
+
+        Given after, the page is found by a keyset seek on rowid, so walking
+        every account costs O(N) overall; offsets alone are skipped by
+        SQLite without decoding the skipped rows.
+
+        Args:
+            offset: Accounts to skip (after the after account, if given)
+            limit: Maximum accounts returned (all if None)
+            after: ID of the last account of the previous page
+
+        Returns:
+            list: The accounts
+
+        Raises:
+            ValueError: If the after account doesn't exist
+        """
+        limit = -1 if limit is None else limit
+        with self.database.connection() as connection:
+            if after is None:
+                rows = connection.execute(SELECT_ACCOUNTS_PAGE, (limit, offset)).fetchall()
+            else:
+                row = connection.execute(SELECT_ACCOUNT_ROWID, (after,)).fetchone()
+                if row is None:
+                    raise ValueError(f"Account not found: {after}")
+                rows = connection.execute(SELECT_ACCOUNTS_AFTER, (row[0], limit, offset)).fetchall()
+        return [_account_from_row(*row) for row in rows]
+
+    def get_next_account_id(self) -> int:
+        with self.database.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM accounts").fetchone()[0] + 1
+
+
+class SQLiteTransactionRepository:
+    """
+    TransactionRepository backed by the transactions table.
+
+    Running per-account totals live in account_aggregates, and balance
+    checkpoints in balance_checkpoints; both are updated by the same
+    statement batch that inserts the transaction.
+    """
+
+    def __init__(self, database: SQLiteDatabase, checkpoint_interval: int = None):
+        self.database = database
+        self.checkpoint_interval = (
+            config.BALANCE_CHECKPOINT_INTERVAL if checkpoint_interval is None else checkpoint_interval
+        )
+        self._id_lock = threading.Lock()
+        with database.connection() as connection:
+            highest = connection.execute(
+                "SELECT MAX(transaction_id) FROM transactions WHERE typeof(transaction_id) = 'integer'"
+            ).fetchone()[0]
+        self.next_transaction_id = (highest or 0) + 1
+
+    def unit_of_work(self):
+        """See SQLiteDatabase.unit_of_work."""
+        return self.database.unit_of_work()
+
+    def _assign_ids(self, transactions) -> None:
+        with self._id_lock:
+            for transaction in transactions:
+                if transaction.transaction_id is None:
+                    transaction.transaction_id = self.next_transaction_id
+                    self.next_transaction_id += 1
+
+    def save_transaction(self, transaction: Transaction):
+        self._assign_ids((transaction,))
+        try:
+            with self.database.unit_of_work(), self.database.connection() as connection:
+                connection.execute(INSERT_TRANSACTION, _transaction_row(transaction))
+                connection.execute(UPSERT_AGGREGATE, _aggregate_row(transaction))
+                self._roll_up(connection, (transaction,))
+                self._checkpoint(connection, (transaction,))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Duplicate transaction ID: {transaction.transaction_id}")
+        return transaction.transaction_id
+
+    def save_transactions(self, transactions: list) -> list:
+        """
+        Save many transactions in one database transaction with executemany.
+
+        Args:
+            transactions: Transactions to insert, in order
+
+        Returns:
+            list: IDs of the saved transactions
+
+        Raises:
+            ValueError: If an ID is already taken or repeated in the batch
+        """
+        self._assign_ids(transactions)
+        try:
+            with self.database.unit_of_work(), self.database.connection() as connection:
+                connection.executemany(INSERT_TRANSACTION, [_transaction_row(t) for t in transactions])
+                connection.executemany(UPSERT_AGGREGATE, [_aggregate_row(t) for t in transactions])
+                self._roll_up(connection, transactions)
+                self._checkpoint(connection, transactions)
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Duplicate transaction ID in batch: {e}")
+        return [t.transaction_id for t in transactions]
+
+    def get_transaction_by_id(self, transaction_id) -> Optional[Transaction]:
+        with self.database.connection() as connection:
+            row = connection.execute(SELECT_TRANSACTION, (transaction_id,)).fetchone()
+        return _transaction_from_row(row) if row is not None else None
+
+    def get_transactions_for_account(self, account_id) -> List[Transaction]:
+        with self.database.connection() as connection:
+            rows = connection.execute(SELECT_HISTORY, (account_id,)).fetchall()
+        return [_transaction_from_row(row) for row in rows]
+
+    def get_next_transaction_id(self) -> int:
+        return self.next_transaction_id
+
+    def get_transactions_page(self, account_id, limit: int, cursor: str = None,
+                              since=None, until=None, transaction_type=None) -> Tuple[list, Optional[str]]:
+        """
+        Get one page of an account's history in timestamp order.
+
+        Uses the (account_id, timestamp) index and the same cursor format
+        as the in-memory repository: the last row's timestamp plus how many
+        rows sharing it were already passed.
+
+        Returns:
+            Tuple[list, Optional[str]]: Transactions and the next page's cursor
+        """
+        lower = to_epoch(since)
+        lower = float("-inf") if lower is None else lower
+        upper = to_epoch(until)
+        upper = float("inf") if upper is None else upper
+        offset = 0
+        if cursor is not None:
+            after, skip = decode_cursor(cursor)
+            if after >= lower:
+                lower, offset = after, skip
+        wanted = getattr(transaction_type, "value", transaction_type)
+
+        page = []
+        last_timestamp, last_skip = None, 0
+        run_timestamp, run = lower, offset
+        with self.database.connection() as connection:
+            rows = connection.execute(SELECT_PAGE, (account_id, lower, upper, offset))
+            for row in rows:
+                timestamp = row[5]
+                if timestamp == run_timestamp:
+                    run += 1
+                else:
+                    run_timestamp, run = timestamp, 1
+                if len(page) == limit:
+                    # A further row exists, so there is a next page
+                    return page, encode_cursor(last_timestamp, last_skip) if page else None
+                if wanted is None or row[2] == wanted:
+                    page.append(_transaction_from_row(row))
+                    last_timestamp, last_skip = timestamp, run
+        return page, None
+
+    def get_account_aggregate(self, account_id) -> AccountAggregate:
+        with self.database.connection() as connection:
+            row = connection.execute(SELECT_AGGREGATE, (account_id,)).fetchone()
+        return _aggregate_from_row(row) if row is not None else AccountAggregate()
+
+    def _roll_up(self, connection, transactions) -> None:
+        """Add transactions to their account and account-class period buckets."""
+        account_rows = []
+        class_rows = []
+        for transaction in transactions:
+            amount = transaction.amount
+            deposit = transaction_type_name(transaction) == "DEPOSIT"
+            totals = (amount, 0.0, 1, 0) if deposit else (0.0, amount, 0, 1)
+            timestamp = transaction.timestamp
+            for granularity, period in ((DAY, timestamp.toordinal()),
+                                        (MONTH, timestamp.year * 12 + timestamp.month - 1)):
+                account_rows.append((ACCOUNT_SCOPE, transaction.account_id, granularity, period) + totals)
+                class_rows.append((granularity, period) + totals + (transaction.account_id,))
+        connection.executemany(UPSERT_ROLLUP, account_rows)
+        connection.executemany(UPSERT_CLASS_ROLLUP, class_rows)
+
+    def _checkpoint(self, connection, transactions) -> None:
+        """Drop the checkpoints the transactions made stale and take new ones where due."""
+        spans = {}
+        for transaction in transactions:
+            epoch = transaction.timestamp.timestamp()
+            span = spans.get(transaction.account_id)
+            if span is None:
+                spans[transaction.account_id] = [epoch, epoch, 1]
+            else:
+                span[0] = min(span[0], epoch)
+                span[1] = max(span[1], epoch)
+                span[2] += 1
+        interval = self.checkpoint_interval
+        connection.executemany(DELETE_CHECKPOINTS, [(account_id, span[0]) for account_id, span in spans.items()])
+        connection.executemany(INSERT_CHECKPOINT, [
+            (account_id, count, interval, interval, latest) for account_id, (_, latest, count) in spans.items()
+        ])
+
+    def get_net_change_as_of(self, account_id, at) -> float:
+        """
+        Net of an account's postings at or before a time, from the nearest checkpoint.
+
+        See TransactionRepository.get_net_change_as_of.
+        """
+        epoch = to_epoch(at)
+        with self.database.connection() as connection:
+            return self._net_change_as_of(connection, account_id, epoch)
+
+    def get_net_changes_as_of(self, account_ids, at) -> dict:
+        """get_net_change_as_of for many accounts at the same cut-off, on one connection."""
+        epoch = to_epoch(at)
+        with self.database.connection() as connection:
+            return {
+                account_id: self._net_change_as_of(connection, account_id, epoch)
+                for account_id in account_ids
+            }
+
+    @staticmethod
+    def _net_change_as_of(connection, account_id, epoch: float) -> float:
+        row = connection.execute(SELECT_CHECKPOINT, (account_id, epoch)).fetchone()
+        after, net = row if row is not None else (float("-inf"), 0.0)
+        return net + connection.execute(SUM_POSTINGS, (account_id, after, epoch)).fetchone()[0]
+
+    def get_period_totals(self, account_id=None, account_class=None, start=None, end=None) -> PeriodTotals:
+        """
+        Deposit/withdrawal totals over a date range, combined from rollup buckets.
+
+        See TransactionRepository.get_period_totals.
+        """
+        scope = rollup_scope(account_id, account_class)
+        months, days = split_range(to_day(start), to_day(end))
+        ranges = [(DAY, low, high) for low, high in days]
+        if months is not None:
+            ranges.append((MONTH,) + months)
+        result = PeriodTotals()
+        with self.database.connection() as connection:
+            for granularity, low, high in ranges:
+                row = connection.execute(SUM_ROLLUPS, scope + _period_bounds(granularity, low, high)).fetchone()
+                result.merge(PeriodTotals(row[0], row[1], int(row[2]), int(row[3])))
+        return result
+
+    def get_period_rollups(self, granularity: str, account_id=None, account_class=None,
+                           start=None, end=None) -> list:
+        """
+        Per-day or per-month totals for the periods starting in [start, end).
+
+        See TransactionRepository.get_period_rollups.
+        """
+        scope = rollup_scope(account_id, account_class)
+        low, high = period_span(granularity, to_day(start), to_day(end))
+        period_start = PERIOD_STARTS[granularity]
+        with self.database.connection() as connection:
+            rows = connection.execute(SELECT_ROLLUPS, scope + _period_bounds(granularity, low, high)).fetchall()
+        return [(period_start(row[0]), PeriodTotals(*row[1:])) for row in rows]
+
+    def rebuild_rollups(self) -> None:
+        """Recompute the rollup table from the transactions table, in one database transaction."""
+        rollups = PeriodRollups()
+        with self.database.unit_of_work(), self.database.connection() as connection:
+            for account_id, account_class, type_name, amount, timestamp in connection.execute(SELECT_POSTINGS):
+                rollups.add_posting(
+                    account_id, account_class, datetime.fromtimestamp(timestamp), amount, type_name == "DEPOSIT"
+                )
+            connection.execute("DELETE FROM period_rollups")
+            connection.executemany(INSERT_ROLLUP, rollups.rows())
+
+    def verify_aggregates(self, account_id=None) -> dict:
+        """
+        Recompute totals from the transactions table and report drift.
+
+        Returns:
+            dict: Account ID -> drifted fields, only for accounts that drifted
+        """
+        query = RECOMPUTE_AGGREGATES
+        parameters = ()
+        if account_id is not None:
+            query += " WHERE account_id = ?"
+            parameters = (account_id,)
+        query += " GROUP BY account_id"
+        with self.database.connection() as connection:
+            rows = connection.execute(query, parameters).fetchall()
+
+        recomputed = {row[0]: _aggregate_from_row(row[1:]) for row in rows}
+        report = {}
+        for checked_id, expected in recomputed.items():
+            drift = self.get_account_aggregate(checked_id).drift_from(expected)
+            if drift:
+                report[checked_id] = drift
+        return report
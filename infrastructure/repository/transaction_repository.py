@@ -0,0 +1,629 @@
+# transaction_repository.py
+
+import copy
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from contextlib import nullcontext
+from domain.entities.transactions  import Transaction
+from infrastructure.repository.account_aggregates import AccountAggregate, is_deposit, transaction_type_name
+from infrastructure.repository.balance_checkpoints import BalanceCheckpoints
+from infrastructure.repository.cold_storage import ColdHistory, TieredHistory, TieredTimestamps
+from infrastructure.repository.pagination import decode_cursor, page_positions, to_epoch
+from infrastructure.repository.period_rollups import PeriodRollups, PeriodTotals, rollup_scope
+from infrastructure.repository.write_ahead_ledger import (
+    RECORD_ACCOUNT_OPENED,
+    RECORD_TRANSACTION,
+    encode_transaction
+)
+
+class TransactionRepository:
+    def __init__(self, ledger=None, account_class_of=None, cold_store=None, snapshots=None):
+        self.transactions = defaultdict(list)
+        self.next_transaction_id = 1
+        self._id_lock = threading.Lock()
+        # Optional WriteAheadLedger; when set, every transaction is durable
+        # before it becomes visible in self.transactions.
+        self.ledger = ledger
+        # Running totals per account, kept in step with self.transactions
+        self.aggregates = {}
+        # Sorted epoch timestamps per account, parallel to self.transactions
+        self.timestamps = defaultdict(list)
+        # Primary index: transaction ID -> transaction
+        self.by_id = {}
+        self._reserved_ids = set()
+        # Day/month totals per account and, given account_class_of, per account class
+        self.rollups = PeriodRollups(account_class_of)
+        # Net of each account's history every few entries, for balance-as-of queries
+        self.checkpoints = BalanceCheckpoints(self._net_change)
+        # Optional ColdStore; once spill() has run, self.transactions and
+        # self.timestamps hold only each account's hot tail and the older
+        # entries live in cold_histories (account_id -> ColdHistory)
+        self.cold_store = cold_store
+        self.cold_histories = {}
+        self._tier_lock = threading.Lock()
+        # Optional SnapshotStore next to the ledger; verify_aggregates starts
+        # from its newest snapshot once compaction has dropped old segments
+        self.snapshots = snapshots
+
+    def save_transaction(self, transaction: Transaction) -> int:
+        # IDs assigned by the caller (uuid4 from TransactionService) are kept
+        # as-is; only transactions without one get the next counter value.
+        with self._id_lock:
+            if transaction.transaction_id is None:
+                transaction.transaction_id = self.next_transaction_id
+                self.next_transaction_id += 1
+            transaction_id = transaction.transaction_id
+            if transaction_id in self.by_id or transaction_id in self._reserved_ids or self._is_cold(transaction_id):
+                raise ValueError(f"Duplicate transaction ID: {transaction_id}")
+            self._reserved_ids.add(transaction_id)
+        try:
+            if self.ledger is not None:
+                self.ledger.append(encode_transaction(transaction))
+            self._append(transaction)
+        finally:
+            with self._id_lock:
+                self._reserved_ids.discard(transaction_id)
+        return transaction_id
+
+    def save_transactions(self, transactions: list) -> list:
+        """
+        Save many transactions with one ledger commit.
+
+        Either every transaction is saved or, if the batch contains a
+        duplicate ID or the ledger write fails, none is.
+
+        Args:
+            transactions: Transactions to append, in order
+
+        Returns:
+            list: IDs of the saved transactions
+
+        Raises:
+            ValueError: If an ID is already taken or repeated in the batch
+        """
+        with self._id_lock:
+            batch_ids = set()
+            for transaction in transactions:
+                if transaction.transaction_id is None:
+                    transaction.transaction_id = self.next_transaction_id
+                    self.next_transaction_id += 1
+                transaction_id = transaction.transaction_id
+                if (transaction_id in self.by_id or transaction_id in self._reserved_ids
+                        or transaction_id in batch_ids or self._is_cold(transaction_id)):
+                    raise ValueError(f"Duplicate transaction ID: {transaction_id}")
+                batch_ids.add(transaction_id)
+            self._reserved_ids |= batch_ids
+        try:
+            if self.ledger is not None:
+                self.ledger.append_many([encode_transaction(t) for t in transactions])
+            for transaction in transactions:
+                self._append(transaction)
+        finally:
+            with self._id_lock:
+                self._reserved_ids -= batch_ids
+        return [t.transaction_id for t in transactions]
+
+    def stage_transaction(self, transaction: Transaction):
+        """
+        Make a transaction durable without publishing it yet.
+
+        The transaction is written to the ledger and its ID stays reserved,
+        but it is not in the history, indexes or aggregates until
+        publish_transactions is called. Hot-account deposits are staged by
+        the slot that takes them and published when the slots consolidate.
+
+        Args:
+            transaction: The transaction
+
+        Returns:
+            The transaction's ID
+
+        Raises:
+            ValueError: If the ID is already taken
+        """
+        with self._id_lock:
+            if transaction.transaction_id is None:
+                transaction.transaction_id = self.next_transaction_id
+                self.next_transaction_id += 1
+            transaction_id = transaction.transaction_id
+            if transaction_id in self.by_id or transaction_id in self._reserved_ids or self._is_cold(transaction_id):
+                raise ValueError(f"Duplicate transaction ID: {transaction_id}")
+            self._reserved_ids.add(transaction_id)
+        if self.ledger is not None:
+            try:
+                self.ledger.append(encode_transaction(transaction))
+            except BaseException:
+                with self._id_lock:
+                    self._reserved_ids.discard(transaction_id)
+                raise
+        return transaction_id
+
+    def publish_transactions(self, transactions: list) -> None:
+        """
+        Publish staged transactions into the history, indexes and aggregates.
+
+        Args:
+            transactions: Transactions previously passed to stage_transaction
+        """
+        try:
+            for transaction in transactions:
+                self._append(transaction)
+        finally:
+            with self._id_lock:
+                self._reserved_ids.difference_update(t.transaction_id for t in transactions)
+
+    def get_transaction_by_id(self, transaction_id):
+        """
+        Look up a transaction by its ID in O(1).
+
+        Spilled transactions are found through the cold tier's ID index,
+        which costs a binary search and one block read.
+
+        Args:
+            transaction_id: ID of the transaction
+
+        Returns:
+            Transaction or None: The transaction if found
+        """
+        transaction = self.by_id.get(transaction_id)
+        if transaction is None and self.cold_store is not None:
+            transaction = self.cold_store.find(transaction_id)
+        return transaction
+
+    def get_transactions_for_account(self, account_id: int) -> list:
+        return self._history(account_id)
+
+    def get_next_transaction_id(self) -> int:
+        return self.next_transaction_id
+
+    def get_transactions_page(self, account_id, limit: int, cursor: str = None,
+                              since=None, until=None, transaction_type=None):
+        """
+        Get one page of an account's history in timestamp order.
+
+        Args:
+            account_id: ID of the account
+            limit: Maximum number of transactions to return
+            cursor: Cursor returned with the previous page
+            since: Inclusive lower time bound
+            until: Exclusive upper time bound
+            transaction_type: Only return this type ('DEPOSIT'/'WITHDRAW')
+
+        Returns:
+            Tuple[list, Optional[str]]: Transactions and the next page's cursor
+        """
+        row_filter = None
+        if transaction_type is not None:
+            wanted = getattr(transaction_type, "value", transaction_type)
+            row_filter = lambda transaction: transaction_type_name(transaction) == wanted
+        cold, history, timestamps = self._tiers(account_id)
+        if cold is not None and _reaches_cold(cold, since, cursor):
+            history = TieredHistory(self.cold_store, cold, history)
+            timestamps = TieredTimestamps(cold, timestamps)
+        return page_positions(timestamps, history, limit, cursor, since, until, row_filter)
+
+    def get_account_aggregate(self, account_id) -> AccountAggregate:
+        """
+        Get the running totals for an account in O(1).
+
+        Args:
+            account_id: ID of the account
+
+        Returns:
+            AccountAggregate: Totals (all zero for an account without transactions)
+        """
+        return self.aggregates.get(account_id) or AccountAggregate()
+
+    def get_period_totals(self, account_id=None, account_class=None, start=None, end=None) -> PeriodTotals:
+        """
+        Deposit/withdrawal totals over a date range, combined from rollup buckets.
+
+        Args:
+            account_id: Account to report on
+            account_class: Or an account class name (e.g. 'SavingsAccount')
+            start: First day, inclusive (unbounded if None)
+            end: Last day, exclusive (unbounded if None)
+
+        Returns:
+            PeriodTotals: The totals
+
+        Raises:
+            ValueError: Unless exactly one scope is given, or for a bound that is not a whole day
+        """
+        return self.rollups.totals(rollup_scope(account_id, account_class), start, end)
+
+    def get_period_rollups(self, granularity: str, account_id=None, account_class=None,
+                           start=None, end=None) -> list:
+        """
+        Per-day or per-month totals for the periods starting in [start, end).
+
+        Returns:
+            list: (period start date, PeriodTotals) for every non-empty period, in order
+        """
+        return self.rollups.periods(rollup_scope(account_id, account_class), granularity, start, end)
+
+    def rebuild_rollups(self) -> None:
+        """Recompute the rollups from the stored history (which mirrors the ledger)."""
+        self.rollups.clear()
+        for account_id in set(self.transactions) | set(self.cold_histories):
+            for transaction in list(self._history(account_id)):
+                self.rollups.add(transaction)
+
+    def get_net_change_as_of(self, account_id, at) -> float:
+        """
+        Net of an account's postings (deposits minus withdrawals) at or before a time.
+
+        Bisects the account's timestamp index, starts from the nearest
+        balance checkpoint and replays only the postings after it.
+
+        Args:
+            account_id: ID of the account
+            at: Cut-off time (datetime or epoch seconds)
+
+        Returns:
+            float: The net change
+
+        """
+        timestamps = self._timestamps(account_id)
+        position = bisect_right(timestamps, to_epoch(at)) if timestamps else 0
+        return self.checkpoints.net_before(account_id, position)
+
+    def get_net_changes_as_of(self, account_ids, at) -> dict:
+        """
+        get_net_change_as_of for many accounts at the same cut-off.
+
+        Returns:
+            dict: Account ID -> net change
+        """
+        return {account_id: self.get_net_change_as_of(account_id, at) for account_id in account_ids}
+
+    def capture_account(self, account_id) -> dict:
+        """
+        Capture an account's derived state and history for a snapshot.
+
+        The running totals, rollup buckets and balance checkpoints are
+        copied as they are, so a restore does not recompute them. Of the
+        history only the hot tail is copied: the cold part is an immutable
+        ColdHistory pointing into the cold store's segments, which a
+        durable store keeps on disk.
+
+        The caller holds the account's stripe lock, so everything matches
+        the ledger up to the LSN read under the same lock.
+
+        Args:
+            account_id: ID of the account
+
+        Returns:
+            dict: aggregate, rollups, checkpoints, cold (ColdHistory or None) and hot (transactions)
+        """
+        cold, history, _ = self._tiers(account_id)
+        aggregate = self.aggregates.get(account_id)
+        return {
+            "aggregate": copy.copy(aggregate) if aggregate is not None else None,
+            "rollups": self.rollups.capture(account_id),
+            "checkpoints": self.checkpoints.capture(account_id),
+            "cold": cold,
+            "hot": list(history)
+        }
+
+    def restore_accounts(self, captured: dict, cold_state: dict = None, next_transaction_id: int = 1,
+                         checkpoint_interval: int = None) -> None:
+        """
+        Load accounts captured by capture_account.
+
+        Cold histories are attached to the cold store's segments again and
+        stay cold; only the hot tails are indexed. Transactions listed as
+        "pending" (hot-account deposits not yet published when captured)
+        are appended as new postings.
+
+        Args:
+            captured: account_id -> captured state
+            cold_state: The cold store's export_state at capture time
+            next_transaction_id: Counter for transactions saved without an ID
+            checkpoint_interval: Interval the checkpoints were captured with;
+                on a mismatch they are dropped and rebuilt on demand
+
+        Raises:
+            ValueError: If the snapshot has cold history but no durable cold store is configured
+        """
+        if cold_state is not None and cold_state["segments"]:
+            if self.cold_store is None or not self.cold_store.durable:
+                raise ValueError("The snapshot refers to cold segments, but no durable cold store is configured")
+        if self.cold_store is not None and self.cold_store.durable:
+            self.cold_store.attach(cold_state)
+        keep_checkpoints = checkpoint_interval == self.checkpoints.interval
+        for account_id, state in captured.items():
+            if state["cold"] is not None:
+                self.cold_histories[account_id] = state["cold"]
+            hot = state["hot"]
+            if hot:
+                self.transactions[account_id] = hot
+                self.timestamps[account_id] = [transaction.timestamp.timestamp() for transaction in hot]
+                for transaction in hot:
+                    self.by_id[transaction.transaction_id] = transaction
+            if state["aggregate"] is not None:
+                self.aggregates[account_id] = state["aggregate"]
+            self.rollups.restore(account_id, state["rollups"])
+            if keep_checkpoints:
+                self.checkpoints.restore(account_id, state["checkpoints"])
+            for transaction in state.get("pending", ()):
+                self._append(transaction)
+        self.next_transaction_id = max(self.next_transaction_id, next_transaction_id)
+
+    def _net_change(self, account_id, start: int, stop: int) -> float:
+        """Sum of the signed amounts at history positions [start, stop)."""
+        return sum(
+            transaction.amount if is_deposit(transaction) else -transaction.amount
+            for transaction in self._history(account_id)[start:stop]
+        )
+
+    def verify_aggregates(self, account_id=None) -> dict:
+        """
+        Check the running totals against the durable ledger and report drift.
+
+        The expected totals are rebuilt without looking at the in-memory
+        history: from the totals in the newest snapshot (when a snapshot
+        store is attached) plus every ledger transaction past each account's
+        snapshot watermark, so drift in the history and the running totals
+        alike shows up. Staged hot-account deposits are left out until they
+        are published. Without a ledger there is nothing durable to compare
+        with, and the totals are recomputed from the in-memory history.
+
+        This is a full scan and is meant for audits and tests, not the
+        request path. Postings made while it runs can show up as drift, so
+        callers hold the checked account's stripe lock (or stop writers).
+
+        Args:
+            account_id: Account to check (all accounts if omitted)
+
+        Returns:
+            dict: Account ID -> drifted fields, only for accounts that drifted
+
+        Raises:
+            ValueError: If the ledger was compacted past the newest snapshot
+        """
+        if self.ledger is None:
+            expected = None
+        else:
+            expected = self._ledger_aggregates(account_id)
+        account_ids = (
+            [account_id] if account_id is not None
+            else set(self.transactions) | set(self.cold_histories) | set(self.aggregates) | set(expected or ())
+        )
+        report = {}
+        for checked_id in account_ids:
+            if expected is None:
+                recomputed = AccountAggregate.from_transactions(self._history(checked_id))
+            else:
+                recomputed = expected.get(checked_id) or AccountAggregate()
+            drift = self.get_account_aggregate(checked_id).drift_from(recomputed)
+            if drift:
+                report[checked_id] = drift
+        return report
+
+    def _ledger_aggregates(self, account_id=None) -> dict:
+        """Totals per account from the newest snapshot and the ledger after it."""
+        state = self.snapshots.load_latest() if self.snapshots is not None else None
+        expected = defaultdict(AccountAggregate)
+        from_lsn = 1
+        watermarks = {}
+        if state is not None:
+            from_lsn = state["lsn"] + 1
+            watermarks = state["watermarks"]
+            captured = state["account_state"]
+            if account_id is not None:
+                captured = {account_id: captured[account_id]} if account_id in captured else {}
+            for checked_id, account_state in captured.items():
+                if account_state["aggregate"] is not None:
+                    expected[checked_id] = copy.copy(account_state["aggregate"])
+                for transaction in account_state.get("pending", ()):
+                    if transaction.transaction_id not in self._reserved_ids:
+                        expected[checked_id].add(transaction)
+
+        segments = self.ledger.segments()
+        if segments and segments[0][0] > from_lsn:
+            raise ValueError(
+                f"Ledger records from LSN {from_lsn} to {segments[0][0] - 1} were compacted "
+                "and no snapshot covers them"
+            )
+        for lsn, kind, record in self.ledger.replay(from_lsn):
+            if kind != RECORD_TRANSACTION or (account_id is not None and record.account_id != account_id):
+                continue
+            if lsn <= watermarks.get(record.account_id, 0) or record.transaction_id in self._reserved_ids:
+                continue
+            expected[record.account_id].add(record)
+        return expected
+
+    def _append(self, transaction) -> None:
+        """Add a transaction to the history, indexes and aggregates."""
+        epoch = transaction.timestamp.timestamp()
+        cold_length = 0
+        if self.cold_store is not None:
+            cold = self.cold_histories.get(transaction.account_id)
+            if cold is not None and epoch <= cold.last_timestamp:
+                cold = self._thaw(transaction.account_id, epoch)
+            cold_length = len(cold) if cold is not None else 0
+        history = self.transactions[transaction.account_id]
+        timestamps = self.timestamps[transaction.account_id]
+        if not timestamps or epoch >= timestamps[-1]:
+            position = len(history)
+            history.append(transaction)
+            timestamps.append(epoch)
+        else:
+            # Late arrival (e.g. clock step): keep both lists sorted
+            position = bisect_right(timestamps, epoch)
+            history.insert(position, transaction)
+            timestamps.insert(position, epoch)
+        self.by_id[transaction.transaction_id] = transaction
+        self._aggregate_for(transaction.account_id).add(transaction)
+        self.rollups.add(transaction)
+        self.checkpoints.appended(transaction.account_id, cold_length + position, cold_length + len(history))
+
+    def _aggregate_for(self, account_id) -> AccountAggregate:
+        aggregate = self.aggregates.get(account_id)
+        if aggregate is None:
+            aggregate = self.aggregates[account_id] = AccountAggregate()
+        return aggregate
+
+    def spill(self, older_than, lock_manager=None) -> int:
+        """
+        Move history entries older than a cut-off into the cold store.
+
+        Each account's old prefix is written to one new segment without
+        holding any lock; the account is then switched over under its
+        stripe lock, unless a late arrival changed the prefix meanwhile (it
+        is then left hot until the next spill). Entries with equal
+        timestamps always end up in the same tier. The ID index is then
+        copied with every stripe held, so writers pause for one dict copy.
+
+        Args:
+            older_than: Cut-off time (datetime or epoch seconds)
+            lock_manager: Lock manager the services write under
+
+        Returns:
+            int: Number of transactions moved
+
+        Raises:
+            ValueError: If no cold store is configured
+        """
+        if self.cold_store is None:
+            raise ValueError("Cold storage is not configured")
+        cutoff = to_epoch(older_than)
+        runs = []
+        for account_id in list(self.transactions):
+            timestamps = self.timestamps.get(account_id)
+            if timestamps and timestamps[0] < cutoff:
+                count = bisect_left(timestamps, cutoff)
+                runs.append((account_id, self.transactions[account_id][:count]))
+        placements = self.cold_store.write(runs)
+
+        moved = 0
+        for account_id, run in runs:
+            with lock_manager.lock_for(account_id) if lock_manager is not None else nullcontext():
+                history = self.transactions.get(account_id, [])
+                count = len(run)
+                if len(history) < count or any(kept is not spilled for kept, spilled in zip(history, run)):
+                    continue
+                timestamps = self.timestamps[account_id]
+                cold = self.cold_histories.get(account_id) or ColdHistory()
+                starts, blocks = placements[account_id]
+                with self._tier_lock:
+                    self.cold_histories[account_id] = cold.extended(timestamps[:count], starts, blocks)
+                    self.transactions[account_id] = history[count:]
+                    self.timestamps[account_id] = timestamps[count:]
+            for transaction in run:
+                self.by_id.pop(transaction.transaction_id, None)
+            moved += count
+        if moved:
+            # A dict keeps its table size after deletions; copy it so the
+            # memory of the spilled entries is actually released
+            with lock_manager.locked_all() if lock_manager is not None else nullcontext():
+                self.by_id = dict(self.by_id)
+        return moved
+
+    def _thaw(self, account_id, epoch: float):
+        """
+        Bring an account's cold entries at or after a time back into memory.
+
+        Called for a late arrival that belongs inside the cold part of the
+        history; whole blocks are thawed, so the tiers stay time-ordered.
+
+        Returns:
+            Optional[ColdHistory]: What remains cold, or None
+        """
+        cold = self.cold_histories[account_id]
+        block = cold.block_of(bisect_left(cold.timestamps, epoch))
+        remaining = cold.truncated(block)
+        thawed = self.cold_store.read_range(cold, len(remaining), len(cold))
+        with self._tier_lock:
+            if len(remaining):
+                self.cold_histories[account_id] = remaining
+            else:
+                del self.cold_histories[account_id]
+            self.transactions[account_id] = thawed + self.transactions.get(account_id, [])
+            self.timestamps[account_id] = list(cold.timestamps[len(remaining):]) + self.timestamps.get(account_id, [])
+        for transaction in thawed:
+            self.by_id[transaction.transaction_id] = transaction
+        return remaining if len(remaining) else None
+
+    def _tiers(self, account_id):
+        """An account's cold history (or None), hot history and hot timestamps, read consistently."""
+        if self.cold_store is None:
+            return None, self.transactions.get(account_id, []), self.timestamps.get(account_id, [])
+        with self._tier_lock:
+            return (
+                self.cold_histories.get(account_id),
+                self.transactions.get(account_id, []),
+                self.timestamps.get(account_id, [])
+            )
+
+    def _history(self, account_id):
+        """An account's full history across both tiers."""
+        cold, history, _ = self._tiers(account_id)
+        return history if cold is None else TieredHistory(self.cold_store, cold, history)
+
+    def _timestamps(self, account_id):
+        """The timestamps matching _history."""
+        cold, _, timestamps = self._tiers(account_id)
+        return timestamps if cold is None else TieredTimestamps(cold, timestamps)
+
+    def _is_cold(self, transaction_id) -> bool:
+        return self.cold_store is not None and transaction_id in self.cold_store
+
+    def replay(self, account_repository=None, from_lsn: int = 1, watermarks: dict = None) -> int:
+        """
+        Rebuild in-memory state by streaming over the ledger.
+
+        Account openings restore the account entities and every posting is
+        applied to the owning account's balance directly: the business rules
+        were already enforced when the posting was first made. A posting
+        dated before its account's opening (imported history) moves the
+        opening back, as the bulk import did when it was posted.
+
+        Args:
+            account_repository: Repository whose accounts and balances to rebuild
+            from_lsn: First ledger record to apply
+            watermarks: Per-account LSN already reflected in the restored
+                account and history (from a snapshot); those records are skipped
+
+        Returns:
+            int: Number of records replayed
+        """
+        accounts = account_repository.accounts if account_repository is not None else {}
+        watermarks = watermarks or {}
+        highest_id = self.next_transaction_id - 1
+        count = 0
+
+        for lsn, kind, record in self.ledger.replay(from_lsn):
+            count += 1
+            if lsn <= watermarks.get(record.account_id, 0):
+                continue
+            if kind == RECORD_ACCOUNT_OPENED:
+                accounts[record.account_id] = record
+                continue
+
+            self._append(record)
+            if isinstance(record.transaction_id, int) and record.transaction_id > highest_id:
+                highest_id = record.transaction_id
+
+            account = accounts.get(record.account_id)
+            if account is not None:
+                if record.transaction_type.value == "DEPOSIT":
+                    account.balance += record.amount
+                else:
+                    account.balance -= record.amount
+                if account.creation_date is not None and record.timestamp < account.creation_date:
+                    account.creation_date = record.timestamp
+
+        self.next_transaction_id = highest_id + 1
+        return count
+
+
+def _reaches_cold(cold: ColdHistory, since, cursor) -> bool:
+    """Whether a page starting at since / cursor may include cold entries."""
+    lower = to_epoch(since)
+    if cursor is not None:
+        after = decode_cursor(cursor)[0]
+        lower = after if lower is None else max(lower, after)
+    return lower is None or lower <= cold.last_timestamp
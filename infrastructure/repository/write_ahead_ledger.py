@@ -0,0 +1,440 @@
+"""
+Write-Ahead Ledger in the Infrastructure Layer.
+This gives the in-memory repositories a durable, append-only backing log.
+
+On-disk layout: a directory of segment files named after the log sequence
+number (LSN) of their first record, e.g. ``00000000000000000001.wal``.
+Each record is framed as::
+
+    <uint32 payload length><uint32 crc32(payload)><payload>
+
+Concurrent writers share fsyncs through group commit: the first writer to
+find un-synced records becomes the leader, writes and fsyncs everything that
+has been queued so far, and wakes every follower whose record was included.
+"""
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, List, Tuple
+
+import config
+from domain.entities.transaction import Transaction, TransactionType
+
+FRAME_HEADER = struct.Struct("<II")
+SEGMENT_SUFFIX = ".wal"
+
+# Record kinds
+RECORD_TRANSACTION = 1
+RECORD_ACCOUNT_OPENED = 2
+
+# Transaction record layout: kind, type code, flags, amount, epoch timestamp
+_TRANSACTION_HEAD = struct.Struct("<BBBdd")
+_STR16 = struct.Struct("<H")
+_STR32 = struct.Struct("<I")
+_INT64 = struct.Struct("<q")
+
+_FLAG_INT_ID = 1
+_FLAG_DESCRIPTION = 2
+
+_TYPE_CODES = {"DEPOSIT": 1, "WITHDRAW": 2}
+_TYPES_BY_CODE = {1: TransactionType.DEPOSIT, 2: TransactionType.WITHDRAW}
+
+
+class LedgerCorruptionError(Exception):
+    """Raised when a sealed ledger segment fails its checksum."""
+    pass
+
+
+def encode_transaction(transaction) -> bytes:
+    """
+    Encode a transaction as a ledger payload.
+
+    Works with both transaction entities; the type may be a TransactionType
+    or the legacy string constant.
+
+    Args:
+        transaction: Transaction to encode
+
+    Returns:
+        bytes: The encoded payload
+    """
+    transaction_type = getattr(transaction.transaction_type, "value", transaction.transaction_type)
+    description = getattr(transaction, "description", None)
+    transaction_id = transaction.transaction_id
+    account_id = str(transaction.account_id).encode("utf-8")
+
+    flags = 0
+    if isinstance(transaction_id, int):
+        flags |= _FLAG_INT_ID
+        id_bytes = _INT64.pack(transaction_id)
+    else:
+        raw_id = str(transaction_id).encode("utf-8")
+        id_bytes = _STR16.pack(len(raw_id)) + raw_id
+
+    parts = [
+        _TRANSACTION_HEAD.pack(
+            RECORD_TRANSACTION,
+            _TYPE_CODES[transaction_type],
+            flags | (_FLAG_DESCRIPTION if description is not None else 0),
+            transaction.amount,
+            transaction.timestamp.timestamp()
+        ),
+        id_bytes,
+        _STR16.pack(len(account_id)),
+        account_id
+    ]
+    if description is not None:
+        raw_description = description.encode("utf-8")
+        parts.append(_STR32.pack(len(raw_description)))
+        parts.append(raw_description)
+    return b"".join(parts)
+
+
+def encode_account_opened(account) -> bytes:
+    """
+    Encode an account opening as a ledger payload.
+
+    Account openings are rare compared to postings, so the full entity
+    (including subclass fields such as overdraft_limit) is pickled.
+
+    Args:
+        account: Account that was created
+
+    Returns:
+        bytes: The encoded payload
+    """
+    return bytes((RECORD_ACCOUNT_OPENED,)) + pickle.dumps(account, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode_record(payload) -> Tuple[int, object]:
+    """
+    Decode a ledger payload.
+
+    Args:
+        payload: Bytes of one record
+
+    Returns:
+        Tuple[int, object]: Record kind and the decoded Transaction or account
+    """
+    kind = payload[0]
+    if kind == RECORD_ACCOUNT_OPENED:
+        return kind, pickle.loads(payload[1:])
+
+    _, type_code, flags, amount, timestamp = _TRANSACTION_HEAD.unpack_from(payload, 0)
+    offset = _TRANSACTION_HEAD.size
+    if flags & _FLAG_INT_ID:
+        transaction_id = _INT64.unpack_from(payload, offset)[0]
+        offset += _INT64.size
+    else:
+        length = _STR16.unpack_from(payload, offset)[0]
+        offset += _STR16.size
+        transaction_id = payload[offset:offset + length].decode("utf-8")
+        offset += length
+    length = _STR16.unpack_from(payload, offset)[0]
+    offset += _STR16.size
+    account_id = payload[offset:offset + length].decode("utf-8")
+    offset += length
+    description = None
+    if flags & _FLAG_DESCRIPTION:
+        length = _STR32.unpack_from(payload, offset)[0]
+        offset += _STR32.size
+        description = payload[offset:offset + length].decode("utf-8")
+
+    return kind, Transaction(
+        transaction_id=transaction_id,
+        account_id=account_id,
+        transaction_type=_TYPES_BY_CODE[type_code],
+        amount=amount,
+        description=description,
+        timestamp=datetime.fromtimestamp(timestamp)
+    )
+
+
+class WriteAheadLedger:
+    """
+    Append-only, segmented, checksummed log with group commit.
+    """
+
+    def __init__(self, directory: str = None, segment_max_bytes: int = None, fsync: bool = None):
+        """
+        Open (or create) a ledger directory.
+
+        A torn record at the end of the newest segment, left by a crash in
+        the middle of a write, is truncated away.
+
+        Args:
+            directory: Directory holding the segment files (defaults to config.LEDGER_DIR)
+            segment_max_bytes: Size at which a new segment is started
+            fsync: Whether commits are fsynced (disable only for tests/benchmarks)
+
+        Raises:
+            ValueError: If no directory is given or configured
+        """
+        self.directory = directory or config.LEDGER_DIR
+        if not self.directory:
+            raise ValueError("Ledger directory is not configured")
+        self.segment_max_bytes = segment_max_bytes or config.LEDGER_SEGMENT_BYTES
+        self.fsync = config.LEDGER_FSYNC if fsync is None else fsync
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._committed = threading.Condition(self._lock)
+        self._pending: List[bytes] = []
+        self._flushing = False
+        self._failure = None
+        self.commit_count = 0
+
+        self._last_lsn = 0
+        segments = self.segments()
+        if segments:
+            base_lsn, path = segments[-1]
+            count, valid_bytes = self._scan_segment(path)
+            if valid_bytes < os.path.getsize(path):
+                with open(path, "r+b") as torn:
+                    torn.truncate(valid_bytes)
+            self._last_lsn = base_lsn + count - 1
+            self._segment_base = base_lsn
+        else:
+            self._segment_base = 1
+        self._durable_lsn = self._last_lsn
+
+        self._file = open(self._segment_path(self._segment_base), "ab")
+        self._segment_size = self._file.tell()
+
+    @property
+    def last_lsn(self) -> int:
+        """LSN of the newest record appended so far."""
+        return self._last_lsn
+
+    @property
+    def durable_lsn(self) -> int:
+        """LSN up to which every record has been committed."""
+        return self._durable_lsn
+
+    def segments(self) -> List[Tuple[int, str]]:
+        """
+        List the segment files in LSN order.
+
+        Returns:
+            List[Tuple[int, str]]: (base LSN, path) for every segment
+        """
+        found = []
+        for name in os.listdir(self.directory):
+            if name.endswith(SEGMENT_SUFFIX):
+                found.append((int(name[:-len(SEGMENT_SUFFIX)]), os.path.join(self.directory, name)))
+        found.sort()
+        return found
+
+    def append(self, payload: bytes) -> int:
+        """
+        Append one record and wait until it is durable.
+
+        Args:
+            payload: Encoded record
+
+        Returns:
+            int: LSN assigned to the record
+        """
+        return self.append_many((payload,))
+
+    def append_many(self, payloads: Iterable[bytes]) -> int:
+        """
+        Append several records and wait until all of them are durable.
+
+        Records from one call are contiguous in the log.
+
+        Args:
+            payloads: Encoded records
+
+        Returns:
+            int: LSN of the last record (the current LSN if nothing was given)
+        """
+        frames = [FRAME_HEADER.pack(len(p), zlib.crc32(p)) + p for p in payloads]
+
+        with self._lock:
+            if self._failure is not None:
+                raise IOError("Ledger is unavailable after a failed write") from self._failure
+            self._pending.extend(frames)
+            self._last_lsn += len(frames)
+            target = self._last_lsn
+
+            while self._durable_lsn < target:
+                if self._failure is not None:
+                    raise IOError("Ledger is unavailable after a failed write") from self._failure
+                if self._flushing:
+                    # Someone else is the leader; our record rides along with
+                    # their fsync or the next one.
+                    self._committed.wait()
+                    continue
+                self._lead_commit()
+        return target
+
+    def _lead_commit(self) -> None:
+        """Write and fsync every queued frame (called with the lock held)."""
+        self._flushing = True
+        batch, self._pending = self._pending, []
+        batch_last = self._last_lsn
+        self._lock.release()
+        try:
+            self._write_batch(batch, batch_last - len(batch) + 1)
+        except BaseException as error:
+            self._lock.acquire()
+            self._failure = error
+            self._flushing = False
+            self._committed.notify_all()
+            raise
+        self._lock.acquire()
+        self._durable_lsn = batch_last
+        self.commit_count += 1
+        self._flushing = False
+        self._committed.notify_all()
+
+    def _write_batch(self, frames: List[bytes], first_lsn: int) -> None:
+        """Write frames to the active segment, rolling over as needed."""
+        chunk: List[bytes] = []
+        lsn = first_lsn
+        for frame in frames:
+            if self._segment_size and self._segment_size + len(frame) > self.segment_max_bytes:
+                self._file.write(b"".join(chunk))
+                chunk = []
+                self._roll_segment(lsn)
+            chunk.append(frame)
+            self._segment_size += len(frame)
+            lsn += 1
+        self._file.write(b"".join(chunk))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _roll_segment(self, base_lsn: int) -> None:
+        """Seal the active segment and start a new one at base_lsn."""
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._segment_base = base_lsn
+        self._file = open(self._segment_path(base_lsn), "ab")
+        self._segment_size = 0
+
+    def _segment_path(self, base_lsn: int) -> str:
+        return os.path.join(self.directory, f"{base_lsn:020d}{SEGMENT_SUFFIX}")
+
+    @staticmethod
+    def _scan_segment(path: str) -> Tuple[int, int]:
+        """Count the valid records in a segment and the bytes they span."""
+        count = 0
+        offset = 0
+        with open(path, "rb") as handle:
+            data = handle.read()
+        end = len(data)
+        while offset + FRAME_HEADER.size <= end:
+            length, checksum = FRAME_HEADER.unpack_from(data, offset)
+            stop = offset + FRAME_HEADER.size + length
+            if stop > end or zlib.crc32(data[offset + FRAME_HEADER.size:stop]) != checksum:
+                break
+            count += 1
+            offset = stop
+        return count, offset
+
+    def iter_payloads(self, from_lsn: int = 1, verify: bool = True) -> Iterator[Tuple[int, bytes]]:
+        """
+        Stream raw record payloads in LSN order.
+
+        Segments are memory-mapped and walked with struct.unpack_from, so no
+        per-record read calls are made. Only durable records are returned.
+
+        Args:
+            from_lsn: First LSN to return
+            verify: Whether to check each record's crc32
+
+        Yields:
+            Tuple[int, bytes]: LSN and payload of each record
+
+        Raises:
+            LedgerCorruptionError: If a record fails its checksum
+        """
+        stop_lsn = self._durable_lsn
+        segments = self.segments()
+        for index, (base_lsn, path) in enumerate(segments):
+            next_base = segments[index + 1][0] if index + 1 < len(segments) else stop_lsn + 1
+            if next_base <= from_lsn or base_lsn > stop_lsn:
+                continue
+            if os.path.getsize(path) == 0:
+                continue
+            with open(path, "rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield from self._iter_segment(mapped, base_lsn, from_lsn, stop_lsn, verify, path)
+            finally:
+                mapped.close()
+
+    @staticmethod
+    def _iter_segment(mapped, lsn, from_lsn, stop_lsn, verify, path):
+        unpack_header = FRAME_HEADER.unpack_from
+        header_size = FRAME_HEADER.size
+        crc32 = zlib.crc32
+        offset = 0
+        end = len(mapped)
+        while offset < end and lsn <= stop_lsn:
+            length, checksum = unpack_header(mapped, offset)
+            start = offset + header_size
+            offset = start + length
+            if lsn >= from_lsn:
+                payload = mapped[start:offset]
+                if verify and crc32(payload) != checksum:
+                    raise LedgerCorruptionError(f"Checksum mismatch at LSN {lsn} in {path}")
+                yield lsn, payload
+            lsn += 1
+
+    def replay(self, from_lsn: int = 1, verify: bool = True) -> Iterator[Tuple[int, int, object]]:
+        """
+        Stream decoded records in LSN order.
+
+        Args:
+            from_lsn: First LSN to return
+            verify: Whether to check each record's crc32
+
+        Yields:
+            Tuple[int, int, object]: LSN, record kind and decoded record
+        """
+        for lsn, payload in self.iter_payloads(from_lsn, verify):
+            kind, record = decode_record(payload)
+            yield lsn, kind, record
+
+    def drop_segments_through(self, lsn: int) -> int:
+        """
+        Delete sealed segments whose records all have an LSN <= lsn.
+
+        The active segment is never deleted.
+
+        Args:
+            lsn: Highest LSN that no longer needs to be kept
+
+        Returns:
+            int: Number of segment files removed
+        """
+        with self._lock:
+            active_base = self._segment_base
+        segments = self.segments()
+        removed = 0
+        for index, (base_lsn, path) in enumerate(segments):
+            if base_lsn >= active_base:
+                break
+            if segments[index + 1][0] - 1 > lsn:
+                break
+            os.remove(path)
+            removed += 1
+        return removed
+
+    def close(self) -> None:
+        """Flush and close the active segment."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+                self._file.close()
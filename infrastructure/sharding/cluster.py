@@ -0,0 +1,138 @@
+"""
+Local shard cluster: starts and stops the shard processes.
+
+    with ShardCluster(4) as cluster:
+        router = cluster.router()
+        ...
+
+Run standalone so several uvicorn workers can share one set of shards
+(SHARD_AUTHKEY must then be set, for the workers to present the same key):
+    SHARD_AUTHKEY=... python -m infrastructure.sharding.cluster
+"""
+import multiprocessing
+import os
+import secrets
+import stat
+import sys
+import time
+from multiprocessing.connection import Client
+from typing import List
+
+import config
+from infrastructure.sharding.shard_router import ShardRouter, shard_addresses
+from infrastructure.sharding.shard_server import SHUTDOWN, run_shard
+
+
+class ShardCluster:
+    """
+    Owns the shard processes on this machine.
+    """
+
+    def __init__(self, shard_count: int = None, socket_dir: str = None, authkey: bytes = None):
+        """
+        Initialize the cluster.
+
+        Args:
+            shard_count: Number of shard processes (defaults to config.SHARD_COUNT)
+            socket_dir: Directory for the Unix sockets (defaults to config.SHARD_SOCKET_DIR)
+            authkey: Shared key (defaults to config.SHARD_AUTHKEY, or a random
+                key for this cluster if that is unset; see router())
+        """
+        self.shard_count = config.SHARD_COUNT if shard_count is None else shard_count
+        if self.shard_count <= 0:
+            raise ValueError("Shard count must be positive")
+        self.socket_dir = socket_dir or config.SHARD_SOCKET_DIR
+        self.authkey = config.SHARD_AUTHKEY if authkey is None else authkey
+        if not self.authkey:
+            # Hex, so it can be handed to other processes in the environment
+            self.authkey = secrets.token_hex(32).encode()
+        self.addresses: List[str] = shard_addresses(self.shard_count, self.socket_dir)
+        self.processes: List[multiprocessing.Process] = []
+
+    def start(self, timeout: float = 30.0) -> "ShardCluster":
+        """
+        Spawn the shard processes and wait until each one accepts connections.
+
+        Raises:
+            RuntimeError: If the socket directory is not a private directory
+                of this user, or a shard does not come up within the timeout
+        """
+        _private_directory(self.socket_dir)
+        context = multiprocessing.get_context("spawn")
+        for index, address in enumerate(self.addresses):
+            process = context.Process(
+                target=run_shard, args=(index, address, self.authkey),
+                name=f"shard-{index}", daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+
+        deadline = time.monotonic() + timeout
+        for process, address in zip(self.processes, self.addresses):
+            while True:
+                try:
+                    Client(address, family="AF_UNIX", authkey=self.authkey).close()
+                    break
+                except (OSError, EOFError):
+                    if not process.is_alive() or time.monotonic() > deadline:
+                        self.stop()
+                        raise RuntimeError(f"Shard {process.name} failed to start")
+                    time.sleep(0.05)
+        return self
+
+    def router(self) -> ShardRouter:
+        """A new router for this cluster's shards."""
+        return ShardRouter(self.addresses, self.authkey)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Ask every shard to exit, then terminate any that do not."""
+        for address in self.addresses:
+            try:
+                with Client(address, family="AF_UNIX", authkey=self.authkey) as connection:
+                    connection.send((SHUTDOWN, (), {}))
+                    connection.recv()
+            except (OSError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.processes = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _private_directory(path: str) -> None:
+    """
+    Create a directory only this user can enter, or make an existing one so.
+
+    makedirs() applies its mode only to directories it creates, so an
+    existing one is checked and tightened here.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise RuntimeError(f"Shard socket directory {path} is not a directory")
+    if info.st_uid != os.getuid():
+        raise RuntimeError(f"Shard socket directory {path} belongs to another user")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(path, 0o700)
+
+
+if __name__ == "__main__":
+    if not config.SHARD_AUTHKEY:
+        sys.exit("Set SHARD_AUTHKEY: the API workers must present the same key to these shards")
+    cluster = ShardCluster().start()
+    print(f"{cluster.shard_count} shards listening in {cluster.socket_dir}. Press Ctrl+C to stop.")
+    try:
+        for process in cluster.processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cluster.stop()
@@ -0,0 +1,61 @@
+"""
+Consistent hash ring mapping account IDs to shards.
+
+Each shard owns many virtual points on a 64-bit ring; an account belongs to
+the first point at or after the hash of its ID. Growing from N to N+1
+shards moves only about 1/(N+1) of the accounts.
+"""
+import hashlib
+from bisect import bisect_left
+from typing import List
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing:
+    """
+    Deterministic account_id -> shard index mapping.
+
+    Every process builds the same ring from the same shard count, so
+    routers in different API workers agree on ownership without talking
+    to each other.
+    """
+
+    def __init__(self, shard_count: int, virtual_nodes: int = 128):
+        """
+        Build the ring.
+
+        Args:
+            shard_count: Number of shards
+            virtual_nodes: Points per shard (more points, more even spread)
+
+        Raises:
+            ValueError: If shard_count or virtual_nodes is not positive
+        """
+        if shard_count <= 0 or virtual_nodes <= 0:
+            raise ValueError("Shard count and virtual nodes must be positive")
+        self.shard_count = shard_count
+        points = sorted(
+            (_hash(f"shard-{shard}#{replica}"), shard)
+            for shard in range(shard_count)
+            for replica in range(virtual_nodes)
+        )
+        self._points: List[int] = [point for point, _ in points]
+        self._owners: List[int] = [shard for _, shard in points]
+
+    def shard_for(self, account_id) -> int:
+        """
+        Get the shard owning an account.
+
+        Args:
+            account_id: ID of the account
+
+        Returns:
+            int: Shard index in [0, shard_count)
+        """
+        position = bisect_left(self._points, _hash(str(account_id)))
+        if position == len(self._points):
+            position = 0
+        return self._owners[position]
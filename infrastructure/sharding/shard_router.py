@@ -0,0 +1,374 @@
+"""
+Shard router.
+
+Presents the BankingService interface but forwards every call to the shard
+process owning the account, chosen by the consistent hash ring. Calls that
+are not tied to one account (transaction lookup by ID, account listing,
+bank-wide totals) are scattered to every shard in parallel and the answers
+gathered into one result.
+"""
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import uuid4
+
+import config
+from domain.Exceptions import exception_error
+from infrastructure.metrics import REGISTRY, merge_families
+from infrastructure.sharding.hash_ring import ConsistentHashRing
+from infrastructure.sharding.shard_server import SHUTDOWN
+
+# Exceptions a shard may report, rebuilt under their own type on this side
+_REMOTE_ERRORS = {
+    name: value for name, value in vars(exception_error).items()
+    if isinstance(value, type) and issubclass(value, Exception)
+}
+_REMOTE_ERRORS.update(ValueError=ValueError, TypeError=ValueError, KeyError=ValueError)
+
+
+class ShardUnavailableError(Exception):
+    """Raised when a shard process cannot be reached."""
+    pass
+
+
+def shard_addresses(shard_count: int = None, socket_dir: str = None) -> List[str]:
+    """
+    Socket paths of the shards, in ring order.
+
+    Args:
+        shard_count: Number of shards (defaults to config.SHARD_COUNT)
+        socket_dir: Directory holding the sockets (defaults to config.SHARD_SOCKET_DIR)
+
+    Returns:
+        List[str]: One Unix socket path per shard
+    """
+    shard_count = config.SHARD_COUNT if shard_count is None else shard_count
+    socket_dir = socket_dir or config.SHARD_SOCKET_DIR
+    return [os.path.join(socket_dir, f"shard-{index}.sock") for index in range(shard_count)]
+
+
+class _ShardClient:
+    """Pool of connections to one shard; each connection serves one call at a time."""
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self._idle = queue.LifoQueue()
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = None
+        try:
+            if connection is None:
+                connection = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+            connection.send((method, args, kwargs))
+            response = connection.recv()
+        except (OSError, EOFError, AuthenticationError) as error:
+            # AuthenticationError: the shard was started with a different SHARD_AUTHKEY
+            if connection is not None:
+                connection.close()
+            raise ShardUnavailableError(f"Shard at {self.address} is unavailable: {error}")
+        self._idle.put(connection)
+
+        if response[0]:
+            return response[1]
+        _, error_name, message = response
+        raise _REMOTE_ERRORS.get(error_name, RuntimeError)(message)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class ShardRouter:
+    """
+    Drop-in for BankingService that fans calls out to shard processes.
+    """
+
+    def __init__(self, addresses: List[str] = None, authkey: bytes = None, virtual_nodes: int = None):
+        """
+        Initialize the router. Connections are opened lazily.
+
+        Args:
+            addresses: Shard socket paths in ring order (defaults from config)
+            authkey: Shared key (defaults to config.SHARD_AUTHKEY)
+            virtual_nodes: Ring points per shard (defaults to config.SHARD_VIRTUAL_NODES)
+
+        Raises:
+            ValueError: If no shared key is given or configured
+        """
+        addresses = addresses or shard_addresses()
+        authkey = config.SHARD_AUTHKEY if authkey is None else authkey
+        if not authkey:
+            raise ValueError("SHARD_AUTHKEY must be set: shards unpickle whatever an authenticated client sends")
+        virtual_nodes = config.SHARD_VIRTUAL_NODES if virtual_nodes is None else virtual_nodes
+        self.ring = ConsistentHashRing(len(addresses), virtual_nodes)
+        self.shards = [_ShardClient(address, authkey) for address in addresses]
+        self._scatter_pool = ThreadPoolExecutor(max_workers=len(addresses), thread_name_prefix="shard-scatter")
+
+    def shard_for(self, account_id) -> int:
+        """Index of the shard owning an account."""
+        return self.ring.shard_for(account_id)
+
+    def _route(self, account_id, method: str, *args, **kwargs):
+        return self.shards[self.ring.shard_for(account_id)].call(method, account_id, *args, **kwargs)
+
+    def _scatter(self, method: str, *args, **kwargs) -> List[Any]:
+        """Call every shard in parallel; returns results (or exceptions) in shard order."""
+        futures = [self._scatter_pool.submit(shard.call, method, *args, **kwargs) for shard in self.shards]
+        return [future.exception() or future.result() for future in futures]
+
+    @staticmethod
+    def _raise_unavailable(results) -> None:
+        for result in results:
+            if isinstance(result, ShardUnavailableError):
+                raise result
+
+    @classmethod
+    def _raise_errors(cls, results) -> None:
+        """Re-raise a scattered call's failure: an unreachable shard first, else the first shard error."""
+        cls._raise_unavailable(results)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    # Single-account calls: routed to the owning shard
+
+    def create_account(self, account_type: str, initial_deposit: float = 0.0,
+                       owner_name: Optional[str] = None, account_id: Optional[str] = None) -> Dict[str, Any]:
+        """Open an account on the shard its (pre-generated) ID hashes to."""
+        account_id = account_id or str(uuid4())
+        shard = self.shards[self.ring.shard_for(account_id)]
+        return shard.call("create_account", account_type, initial_deposit, owner_name, account_id)
+
+    def get_account(self, account_id: str) -> Dict[str, Any]:
+        return self._route(account_id, "get_account")
+
+    def get_balance(self, account_id: str) -> Dict[str, Any]:
+        return self._route(account_id, "get_balance")
+
+    def get_balance_as_of(self, account_id: str, at) -> Dict[str, Any]:
+        return self._route(account_id, "get_balance_as_of", at)
+
+    def get_account_summary(self, account_id: str) -> Dict[str, Any]:
+        return self._route(account_id, "get_account_summary")
+
+    def get_period_report(self, account_id: str = None, account_type: str = None, start=None, end=None,
+                          granularity: str = None) -> Dict[str, Any]:
+        """
+        Route an account's report to its shard; add up every shard's report for an account type.
+        """
+        if account_id is not None:
+            return self._route(account_id, "get_period_report", None, start, end, granularity)
+        results = self._scatter("get_period_report", None, account_type, start, end, granularity)
+        self._raise_errors(results)
+        report = results[0]
+        periods = {period["period"]: period for period in report.get("periods", [])}
+        for result in results[1:]:
+            _add_totals(report["totals"], result["totals"])
+            for period in result.get("periods", []):
+                if period["period"] in periods:
+                    _add_totals(periods[period["period"]], period)
+                else:
+                    periods[period["period"]] = period
+        if granularity is not None:
+            report["periods"] = [periods[key] for key in sorted(periods)]
+        return report
+
+    def deposit(self, account_id: str, amount: float, description: str = None,
+                idempotency_key: str = None) -> Dict[str, Any]:
+        return self._route(account_id, "deposit", amount, description, idempotency_key)
+
+    def withdraw(self, account_id: str, amount: float, description: str = None,
+                 idempotency_key: str = None) -> Dict[str, Any]:
+        return self._route(account_id, "withdraw", amount, description, idempotency_key)
+
+    def get_transaction_history_page(self, account_id: str, limit: int = None, cursor: str = None,
+                                     since=None, until=None, transaction_type=None) -> Dict[str, Any]:
+        return self._route(
+            account_id, "get_transaction_history_page", limit,
+            cursor=cursor, since=since, until=until, transaction_type=transaction_type
+        )
+
+    # Multi-account calls
+
+    def apply_batch(self, postings: Iterable[Dict[str, Any]], atomic: bool = True) -> Dict[str, Any]:
+        """
+        Split a batch by shard and apply the parts in parallel.
+
+        Atomicity is per shard, so an atomic batch must stay on one shard;
+        best-effort batches may span any number of shards.
+
+        Raises:
+            ValueError: If an atomic batch touches more than one shard
+        """
+        postings = list(postings)
+        errors = {}
+        parts = {}
+        for index, posting in enumerate(postings):
+            try:
+                shard = self.ring.shard_for(posting["account_id"])
+            except (KeyError, TypeError) as e:
+                errors[index] = f"Missing field: {e}"
+                continue
+            parts.setdefault(shard, []).append(index)
+
+        if atomic and (errors or len(parts) > 1):
+            if errors:
+                return {"committed": False, "applied": 0, "failed": len(errors),
+                        "results": [None] * len(postings), "errors": errors}
+            raise ValueError("Atomic batches must only touch accounts on one shard")
+
+        futures = {
+            shard: self._scatter_pool.submit(
+                self.shards[shard].call, "apply_batch", [postings[i] for i in indexes], atomic
+            )
+            for shard, indexes in parts.items()
+        }
+        results = [None] * len(postings)
+        committed = True
+        for shard, future in futures.items():
+            indexes = parts[shard]
+            outcome = future.result()
+            committed = committed and outcome["committed"]
+            for position, transaction_id in enumerate(outcome["results"]):
+                results[indexes[position]] = transaction_id
+            for position, message in outcome["errors"].items():
+                errors[indexes[position]] = message
+
+        applied = sum(result is not None for result in results)
+        return {"committed": committed, "applied": applied, "failed": len(errors),
+                "results": results, "errors": errors}
+
+    def get_transaction(self, transaction_id) -> Dict[str, Any]:
+        """
+        Find a transaction on whichever shard holds it.
+
+        Raises:
+            ValueError: If no shard has the transaction
+        """
+        results = self._scatter("get_transaction", transaction_id)
+        for result in results:
+            if isinstance(result, dict):
+                return result
+        self._raise_unavailable(results)
+        raise ValueError(f"Transaction not found: {transaction_id}")
+
+    def list_accounts(self, offset: int = 0, limit: int = None, after: str = None) -> List[Dict[str, Any]]:
+        """
+        List accounts shard by shard, each shard in creation order.
+
+        Shard sizes are fetched first so only the shards overlapping the
+        requested window are asked for accounts, and only for their part.
+        Given after, the page starts in the shard owning that account, right
+        behind it, and continues with the following shards.
+
+        Raises:
+            ValueError: If both offset and after are given, or the after account doesn't exist
+        """
+        if after is not None:
+            if offset:
+                raise ValueError("Page by offset or by after, not both")
+            first = self.ring.shard_for(after)
+            accounts = self.shards[first].call("list_accounts", 0, limit, after)
+            for shard in self.shards[first + 1:]:
+                wanted = None if limit is None else limit - len(accounts)
+                if wanted is not None and wanted <= 0:
+                    break
+                accounts.extend(shard.call("list_accounts", 0, wanted))
+            return accounts
+        counts = self._scatter("count_accounts")
+        self._raise_errors(counts)
+        accounts = []
+        for shard, count in zip(self.shards, counts):
+            wanted = None if limit is None else limit - len(accounts)
+            if wanted is not None and wanted <= 0:
+                break
+            if offset >= count:
+                offset -= count
+                continue
+            accounts.extend(shard.call("list_accounts", offset, wanted))
+            offset = 0
+        return accounts
+
+    def count_accounts(self) -> int:
+        """Number of accounts across every shard."""
+        counts = self._scatter("count_accounts")
+        self._raise_errors(counts)
+        return sum(counts)
+
+    def get_balances_as_of(self, at, account_ids: Iterable[str] = None) -> Dict[str, Any]:
+        """
+        Ask each shard for its accounts' balances at the cut-off and merge them.
+
+        Given account IDs, each shard is only asked about the accounts it owns.
+        """
+        if account_ids is None:
+            results = self._scatter("get_balances_as_of", at)
+        else:
+            account_ids = list(account_ids)
+            by_shard = {}
+            for account_id in account_ids:
+                by_shard.setdefault(self.ring.shard_for(account_id), []).append(account_id)
+            futures = [
+                self._scatter_pool.submit(self.shards[index].call, "get_balances_as_of", at, owned)
+                for index, owned in by_shard.items()
+            ]
+            results = [future.exception() or future.result() for future in futures]
+        self._raise_errors(results)
+        balances = {}
+        for result in results:
+            balances.update(result["balances"])
+        if account_ids is not None:
+            balances = {account_id: balances[account_id] for account_id in account_ids}
+        as_of = results[0]["as_of"] if results else getattr(at, "isoformat", lambda: at)()
+        return {"as_of": as_of, "balances": balances}
+
+    def get_bank_totals(self) -> Dict[str, Any]:
+        """Sum every shard's totals."""
+        results = self._scatter("get_bank_totals")
+        self._raise_errors(results)
+        totals = {"accounts": 0, "total_balance": 0.0, "accounts_by_type": {}}
+        for result in results:
+            totals["accounts"] += result["accounts"]
+            totals["total_balance"] += result["total_balance"]
+            for account_type, count in result["accounts_by_type"].items():
+                totals["accounts_by_type"][account_type] = totals["accounts_by_type"].get(account_type, 0) + count
+        return totals
+
+    def collect_metrics(self) -> Dict[str, Any]:
+        """
+        Merge every shard's metrics, labelled by shard, with this process's own.
+
+        Unreachable shards are left out rather than failing the scrape.
+        """
+        results = self._scatter("collect_metrics")
+        sources = [((), REGISTRY.collect())]
+        sources += [
+            ((("shard", str(index)),), result)
+            for index, result in enumerate(results) if isinstance(result, dict)
+        ]
+        return merge_families(sources)
+
+    def shutdown_shards(self) -> None:
+        """Ask every shard process to exit."""
+        self._scatter(SHUTDOWN)
+
+    def close(self) -> None:
+        """Close pooled connections and the scatter threads."""
+        for shard in self.shards:
+            shard.close()
+        self._scatter_pool.shutdown(wait=False)
+
+
+def _add_totals(totals: Dict[str, Any], other: Dict[str, Any]) -> None:
+    for name in ("deposits", "withdrawals", "net", "deposit_count", "withdrawal_count", "transaction_count"):
+        totals[name] += other[name]
@@ -0,0 +1,114 @@
+"""
+Shard server process.
+
+Each shard is a separate process owning the accounts the hash ring assigns
+to it, with its own repositories, lock manager and ledger directory or
+database file. It serves a BankingService over a Unix socket using
+multiprocessing.connection; each client connection gets a thread.
+
+Wire format (pickled by multiprocessing.connection):
+    request   (method_name, args, kwargs)
+    response  (True, result) or (False, exception_class_name, message)
+"""
+import os
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import config
+from application.banking_service import BankingService
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.repository.factory import build_idempotency_cache, build_repositories
+
+SHUTDOWN = "__shutdown__"
+
+# BankingService methods a router may call
+SHARD_METHODS = frozenset({
+    "create_account", "get_account", "get_balance", "get_balance_as_of", "get_balances_as_of",
+    "get_account_summary", "get_period_report",
+    "deposit", "withdraw", "apply_batch", "get_transaction",
+    "get_transaction_history_page", "list_accounts", "count_accounts", "get_bank_totals",
+    "collect_metrics",
+})
+
+
+class ShardServer:
+    """
+    Serves one shard's BankingService on a Unix socket.
+    """
+
+    def __init__(self, shard_index: int, address: str, authkey: bytes, banking: BankingService = None):
+        """
+        Initialize the server.
+
+        Args:
+            shard_index: Index of this shard on the hash ring
+            address: Unix socket path to listen on
+            authkey: Shared key clients must present
+            banking: Service to expose (built from config if None)
+        """
+        self.shard_index = shard_index
+        self.address = address
+        self.authkey = authkey
+        if banking is None:
+            ledger_dir = os.path.join(config.LEDGER_DIR, f"shard-{shard_index}") if config.LEDGER_DIR else None
+            root, extension = os.path.splitext(config.SQLITE_PATH)
+            sqlite_path = f"{root}-shard-{shard_index}{extension}"
+            lock_manager = StripedLockManager()
+            account_repository, transaction_repository = build_repositories(lock_manager, ledger_dir, sqlite_path)
+            idempotency = build_idempotency_cache(ledger_dir, sqlite_path)
+            banking = BankingService(account_repository, transaction_repository, lock_manager, idempotency)
+        self.banking = banking
+        self._stopping = threading.Event()
+
+    def serve_forever(self) -> None:
+        """Accept connections until a client sends the shutdown message."""
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        try:
+            while not self._stopping.is_set():
+                try:
+                    connection = listener.accept()
+                except (OSError, AuthenticationError):
+                    # Failed handshake (wrong key, client went away); keep serving
+                    continue
+                if self._stopping.is_set():
+                    connection.close()
+                    break
+                threading.Thread(
+                    target=self._serve_connection, args=(connection,),
+                    name=f"shard-{self.shard_index}-conn", daemon=True
+                ).start()
+        finally:
+            listener.close()
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+
+    def _serve_connection(self, connection) -> None:
+        with connection:
+            while True:
+                try:
+                    method, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+                if method == SHUTDOWN:
+                    self._stopping.set()
+                    connection.send((True, None))
+                    # Wake accept() in the main thread so it sees the flag
+                    Client(self.address, family="AF_UNIX", authkey=self.authkey).close()
+                    return
+                connection.send(self._dispatch(method, args, kwargs))
+
+    def _dispatch(self, method, args, kwargs):
+        if method not in SHARD_METHODS:
+            return False, "ValueError", f"Unknown shard method: {method}"
+        try:
+            return True, getattr(self.banking, method)(*args, **kwargs)
+        except Exception as error:
+            return False, type(error).__name__, str(error)
+
+
+def run_shard(shard_index: int, address: str, authkey: bytes) -> None:
+    """Process entry point: build the shard's state and serve it."""
+    ShardServer(shard_index, address, authkey).serve_forever()
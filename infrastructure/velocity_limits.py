@@ -0,0 +1,209 @@
+"""
+Withdrawal velocity limiter in the Infrastructure Layer.
+This enforces the per-class velocity_limits of config.ACCOUNT_CLASSES
+(withdrawal count, amount and overdraft uses per minute/hour/day) without
+looking at the ledger.
+
+Each tracked account has, per limited window, a ring of
+config.VELOCITY_BUCKETS buckets covering the window, plus running totals
+of the ring. Moving the ring forward clears the buckets that fell out of
+the window and takes them off the totals. That is at most one pass over a
+fixed-size ring, so a check or an update costs O(1) whatever the
+account's history. The window slides one bucket (window / buckets) at a
+time, so a posting stops counting between window - bucket and window
+after it was made.
+
+An account whose last withdrawal is older than its longest window has
+nothing left to count; it is dropped the next time the limiter is used.
+Past config.VELOCITY_MAX_ACCOUNTS, the least recently active account is
+dropped even if its windows are still open, which bounds memory at the
+cost of forgetting that account's recent withdrawals.
+
+Callers check and record under the account's lock (see TransactionService).
+"""
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Sequence, Tuple
+
+import config
+from domain.Exceptions.exception_error import VelocityLimitExceededError
+from domain.services.rule_registry import VelocityLimit
+
+# Withdrawals already approved in the same batch: (count, amount, overdrafts)
+NOTHING_PENDING = (0, 0.0, 0)
+
+
+class _Ring:
+    """Rolling totals of one account over one window."""
+
+    __slots__ = ("width", "head", "counts", "amounts", "overdrafts", "count", "amount", "overdraft_count")
+
+    def __init__(self, seconds: float, buckets: int, now: float):
+        self.width = seconds / buckets
+        # Absolute index (now // width) of the newest bucket
+        self.head = int(now // self.width)
+        self.counts = array("I", bytes(4 * buckets))
+        self.amounts = array("d", bytes(8 * buckets))
+        self.overdrafts = array("I", bytes(4 * buckets))
+        self.count = 0
+        self.amount = 0.0
+        self.overdraft_count = 0
+
+    def advance(self, now: float) -> int:
+        """Clear the buckets that left the window; returns the slot of the current bucket."""
+        bucket = int(now // self.width)
+        size = len(self.counts)
+        if bucket > self.head:
+            if bucket - self.head >= size:
+                self.counts = array("I", bytes(4 * size))
+                self.amounts = array("d", bytes(8 * size))
+                self.overdrafts = array("I", bytes(4 * size))
+                self.count = self.overdraft_count = 0
+                self.amount = 0.0
+            else:
+                for stale in range(self.head + 1, bucket + 1):
+                    slot = stale % size
+                    if self.counts[slot]:
+                        self.count -= self.counts[slot]
+                        self.amount -= self.amounts[slot]
+                        self.overdraft_count -= self.overdrafts[slot]
+                        self.counts[slot] = self.overdrafts[slot] = 0
+                        self.amounts[slot] = 0.0
+                if not self.count:
+                    # Drop the rounding error the subtractions left behind
+                    self.amount = 0.0
+            self.head = bucket
+        return bucket % size
+
+
+class _AccountState:
+    __slots__ = ("rings", "expires")
+
+    def __init__(self):
+        # Window seconds -> ring; a rule reload with new windows simply adds rings
+        self.rings: Dict[float, _Ring] = {}
+        self.expires = 0.0
+
+
+class VelocityLimiter:
+    """
+    Per-account sliding-window withdrawal counters with bounded memory.
+    """
+
+    def __init__(self, buckets: int = None, capacity: int = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize an empty limiter.
+
+        Args:
+            buckets: Ring buckets per window (defaults to config.VELOCITY_BUCKETS)
+            capacity: Accounts tracked at most (defaults to config.VELOCITY_MAX_ACCOUNTS)
+            clock: Time source in seconds
+
+        Raises:
+            ValueError: If buckets or capacity is not positive
+        """
+        self.buckets = config.VELOCITY_BUCKETS if buckets is None else buckets
+        self.capacity = config.VELOCITY_MAX_ACCOUNTS if capacity is None else capacity
+        if self.buckets <= 0 or self.capacity <= 0:
+            raise ValueError("Velocity buckets and capacity must be positive")
+        self._clock = clock
+        # account_id -> state, least recently active first
+        self._accounts: "OrderedDict[Hashable, _AccountState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def check(self, account_id: Hashable, limits: Sequence[VelocityLimit], amount: float,
+              overdraft: bool = False, pending: Tuple[int, float, int] = NOTHING_PENDING) -> None:
+        """
+        Check that one more withdrawal stays within an account's limits.
+
+        Nothing is recorded; call record() once the withdrawal has been made.
+
+        Args:
+            account_id: ID of the account
+            limits: The account class's velocity limits
+            amount: Amount of the withdrawal
+            overdraft: Whether it takes the balance below zero
+            pending: Withdrawals approved earlier in the same batch but not yet recorded
+
+        Raises:
+            VelocityLimitExceededError: If any window's limit would be exceeded
+        """
+        pending_count, pending_amount, pending_overdrafts = pending
+        now = self._clock()
+        with self._lock:
+            state = self._accounts.get(account_id)
+            for limit in limits:
+                ring = state.rings.get(limit.seconds) if state is not None else None
+                if ring is not None:
+                    ring.advance(now)
+                    count, total, overdrafts = ring.count, ring.amount, ring.overdraft_count
+                else:
+                    count, total, overdrafts = 0, 0.0, 0
+                if limit.count is not None and count + pending_count + 1 > limit.count:
+                    raise VelocityLimitExceededError(
+                        f"Velocity limit exceeded: at most {limit.count} withdrawals per {limit.window}"
+                    )
+                if limit.amount is not None and total + pending_amount + amount > limit.amount + 1e-9:
+                    raise VelocityLimitExceededError(
+                        f"Velocity limit exceeded: at most {limit.amount:.2f} withdrawn per {limit.window}"
+                    )
+                if overdraft and limit.overdrafts is not None and overdrafts + pending_overdrafts + 1 > limit.overdrafts:
+                    raise VelocityLimitExceededError(
+                        f"Velocity limit exceeded: at most {limit.overdrafts} overdraft withdrawals per {limit.window}"
+                    )
+
+    def record(self, account_id: Hashable, limits: Sequence[VelocityLimit], amount: float,
+               overdraft: bool = False) -> None:
+        """
+        Count a withdrawal that was made.
+
+        Args:
+            account_id: ID of the account
+            limits: The account class's velocity limits
+            amount: Amount withdrawn
+            overdraft: Whether it took the balance below zero
+        """
+        if not limits:
+            return
+        now = self._clock()
+        with self._lock:
+            state = self._accounts.get(account_id)
+            if state is None:
+                state = self._accounts[account_id] = _AccountState()
+            else:
+                self._accounts.move_to_end(account_id)
+            rings = state.rings
+            for limit in limits:
+                ring = rings.get(limit.seconds)
+                if ring is None:
+                    ring = rings[limit.seconds] = _Ring(limit.seconds, self.buckets, now)
+                slot = ring.advance(now)
+                ring.counts[slot] += 1
+                ring.amounts[slot] += amount
+                ring.count += 1
+                ring.amount += amount
+                if overdraft:
+                    ring.overdrafts[slot] += 1
+                    ring.overdraft_count += 1
+            expires = now + limits[-1].seconds
+            if expires > state.expires:
+                state.expires = expires
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop idle accounts from the front, and the idlest ones past capacity."""
+        accounts = self._accounts
+        while accounts:
+            account_id, state = next(iter(accounts.items()))
+            if state.expires > now and len(accounts) <= self.capacity:
+                return
+            del accounts[account_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._accounts.clear()
@@ -3,46 +3,44 @@ Main application file for the Banking Application.
 This serves as the entry point to run the API.
 """
 import uvicorn
+import os
 import random
 from typing import List, Dict, Any
 from datetime import datetime
 
 import config as config
-from domain.entities.checkingAccount import CheckingAccount
-from domain.entities.savingsAccount import SavingsAccount
-from api.api import app, account_service, transaction_service
 
-def create_demo_data():
+def create_demo_data(banking):
     """Create some demo accounts and transactions for testing."""
     # Create a checking account
-    checking_id = account_service.create_account(
-        CheckingAccount, 1000.0, "John Doe"
-    )
+    checking_id = banking.create_account(
+        "checking", 1000.0, "John Doe"
+    )["account_id"]
     
     # Create a savings account
-    savings_id = account_service.create_account(
-        SavingsAccount, 5000.0, "Jane Smith"
-    )
+    savings_id = banking.create_account(
+        "savings", 5000.0, "Jane Smith"
+    )["account_id"]
     
     # Add some transactions to the checking account
-    transaction_service.deposit(
+    banking.deposit(
         checking_id, 500.0, "Initial salary deposit"
     )
-    transaction_service.withdraw(
+    banking.withdraw(
         checking_id, 200.0, "ATM withdrawal"
     )
-    transaction_service.deposit(
+    banking.deposit(
         checking_id, 300.0, "Refund from online store"
     )
-    transaction_service.withdraw(
+    banking.withdraw(
         checking_id, 150.0, "Grocery shopping"
     )
     
     # Add some transactions to the savings account
-    transaction_service.deposit(
+    banking.deposit(
         savings_id, 1000.0, "Bonus payment"
     )
-    transaction_service.deposit(
+    banking.deposit(
         savings_id, 250.0, "Interest payment"
     )
     
@@ -80,9 +78,22 @@ def print_welcome_banner():
 if __name__ == "__main__":
     print_welcome_banner()
     
+    # Several API workers only agree on state when accounts live in shards
+    cluster = None
+    workers = config.API_WORKERS if config.SHARD_COUNT else 1
+    if config.SHARD_COUNT:
+        from infrastructure.sharding.cluster import ShardCluster
+        cluster = ShardCluster().start()
+        # The cluster's key (generated if SHARD_AUTHKEY is unset), for this
+        # process's router and the uvicorn workers it spawns
+        config.SHARD_AUTHKEY = cluster.authkey
+        os.environ["SHARD_AUTHKEY"] = cluster.authkey.decode()
+        print(f"Started {cluster.shard_count} account shards in {cluster.socket_dir}")
+    
     # Create demo data if running in debug mode
     if config.DEBUG:
-        demo_accounts = create_demo_data()
+        from api.api import banking
+        demo_accounts = create_demo_data(banking)
         
         # Print demo account IDs for easy testing
         print("\nDemo Accounts:")
@@ -91,9 +102,14 @@ if __name__ == "__main__":
         print("\nAPI is running. Press Ctrl+C to stop.")
     
     # Run the FastAPI application using uvicorn
-    uvicorn.run(
-        "api.api:app", 
-        host=config.API_HOST, 
-        port=config.API_PORT,
-        reload=config.DEBUG
-    )
\ No newline at end of file
+    try:
+        uvicorn.run(
+            "api.api:app", 
+            host=config.API_HOST, 
+            port=config.API_PORT,
+            reload=config.DEBUG and workers == 1,
+            workers=workers
+        )
+    finally:
+        if cluster is not None:
+            cluster.stop()
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Tests for listing accounts page by page.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from application.banking_service import BankingService
+from application.ledger_export import iter_account_ids
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.cached_account_repository import CachedAccountRepository
+from infrastructure.repository.sqlite_repository import (
+    SQLiteAccountRepository, SQLiteDatabase, SQLiteTransactionRepository, _AccountTable
+)
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+ACCOUNTS = 25
+
+
+class _PagingTests:
+    """Shared cases; subclasses build self.banking."""
+
+    def _create_accounts(self):
+        self.account_ids = [
+            self.banking.create_account("checking" if i % 2 else "savings", 100.0 + i)["account_id"]
+            for i in range(ACCOUNTS)
+        ]
+
+    def test_offset_pages_in_creation_order(self):
+        page = self.banking.list_accounts(5, 10)
+        self.assertEqual([account["account_id"] for account in page], self.account_ids[5:15])
+
+    def test_after_walks_every_account_once(self):
+        seen = []
+        after = None
+        while True:
+            page = self.banking.list_accounts(0, 7, after)
+            seen.extend(account["account_id"] for account in page)
+            if len(page) < 7:
+                break
+            after = page[-1]["account_id"]
+        self.assertEqual(seen, self.account_ids)
+
+    def test_export_walks_by_after(self):
+        self.assertEqual(list(iter_account_ids(self.banking, chunk_size=4)), self.account_ids)
+
+    def test_unknown_after_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.banking.list_accounts(0, 10, "no-such-account")
+
+    def test_offset_and_after_are_exclusive(self):
+        with self.assertRaises(ValueError):
+            self.banking.list_accounts(3, 10, self.account_ids[0])
+
+
+class MemoryPagingTest(_PagingTests, unittest.TestCase):
+
+    def setUp(self):
+        self.banking = BankingService(AccountRepository(), TransactionRepository())
+        self._create_accounts()
+
+
+class SQLitePagingTest(_PagingTests, unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="paging-test-")
+        self.database = SQLiteDatabase(os.path.join(self.directory, "bank.db"))
+        self.banking = BankingService(
+            CachedAccountRepository(SQLiteAccountRepository(self.database)),
+            SQLiteTransactionRepository(self.database)
+        )
+        self._create_accounts()
+        # A page must never load the whole table
+        patcher = mock.patch.object(_AccountTable, "values", side_effect=AssertionError("Loaded every account"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.database.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Tests for TransactionService.apply_batch.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import re
+import shutil
+import tempfile
+import unittest
+
+from application.transaction_service import TransactionService
+from domain.entities.checkingAccount import CheckingAccount
+from domain.entities.savingsAccount import SavingsAccount
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger
+
+UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+def _posting(account_id, type_name, amount, description=None):
+    return {"account_id": account_id, "type": type_name, "amount": amount, "description": description}
+
+
+class ApplyBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="batch-test-")
+        self.ledger = WriteAheadLedger(self.directory, fsync=False)
+        self.accounts = AccountRepository(self.ledger)
+        self.transactions = TransactionRepository(self.ledger)
+        self.service = TransactionService(self.accounts, self.transactions)
+        self.accounts.create_account(CheckingAccount("c1", 100.0, 50.0, owner_name="Owner"))
+        self.accounts.create_account(SavingsAccount("s1", 200.0, owner_name="Owner"))
+
+    def tearDown(self):
+        self.ledger.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _balance(self, account_id):
+        return self.accounts.get_account_by_id(account_id).balance
+
+    def _history(self, account_id):
+        return self.transactions.get_transactions_for_account(account_id)
+
+    def test_batch_is_applied_with_one_ledger_commit(self):
+        commits = self.ledger.commit_count
+        result = self.service.apply_batch([
+            _posting("c1", "deposit", 25.0, "pay"),
+            _posting("s1", "withdraw", 50.0),
+            _posting("c1", "withdraw", 10.0)
+        ])
+        self.assertTrue(result["committed"])
+        self.assertEqual((result["applied"], result["failed"]), (3, 0))
+        # Account updates are not logged; the postings share one commit
+        self.assertEqual(self.ledger.commit_count, commits + 1)
+        self.assertEqual(self._balance("c1"), 115.0)
+        self.assertEqual(self._balance("s1"), 150.0)
+        self.assertEqual([t.transaction_id for t in self._history("c1")], [result["results"][0], result["results"][2]])
+        self.assertEqual(self._history("c1")[0].description, "pay")
+
+    def test_ids_are_unique_and_uuid_shaped(self):
+        result = self.service.apply_batch([_posting("c1", "deposit", 1.0) for _ in range(20)])
+        ids = result["results"]
+        self.assertEqual(len(set(ids)), 20)
+        self.assertTrue(all(UUID.match(transaction_id) for transaction_id in ids))
+        other = self.service.apply_batch([_posting("c1", "deposit", 1.0)])["results"]
+        self.assertNotIn(other[0], ids)
+
+    def test_atomic_batch_with_a_failure_applies_nothing(self):
+        commits = self.ledger.commit_count
+        result = self.service.apply_batch([
+            _posting("c1", "deposit", 25.0),
+            _posting("s1", "withdraw", 500.0),
+            _posting("c1", "withdraw", 10.0)
+        ])
+        self.assertFalse(result["committed"])
+        self.assertEqual(list(result["errors"]), [1])
+        self.assertEqual(result["results"], [None, None, None])
+        self.assertEqual(self.ledger.commit_count, commits)
+        self.assertEqual((self._balance("c1"), self._balance("s1")), (100.0, 200.0))
+        self.assertEqual(self._history("c1"), [])
+
+    def test_invalid_postings_are_rejected_before_any_account_is_read(self):
+        result = self.service.apply_batch([
+            _posting("c1", "deposit", 25.0),
+            _posting("c1", "transfer", 5.0),
+            _posting("c1", "deposit", -1.0),
+            {"type": "deposit", "amount": 1.0}
+        ])
+        self.assertFalse(result["committed"])
+        self.assertEqual(sorted(result["errors"]), [1, 2, 3])
+        self.assertEqual(self._balance("c1"), 100.0)
+
+    def test_best_effort_skips_only_the_failing_postings(self):
+        result = self.service.apply_batch([
+            _posting("c1", "deposit", 25.0),
+            _posting("missing", "deposit", 5.0),
+            _posting("s1", "withdraw", 500.0),
+            _posting("s1", "deposit", 5.0)
+        ], atomic=False)
+        self.assertTrue(result["committed"])
+        self.assertEqual((result["applied"], result["failed"]), (2, 2))
+        self.assertIn("missing", result["errors"][1])
+        self.assertIsNone(result["results"][2])
+        self.assertEqual((self._balance("c1"), self._balance("s1")), (125.0, 205.0))
+
+    def test_rules_run_in_batch_order(self):
+        # The withdrawal only fits the overdraft after the deposit before it
+        ok = self.service.apply_batch([_posting("c1", "deposit", 50.0), _posting("c1", "withdraw", 200.0)])
+        self.assertTrue(ok["committed"])
+        self.assertEqual(self._balance("c1"), -50.0)
+        reversed_order = self.service.apply_batch([_posting("c1", "withdraw", 60.0), _posting("c1", "deposit", 500.0)])
+        self.assertFalse(reversed_order["committed"])
+        self.assertEqual(list(reversed_order["errors"]), [0])
+        self.assertEqual(self._balance("c1"), -50.0)
+
+    def test_batch_is_replayed_from_the_ledger(self):
+        result = self.service.apply_batch([
+            _posting("c1", "deposit", 25.0),
+            _posting("s1", "withdraw", 50.0),
+            _posting("c1", "withdraw", 10.0)
+        ])
+        self.ledger.close()
+
+        self.ledger = WriteAheadLedger(self.directory, fsync=False)
+        accounts = AccountRepository(self.ledger)
+        transactions = TransactionRepository(self.ledger)
+        transactions.replay(accounts)
+        self.assertEqual(accounts.get_account_by_id("c1").balance, 115.0)
+        self.assertEqual(accounts.get_account_by_id("s1").balance, 150.0)
+        for transaction_id in result["results"]:
+            self.assertIsNotNone(transactions.get_transaction_by_id(transaction_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
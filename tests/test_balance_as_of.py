@@ -0,0 +1,108 @@
+"""
+Tests for balance-as-of queries against a full-history recomputation.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import random
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import config
+from application.banking_service import BankingService
+from domain.entities.checkingAccount import CheckingAccount
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+OPENED = datetime(2024, 1, 1, 9)
+OPENING_BALANCE = 100.0
+
+
+class BalanceAsOfTest(unittest.TestCase):
+
+    def setUp(self):
+        # Small interval, so most cut-offs start from a checkpoint
+        with mock.patch.object(config, "BALANCE_CHECKPOINT_INTERVAL", 4):
+            self.transactions = TransactionRepository()
+        self.accounts = AccountRepository()
+        self.banking = BankingService(self.accounts, self.transactions)
+        self.postings = {}
+        self.random = random.Random(7)
+        for account_id in ("A", "B"):
+            self.accounts.create_account(
+                CheckingAccount(account_id, OPENING_BALANCE, 1000.0, creation_date=OPENED, owner_name="Owner")
+            )
+            self.postings[account_id] = []
+        for minute in range(1, 60):
+            self._post(self.random.choice("AB"), OPENED + timedelta(minutes=minute))
+
+    def _post(self, account_id, timestamp, amount=None):
+        deposit = self.random.random() < 0.6
+        amount = amount if amount is not None else round(self.random.uniform(1, 50), 2)
+        self.transactions.save_transaction(Transaction(
+            transaction_id=f"{account_id}-{len(self.postings[account_id])}",
+            account_id=account_id,
+            transaction_type=TransactionType.DEPOSIT if deposit else TransactionType.WITHDRAW,
+            amount=amount,
+            timestamp=timestamp
+        ))
+        self.postings[account_id].append((timestamp, amount if deposit else -amount))
+
+    def _recomputed(self, account_id, at):
+        return OPENING_BALANCE + sum(amount for timestamp, amount in self.postings[account_id] if timestamp <= at)
+
+    def test_matches_full_recomputation_at_every_cut_off(self):
+        for minute in range(0, 62):
+            at = OPENED + timedelta(minutes=minute, seconds=30)
+            for account_id in ("A", "B"):
+                balance = self.banking.get_balance_as_of(account_id, at)["balance"]
+                self.assertAlmostEqual(balance, self._recomputed(account_id, at), places=6)
+        self.assertGreater(len(self.transactions.checkpoints.capture("A")), 3)
+
+    def test_postings_at_the_cut_off_are_included(self):
+        at = OPENED + timedelta(minutes=30, seconds=15)
+        self._post("A", at, amount=500.0)
+        before = self.banking.get_balance_as_of("A", at - timedelta(microseconds=1))["balance"]
+        self.assertAlmostEqual(self.banking.get_balance_as_of("A", at)["balance"] - before,
+                               self.postings["A"][-1][1], places=6)
+        self.assertAlmostEqual(self.banking.get_balance_as_of("A", at.isoformat())["balance"],
+                               self._recomputed("A", at), places=6)
+
+    def test_late_arrival_invalidates_later_checkpoints(self):
+        # Lands before most of A's postings and checkpoints
+        self._post("A", OPENED + timedelta(seconds=90), amount=1000.0)
+        for minute in (1, 2, 30, 59):
+            at = OPENED + timedelta(minutes=minute)
+            balance = self.banking.get_balance_as_of("A", at)["balance"]
+            self.assertAlmostEqual(balance, self._recomputed("A", at), places=6)
+
+    def test_account_not_open_yet_has_no_balance(self):
+        self.assertIsNone(self.banking.get_balance_as_of("A", OPENED - timedelta(seconds=1))["balance"])
+        self.assertEqual(self.banking.get_balance_as_of("A", OPENED)["balance"], OPENING_BALANCE)
+        balances = self.banking.get_balances_as_of("2023-12-31")["balances"]
+        self.assertEqual(balances, {"A": None, "B": None})
+
+    def test_many_accounts_at_one_cut_off(self):
+        at = OPENED + timedelta(minutes=45)
+        balances = self.banking.get_balances_as_of(at, ["A", "B"])["balances"]
+        for account_id in ("A", "B"):
+            self.assertAlmostEqual(balances[account_id], self._recomputed(account_id, at), places=6)
+
+    def test_missing_opening_balance_is_an_error(self):
+        self.accounts.get_account_by_id("A").opening_balance = None
+        with self.assertRaises(ValueError):
+            self.banking.get_balance_as_of("A", OPENED + timedelta(minutes=5))
+        with self.assertRaises(ValueError):
+            self.banking.get_balances_as_of(OPENED + timedelta(minutes=5))
+        # Before the account opened there is nothing to add it to
+        self.assertIsNone(self.banking.get_balance_as_of("A", OPENED - timedelta(days=1))["balance"])
+
+    def test_unknown_account_is_an_error(self):
+        with self.assertRaises(ValueError):
+            self.banking.get_balance_as_of("missing", OPENED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Tests for the JSONL bulk import.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from application.banking_service import BankingService
+from application.bulk_import import BulkImporter
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger
+
+
+def _account(account_id=None, **fields):
+    record = {"record": "account", "account_type": "checking", "initial_deposit": 100.0, **fields}
+    if account_id is not None:
+        record["account_id"] = account_id
+    return record
+
+
+def _posting(account_id, amount, timestamp, kind="deposit"):
+    return {"record": "transaction", "account_id": account_id, "type": kind, "amount": amount,
+            "timestamp": timestamp}
+
+
+class BulkImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="import-test-")
+        self.path = os.path.join(self.directory, "migration.jsonl")
+        self.lock_manager = StripedLockManager()
+        self._use(AccountRepository(), TransactionRepository())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _use(self, accounts, transactions):
+        self.accounts = accounts
+        self.transactions = transactions
+        self.banking = BankingService(accounts, transactions, self.lock_manager)
+
+    def _write(self, records):
+        with open(self.path, "w") as handle:
+            for record in records:
+                handle.write(json.dumps(record) + "\n")
+
+    def _import(self, chunk_bytes=1 << 20, resume=False):
+        importer = BulkImporter(self.accounts, self.transactions, self.lock_manager,
+                                workers=1, chunk_bytes=chunk_bytes)
+        return importer.run(self.path, resume=resume)
+
+    def _balance_as_of(self, account_id, at):
+        return self.banking.get_balance_as_of(account_id, at)["balance"]
+
+    def test_account_is_dated_by_its_earliest_posting(self):
+        self._write([
+            _account("A1"),
+            _posting("A1", 25.0, "2024-01-31T09:00:00"),
+            _posting("A1", 10.0, "2024-03-01T09:00:00")
+        ])
+        self._import()
+        self.assertEqual(self.accounts.get_account_by_id("A1").creation_date, datetime(2024, 1, 31, 9))
+        self.assertIsNone(self._balance_as_of("A1", "2024-01-01"))
+        self.assertEqual(self._balance_as_of("A1", "2024-02-01"), 125.0)
+        self.assertEqual(self._balance_as_of("A1", "2024-04-01"), 135.0)
+
+    def test_creation_date_from_the_record(self):
+        self._write([_account("A1", creation_date="2023-06-01T00:00:00")])
+        self._import()
+        self.assertEqual(self._balance_as_of("A1", "2023-07-01"), 100.0)
+
+    def test_postings_in_later_chunks_move_the_opening_back(self):
+        self._write([_account("A1")] + [_posting("A1", 1.0, f"2024-01-{day:02d}T12:00:00") for day in range(28, 0, -1)])
+        state = self._import(chunk_bytes=128)
+        self.assertGreater(state["offset"], 128)
+        self.assertEqual(self.accounts.get_account_by_id("A1").creation_date, datetime(2024, 1, 1, 12))
+        self.assertEqual(self._balance_as_of("A1", "2024-01-02"), 101.0)
+
+    def test_generated_account_ids_survive_a_replayed_chunk(self):
+        self._write([_account(owner_name="Ada"), _account(owner_name="Grace")])
+        state = self._import()
+        self.assertEqual(state["accounts"], 2)
+
+        # As if the run crashed before its checkpoint was written
+        checkpoint_path = self.path + ".checkpoint.json"
+        with open(checkpoint_path) as handle:
+            checkpoint = json.load(handle)
+        checkpoint.update(offset=0, lines=0, accounts=0, complete=False)
+        with open(checkpoint_path, "w") as handle:
+            json.dump(checkpoint, handle)
+        state = self._import(resume=True)
+
+        self.assertEqual(state["accounts"], 0)
+        self.assertEqual(state["errors"], 2)
+        self.assertEqual(len(self.accounts.accounts), 2)
+
+    def test_ledger_replay_keeps_the_moved_opening(self):
+        ledger_dir = os.path.join(self.directory, "ledger")
+        ledger = WriteAheadLedger(ledger_dir, fsync=False)
+        self._use(AccountRepository(ledger), TransactionRepository(ledger))
+        self._write([_account("A1")] + [_posting("A1", 1.0, f"2024-01-{day:02d}T12:00:00") for day in range(28, 0, -1)])
+        self._import(chunk_bytes=128)
+        ledger.close()
+
+        ledger = WriteAheadLedger(ledger_dir, fsync=False)
+        self._use(AccountRepository(ledger), TransactionRepository(ledger))
+        self.transactions.replay(self.accounts)
+        self.assertEqual(self.accounts.get_account_by_id("A1").creation_date, datetime(2024, 1, 1, 12))
+        self.assertEqual(self._balance_as_of("A1", "2024-01-02"), 101.0)
+        ledger.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests for the read-through account cache in front of the SQLite backend.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from application.transaction_service import TransactionService
+from domain.entities.checkingAccount import CheckingAccount
+from infrastructure.repository.cached_account_repository import CachedAccountRepository
+from infrastructure.repository.sqlite_repository import (
+    SQLiteAccountRepository, SQLiteDatabase, SQLiteTransactionRepository
+)
+
+TIMEOUT = 5
+
+
+class _GatedAccountRepository(SQLiteAccountRepository):
+    """SQLite account repository whose update_account waits to be released, then optionally fails."""
+
+    def __init__(self, database):
+        super().__init__(database)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.fail = False
+
+    def update_account(self, account):
+        self.entered.set()
+        if not self.release.wait(TIMEOUT):
+            raise RuntimeError("Test never released update_account")
+        if self.fail:
+            raise OSError("Simulated write failure")
+        super().update_account(account)
+
+
+class _FailingTransactionRepository(SQLiteTransactionRepository):
+    def save_transaction(self, transaction):
+        raise OSError("Simulated ledger failure")
+
+
+class CachedAccountRepositoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="cache-test-")
+        self.database = SQLiteDatabase(os.path.join(self.directory, "bank.db"))
+        self.accounts = _GatedAccountRepository(self.database)
+        self.cache = CachedAccountRepository(self.accounts)
+        self.cache.create_account(CheckingAccount("acct-1", 100.0, owner_name="Test Owner"))
+        # Warm the cache, so readers are served from it
+        self.assertEqual(self.cache.get_account_by_id("acct-1").balance, 100.0)
+
+    def tearDown(self):
+        self.accounts.release.set()
+        self.database.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _deposit_in_background(self, service, amount):
+        errors = []
+
+        def deposit():
+            try:
+                service.deposit("acct-1", amount)
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=deposit)
+        thread.start()
+        self.assertTrue(self.accounts.entered.wait(TIMEOUT), "Deposit never reached update_account")
+        return thread, errors
+
+    def test_lookups_return_private_copies(self):
+        account = self.cache.get_account_by_id("acct-1")
+        account.balance += 50.0
+        self.assertEqual(self.cache.get_account_by_id("acct-1").balance, 100.0)
+
+    def test_concurrent_reader_does_not_see_uncommitted_balance(self):
+        service = TransactionService(self.cache, SQLiteTransactionRepository(self.database))
+        thread, errors = self._deposit_in_background(service, 50.0)
+
+        # The deposit is mid unit of work: its new balance is not committed yet
+        self.assertEqual(self.cache.get_account_by_id("acct-1").balance, 100.0)
+
+        self.accounts.release.set()
+        thread.join(TIMEOUT)
+        self.assertEqual(errors, [])
+        self.assertEqual(self.cache.get_account_by_id("acct-1").balance, 150.0)
+        self.assertEqual(self.accounts.get_account_by_id("acct-1").balance, 150.0)
+
+    def test_rollback_leaves_cache_at_committed_balance(self):
+        service = TransactionService(self.cache, SQLiteTransactionRepository(self.database))
+        self.accounts.fail = True
+        thread, errors = self._deposit_in_background(service, 50.0)
+        self.assertEqual(self.cache.get_account_by_id("acct-1").balance, 100.0)
+
+        self.accounts.release.set()
+        thread.join(TIMEOUT)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.accounts.get_account_by_id("acct-1").balance, 100.0)
+        self.assertEqual(self.cache.get_account_by_id("acct-1").balance, 100.0)
+
+    def test_failed_ledger_append_leaves_cache_at_committed_balance(self):
+        service = TransactionService(self.cache, _FailingTransactionRepository(self.database))
+        self.accounts.release.set()
+        with self.assertRaises(OSError):
+            service.deposit("acct-1", 50.0)
+        self.assertEqual(self.accounts.get_account_by_id("acct-1").balance, 100.0)
+        self.assertEqual(self.cache.get_account_by_id("acct-1").balance, 100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
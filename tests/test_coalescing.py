@@ -0,0 +1,51 @@
+"""
+Tests for read coalescing in the API layer.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import asyncio
+import threading
+import unittest
+
+from api.coalescing import RequestCoalescer
+
+
+class RequestCoalescerTest(unittest.TestCase):
+
+    def _run_concurrently(self, coalescer, func, requests, offload):
+        async def main():
+            return await asyncio.gather(*(coalescer.run(("balance", "acct-1"), func, offload=offload)
+                                          for _ in range(requests)))
+        return asyncio.run(main())
+
+    def test_inline_reads_are_coalesced(self):
+        coalescer = RequestCoalescer()
+        calls = []
+        results = self._run_concurrently(coalescer, lambda: calls.append(1) or len(calls), 10, offload=False)
+        self.assertEqual(results, [1] * 10)
+        self.assertEqual((coalescer.computed, coalescer.coalesced), (1, 9))
+
+    def test_offloaded_reads_leave_the_event_loop(self):
+        coalescer = RequestCoalescer()
+        loop_thread = threading.get_ident()
+        results = self._run_concurrently(coalescer, threading.get_ident, 5, offload=True)
+        self.assertNotEqual(results[0], loop_thread)
+        self.assertEqual(coalescer.computed, 1)
+
+    def test_failure_reaches_every_waiter(self):
+        coalescer = RequestCoalescer()
+
+        def fail():
+            raise ValueError("Account not found: acct-1")
+
+        async def main():
+            return await asyncio.gather(*(coalescer.run("key", fail) for _ in range(3)), return_exceptions=True)
+
+        errors = asyncio.run(main())
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors))
+        self.assertEqual(coalescer.computed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
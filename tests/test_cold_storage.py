@@ -0,0 +1,133 @@
+"""
+Tests for spilling old history to the cold tier and thawing it back.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.repository.cold_storage import ColdStore
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+START = datetime(2024, 2, 1, 9)
+CUTOFF = START + timedelta(minutes=60)
+
+
+def _postings():
+    postings = []
+    for i in range(90):
+        postings.append(Transaction(
+            transaction_id=f"t{i:03d}",
+            account_id="acct-1" if i % 3 else "acct-2",
+            transaction_type=TransactionType.WITHDRAW if i % 4 == 0 else TransactionType.DEPOSIT,
+            amount=float(i % 17) + 0.5,
+            description=f"posting {i}",
+            # Pairs share a timestamp, so equal timestamps straddle block edges
+            timestamp=START + timedelta(minutes=i // 2 * 2)
+        ))
+    return postings
+
+
+class ColdTierTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="cold-test-")
+        self.store = ColdStore(self.directory, block_entries=4, cache_blocks=2)
+        self.lock_manager = StripedLockManager()
+        self.tiered = TransactionRepository(cold_store=self.store)
+        self.reference = TransactionRepository()
+        for transaction in _postings():
+            self.tiered.save_transaction(transaction)
+            self.reference.save_transaction(transaction)
+        self.moved = self.tiered.spill(CUTOFF, self.lock_manager)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @staticmethod
+    def _rows(transactions):
+        return [(t.transaction_id, t.transaction_type, t.amount, t.description, t.timestamp) for t in transactions]
+
+    def _walk(self, repository, account_id, limit, **filters):
+        seen, cursor = [], None
+        while True:
+            page, cursor = repository.get_transactions_page(account_id, limit, cursor, **filters)
+            seen.extend(self._rows(page))
+            if cursor is None:
+                return seen
+
+    def _assert_matches_reference(self):
+        for account_id in ("acct-1", "acct-2"):
+            self.assertEqual(self._rows(self.tiered.get_transactions_for_account(account_id)),
+                             self._rows(self.reference.get_transactions_for_account(account_id)))
+            for limit in (1, 5, 100):
+                self.assertEqual(self._walk(self.tiered, account_id, limit),
+                                 self._walk(self.reference, account_id, limit))
+            bounds = {"since": START + timedelta(minutes=30), "until": CUTOFF + timedelta(minutes=10)}
+            self.assertEqual(self._walk(self.tiered, account_id, 3, transaction_type="WITHDRAW", **bounds),
+                             self._walk(self.reference, account_id, 3, transaction_type="WITHDRAW", **bounds))
+            for minute in (0, 31, 60, 61, 200):
+                at = START + timedelta(minutes=minute)
+                self.assertAlmostEqual(self.tiered.get_net_change_as_of(account_id, at),
+                                       self.reference.get_net_change_as_of(account_id, at), places=9)
+            self.assertEqual(self.tiered.get_account_aggregate(account_id).to_dict(),
+                             self.reference.get_account_aggregate(account_id).to_dict())
+
+    def test_spill_moves_old_entries_and_keeps_every_read_the_same(self):
+        self.assertEqual(self.moved, 60)
+        self.assertEqual(self.store.stats()["entries"], 60)
+        self.assertGreater(self.store.stats()["bytes_on_disk"], 0)
+        # Only the entries at or after the cut-off are still held in memory
+        hot = self.tiered.transactions["acct-1"] + self.tiered.transactions["acct-2"]
+        self.assertTrue(all(t.timestamp >= CUTOFF for t in hot))
+        self.assertNotIn("t000", self.tiered.by_id)
+        self._assert_matches_reference()
+
+    def test_cold_transactions_are_found_by_id(self):
+        for transaction in _postings():
+            self.assertEqual(self._rows([self.tiered.get_transaction_by_id(transaction.transaction_id)]),
+                             self._rows([transaction]))
+        self.assertIsNone(self.tiered.get_transaction_by_id("t999"))
+
+    def test_cold_ids_stay_taken(self):
+        with self.assertRaises(ValueError):
+            self.tiered.save_transaction(Transaction("t000", "acct-2", TransactionType.DEPOSIT, 1.0))
+
+    def test_late_arrival_thaws_the_blocks_after_it(self):
+        cold_before = len(self.tiered.cold_histories["acct-1"])
+        late = Transaction("late", "acct-1", TransactionType.DEPOSIT, 42.0, timestamp=START + timedelta(minutes=41))
+        self.tiered.save_transaction(late)
+        self.reference.save_transaction(Transaction("late", "acct-1", TransactionType.DEPOSIT, 42.0,
+                                                    timestamp=late.timestamp))
+        cold_after = self.tiered.cold_histories.get("acct-1")
+        self.assertLess(len(cold_after), cold_before)
+        self.assertEqual(len(cold_after) % self.store.block_entries, 0)
+        self.assertTrue(all(t.timestamp < late.timestamp for t in self.store.iter_range(cold_after)))
+        self._assert_matches_reference()
+
+    def test_late_arrival_before_all_cold_history_thaws_everything(self):
+        for repository in (self.tiered, self.reference):
+            repository.save_transaction(Transaction("early", "acct-2", TransactionType.WITHDRAW, 3.0,
+                                                    timestamp=START - timedelta(days=1)))
+        self.assertNotIn("acct-2", self.tiered.cold_histories)
+        self._assert_matches_reference()
+
+    def test_spilling_again_is_incremental(self):
+        self.assertEqual(self.tiered.spill(CUTOFF, self.lock_manager), 0)
+        self.assertEqual(self.tiered.spill(START + timedelta(minutes=80), self.lock_manager), 20)
+        self.assertEqual(self.store.stats()["segments"], 2)
+        self._assert_matches_reference()
+
+    def test_spill_needs_a_cold_store(self):
+        with self.assertRaises(ValueError):
+            self.reference.spill(CUTOFF)
+
+
+if __name__ == "__main__":
+    unittest.main()
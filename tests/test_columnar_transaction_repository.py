@@ -0,0 +1,146 @@
+"""
+Tests for the columnar, array-backed transaction store.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from application.transaction_service import TransactionService
+from domain.entities.checkingAccount import CheckingAccount
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.columnar_transaction_repository import (
+    ColumnarTransactionRepository, TransactionView
+)
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger
+
+START = datetime(2024, 5, 1, 8)
+
+
+def _postings():
+    """Mixed ID formats, descriptions, types and one late arrival."""
+    postings = []
+    for i in range(30):
+        transaction_id = str(uuid4()) if i % 3 else (i if i % 2 else f"legacy-{i}")
+        postings.append(Transaction(
+            transaction_id=transaction_id,
+            account_id="acct-1" if i % 4 else "acct-2",
+            transaction_type=TransactionType.WITHDRAW if i % 5 == 0 else TransactionType.DEPOSIT,
+            amount=float(i) + 0.25,
+            description=None if i % 2 else f"note {i % 3}",
+            timestamp=START + timedelta(minutes=i)
+        ))
+    postings.append(Transaction(str(uuid4()), "acct-1", TransactionType.DEPOSIT, 7.0, "late",
+                                START - timedelta(hours=1)))
+    return postings
+
+
+class ColumnarRepositoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.columnar = ColumnarTransactionRepository()
+        self.reference = TransactionRepository()
+        self.postings = _postings()
+        for transaction in self.postings:
+            self.columnar.save_transaction(transaction)
+            self.reference.save_transaction(transaction)
+
+    @staticmethod
+    def _rows(transactions):
+        return [
+            (t.transaction_id, t.account_id, t.transaction_type, t.amount, t.description, t.timestamp)
+            for t in transactions
+        ]
+
+    def test_views_read_back_every_field(self):
+        for transaction in self.postings:
+            view = self.columnar.get_transaction_by_id(transaction.transaction_id)
+            self.assertIsInstance(view, TransactionView)
+            self.assertEqual(self._rows([view]), self._rows([transaction]))
+            materialized = view.materialize()
+            self.assertIsInstance(materialized, Transaction)
+            self.assertEqual(materialized.get_transaction_info(), transaction.get_transaction_info())
+        self.assertIsNone(self.columnar.get_transaction_by_id(str(uuid4())))
+        self.assertEqual(len(self.columnar), len(self.postings))
+
+    def test_views_have_no_instance_dict(self):
+        view = self.columnar.get_transaction_by_id(self.postings[1].transaction_id)
+        self.assertFalse(hasattr(view, "__dict__"))
+        self.assertEqual(view, self.columnar.get_transaction_by_id(self.postings[1].transaction_id))
+
+    def test_history_matches_the_list_repository(self):
+        for account_id in ("acct-1", "acct-2"):
+            self.assertEqual(
+                self._rows(self.columnar.get_transactions_for_account(account_id)),
+                self._rows(self.reference.get_transactions_for_account(account_id))
+            )
+        self.assertEqual(self.columnar.get_transactions_for_account("acct-1")[0].description, "late")
+
+    def test_pages_and_aggregates_match_the_list_repository(self):
+        accounts = AccountRepository()
+        accounts.create_account(CheckingAccount("acct-1", 0.0, owner_name="Owner"))
+        columnar = TransactionService(accounts, self.columnar)
+        reference = TransactionService(accounts, self.reference)
+        cursors = [None, None]
+        while True:
+            pages = [
+                service.get_transaction_history_page("acct-1", 4, cursor, transaction_type="deposit")
+                for service, cursor in zip((columnar, reference), cursors)
+            ]
+            self.assertEqual(self._rows(pages[0]["transactions"]), self._rows(pages[1]["transactions"]))
+            cursors = [page["next_cursor"] for page in pages]
+            if cursors[0] is None:
+                break
+        self.assertEqual(self.columnar.get_account_aggregate("acct-1").to_dict(),
+                         self.reference.get_account_aggregate("acct-1").to_dict())
+        at = START + timedelta(minutes=13, seconds=30)
+        self.assertAlmostEqual(self.columnar.get_net_change_as_of("acct-1", at),
+                               self.reference.get_net_change_as_of("acct-1", at), places=9)
+
+    def test_duplicate_ids_are_rejected(self):
+        for transaction_id in (self.postings[0].transaction_id, self.postings[1].transaction_id, 3):
+            with self.assertRaises(ValueError):
+                self.columnar.save_transaction(
+                    Transaction(transaction_id, "acct-1", TransactionType.DEPOSIT, 1.0)
+                )
+        self.assertEqual(len(self.columnar), len(self.postings))
+
+
+class ColumnarReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="columnar-test-")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_replay_rebuilds_rows_index_and_aggregates(self):
+        ledger = WriteAheadLedger(self.directory, fsync=False)
+        written = ColumnarTransactionRepository(ledger)
+        for transaction in _postings():
+            written.save_transaction(transaction)
+        ledger.close()
+
+        ledger = WriteAheadLedger(self.directory, fsync=False)
+        replayed = ColumnarTransactionRepository(ledger)
+        replayed.replay()
+        ledger.close()
+        self.assertEqual(len(replayed), len(written))
+        for account_id in ("acct-1", "acct-2"):
+            self.assertEqual(
+                [t.materialize().get_transaction_info() for t in replayed.get_transactions_for_account(account_id)],
+                [t.materialize().get_transaction_info() for t in written.get_transactions_for_account(account_id)]
+            )
+            self.assertEqual(replayed.get_account_aggregate(account_id).to_dict(),
+                             written.get_account_aggregate(account_id).to_dict())
+        self.assertEqual(replayed.verify_aggregates(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
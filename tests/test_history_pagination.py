@@ -0,0 +1,121 @@
+"""
+Tests for cursor-paginated, time-filtered transaction history.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from application.transaction_service import TransactionService
+from domain.entities.checkingAccount import CheckingAccount
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.sqlite_repository import (
+    SQLiteAccountRepository, SQLiteDatabase, SQLiteTransactionRepository
+)
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+START = datetime(2024, 3, 1, 12)
+
+
+class _PaginationTests:
+    """Shared cases; subclasses build self.accounts and self.transactions."""
+
+    def _populate(self):
+        self.accounts.create_account(CheckingAccount("acct-1", 0.0, owner_name="Owner"))
+        self.service = TransactionService(self.accounts, self.transactions)
+        self.saved = []
+        for i in range(20):
+            # Pairs of postings share a timestamp, so pages split runs of equal keys
+            self._save(i, START + timedelta(minutes=i // 2))
+
+    def _save(self, i, timestamp):
+        transaction = Transaction(
+            transaction_id=f"t{i:03d}",
+            account_id="acct-1",
+            transaction_type=TransactionType.DEPOSIT if i % 3 else TransactionType.WITHDRAW,
+            amount=float(i + 1),
+            timestamp=timestamp
+        )
+        self.transactions.save_transaction(transaction)
+        self.saved.append(transaction)
+
+    def _walk(self, limit, **filters):
+        seen, cursor = [], None
+        while True:
+            page = self.service.get_transaction_history_page("acct-1", limit, cursor, **filters)
+            seen.extend(transaction.transaction_id for transaction in page["transactions"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return seen
+
+    def _walk_from(self, cursor, limit):
+        seen = []
+        while cursor is not None:
+            page = self.service.get_transaction_history_page("acct-1", limit, cursor)
+            seen.extend(transaction.transaction_id for transaction in page["transactions"])
+            cursor = page["next_cursor"]
+        return seen
+
+    def test_pages_cover_the_history_once_in_order(self):
+        for limit in (1, 3, 4, 19, 20, 50):
+            self.assertEqual(self._walk(limit), [t.transaction_id for t in self.saved])
+
+    def test_time_bounds_are_inclusive_then_exclusive(self):
+        since, until = START + timedelta(minutes=2), START + timedelta(minutes=5)
+        expected = [t.transaction_id for t in self.saved if since <= t.timestamp < until]
+        self.assertEqual(len(expected), 6)
+        self.assertEqual(self._walk(4, since=since, until=until), expected)
+
+    def test_type_filter(self):
+        expected = [t.transaction_id for t in self.saved if t.transaction_type is TransactionType.WITHDRAW]
+        self.assertEqual(self._walk(2, transaction_type="withdraw"), expected)
+
+    def test_rows_appended_between_pages_are_picked_up(self):
+        first = self.service.get_transaction_history_page("acct-1", 5)
+        self._save(20, START + timedelta(hours=1))
+        rest = self._walk_from(first["next_cursor"], 5)
+        seen = [t.transaction_id for t in first["transactions"]] + rest
+        self.assertEqual(seen, [t.transaction_id for t in self.saved])
+
+    def test_invalid_parameters_are_rejected(self):
+        for kwargs in ({"limit": 0}, {"limit": 100000}, {"cursor": "not-a-cursor"},
+                       {"transaction_type": "transfer"}):
+            with self.assertRaises(ValueError):
+                self.service.get_transaction_history_page("acct-1", **kwargs)
+        with self.assertRaises(ValueError):
+            self.service.get_transaction_history_page("missing")
+
+
+class MemoryPaginationTest(_PaginationTests, unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = AccountRepository()
+        self.transactions = TransactionRepository()
+        self._populate()
+
+    def test_late_arrival_is_placed_by_timestamp(self):
+        self._save(20, START - timedelta(minutes=1))
+        self.assertEqual(self._walk(3)[0], "t020")
+
+
+class SQLitePaginationTest(_PaginationTests, unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="pagination-test-")
+        self.database = SQLiteDatabase(os.path.join(self.directory, "bank.db"))
+        self.accounts = SQLiteAccountRepository(self.database)
+        self.transactions = SQLiteTransactionRepository(self.database)
+        self._populate()
+
+    def tearDown(self):
+        self.database.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Tests for hot-account sub-balance slots and their consolidation.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import shutil
+import tempfile
+import threading
+import unittest
+
+from application.banking_service import BankingService
+from domain.entities.checkingAccount import CheckingAccount
+from infrastructure.hot_accounts import HotAccountRegistry
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger
+
+
+class HotAccountTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="hot-test-")
+        self.ledger = WriteAheadLedger(self.directory, fsync=False)
+        self.accounts = AccountRepository(self.ledger)
+        self.transactions = TransactionRepository(self.ledger)
+        self.registry = HotAccountRegistry(slots=4, promote_after=0, max_pending=1000)
+        self.banking = BankingService(self.accounts, self.transactions,
+                                      lock_manager=StripedLockManager(hot_accounts=self.registry))
+        self.service = self.banking.transaction_service
+        self.accounts.create_account(CheckingAccount("hot", 100.0, 0.0, owner_name="Owner"))
+        self.service.promote_hot_account("hot")
+
+    def tearDown(self):
+        self.ledger.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _committed(self):
+        return self.accounts.get_account_by_id("hot").balance
+
+    def _deposit_concurrently(self, threads=8, each=25, amount=2.0):
+        def deposit():
+            for _ in range(each):
+                self.service.deposit("hot", amount)
+
+        workers = [threading.Thread(target=deposit) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return threads * each * amount
+
+    def test_pending_deposits_count_towards_the_balance_at_once(self):
+        deposited = self._deposit_concurrently()
+        # Still pending: the committed balance and the history have not moved
+        self.assertEqual(self._committed(), 100.0)
+        self.assertEqual(self.transactions.get_transactions_for_account("hot"), [])
+        self.assertEqual(self.banking.get_balance("hot")["balance"], 100.0 + deposited)
+        stats = self.registry.stats()["accounts"]["hot"]
+        self.assertEqual(stats["pending_transactions"], 200)
+        self.assertAlmostEqual(stats["pending_balance"], deposited)
+
+    def test_history_reads_consolidate(self):
+        deposited = self._deposit_concurrently()
+        history = self.service.get_transaction_history("hot")
+        self.assertEqual(len(history), 200)
+        self.assertEqual(self._committed(), 100.0 + deposited)
+        self.assertEqual(self.transactions.get_account_aggregate("hot").total_deposits, deposited)
+        self.assertEqual(self.registry.stats()["accounts"]["hot"]["pending_transactions"], 0)
+
+    def test_pending_deposit_is_found_by_id(self):
+        transaction = self.service.deposit("hot", 5.0)
+        self.assertIs(self.service.get_transaction_by_id(transaction.transaction_id), transaction)
+        self.assertEqual(self._committed(), 105.0)
+
+    def test_withdrawal_consolidates_first(self):
+        self.service.deposit("hot", 50.0)
+        # Only allowed once the pending deposit is part of the balance
+        self.service.withdraw("hot", 140.0)
+        self.assertEqual(self._committed(), 10.0)
+        self.assertEqual(len(self.transactions.get_transactions_for_account("hot")), 2)
+
+    def test_full_slot_consolidates(self):
+        self.registry.max_pending = 2
+        # Deposits rotate over the 4 slots, so the fifth fills the first slot
+        for _ in range(4):
+            self.service.deposit("hot", 1.0)
+        self.assertEqual(self._committed(), 100.0)
+        self.service.deposit("hot", 1.0)
+        self.assertEqual(self._committed(), 105.0)
+        self.assertEqual(len(self.transactions.get_transactions_for_account("hot")), 5)
+
+    def test_demote_folds_pending_deposits_in(self):
+        self._deposit_concurrently(threads=2, each=5, amount=1.0)
+        self.service.demote_hot_account("hot")
+        self.assertNotIn("hot", self.registry)
+        self.assertEqual(self._committed(), 110.0)
+        self.assertEqual(len(self.transactions.get_transactions_for_account("hot")), 10)
+        self.service.deposit("hot", 1.0)
+        self.assertEqual(self._committed(), 111.0)
+
+    def test_pending_deposits_are_replayed_after_a_restart(self):
+        deposited = self._deposit_concurrently(threads=2, each=5)
+        self.ledger.close()
+
+        self.ledger = WriteAheadLedger(self.directory, fsync=False)
+        accounts = AccountRepository(self.ledger)
+        transactions = TransactionRepository(self.ledger)
+        transactions.replay(accounts)
+        self.assertEqual(accounts.get_account_by_id("hot").balance, 100.0 + deposited)
+        self.assertEqual(len(transactions.get_transactions_for_account("hot")), 10)
+
+
+class PromotionTest(unittest.TestCase):
+
+    def test_contention_promotes_within_a_window(self):
+        registry = HotAccountRegistry(slots=2, promote_after=2, window=60.0)
+        registry._contended("busy")
+        self.assertNotIn("busy", registry)
+        registry._contended("busy")
+        self.assertIn("busy", registry)
+        self.assertEqual(registry.promotions, 1)
+
+    def test_promotion_needs_an_account_and_slots(self):
+        banking = BankingService(AccountRepository(), TransactionRepository(),
+                                 lock_manager=StripedLockManager(hot_accounts=HotAccountRegistry(slots=2)))
+        with self.assertRaises(ValueError):
+            banking.transaction_service.promote_hot_account("missing")
+        with self.assertRaises(ValueError):
+            HotAccountRegistry(slots=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Tests for the journaled idempotency-key cache.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from application.transaction_service import TransactionService
+from domain.Exceptions.exception_error import IdempotencyKeyReusedError
+from domain.entities.checkingAccount import CheckingAccount
+from infrastructure.idempotency import IdempotencyCache
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+TIMEOUT = 5
+
+
+class IdempotencyJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="idempotency-test-")
+        self.path = os.path.join(self.directory, "journal")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_cache_hits_do_not_wait_for_journal_fsync(self):
+        cache = IdempotencyCache(capacity=100, path=self.path, fsync=True)
+        cache.run("warm", "fp", lambda: "warm")
+        syncing = threading.Event()
+        release = threading.Event()
+        real_fsync = os.fsync
+
+        def slow_fsync(fileno):
+            syncing.set()
+            release.wait(TIMEOUT)
+            real_fsync(fileno)
+
+        with mock.patch("infrastructure.idempotency.os.fsync", slow_fsync):
+            writer = threading.Thread(target=cache.run, args=("slow", "fp", lambda: "slow"))
+            writer.start()
+            self.assertTrue(syncing.wait(TIMEOUT))
+            started = time.monotonic()
+            self.assertEqual(cache.run("warm", "fp", lambda: "again"), "warm")
+            self.assertLess(time.monotonic() - started, 1.0)
+            release.set()
+            writer.join(TIMEOUT)
+        cache.close()
+
+    def test_concurrent_appends_survive_background_compaction(self):
+        capacity = 50
+        cache = IdempotencyCache(capacity=capacity, path=self.path, fsync=True)
+
+        def complete(thread_index):
+            for i in range(200):
+                key = f"{thread_index}-{i}"
+                cache.run(key, "fp", lambda: key)
+
+        threads = [threading.Thread(target=complete, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(TIMEOUT * 4)
+        # Let a compaction still running finish before the journal is closed
+        deadline = time.monotonic() + TIMEOUT
+        while cache._compacting and time.monotonic() < deadline:
+            time.sleep(0.01)
+        expected = dict((key, entry[2]) for key, entry in cache._completed.items())
+        cache.close()
+
+        self.assertEqual(len(expected), capacity)
+        reloaded = IdempotencyCache(capacity=capacity, path=self.path, fsync=False)
+        for key, result in expected.items():
+            self.assertEqual(reloaded.run(key, "fp", lambda: "ran again"), result)
+        reloaded.close()
+        # Compaction kept the file near the live entries, not all 800 completions
+        with open(self.path, "rb") as handle:
+            self.assertLess(handle.read().count(b"fp"), 4 * capacity)
+
+
+class IdempotentRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = AccountRepository()
+        self.accounts.create_account(CheckingAccount("acct-1", 100.0, owner_name="Owner"))
+        self.service = TransactionService(self.accounts, TransactionRepository())
+
+    def test_retry_with_the_amount_spelled_differently_is_a_replay(self):
+        for operation in (self.service.deposit, self.service.withdraw):
+            first = operation("acct-1", 10.0, "retry", idempotency_key=operation.__name__)
+            for amount in ("10", "10.00", 10):
+                self.assertIs(operation("acct-1", amount, "retry", idempotency_key=operation.__name__), first)
+        self.assertEqual(self.accounts.get_account_by_id("acct-1").balance, 100.0)
+
+    def test_retry_with_another_amount_is_refused(self):
+        self.service.deposit("acct-1", "10", idempotency_key="k")
+        with self.assertRaises(IdempotencyKeyReusedError):
+            self.service.deposit("acct-1", "10.01", idempotency_key="k")
+        with self.assertRaises(ValueError):
+            self.service.deposit("acct-1", "ten", idempotency_key="other")
+
+
+if __name__ == "__main__":
+    unittest.main()
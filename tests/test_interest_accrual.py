@@ -0,0 +1,82 @@
+"""
+Tests for the month-end interest and fee run.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import unittest
+
+from application.interest_accrual import InterestAccrualService
+from application.transaction_service import TransactionService
+from domain.Exceptions.exception_error import VelocityLimitExceededError
+from domain.entities.savingsAccount import SavingsAccount
+from domain.services.rule_registry import RULES
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.velocity_limits import VelocityLimiter
+
+
+class AccrualVelocityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = AccountRepository()
+        self.accounts.create_account(SavingsAccount("busy", 200.0, owner_name="Busy Saver"))
+        self.accounts.create_account(SavingsAccount("quiet", 50.0, owner_name="Quiet Saver"))
+        self.service = TransactionService(self.accounts, TransactionRepository(), velocity=VelocityLimiter())
+        # Savings allow six withdrawals an hour; use them all, and drop below the minimum balance
+        for _ in range(6):
+            self.service.withdraw("busy", 20.0)
+
+    def test_fee_is_posted_to_an_account_at_its_velocity_limit(self):
+        summary = InterestAccrualService(self.accounts, self.service).run()
+        self.assertTrue(summary["committed"])
+        self.assertEqual(summary["errors"], {})
+        # Interest and a fee for each account
+        self.assertEqual(summary["applied"], 4)
+        self.assertLess(self.accounts.get_account_by_id("busy").balance, 80.0)
+
+    def test_fee_does_not_use_up_the_customer_limit(self):
+        InterestAccrualService(self.accounts, self.service).run(atomic=False)
+        for _ in range(6):
+            self.service.withdraw("quiet", 1.0)
+        with self.assertRaises(VelocityLimitExceededError):
+            self.service.withdraw("quiet", 1.0)
+
+    def test_customer_batches_are_still_limited(self):
+        result = self.service.apply_batch([{"account_id": "busy", "type": "withdraw", "amount": 1.0}])
+        self.assertFalse(result["committed"])
+        self.assertIn("Velocity limit exceeded", result["errors"][0])
+
+
+class AccrualAmountTest(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = AccountRepository()
+        self.service = TransactionService(self.accounts, TransactionRepository())
+        self.rate = RULES.for_type("savings").interest_rate
+
+    def test_interest_uses_the_configured_rate(self):
+        # Built like AccountService does, so the entity keeps its constructor default rate
+        self.accounts.create_account(SavingsAccount("saver", 1200.0, owner_name="Saver"))
+        self.assertNotEqual(self.accounts.get_account_by_id("saver").interest_rate, self.rate)
+        summary = InterestAccrualService(self.accounts, self.service).run()
+        self.assertEqual(summary["total_interest"], round(1200.0 * self.rate / 12, 2))
+        self.assertEqual(self.accounts.get_account_by_id("saver").balance, 1200.0 + summary["total_interest"])
+
+    def test_amounts_and_totals_are_whole_cents(self):
+        # The float64 sum of these rounded amounts is 0.7599999999999999
+        for i in range(3):
+            self.accounts.create_account(SavingsAccount(f"s{i}", 100.0 + i * 7.31, owner_name="Saver"))
+        self.accounts.create_account(SavingsAccount("low", 43.21, owner_name="Saver"))
+        summary = InterestAccrualService(self.accounts, self.service).run(dry_run=True)
+        for key in ("total_interest", "total_fees"):
+            self.assertEqual(summary[key], round(summary[key], 2))
+        amounts = [posting["amount"] for posting in summary["preview"]]
+        self.assertTrue(all(amount == round(amount, 2) for amount in amounts))
+        interest = sum(posting["amount"] for posting in summary["preview"] if posting["type"] == "deposit")
+        self.assertEqual(summary["total_interest"], round(interest, 2))
+        self.assertEqual(summary["total_fees"], RULES.for_type("savings").min_balance_fee)
+
+
+if __name__ == "__main__":
+    unittest.main()
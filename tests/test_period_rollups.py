@@ -0,0 +1,141 @@
+"""
+Tests for the day/month period rollups and the period report.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import random
+import unittest
+from datetime import date, datetime, timedelta
+
+from application.banking_service import BankingService
+from domain.entities.checkingAccount import CheckingAccount
+from domain.entities.savingsAccount import SavingsAccount
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.period_rollups import account_class_resolver, split_range
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+FIRST_DAY = date(2023, 12, 20)
+DAYS = 80
+
+
+class SplitRangeTest(unittest.TestCase):
+
+    def test_partial_months_come_from_days(self):
+        months, days = split_range(date(2024, 1, 15), date(2024, 4, 10))
+        self.assertEqual(months, (2024 * 12 + 1, 2024 * 12 + 3))
+        self.assertEqual(days, [
+            (date(2024, 1, 15).toordinal(), date(2024, 2, 1).toordinal()),
+            (date(2024, 4, 1).toordinal(), date(2024, 4, 10).toordinal())
+        ])
+
+    def test_whole_months_need_no_days(self):
+        self.assertEqual(split_range(date(2024, 1, 1), date(2024, 3, 1)), ((2024 * 12, 2024 * 12 + 2), []))
+
+    def test_ranges_inside_one_month_are_days_only(self):
+        months, days = split_range(date(2024, 2, 3), date(2024, 2, 20))
+        self.assertIsNone(months)
+        self.assertEqual(days, [(date(2024, 2, 3).toordinal(), date(2024, 2, 20).toordinal())])
+
+    def test_empty_and_open_ranges(self):
+        self.assertEqual(split_range(date(2024, 2, 3), date(2024, 2, 3)), (None, []))
+        self.assertEqual(split_range(None, date(2024, 2, 3)),
+                         ((None, 2024 * 12 + 1), [(date(2024, 2, 1).toordinal(), date(2024, 2, 3).toordinal())]))
+
+
+class PeriodRollupsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = AccountRepository()
+        self.transactions = TransactionRepository(account_class_of=account_class_resolver(self.accounts.accounts))
+        self.banking = BankingService(self.accounts, self.transactions)
+        self.accounts.create_account(CheckingAccount("c1", 0.0, 1000.0, owner_name="Owner"))
+        self.accounts.create_account(CheckingAccount("c2", 0.0, 1000.0, owner_name="Owner"))
+        self.accounts.create_account(SavingsAccount("s1", 1000.0, owner_name="Owner"))
+        self.postings = []
+        generator = random.Random(11)
+        for i in range(400):
+            # Include postings right at midnight and just before it
+            day = FIRST_DAY + timedelta(days=generator.randrange(DAYS))
+            seconds = generator.choice((0, 86399, generator.randrange(86400)))
+            self._post(generator.choice(("c1", "c2", "s1")), datetime.combine(day, datetime.min.time())
+                       + timedelta(seconds=seconds), round(generator.uniform(1, 100), 2),
+                       generator.random() < 0.5, i)
+
+    def _post(self, account_id, timestamp, amount, deposit, i):
+        transaction_type = TransactionType.DEPOSIT if deposit else TransactionType.WITHDRAW
+        self.transactions.save_transaction(Transaction(f"t{i}", account_id, transaction_type, amount,
+                                                       timestamp=timestamp))
+        self.postings.append((account_id, timestamp, amount, deposit))
+
+    def _expected(self, account_ids, start, end):
+        selected = [
+            (amount, deposit) for account_id, timestamp, amount, deposit in self.postings
+            if account_id in account_ids
+            and (start is None or timestamp.date() >= start) and (end is None or timestamp.date() < end)
+        ]
+        return (sum(a for a, d in selected if d), sum(a for a, d in selected if not d),
+                sum(1 for _, d in selected if d), sum(1 for _, d in selected if not d))
+
+    def _assert_totals(self, totals, expected):
+        self.assertAlmostEqual(totals.deposits, expected[0], places=6)
+        self.assertAlmostEqual(totals.withdrawals, expected[1], places=6)
+        self.assertEqual((totals.deposit_count, totals.withdrawal_count), expected[2:])
+
+    def test_ranges_match_a_scan_of_the_postings(self):
+        bounds = [None, date(2023, 12, 31), date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 31),
+                  date(2024, 2, 1), date(2024, 2, 29), date(2024, 3, 1), date(2024, 3, 9)]
+        for start in bounds:
+            for end in bounds:
+                if start is not None and end is not None and start > end:
+                    continue
+                for account_id in ("c1", "s1"):
+                    self._assert_totals(self.transactions.get_period_totals(account_id, start=start, end=end),
+                                        self._expected({account_id}, start, end))
+
+    def test_class_scope_combines_its_accounts_only(self):
+        start, end = date(2024, 1, 10), date(2024, 2, 20)
+        self._assert_totals(self.transactions.get_period_totals(account_class="CheckingAccount", start=start, end=end),
+                            self._expected({"c1", "c2"}, start, end))
+        self._assert_totals(self.transactions.get_period_totals(account_class="SavingsAccount", start=start, end=end),
+                            self._expected({"s1"}, start, end))
+        with self.assertRaises(ValueError):
+            self.transactions.get_period_totals("c1", "CheckingAccount")
+
+    def test_periods_list_each_bucket_in_order(self):
+        months = self.transactions.get_period_rollups("month", "c1")
+        self.assertEqual([period for period, _ in months], [date(2023, 12, 1), date(2024, 1, 1),
+                                                              date(2024, 2, 1), date(2024, 3, 1)])
+        for period, totals in months:
+            following = date(period.year + period.month // 12, period.month % 12 + 1, 1)
+            self._assert_totals(totals, self._expected({"c1"}, period, following))
+        days = self.transactions.get_period_rollups("day", "c1", start=date(2024, 1, 31), end=date(2024, 2, 2))
+        for period, totals in days:
+            self._assert_totals(totals, self._expected({"c1"}, period, period + timedelta(days=1)))
+        with self.assertRaises(ValueError):
+            self.transactions.get_period_rollups("week", "c1")
+
+    def test_report_by_account_and_by_type(self):
+        report = self.banking.get_period_report("c1", start="2024-01-15", end="2024-03-01", granularity="month")
+        expected = self._expected({"c1"}, date(2024, 1, 15), date(2024, 3, 1))
+        self.assertAlmostEqual(report["totals"]["deposits"], expected[0], places=6)
+        self.assertEqual(report["totals"]["transaction_count"], expected[2] + expected[3])
+        # Only February starts inside the range
+        self.assertEqual([entry["period"] for entry in report["periods"]], ["2024-02-01"])
+
+        report = self.banking.get_period_report(account_type="checking", start="2024-01-01", end="2024-02-01")
+        self.assertEqual(report["account_type"], "checking")
+        expected = self._expected({"c1", "c2"}, date(2024, 1, 1), date(2024, 2, 1))
+        self.assertAlmostEqual(report["totals"]["withdrawals"], expected[1], places=6)
+
+    def test_report_rejects_bad_parameters(self):
+        for kwargs in ({"account_id": "missing"}, {"account_type": "brokerage"},
+                       {"account_id": "c1", "start": "2024-01-01T12:00:00"},
+                       {"account_id": "c1", "granularity": "week"}):
+            with self.assertRaises(ValueError):
+                self.banking.get_period_report(**kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()
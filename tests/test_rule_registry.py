@@ -0,0 +1,118 @@
+"""
+Tests for the compiled, hot-swappable account-class rules.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import threading
+import unittest
+
+from domain.Exceptions.exception_error import (
+    AccountClosedError,
+    InsufficientBalanceError,
+    InsufficientDepositError
+)
+from domain.entities.checkingAccount import CheckingAccount
+from domain.entities.savingsAccount import SavingsAccount
+from domain.services.rule_registry import RuleRegistry, compile_table
+
+
+def _classes(fee: float, minimum_balance: float = 100.0) -> dict:
+    return {
+        "checking": {"class": "CheckingAccount", "config": {"overdraft": True, "monthly_fee": fee}},
+        "savings": {"class": "SavingsAccount", "config": {
+            "monthly_fee": fee,
+            "min_balance_fee": fee,
+            "minimum_balance": minimum_balance,
+            "minimum_initial_deposit": 500.0
+        }}
+    }
+
+
+class AccountRulesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.table = compile_table(_classes(5.0))
+
+    def test_opening_minimum(self):
+        rules = self.table.by_type["savings"]
+        rules.check_opening(500.0)
+        with self.assertRaises(InsufficientDepositError):
+            rules.check_opening(499.99)
+        self.table.by_type["checking"].check_opening(0.0)
+
+    def test_checking_withdrawals_may_use_the_overdraft(self):
+        rules = self.table.by_entity[CheckingAccount]
+        account = CheckingAccount("c1", 100.0, 50.0, owner_name="Owner")
+        rules.check_withdrawal(account, 150.0)
+        with self.assertRaises(InsufficientBalanceError):
+            rules.check_withdrawal(account, 150.01)
+        account.status = "closed"
+        with self.assertRaises(AccountClosedError):
+            rules.check_withdrawal(account, 1.0)
+
+    def test_savings_withdrawals_stop_at_zero(self):
+        rules = self.table.by_entity[SavingsAccount]
+        account = SavingsAccount("s1", 100.0, owner_name="Owner")
+        rules.check_withdrawal(account, 100.0)
+        with self.assertRaises(ValueError):
+            rules.check_withdrawal(account, 100.01)
+        with self.assertRaises(ValueError):
+            rules.check_withdrawal(account, 0.0)
+
+    def test_min_balance_fee_uses_its_own_threshold(self):
+        rules = self.table.by_type["savings"]
+        # Between minimum_balance (100) and minimum_initial_deposit (500): only the monthly fee
+        self.assertEqual(rules.fee(300.0), 5.0)
+        self.assertEqual(rules.fee(99.0), 10.0)
+        self.assertEqual(self.table.by_type["checking"].fee(-50.0), 5.0)
+
+    def test_unconfigured_classes_get_the_defaults(self):
+        class OtherAccount(SavingsAccount):
+            pass
+        self.assertIs(self.table.by_entity[OtherAccount], self.table.default)
+        self.assertIs(self.table.for_class("OtherAccount"), self.table.default)
+
+
+class RuleRegistryReloadTest(unittest.TestCase):
+
+    def test_invalid_rules_leave_the_current_table_in_place(self):
+        registry = RuleRegistry(_classes(1.0))
+        table = registry.table
+        for bad in (
+            {"checking": {"config": {}}},
+            {"savings": {"class": "SavingsAccount", "config": {"monthly_fee": "lots"}}},
+            {"savings": {"class": "SavingsAccount", "config": {"velocity_limits": {"week": {"count": 1}}}}}
+        ):
+            with self.assertRaises(ValueError):
+                registry.reload(bad)
+            self.assertIs(registry.table, table)
+        self.assertEqual(registry.reload(_classes(2.0)).version, table.version + 1)
+
+    def test_readers_never_see_a_mix_of_old_and_new_rules(self):
+        registry = RuleRegistry(_classes(1.0))
+        stop = threading.Event()
+        mixed = []
+
+        def read():
+            while not stop.is_set():
+                table = registry.table
+                fees = {rules.monthly_fee for rules in table.by_type.values()}
+                fees.add(table.by_entity[SavingsAccount].min_balance_fee)
+                if len(fees) != 1:
+                    mixed.append(fees)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for generation in range(200):
+            registry.reload(_classes(float(generation)))
+        stop.set()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(mixed, [])
+        self.assertEqual(registry.table.version, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for the shard router's error handling and the cluster's socket directory.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+from infrastructure.sharding.cluster import ShardCluster, _private_directory
+from infrastructure.sharding.shard_router import ShardRouter, ShardUnavailableError
+
+
+class ShardRouterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.router = ShardRouter(["/nonexistent/shard-0.sock", "/nonexistent/shard-1.sock"], b"test-key")
+        self.addCleanup(self.router.close)
+
+    def test_shard_key_is_required(self):
+        with mock.patch("config.SHARD_AUTHKEY", b""):
+            with self.assertRaises(ValueError):
+                ShardRouter(["/nonexistent/shard-0.sock"])
+
+    def test_cluster_generates_a_key_when_none_is_configured(self):
+        with mock.patch("config.SHARD_AUTHKEY", b""):
+            keys = {ShardCluster(1).authkey for _ in range(2)}
+        self.assertEqual(len(keys), 2)
+        self.assertTrue(all(len(key) == 64 for key in keys))
+
+    def test_bank_totals_reraise_shard_errors(self):
+        totals = {"accounts": 1, "total_balance": 10.0, "accounts_by_type": {"Checking": 1}}
+        with mock.patch.object(self.router, "_scatter", return_value=[ValueError("Shard failed"), totals]):
+            with self.assertRaises(ValueError):
+                self.router.get_bank_totals()
+
+    def test_unreachable_shard_is_reported_unavailable(self):
+        with self.assertRaises(ShardUnavailableError):
+            self.router.get_bank_totals()
+
+
+class PrivateDirectoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.parent = tempfile.mkdtemp(prefix="shard-dir-test-")
+        self.addCleanup(shutil.rmtree, self.parent, True)
+
+    def test_existing_directory_is_tightened(self):
+        path = os.path.join(self.parent, "sockets")
+        os.mkdir(path)
+        os.chmod(path, 0o777)
+        _private_directory(path)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o700)
+
+    def test_symlink_is_refused(self):
+        target = os.path.join(self.parent, "elsewhere")
+        os.mkdir(target)
+        path = os.path.join(self.parent, "sockets")
+        os.symlink(target, path)
+        with self.assertRaises(RuntimeError):
+            _private_directory(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
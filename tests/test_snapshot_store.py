@@ -0,0 +1,149 @@
+"""
+Tests for snapshots, ledger compaction and restart with the cold tier.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import config
+from application.banking_service import BankingService
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.repository import factory
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.cold_storage import ColdStore
+from infrastructure.repository.period_rollups import account_class_resolver
+from infrastructure.repository.snapshot_store import SnapshotStore
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger
+
+
+class SnapshotRestartTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="snapshot-test-")
+        self.open_bank()
+
+    def tearDown(self):
+        self.close_bank()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def open_bank(self):
+        self.lock_manager = StripedLockManager()
+        self.ledger = WriteAheadLedger(self.directory, segment_max_bytes=1024, fsync=False)
+        self.snapshots = SnapshotStore(os.path.join(self.directory, "snapshots"))
+        self.cold_store = ColdStore(os.path.join(self.directory, "cold"), block_entries=8, durable=True)
+        self.accounts = AccountRepository(self.ledger)
+        self.transactions = TransactionRepository(
+            self.ledger, account_class_resolver(self.accounts.accounts), cold_store=self.cold_store,
+            snapshots=self.snapshots
+        )
+        self.replayed = self.snapshots.restore(self.accounts, self.transactions)
+        self.banking = BankingService(self.accounts, self.transactions, self.lock_manager)
+
+    def close_bank(self):
+        self.cold_store.close()
+        self.ledger.close()
+
+    def restart(self):
+        self.close_bank()
+        self.open_bank()
+
+    def take_snapshot(self):
+        return self.snapshots.take(self.accounts, self.transactions, self.ledger, self.lock_manager)
+
+    def state(self, account_id):
+        history = self.banking.transaction_service.get_transaction_history(account_id)
+        return {
+            "balance": self.accounts.get_account_by_id(account_id).balance,
+            "summary": self.banking.get_account_summary(account_id),
+            "history": [(t.transaction_id, t.amount) for t in history],
+            "months": [
+                (start, totals.to_dict())
+                for start, totals in self.transactions.get_period_rollups("month", account_class="CheckingAccount")
+            ],
+            "as_of": self.transactions.get_net_change_as_of(account_id, time.time() + 60)
+        }
+
+    def post(self, account_id, count):
+        for _ in range(count):
+            self.banking.deposit(account_id, 10.0)
+            self.banking.withdraw(account_id, 3.0)
+
+    def test_cold_history_stays_cold_across_a_restart(self):
+        account_id = self.banking.create_account("checking", 100.0)["account_id"]
+        self.post(account_id, 40)
+        self.assertEqual(self.transactions.spill(time.time() + 1, self.lock_manager), 80)
+        self.post(account_id, 5)
+        self.take_snapshot()
+        self.assertGreater(self.snapshots.compact(self.ledger), 0)
+        self.post(account_id, 2)
+        expected = self.state(account_id)
+        cold_id = expected["history"][0][0]
+
+        self.restart()
+        self.assertEqual(self.replayed, len(list(self.ledger.replay(self.snapshots.snapshots()[0][0] + 1))))
+        # Only the hot tail is back in memory; the rest is read from the same segments
+        self.assertEqual(len(self.transactions.transactions[account_id]), 14)
+        self.assertEqual(len(self.transactions.cold_histories[account_id]), 80)
+        self.assertNotIn(cold_id, self.transactions.by_id)
+        self.assertEqual(self.state(account_id), expected)
+        self.assertEqual(self.banking.get_transaction(cold_id)["amount"], 10.0)
+        self.assertEqual(self.transactions.verify_aggregates(), {})
+
+    def test_snapshot_holds_no_cold_transactions(self):
+        account_id = self.banking.create_account("checking", 100.0)["account_id"]
+        self.post(account_id, 200)
+        self.transactions.spill(time.time() + 1, self.lock_manager)
+        path = self.take_snapshot()["path"]
+        with open(path, "rb") as handle:
+            state = pickle.load(handle)
+        self.assertEqual(state["account_state"][account_id]["hot"], [])
+        self.assertEqual(len(state["account_state"][account_id]["cold"]), 400)
+
+    def test_derived_state_survives_a_restart_without_spills(self):
+        account_id = self.banking.create_account("checking", 100.0)["account_id"]
+        self.post(account_id, 30)
+        self.take_snapshot()
+        self.snapshots.compact(self.ledger)
+        expected = self.state(account_id)
+        self.restart()
+        self.assertEqual(self.state(account_id), expected)
+
+    def test_compacted_ledger_without_snapshot_is_refused(self):
+        account_id = self.banking.create_account("checking", 100.0)["account_id"]
+        self.post(account_id, 30)
+        self.take_snapshot()
+        self.assertGreater(self.snapshots.compact(self.ledger), 0)
+        for _, path in self.snapshots.snapshots():
+            os.remove(path)
+        self.close_bank()
+        with self.assertRaises(ValueError):
+            self.open_bank()
+        # open_bank failed part-way; leave something for tearDown to close
+        self.cold_store = ColdStore(os.path.join(self.directory, "cold"), durable=True)
+        self.ledger = WriteAheadLedger(self.directory, fsync=False)
+
+
+class FactoryCompactionTest(unittest.TestCase):
+
+    def test_periodic_snapshots_compact_the_ledger(self):
+        directory = tempfile.mkdtemp(prefix="factory-test-")
+        self.addCleanup(shutil.rmtree, directory, True)
+        with mock.patch.object(config, "REPOSITORY_BACKEND", "memory"), \
+                mock.patch.object(SnapshotStore, "start_periodic") as start_periodic:
+            _, transactions = factory.build_repositories(StripedLockManager(), ledger_dir=directory)
+        transactions.ledger.close()
+        self.assertEqual(start_periodic.call_args.kwargs["compact"], config.SNAPSHOT_COMPACT)
+        self.assertTrue(config.SNAPSHOT_COMPACT)
+        self.assertTrue(transactions.cold_store.durable)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Tests for the statement batch job's chunk retries and resume.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+from application import statements
+from application.banking_service import BankingService
+from application.checkpoints import load_checkpoint
+from application.statements import (
+    CHECKPOINT_FILE, IMAGE_DIRECTORY, StatementJob, render_chunk, statement_file_name
+)
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+ACCOUNTS = 7
+CHUNK_ACCOUNTS = 2
+
+
+class _FlakyRenderer:
+    """render_chunk that fails a chunk's first `failures` attempts."""
+
+    def __init__(self, failing_first: int, failures: int):
+        self.failing_first = failing_first
+        self.failures = failures
+        self.calls = []
+
+    def __call__(self, image_directory, output_directory, first, last, statement_format):
+        self.calls.append(first)
+        if first == self.failing_first and self.failures:
+            self.failures -= 1
+            raise OSError("Simulated render failure")
+        return render_chunk(image_directory, output_directory, first, last, statement_format)
+
+
+class StatementJobTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="statements-test-")
+        self.banking = BankingService(AccountRepository(), TransactionRepository())
+        self.account_ids = []
+        for i in range(ACCOUNTS):
+            account_id = self.banking.create_account("checking", 100.0 + i)["account_id"]
+            self.banking.deposit(account_id, 10.0)
+            self.account_ids.append(account_id)
+        today = date.today()
+        self.start = today.replace(day=1)
+        self.end = date(today.year + today.month // 12, today.month % 12 + 1, 1)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _run(self, renderer, retries, resume=False, start=None):
+        job = StatementJob(self.banking.account_repository, self.banking.transaction_repository,
+                           self.banking.transaction_service, workers=1, chunk_accounts=CHUNK_ACCOUNTS,
+                           retries=retries)
+        with mock.patch.object(statements, "render_chunk", renderer):
+            return job.run(self.directory, start or self.start, self.end, resume=resume)
+
+    def _written(self):
+        return sorted(
+            account_id for account_id in self.account_ids
+            if os.path.exists(os.path.join(self.directory, statement_file_name(account_id, "txt")))
+        )
+
+    def test_failed_chunk_is_retried(self):
+        renderer = _FlakyRenderer(failing_first=2, failures=1)
+        state = self._run(renderer, retries=1)
+        self.assertTrue(state["complete"])
+        self.assertEqual(state["failed"], {})
+        self.assertEqual(state["statements"], ACCOUNTS)
+        self.assertEqual(renderer.calls.count(2), 2)
+        self.assertEqual(self._written(), sorted(self.account_ids))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, IMAGE_DIRECTORY)))
+
+    def test_resume_renders_only_unfinished_chunks(self):
+        state = self._run(_FlakyRenderer(failing_first=4, failures=2), retries=1)
+        self.assertFalse(state["complete"])
+        self.assertEqual(list(state["failed"]), ["2"])
+        self.assertEqual(state["statements"], ACCOUNTS - CHUNK_ACCOUNTS)
+        self.assertEqual(load_checkpoint(os.path.join(self.directory, CHECKPOINT_FILE)), state)
+        # The image is kept for the resumed run
+        self.assertTrue(os.path.isdir(os.path.join(self.directory, IMAGE_DIRECTORY)))
+
+        renderer = _FlakyRenderer(failing_first=None, failures=0)
+        state = self._run(renderer, retries=0, resume=True)
+        self.assertEqual(renderer.calls, [4])
+        self.assertTrue(state["complete"])
+        self.assertEqual(state["failed"], {})
+        self.assertEqual(state["statements"], ACCOUNTS)
+        self.assertEqual(self._written(), sorted(self.account_ids))
+
+    def test_resume_refuses_another_period(self):
+        self._run(_FlakyRenderer(failing_first=0, failures=1), retries=0)
+        with self.assertRaises(ValueError):
+            self._run(_FlakyRenderer(failing_first=None, failures=0), retries=0, resume=True,
+                      start=self.start.replace(year=self.start.year - 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for the transaction ID index and caller-assigned IDs.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import shutil
+import tempfile
+import threading
+import unittest
+
+from application.transaction_service import TransactionService
+from domain.entities.checkingAccount import CheckingAccount
+from domain.entities.transaction import Transaction, TransactionType
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger
+
+
+def _transaction(transaction_id, amount=10.0):
+    return Transaction(transaction_id, "acct-1", TransactionType.DEPOSIT, amount)
+
+
+class TransactionIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = TransactionRepository()
+
+    def test_service_ids_are_kept_and_found(self):
+        accounts = AccountRepository()
+        accounts.create_account(CheckingAccount("acct-1", 0.0, owner_name="Owner"))
+        service = TransactionService(accounts, self.transactions)
+        transaction = service.deposit("acct-1", 25.0)
+        self.assertEqual(len(transaction.transaction_id), 36)
+        self.assertIs(service.get_transaction_by_id(transaction.transaction_id), transaction)
+        with self.assertRaises(ValueError):
+            service.get_transaction_by_id("no-such-transaction")
+
+    def test_missing_ids_get_the_counter(self):
+        first, second = _transaction(None), _transaction(None)
+        self.assertEqual(self.transactions.save_transaction(first), 1)
+        self.assertEqual(self.transactions.save_transaction(second), 2)
+        self.assertIs(self.transactions.get_transaction_by_id(2), second)
+
+    def test_duplicate_ids_are_rejected(self):
+        self.transactions.save_transaction(_transaction("t1"))
+        with self.assertRaises(ValueError):
+            self.transactions.save_transaction(_transaction("t1", 99.0))
+        self.assertEqual(self.transactions.get_transaction_by_id("t1").amount, 10.0)
+
+    def test_a_batch_with_a_duplicate_saves_nothing(self):
+        self.transactions.save_transaction(_transaction("t1"))
+        for batch in ([_transaction("t2"), _transaction("t1")], [_transaction("t3"), _transaction("t3")]):
+            with self.assertRaises(ValueError):
+                self.transactions.save_transactions(batch)
+        self.assertEqual(len(self.transactions.get_transactions_for_account("acct-1")), 1)
+        self.assertIsNone(self.transactions.get_transaction_by_id("t2"))
+
+    def test_concurrent_saves_of_one_id_admit_exactly_one(self):
+        outcomes = []
+        barrier = threading.Barrier(8)
+
+        def save():
+            barrier.wait()
+            try:
+                self.transactions.save_transaction(_transaction("same"))
+                outcomes.append("saved")
+            except ValueError:
+                outcomes.append("rejected")
+
+        threads = [threading.Thread(target=save) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(outcomes.count("saved"), 1)
+
+
+class LedgerReplayIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="index-test-")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_replay_rebuilds_the_index_and_the_counter(self):
+        ledger = WriteAheadLedger(self.directory, fsync=False)
+        transactions = TransactionRepository(ledger)
+        transactions.save_transaction(_transaction("uuid-like"))
+        transactions.save_transaction(_transaction(None))
+        transactions.save_transaction(_transaction(None))
+        ledger.close()
+
+        ledger = WriteAheadLedger(self.directory, fsync=False)
+        replayed = TransactionRepository(ledger)
+        self.assertEqual(replayed.replay(), 3)
+        self.assertEqual(replayed.get_transaction_by_id("uuid-like").amount, 10.0)
+        self.assertIsNotNone(replayed.get_transaction_by_id(2))
+        # New counter IDs continue after the replayed ones
+        self.assertEqual(replayed.save_transaction(_transaction(None)), 3)
+        ledger.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Tests for auditing the in-memory transaction repository against its ledger.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from application.banking_service import BankingService
+from infrastructure.lock_manager import StripedLockManager
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.snapshot_store import SnapshotStore
+from infrastructure.repository.transaction_repository import TransactionRepository
+from infrastructure.repository.write_ahead_ledger import WriteAheadLedger
+
+
+class VerifyAggregatesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="verify-test-")
+        self.ledger = WriteAheadLedger(self.directory, segment_max_bytes=512, fsync=False)
+        self.snapshots = SnapshotStore(os.path.join(self.directory, "snapshots"))
+        self.lock_manager = StripedLockManager()
+        self.accounts = AccountRepository(self.ledger)
+        self.transactions = TransactionRepository(self.ledger, snapshots=self.snapshots)
+        self.banking = BankingService(self.accounts, self.transactions, lock_manager=self.lock_manager)
+        self.account_id = self.banking.create_account("checking", 100.0)["account_id"]
+        for _ in range(20):
+            self.banking.transaction_service.deposit(self.account_id, 10.0)
+            self.banking.transaction_service.withdraw(self.account_id, 4.0)
+
+    def tearDown(self):
+        self.ledger.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _lose_last_posting(self):
+        """Drift the in-memory history and running totals together, as a lost append would."""
+        lost = self.transactions.transactions[self.account_id].pop()
+        self.transactions.timestamps[self.account_id].pop()
+        del self.transactions.by_id[lost.transaction_id]
+        aggregate = self.transactions.aggregates[self.account_id]
+        aggregate.transaction_count -= 1
+        aggregate.total_withdrawals -= lost.amount
+
+    def test_consistent_state_reports_no_drift(self):
+        self.assertEqual(self.transactions.verify_aggregates(), {})
+
+    def test_history_lost_from_memory_is_reported(self):
+        self._lose_last_posting()
+        drift = self.transactions.verify_aggregates(self.account_id)
+        self.assertIn("transaction_count", drift[self.account_id])
+        summary = self.banking.transaction_service.get_account_summary(self.account_id, verify=True)
+        self.assertEqual(summary["drift"]["transaction_count"], {"running": 39, "recomputed": 40})
+
+    def test_verifies_from_snapshot_after_compaction(self):
+        self.snapshots.take(self.accounts, self.transactions, self.ledger, self.lock_manager)
+        self.assertGreater(self.snapshots.compact(self.ledger), 0)
+        self.banking.transaction_service.deposit(self.account_id, 1.0)
+        self.assertEqual(self.transactions.verify_aggregates(), {})
+
+        self._lose_last_posting()
+        self.assertIn(self.account_id, self.transactions.verify_aggregates())
+
+    def test_compacted_ledger_without_snapshot_is_refused(self):
+        self.snapshots.take(self.accounts, self.transactions, self.ledger, self.lock_manager)
+        self.snapshots.compact(self.ledger)
+        unattached = TransactionRepository(self.ledger)
+        with self.assertRaises(ValueError):
+            unattached.verify_aggregates()
+
+
+if __name__ == "__main__":
+    unittest.main()
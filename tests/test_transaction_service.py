@@ -0,0 +1,46 @@
+"""
+Tests for the write order of TransactionService deposits and withdrawals.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import unittest
+
+from application.transaction_service import TransactionService
+from domain.entities.checkingAccount import CheckingAccount
+from infrastructure.repository.account_repository import AccountRepository
+from infrastructure.repository.transaction_repository import TransactionRepository
+
+
+class _FailingTransactionRepository(TransactionRepository):
+    def save_transaction(self, transaction):
+        raise OSError("Simulated ledger failure")
+
+
+class LedgerFirstTest(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = AccountRepository()
+        self.accounts.create_account(CheckingAccount("acct-1", 100.0, owner_name="Test Owner"))
+        self.service = TransactionService(self.accounts, _FailingTransactionRepository())
+
+    def test_failed_append_leaves_deposit_balance_unchanged(self):
+        with self.assertRaises(OSError):
+            self.service.deposit("acct-1", 50.0)
+        self.assertEqual(self.accounts.get_account_by_id("acct-1").balance, 100.0)
+
+    def test_failed_append_leaves_withdrawal_balance_unchanged(self):
+        with self.assertRaises(OSError):
+            self.service.withdraw("acct-1", 30.0)
+        self.assertEqual(self.accounts.get_account_by_id("acct-1").balance, 100.0)
+
+    def test_successful_deposit_is_recorded(self):
+        transactions = TransactionRepository()
+        service = TransactionService(self.accounts, transactions)
+        transaction = service.deposit("acct-1", 50.0)
+        self.assertEqual(self.accounts.get_account_by_id("acct-1").balance, 150.0)
+        self.assertEqual(transactions.get_transaction_by_id(transaction.transaction_id).amount, 50.0)
+
+
+if __name__ == "__main__":
+    unittest.main()